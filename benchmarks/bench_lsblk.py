@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# Sentetik lsblk çıktısıyla aygıt incelemesi ölçümü (1000+ aygıt)
+# Kullanım: python3 benchmarks/bench_lsblk.py [aygıt_sayısı] [tekrar]
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "extfscheck.1.2", "usr", "share", "fscheck"))
+
+import devices
+
+
+def synthetic_records(count, generation=0):
+    """count bölüm içeren sahte lsblk kayıtları üret (her 4 bölüm bir disk)"""
+    records = []
+    for i in range(count):
+        disk = f"sd{i // 4:04d}"
+        if i % 4 == 0:
+            records.append({
+                "name": disk, "path": f"/dev/{disk}", "type": "disk", "fstype": None,
+                "mountpoint": None, "size": 4 * 10 ** 12, "label": None, "uuid": None,
+                "pkname": None, "rota": True, "partuuid": None,
+            })
+        name = f"{disk}p{i % 4 + 1}"
+        records.append({
+            "name": name, "path": f"/dev/{name}", "type": "part",
+            "fstype": "btrfs" if i % 5 == 0 else "ext4",
+            "mountpoint": f"/srv/data {i}" if i % 3 == 0 else None,
+            "size": 10 ** 12 + generation,
+            "label": f"Backup Volume {i}", "uuid": f"{i:08x}-0000-4000-8000-{generation:012x}",
+            "pkname": disk, "rota": i % 2 == 0, "partuuid": f"{i:08x}-01",
+        })
+    return records
+
+
+def as_json(records):
+    return json.dumps({"blockdevices": records})
+
+
+def as_pairs(records):
+    # Eski "lsblk -P" biçimi
+    lines = []
+    for r in records:
+        lines.append(" ".join(
+            f'{k.upper()}="{"" if r.get(k) is None else r[k]}"'
+            for k in ("name", "type", "fstype", "mountpoint", "size", "label")))
+    return "\n".join(lines)
+
+
+def legacy_load(text):
+    # Eski load_disks: iki ayrı ayrıştırma ve iç içe döngü
+    def parse(text):
+        out = []
+        for line in text.splitlines():
+            props = {}
+            for item in line.strip().split():
+                if "=" in item:
+                    key, val = item.split("=", 1)
+                    props[key] = val.strip('"')
+            out.append(props)
+        return out
+    disks = []
+    for props in parse(text):
+        if props.get("TYPE") in ["part", "disk"] and props.get("FSTYPE") in ["ext2", "ext3", "ext4", "btrfs"]:
+            disks.append(("/dev/" + props["NAME"], props["FSTYPE"], False))
+    info = {}
+    for props in parse(text):
+        devpath = "/dev/" + props.get("NAME", "")
+        for disk_path, fstype, is_system in disks:
+            if disk_path == devpath:
+                info[devpath] = f"{devpath} ({fstype}, {props.get('SIZE')})"
+                break
+    return disks, info
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    base = synthetic_records(count)
+    changed = synthetic_records(count)
+    for r in changed[1::100]:
+        r["mountpoint"] = "/mnt/changed"
+    base_json, changed_json = as_json(base), as_json(changed)
+    pairs = as_pairs(base)
+
+    def full_scan():
+        table = devices.DeviceTable()
+        table.update(devices.parse_lsblk(base_json))
+
+    table = devices.DeviceTable()
+    table.update(devices.parse_lsblk(base_json))
+
+    def incremental():
+        t = devices.DeviceTable()
+        t.devices = dict(table.devices)
+        return t.update(devices.parse_lsblk(changed_json))
+
+    results = {
+        "devices": len(base),
+        "legacy_parse_and_match_s": timed(lambda: legacy_load(pairs), repeat),
+        "json_parse_and_table_s": timed(full_scan, repeat),
+        "json_incremental_diff_s": timed(incremental, repeat),
+        "incremental_events": len(incremental()),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
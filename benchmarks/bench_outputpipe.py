@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# Çıktı hattı stres ölçümü: bir iş parçacığından 1M satır gönder
+# Kullanım: python3 benchmarks/bench_outputpipe.py [satır_sayısı]
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "extfscheck.1.2", "usr", "share", "fscheck"))
+
+import outputpipe
+
+
+class FakeMainLoop:
+    """GLib.timeout_add benzeri basit zamanlayıcı"""
+
+    def __init__(self):
+        self.timers = []
+        self.lock = threading.Lock()
+        self.counter = 0
+
+    def timeout_add(self, delay_ms, callback):
+        with self.lock:
+            self.counter += 1
+            heapq.heappush(self.timers, (time.monotonic() + delay_ms / 1000.0, self.counter, callback))
+
+    def run_until(self, done):
+        while True:
+            with self.lock:
+                item = self.timers[0] if self.timers else None
+            if item is None:
+                if done.is_set():
+                    return
+                time.sleep(0.001)
+                continue
+            if item[0] > time.monotonic():
+                time.sleep(min(0.005, item[0] - time.monotonic()))
+                continue
+            with self.lock:
+                heapq.heappop(self.timers)
+            item[2]()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    loop = FakeMainLoop()
+    view = []
+    delivered_chars = [0]
+
+    def deliver(text):
+        # Metin alanını taklit et: sona ekle, en fazla 5000 satır tut
+        view.extend(text.splitlines())
+        delivered_chars[0] += len(text)
+        del view[:-5000]
+
+    pipe = outputpipe.OutputPipe(deliver, loop.timeout_add)
+    done = threading.Event()
+
+    def producer():
+        for i in range(count):
+            pipe.push(f"Inode {i} has illegal block(s).  Clear? no")
+        done.set()
+
+    start = time.perf_counter()
+    thread = threading.Thread(target=producer)
+    thread.start()
+    loop.run_until(done)
+    thread.join()
+    pipe.flush()
+    elapsed = time.perf_counter() - start
+    stats = pipe.stats()
+    stats.update({
+        "lines": count,
+        "elapsed_s": elapsed,
+        "lines_per_s": count / elapsed,
+        "deliveries_per_s": stats["batches"] / elapsed,
+        "view_lines": len(view),
+        "last_line": view[-1] if view else None,
+    })
+    print(json.dumps(stats, indent=2))
+    # Değişmezler (tests/test_outputpipe.py ile aynı): tampon sınırlı, her satır teslim edildi ya da sayıldı
+    return 0 if (stats["max_backlog"] <= pipe.capacity
+                 and stats["delivered"] + stats["dropped"] == stats["pushed"] == count) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
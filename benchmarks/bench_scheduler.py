@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# Zamanlayıcı ölçümü: bir düzine ext4 imajını seri ve paralel incele
+# Kullanım: python3 benchmarks/bench_scheduler.py [imaj_sayısı] [boyut_MB]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "extfscheck.1.2", "usr", "share", "fscheck"))
+
+import scheduler
+
+
+def make_images(directory, count, size_mb):
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"bench{i:02d}.img")
+        with open(path, "wb") as f:
+            f.truncate(size_mb * 1024 * 1024)
+        subprocess.run(["mke2fs", "-q", "-F", "-t", "ext4", "-N", str(size_mb * 256), path], check=True)
+        paths.append(path)
+    return paths
+
+
+def run_forced(job, engine, on_line, on_exit):
+    # Temiz imajlarda da tam tarama yapılması için -f eklenir
+    return engine.spawn(["/sbin/e2fsck", "-f", "-n", job.path], on_line=on_line,
+                        on_exit=lambda proc_job: on_exit(proc_job.returncode, proc_job.error))
+
+
+def run(paths, workers, grouped=True):
+    sched = scheduler.ExamineScheduler(runner=run_forced, max_workers=workers)
+    for path in paths:
+        sched.submit(path, "ext4", scheduler.spindle_key(path) if grouped else None)
+    sched.wait()
+    return {
+        "workers": workers,
+        "spindle_grouping": grouped,
+        "wall_clock_s": sched.wall_clock,
+        "job_s": [round(j.elapsed, 4) for j in sched.jobs],
+        "returncodes": sorted({j.returncode for j in sched.jobs}),
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    size_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    with tempfile.TemporaryDirectory(prefix="fscheck-bench-") as tmp:
+        paths = make_images(tmp, count, size_mb)
+        results = {
+            "images": count,
+            "size_mb": size_mb,
+            "spindle_key": scheduler.spindle_key(paths[0]),
+            "serial": run(paths, 1),
+            "parallel": run(paths, os.cpu_count()),
+            "parallel_ungrouped": run(paths, os.cpu_count(), grouped=False),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Anlık görüntü kontrolü deneyi: döngü aygıtında geçici bir VG, yazma yükü altında bağlı ext4
+# Aynı anda doğrudan "e2fsck -n" ile anlık görüntü kontrolünü karşılaştırır (yanlış alarm sayısı)
+# Kullanım (root, lvm2 gerekli): python3 benchmarks/bench_snapshot.py [tekrar] [boyut_MB]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "extfscheck.1.2", "usr", "share", "fscheck"))
+
+import jobengine
+import snapshot
+
+VG = "fscheckbench"
+LV = "data"
+
+
+def sh(*cmd):
+    return subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+
+
+def setup(tmp, size_mb):
+    """Seyrek dosya -> döngü aygıtı -> VG -> LV (yarısı anlık görüntüye boş kalır) -> ext4 -> bağla"""
+    backing = os.path.join(tmp, "pv.img")
+    with open(backing, "wb") as f:
+        f.truncate(size_mb * 1024 * 1024)
+    loop = sh("losetup", "--find", "--show", backing).strip()
+    sh("pvcreate", "-q", loop)
+    sh("vgcreate", "-q", VG, loop)
+    sh("lvcreate", "-q", "-y", "-n", LV, "-l", "50%VG", VG)
+    device = f"/dev/{VG}/{LV}"
+    sh("mke2fs", "-q", "-t", "ext4", device)
+    mountpoint = os.path.join(tmp, "mnt")
+    os.mkdir(mountpoint)
+    sh("mount", device, mountpoint)
+    return loop, device, mountpoint
+
+
+def teardown(loop, mountpoint):
+    for cmd in (["umount", mountpoint], ["vgremove", "-q", "-f", VG], ["pvremove", "-q", loop],
+                ["losetup", "-d", loop]):
+        subprocess.run(cmd, capture_output=True)
+
+
+def writer(mountpoint, stop):
+    # Sürekli dosya oluşturup silen yük: meta veriyi kontrol sırasında değiştirir
+    i = 0
+    while not stop.is_set():
+        path = os.path.join(mountpoint, f"f{i % 500}")
+        with open(path, "wb") as f:
+            f.write(os.urandom(4096 * (1 + i % 16)))
+        if i % 3 == 0:
+            os.remove(path)
+        i += 1
+
+
+def direct_check(device):
+    started = time.monotonic()
+    proc = subprocess.run(["/sbin/e2fsck", "-f", "-n", device], capture_output=True, text=True)
+    return {"returncode": proc.returncode, "seconds": round(time.monotonic() - started, 3)}
+
+
+def snapshot_check(device):
+    loop = jobengine.SelectorLoop()
+    # Deney kaynağı işaretlemez (tune2fs) ki her tekrar aynı başlasın
+    check = snapshot.SnapshotCheck(jobengine.JobEngine(loop), device, mark_origin=False).start()
+    loop.run_until(lambda: not check.running)
+    return {"returncode": check.returncode, "error": check.error, "seconds": round(check.elapsed, 3),
+            "steps_s": check.timings}
+
+
+def main():
+    if os.geteuid() != 0:
+        print("bench_snapshot.py must run as root (needs losetup and lvm2)", file=sys.stderr)
+        sys.exit(1)
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    size_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    with tempfile.TemporaryDirectory(prefix="fscheck-snap-") as tmp:
+        loop, device, mountpoint = setup(tmp, size_mb)
+        stop = threading.Event()
+        thread = threading.Thread(target=writer, args=(mountpoint, stop), daemon=True)
+        thread.start()
+        try:
+            direct = [direct_check(device) for _ in range(repeat)]
+            snap = [snapshot_check(device) for _ in range(repeat)]
+        finally:
+            stop.set()
+            thread.join()
+            teardown(loop, mountpoint)
+    print(json.dumps({
+        "repeat": repeat,
+        "size_mb": size_mb,
+        # Dosya sistemi sağlam olduğu için sıfırdan farklı her kod yanlış alarmdır
+        "direct_false_positives": sum(1 for r in direct if r["returncode"] != 0),
+        "snapshot_false_positives": sum(1 for r in snap if r["returncode"] != 0),
+        "direct": direct,
+        "snapshot": snap,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# Yeniden üretilebilir ölçüm takımı: sentetik ext2/3/4 ve btrfs imajları, debugfs ile bilinen bozulmalar
+# İnceleme ve onarım yolları, çıktı hattı ve aygıt listesi (load_disks) tekrarlı ölçülür; sonuç JSON'dur
+# Kullanım: python3 benchmarks/bench_suite.py run [--sizes 64,256] [--fstypes ext4,btrfs] [--runs 5] [--output SONUÇ]
+#           python3 benchmarks/bench_suite.py compare ESKİ.json YENİ.json [--threshold 10]
+# root gerekmez: imajlar düz dosyadır, mke2fs -d / mkfs.btrfs --rootdir ile doldurulur,
+# onarım yardımcının test kipinde (düzenli dosyalar, pkexec'siz) çalışır
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "extfscheck.1.2", "usr", "share", "fscheck"))
+
+import devices
+import engine
+import fsckreport
+import helper
+import imagescan
+import jobengine
+import logstore
+import outputpipe
+
+EXT_FSTYPES = ("ext2", "ext3", "ext4")
+# Gerçek bir çökme gibi: durum "temiz değil" işaretlenir ki e2fsck -n kısayol almadan tam tarasın
+UNCLEAN = "ssv state 0"
+# Dizin başına dosya; ağaç düzeni d000/f00000 biçimindedir, bozulmalar bu adlara dayanır
+FILES_PER_DIR = 100
+MAX_FILE_SIZE = 32 * 1024
+# Bilinen bozulmalar (debugfs komutları); yorumlar e2fsck'nin onları bulduğu geçişi verir
+CORRUPTIONS = {
+    "cleared_inode": ["clri /d000/f00000"],  # 2: silinmiş inode'a işaret eden girdi
+    "link_count": ["sif /d000/f00001 links_count 7"],  # 4: bağ sayısı
+    "inode_bitmap": ["freei /d000/f00002"],  # 5: inode bit eşlemi farkları
+    "orphan_dir": ["unlink /d001"],  # 3: bağlantısız dizin -> lost+found
+    "summary_counts": ["ssv free_blocks_count 0", "ssv free_inodes_count 0"],  # 5: özet sayaçlar
+}
+# Karşılaştırmada bu süreden kısa farklar gürültü sayılır
+NOISE_FLOOR_S = 0.005
+
+
+def populate(directory, files, seed):
+    """Tohumla belirlenen dosya ağacı: her çalıştırmada aynı adlar, boyutlar ve içerik"""
+    rng = random.Random(seed)
+    for i in range(files):
+        subdir = os.path.join(directory, f"d{i // FILES_PER_DIR:03d}")
+        if i % FILES_PER_DIR == 0:
+            os.mkdir(subdir)
+        size = rng.randint(1, MAX_FILE_SIZE)
+        with open(os.path.join(subdir, f"f{i:05d}"), "wb") as f:
+            f.write(rng.randbytes(64) * (size // 64 + 1))
+        # Sert ve sembolik bağlar bağ sayısı ve kısa yol kontrollerini de çalıştırır
+        if i % 50 == 7:
+            os.link(os.path.join(subdir, f"f{i:05d}"), os.path.join(subdir, f"h{i:05d}"))
+        if i % 50 == 13:
+            os.symlink(f"f{i:05d}", os.path.join(subdir, f"s{i:05d}"))
+
+
+def make_image(path, fstype, size_mb, inode_ratio, source):
+    """Düz dosyada dosya sistemi oluştur ve doldur; araç yoksa None"""
+    with open(path, "wb") as f:
+        f.truncate(size_mb * 1024 * 1024)
+    if fstype in EXT_FSTYPES:
+        subprocess.run(["mke2fs", "-q", "-F", "-t", fstype, "-i", str(inode_ratio), "-d", source, path],
+                       check=True, capture_output=True)
+        debugfs(path, [UNCLEAN])
+    elif shutil.which("mkfs.btrfs"):
+        subprocess.run(["mkfs.btrfs", "-q", "-f", "--rootdir", source, path], check=True, capture_output=True)
+    else:
+        os.remove(path)
+        return None
+    return path
+
+
+def debugfs(path, commands):
+    subprocess.run(["debugfs", "-w", "-f", "-", path], input="\n".join(commands) + "\n",
+                   check=True, capture_output=True, text=True)
+
+
+def copy_image(source, target):
+    subprocess.run(["cp", "--sparse=always", source, target], check=True)
+    return target
+
+
+def stats(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "min": round(min(values), 4),
+        "median": round(statistics.median(values), 4),
+        "mean": round(statistics.fmean(values), 4),
+        "max": round(max(values), 4),
+    }
+
+
+def summarize(samples, expected):
+    """Tekrarların sonuçlarını tek ölçüme indir; beklenen sonuçtan sapma "ok": false olur"""
+    usage = [s.get("resources") or {} for s in samples]
+    verdicts = sorted({s["verdict"] for s in samples})
+    return {
+        "runs": len(samples),
+        "wall_s": stats([s["wall_s"] for s in samples]),
+        "user_s": stats([u.get("user_s") for u in usage]),
+        "sys_s": stats([u.get("sys_s") for u in usage]),
+        "peak_rss": max((u.get("peak_rss") or 0 for u in usage), default=0) or None,
+        "passes_s": {name: stats([s["passes"].get(name) for s in samples])
+                     for name in samples[0]["passes"]} if samples else {},
+        "verdicts": verdicts,
+        "expected": expected,
+        "ok": verdicts == [expected],
+    }
+
+
+def examine_once(path):
+    """Başsız motorun uçtan uca inceleme yolu (çözümleme, zamanlayıcı, ayrıştırıcı)"""
+    eng = engine.Engine(use_cache=False, write_reports=False, max_workers=1)
+    started = time.monotonic()
+    results, _, _ = eng.examine([path], force=True)
+    result = results[0]
+    return {
+        "wall_s": time.monotonic() - started,
+        "verdict": result["verdict"],
+        "resources": result.get("resources"),
+        "passes": {p["pass"]: p.get("real_s", p.get("duration_s")) for p in result.get("passes", [])},
+    }
+
+
+class Repairer:
+    """Onarımı arayüzün kullandığı yardımcı üzerinden yürüt (test kipi: düzenli dosyalar, root'suz)"""
+
+    def __init__(self, directory):
+        self.loop = jobengine.SelectorLoop()
+        self.jobs = jobengine.JobEngine(self.loop)
+        self.session = helper.Session(self.loop, os.path.join(directory, "helper.sock"), test_mode=True)
+
+    def repair_once(self, path, fstype):
+        parser = fsckreport.ReportParser(path, fstype, "repair")
+        done = []
+        started = time.monotonic()
+        self.session.launch(self.jobs, "repair", ["false"], on_line=parser.feed_line, on_exit=done.append,
+                            progress=jobengine.PROGRESS_FD, path=path, fstype=fstype)
+        self.loop.run_until(lambda: done)
+        wall = time.monotonic() - started
+        report = parser.finish(done[0].returncode)
+        return {
+            "wall_s": wall,
+            "verdict": report.verdict if not done[0].error else "failed",
+            "resources": getattr(done[0], "resources", None),
+            "passes": {p["pass"]: p.get("real_s", p["duration_s"]) for p in report.passes},
+        }
+
+    def close(self):
+        if self.session.client is not None:
+            self.session.client.close()
+        if self.session.proc is not None:
+            self.session.proc.terminate()
+            self.session.proc.wait()
+
+
+def bench_pipeline(directory, lines, total):
+    """Arayüzün çıktı hattı: ayrıştırıcı + hız sınırlı OutputPipe + sıkıştırılmış günlük"""
+    pending = []
+    log = logstore.LogStore("bench", directory=directory)
+    # Arayüz gibi: görünüm günlükten okunur, teslimat sadece bildirimdir
+    pipe = outputpipe.OutputPipe(lambda: None, lambda delay, callback: pending.append(callback), log=log,
+                                 notify_only=True)
+    parser = fsckreport.ReportParser("bench", "ext4")
+    started = time.monotonic()
+    for i in range(total):
+        line = lines[i % len(lines)]
+        parser.feed_line(line)
+        pipe.push(line)
+        # Ana döngü taklidi: her 1000 satırda bir planlanan teslimatlar çalışır
+        if i % 1000 == 999:
+            while pending:
+                pending.pop()()
+    while pending:
+        pending.pop()()
+    pipe.close()
+    wall = time.monotonic() - started
+    return {"wall_s": wall, "lines_per_s": round(total / wall) if wall else None, **pipe.stats()}
+
+
+def bench_load_disks(images):
+    """load_disks'in GTK dışı kısmı: lsblk taraması, tablo güncellemesi ve imaj girdileri"""
+    started = time.monotonic()
+    table = devices.DeviceTable()
+    try:
+        table.update(devices.probe(), None)
+        error = None
+    except Exception as e:
+        error = str(e)
+    image_devices = [imagescan.image_device(path) for path in images]
+    table.update([dev for dev in image_devices if dev is not None], set())
+    return {"wall_s": time.monotonic() - started, "devices": len(table), "error": error}
+
+
+def tool_versions():
+    return {tool: fsckreport.tool_version(tool) for tool in fsckreport.VERSION_COMMANDS}
+
+
+def run(args):
+    rng_seed = args.seed
+    results = {}
+    meta = {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "host": platform.node(),
+        "kernel": platform.release(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "tools": tool_versions(),
+        "params": {"sizes_mb": args.sizes, "fstypes": args.fstypes, "runs": args.runs,
+                   "inode_ratio": args.inode_ratio, "files_per_mb": args.files_per_mb, "seed": rng_seed},
+        # root olmadan sayfa önbelleği boşaltılamaz: ilk tekrar hariç ölçümler sıcak önbellektir
+        "cache": "warm",
+        "skipped": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="fscheck-suite-", dir=args.workdir) as tmp:
+        repairer = Repairer(tmp)
+        images = []
+        try:
+            for size_mb in args.sizes:
+                source = os.path.join(tmp, f"tree-{size_mb}")
+                os.mkdir(source)
+                populate(source, size_mb * args.files_per_mb, rng_seed)
+                for fstype in args.fstypes:
+                    name = f"{fstype}-{size_mb}MB"
+                    base = make_image(os.path.join(tmp, f"{name}.img"), fstype, size_mb, args.inode_ratio, source)
+                    if base is None:
+                        meta["skipped"].append(f"{name}: mkfs.{fstype} not available")
+                        continue
+                    images.append(base)
+                    results[f"{name}/clean/examine"] = summarize(
+                        [examine_once(base) for _ in range(args.runs)], "clean")
+                    if fstype not in EXT_FSTYPES:
+                        # debugfs sadece ext2/3/4 yazar; btrfs için sadece temiz inceleme ölçülür
+                        meta["skipped"].append(f"{name}: corruptions need debugfs (ext2/3/4 only)")
+                        continue
+                    for case, commands in CORRUPTIONS.items():
+                        corrupt = copy_image(base, os.path.join(tmp, f"{name}-{case}.img"))
+                        debugfs(corrupt, commands)
+                        images.append(corrupt)
+                        results[f"{name}/{case}/examine"] = summarize(
+                            [examine_once(corrupt) for _ in range(args.runs)], "errors")
+                        repairs = []
+                        for _ in range(args.runs):
+                            # Onarım imajı değiştirir; her tekrar bozuk kopyanın yeni kopyasıyla başlar
+                            target = copy_image(corrupt, os.path.join(tmp, "repair.img"))
+                            repairs.append(repairer.repair_once(target, fstype))
+                        results[f"{name}/{case}/repair"] = summarize(repairs, "fixed")
+                        after = examine_once(target)
+                        results[f"{name}/{case}/repair"]["clean_after"] = after["verdict"] == "clean"
+                        os.remove(target)
+            if images:
+                lines = subprocess.run(["/sbin/e2fsck", "-fn", "-tt", images[-1]], capture_output=True,
+                                       text=True).stdout.splitlines() or ["Pass 1: Checking inodes"]
+                samples = [bench_pipeline(tmp, lines, args.pipeline_lines) for _ in range(args.runs)]
+                results["pipeline"] = {"runs": len(samples), "wall_s": stats([s["wall_s"] for s in samples]),
+                                       "lines": args.pipeline_lines, "last": samples[-1]}
+            samples = [bench_load_disks(images) for _ in range(args.runs)]
+            results["load_disks"] = {"runs": len(samples), "wall_s": stats([s["wall_s"] for s in samples]),
+                                     "devices": samples[-1]["devices"], "error": samples[-1]["error"]}
+        finally:
+            repairer.close()
+    output = {"meta": meta, "results": results}
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    return 0 if all(r.get("ok", True) for r in results.values()) else 1
+
+
+def compare(args):
+    """İki sonuç dosyasının medyan sürelerini karşılaştır; gerileme ya da sonuç değişimi varsa 1"""
+    with open(args.old) as f:
+        old = json.load(f)["results"]
+    with open(args.new) as f:
+        new = json.load(f)["results"]
+    rows = []
+    failed = False
+    for key in sorted(set(old) & set(new)):
+        before = (old[key].get("wall_s") or {}).get("median")
+        after = (new[key].get("wall_s") or {}).get("median")
+        if before is None or after is None:
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        status = "ok"
+        if change > args.threshold and after - before > NOISE_FLOOR_S:
+            status = "REGRESSION"
+        elif change < -args.threshold and before - after > NOISE_FLOOR_S:
+            status = "faster"
+        if old[key].get("ok", True) and not new[key].get("ok", True):
+            status = "WRONG RESULT"
+        failed |= status in ("REGRESSION", "WRONG RESULT")
+        rows.append({"case": key, "old_s": before, "new_s": after, "change_pct": round(change, 1),
+                     "status": status})
+    for row in rows:
+        print(f'{row["case"]:<40} {row["old_s"]:>10.4f} {row["new_s"]:>10.4f} {row["change_pct"]:>+8.1f}%  '
+              f'{row["status"]}')
+    missing = sorted(set(old) ^ set(new))
+    if missing:
+        print(f"not in both: {', '.join(missing)}")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--sizes", type=lambda text: [int(s) for s in text.split(",")], default=[64, 256])
+    run_parser.add_argument("--fstypes", type=lambda text: text.split(","), default=["ext2", "ext3", "ext4", "btrfs"])
+    run_parser.add_argument("--runs", type=int, default=5)
+    # mke2fs -i: inode başına bayt (küçük değer = yoğun inode tablosu, uzun 1. geçiş)
+    run_parser.add_argument("--inode-ratio", type=int, default=16384)
+    run_parser.add_argument("--files-per-mb", type=int, default=20)
+    run_parser.add_argument("--pipeline-lines", type=int, default=200000)
+    run_parser.add_argument("--seed", type=int, default=1)
+    run_parser.add_argument("--workdir", help="imajların oluşturulacağı dizin (varsayılan: sistem geçici dizini)")
+    run_parser.add_argument("--output")
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="yüzde")
+    args = parser.parse_args()
+    sys.exit(run(args) if args.command == "run" else compare(args))
+
+
+if __name__ == "__main__":
+    main()
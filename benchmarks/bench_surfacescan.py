@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Yüzey taraması deneyi: bilinen okunamayan aralıklar tam LBA'larıyla bulunuyor mu, hız aygıta yakın mı
+# root ve dmsetup varsa döngü aygıtı üzerine dm-linear/dm-error tablosu kurulur (gerçek EIO),
+# yoksa seyrek olmayan imaj dosyası --inject-fault ile aynı aralıklarla taranır
+# Hız, aynı aygıtta "dd iflag=direct" ile karşılaştırılır
+# Kullanım: python3 benchmarks/bench_surfacescan.py [boyut_MB] [tekrar] [--no-dm]
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "extfscheck.1.2", "usr", "share", "fscheck"))
+
+import surfacescan
+
+DM_NAME = "fscheckbench-surface"
+SECTOR = 512
+# (başlangıç sektörü, sektör sayısı): hizasız tek sektör, blok içi aralık, parça sınırını aşan aralık
+FAULTS = ((10007, 1), (20480 + 3, 9), (surfacescan.DEFAULT_CHUNK // SECTOR * 3 - 4, 12))
+DD_BLOCK = "4M"
+
+
+def sh(*cmd):
+    return subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+
+
+def make_image(path, size_mb):
+    """Rastgele içerikli imaj: sıfır sayfaları ya da seyrek delikler okuma hızını şişirmesin"""
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+        os.fsync(f.fileno())
+
+
+def dm_setup(image, sectors):
+    """Döngü aygıtı -> FAULTS aralıkları dm-error, geri kalanı dm-linear"""
+    loop = sh("losetup", "--find", "--show", "--direct-io=on", image).strip()
+    table = []
+    position = 0
+    for start, length in sorted(FAULTS):
+        if start > position:
+            table.append(f"{position} {start - position} linear {loop} {position}")
+        table.append(f"{start} {length} error")
+        position = start + length
+    if position < sectors:
+        table.append(f"{position} {sectors - position} linear {loop} {position}")
+    try:
+        subprocess.run(["dmsetup", "create", DM_NAME], input="\n".join(table) + "\n", check=True,
+                       capture_output=True, text=True)
+    except subprocess.CalledProcessError:
+        sh("losetup", "-d", loop)
+        raise
+    return loop, f"/dev/mapper/{DM_NAME}"
+
+
+def dm_teardown(loop):
+    subprocess.run(["dmsetup", "remove", DM_NAME], capture_output=True)
+    subprocess.run(["losetup", "-d", loop], capture_output=True)
+
+
+def dd_rate(path, size):
+    """dd iflag=direct ile okuma hızı (bayt/s); dm-error aralıkları conv=noerror ile atlanır"""
+    start = time.monotonic()
+    subprocess.run(["dd", f"if={path}", "of=/dev/null", f"bs={DD_BLOCK}", "iflag=direct", "conv=noerror"],
+                   capture_output=True)
+    return size / (time.monotonic() - start)
+
+
+def scan(path, faults):
+    scanner = surfacescan.SurfaceScan(path, faults=faults)
+    scanner.open()
+    try:
+        scanner.run(lambda offset, length: None, lambda current: None)
+    finally:
+        scanner.close()
+    return scanner.as_dict()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    size_mb = int(args[0]) if args else 512
+    repeat = int(args[1]) if len(args) > 1 else 3
+    use_dm = "--no-dm" not in sys.argv and os.geteuid() == 0 and shutil.which("dmsetup") is not None
+    expected = sorted((start, length) for start, length in FAULTS)
+    scratch = os.environ.get("TMPDIR", "/var/tmp")
+    with tempfile.TemporaryDirectory(prefix="fscheck-surface-", dir=scratch) as tmp:
+        image = os.path.join(tmp, "disk.img")
+        make_image(image, size_mb)
+        size = size_mb * 1024 * 1024
+        loop = None
+        if use_dm:
+            try:
+                loop, path = dm_setup(image, size // SECTOR)
+                faults = []
+            except subprocess.CalledProcessError as e:
+                # Çekirdekte device-mapper yoksa (kapsayıcılar) hata enjeksiyonuyla sürdür
+                print(f"dm-error unavailable, using --inject-fault: {e.stderr.strip()}", file=sys.stderr)
+                use_dm = False
+        if not use_dm:
+            path = image
+            faults = [(start * SECTOR, length * SECTOR) for start, length in FAULTS]
+        try:
+            runs = [scan(path, faults) for _ in range(repeat)]
+            dd = [dd_rate(path, size) for _ in range(repeat)]
+        finally:
+            if loop:
+                dm_teardown(loop)
+    found = sorted((entry["lba"], entry["sectors"]) for entry in runs[-1]["unreadable"])
+    best = max(run["mb_s"] for run in runs)
+    dd_best = max(dd) / 1e6
+    print(json.dumps({
+        "size_mb": size_mb,
+        "repeat": repeat,
+        "backend": "dm-error" if use_dm else "inject-fault",
+        "direct": runs[-1]["direct"],
+        "expected_unreadable": expected,
+        "found_unreadable": found,
+        "exact": found == expected,
+        "scan_mb_s": [run["mb_s"] for run in runs],
+        "dd_direct_mb_s": [round(rate / 1e6, 1) for rate in dd],
+        # 1'e yakınsa tarama aygıt bant genişliğine yakındır
+        "ratio_to_dd": round(best / dd_best, 2) if dd_best else None,
+        "slow_regions": runs[-1]["slow_regions"],
+    }, indent=2))
+    return 0 if found == expected else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+# Açılışta aygıt başına onarım: uygulamanın yazdığı iş listesi (UUID, tür, seçenekler) okunur ve
+# bağımsız dosya sistemleri fiziksel diske göre gruplanıp paralel onarılır (fsck -A geçişleri gibi:
+# önce kök, sonra diğerleri). Aygıt başına süreler günlüğe (journal) yapılandırılmış alanlarla yazılır.
+# btrfs: bağlı olmayan birimler "btrfs check" ile, bağlı kök birim bağlandıktan sonra scrub ile denetlenir.
+# Tüm çalıştırma bir süre bütçesiyle sınırlıdır; aşılırsa işler durdurulur ve açılış normal sürer.
+import argparse
+import configparser
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import discovery
+import fsckreport
+import scheduler
+import scrub
+import superblock
+import surfacescan
+
+# /etc kök dosya sistemindedir; /var bu aşamada henüz bağlı olmayabilir
+MANIFEST_PATH = "/etc/fscheck/boot-jobs.json"
+# Sonuçlar tmpfs'e yazılır; arayüz açıldığında okur, sonraki açılışta kendiliğinden silinir
+RESULTS_PATH = "/run/fscheck/boot-results.json"
+CONFIG_PATH = "/etc/fscheck/boot.conf"
+# Her olay bir JSON satırı (ilerleme ve süreler); kabuk betiği de aynı biçimde yazar. Onarım
+# sırasında kök salt okunur, /var ayrı bir dosya sistemiyse henüz bağlı değildir: olaylar önce
+# tmpfs'teki kuyruğa yazılır, local-fs sonrası fscheck-boot-log.service ile LOGFILE'a eklenir
+LOGFILE = "/var/log/fscheck-boot.log"
+LOG_SPOOL = "/run/fscheck/boot-log.jsonl"
+JOURNAL_SOCKET = "/run/systemd/journal/socket"
+BY_UUID_DIR = "/dev/disk/by-uuid"
+SYSLOG_IDENTIFIER = "fscheck-boot"
+# repair: e2fsck -y / btrfs check --repair / scrub, check: salt okunur kontrol (sadece rapor)
+MODES = ("repair", "check")
+BOOT_FSTYPES = ("ext2", "ext3", "ext4", "btrfs")
+MOUNT_TIMEOUT = 60
+# Yapılandırma yoksa kullanılan değerler; time_budget saniyedir, 0 sınırsız demektir
+DEFAULT_CONFIG = {
+    "time_budget": 900,
+    "workers": 0,
+    "progress_interval": 10,
+    # Bağlı btrfs kök birimi: scrub (bağlandıktan sonra, ön planda) ya da skip
+    "btrfs_root": "scrub",
+}
+BTRFS_ROOT_ACTIONS = ("scrub", "skip")
+SCRUB_CANCEL_TIMEOUT = 30
+
+
+def load_config(path=CONFIG_PATH):
+    """[boot] bölümündeki ayarlar; eksik ya da geçersiz değerler için varsayılanlar"""
+    config = dict(DEFAULT_CONFIG)
+    parser = configparser.ConfigParser()
+    try:
+        parser.read(path, encoding="utf-8")
+    except configparser.Error:
+        return config
+    if "boot" not in parser:
+        return config
+    section = parser["boot"]
+    for key in ("time_budget", "workers", "progress_interval"):
+        try:
+            value = section.getint(key, fallback=config[key])
+        except ValueError:
+            continue
+        if value >= 0:
+            config[key] = value
+    btrfs_root = section.get("btrfs_root", config["btrfs_root"])
+    if btrfs_root in BTRFS_ROOT_ACTIONS:
+        config["btrfs_root"] = btrfs_root
+    return config
+
+
+def log_event(event, path=None, **fields):
+    """Makinece okunabilir günlük: her olay bir JSON satırı, /run'daki kuyruğa eklenir
+
+    Kuyruk yazılamazsa kayıt kaybolmasın diye journal'a gönderilir.
+    """
+    record = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "event": event}
+    record.update(fields)
+    path = path or LOG_SPOOL
+    line = json.dumps(record)
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o755, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(line + "\n")
+    except OSError as e:
+        journal_send(f"fscheck: cannot write {path}: {e}: {line}", priority=4)
+
+
+def flush_log(spool=LOG_SPOOL, logfile=LOGFILE):
+    """Kuyruktaki olayları kalıcı günlüğe ekle (local-fs sonrası); eklenen satır sayısı
+
+    Kuyruk önce yeniden adlandırılır: ekleme sırasında yazılan olaylar yeni kuyruğa gider.
+    Ekleme başarısız olursa kuyruk yerinde kalır ve hata yükseltilir.
+    """
+    pending = spool + ".flushing"
+    count = 0
+    # Önceki yarım kalmış ekleme varsa önce o, sonra yeni kuyruk (sıra korunur)
+    for _ in range(2):
+        if not os.path.exists(pending):
+            try:
+                os.rename(spool, pending)
+            except FileNotFoundError:
+                break
+        with open(pending) as f:
+            lines = f.readlines()
+        os.makedirs(os.path.dirname(logfile), mode=0o755, exist_ok=True)
+        with open(logfile, "a") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.remove(pending)
+        count += len(lines)
+    return count
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """İş listesi; dosya yoksa ya da bozuksa boş liste"""
+    try:
+        with open(path) as f:
+            jobs = json.load(f).get("jobs", [])
+    except (OSError, ValueError, AttributeError):
+        return []
+    return [job for job in jobs if isinstance(job, dict) and job.get("uuid")]
+
+
+def save_manifest(jobs, path=MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), mode=0o755, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": 1, "jobs": jobs}, f, indent=2)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def add_job(uuid, fstype, device=None, mode="repair", force=True, path=MANIFEST_PATH):
+    """Aygıtı sonraki açılışın onarım listesine ekle; aynı UUID'nin eski kaydının yerine geçer"""
+    if fstype not in BOOT_FSTYPES:
+        raise ValueError(f"Boot repair is not available for {fstype}")
+    if mode not in MODES:
+        raise ValueError(f"Unknown boot mode: {mode}")
+    jobs = [job for job in load_manifest(path) if job["uuid"] != uuid]
+    jobs.append({"uuid": uuid, "fstype": fstype, "device": device, "mode": mode, "force": bool(force),
+                 "added": time.time()})
+    save_manifest(jobs, path)
+    return jobs
+
+
+def resolve(job):
+    """UUID'den aygıt yolu; aygıt adları açılışlar arasında değişebilir, ipucu sadece yedektir"""
+    candidate = os.path.join(BY_UUID_DIR, job["uuid"])
+    if os.path.exists(candidate):
+        return os.path.realpath(candidate)
+    hint = job.get("device")
+    if hint:
+        info = superblock.try_probe(hint)
+        if info is not None and info.uuid == job["uuid"]:
+            return hint
+    return None
+
+
+def mountpoints(device, path=discovery.MOUNTINFO_PATH):
+    """Aygıtın bağlama noktaları (mountinfo'daki major:minor ile, ad eşlemesine gerek yok)"""
+    try:
+        rdev = os.stat(device).st_rdev
+    except OSError:
+        return []
+    wanted = f"{os.major(rdev)}:{os.minor(rdev)}"
+    found = []
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) > 4 and parts[2] == wanted:
+                found.append(parts[4].replace("\\040", " "))
+    return found
+
+
+def repair_command(device, mode="repair", force=True, bad_blocks=None):
+    # -tt: geçiş başına süreler rapora ve günlüğe yazılır
+    cmd = ["/sbin/e2fsck", "-y" if mode == "repair" else "-n"]
+    if force:
+        cmd.append("-f")
+    # Yüzey taramasının listesi yalnızca onarımda kötü blok olarak işaretlenir (-l)
+    if bad_blocks and mode == "repair":
+        cmd += ["-l", bad_blocks]
+    return cmd + ["-tt", device]
+
+
+def btrfs_command(device, mode="repair"):
+    return ["btrfs", "check", "--repair" if mode == "repair" else "--readonly", device]
+
+
+def scrub_cancel(mountpoint):
+    # Yarıda kalan scrub uygulamadan "Online scrub" ile sürdürülebilir (scrub resume)
+    subprocess.run(scrub.cancel_command(mountpoint), capture_output=True, timeout=SCRUB_CANCEL_TIMEOUT)
+
+
+def journal_send(message, priority=6, **fields):
+    """Günlüğe yerel protokolle yapılandırılmış kayıt; journald yoksa stdout (servis çıktısı)"""
+    entry = {"MESSAGE": message, "PRIORITY": str(priority), "SYSLOG_IDENTIFIER": SYSLOG_IDENTIFIER}
+    entry.update({f"FSCHECK_{key.upper()}": value for key, value in fields.items() if value is not None})
+    data = "".join(f"{key}={str(value).replace(chr(10), ' ')}\n" for key, value in entry.items())
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(data.encode(), JOURNAL_SOCKET)
+        return
+    except OSError:
+        pass
+    print(message, flush=True)
+
+
+def remount_root(mode):
+    proc = subprocess.run(["mount", "-o", f"remount,{mode}", "/"], capture_output=True, text=True,
+                          timeout=MOUNT_TIMEOUT)
+    return proc.returncode == 0, proc.stderr.strip()
+
+
+class BootRun:
+    """Bir açılıştaki tüm işler: kök önce tek başına, sonra diğerleri disk grubu başına sırayla
+
+    Süre bütçesi tüm çalıştırma içindir: her iş kalan süreyle başlatılır ve süre dolunca
+    SIGTERM ile durdurulur (e2fsck 32 ile güvenle çıkar, scrub iptal edilir). btrfs check
+    --repair yarıda kesilemez; bütçe dolduysa başlatılmaz ama başladıysa bitmesi beklenir.
+    """
+
+    def __init__(self, jobs, config=None):
+        self.jobs = jobs
+        self.config = dict(DEFAULT_CONFIG, **(config or {}))
+        self.max_workers = self.config["workers"] or None
+        self.results = []
+        self.started = None
+        self.finished = None
+        self.deadline = None
+
+    @property
+    def remaining(self):
+        """Bütçeden kalan saniye; bütçe yoksa None"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def run(self):
+        self.started = time.time()
+        if self.config["time_budget"]:
+            self.deadline = time.monotonic() + self.config["time_budget"]
+        log_event("start", jobs=len(self.jobs), time_budget=self.config["time_budget"] or None)
+        root, others = [], []
+        for job in self.jobs:
+            entry = {"uuid": job["uuid"], "fstype": job.get("fstype", "ext4"), "mode": job.get("mode", "repair"),
+                     "force": job.get("force", True), "device": resolve(job), "action": None,
+                     "mountpoint": None, "returncode": None, "verdict": None, "error": None, "seconds": None,
+                     "timed_out": False, "passes": []}
+            self.results.append(entry)
+            mounted = mountpoints(entry["device"]) if entry["device"] else []
+            if entry["fstype"] not in BOOT_FSTYPES or entry["mode"] not in MODES:
+                self._skip(entry, f"unsupported job ({entry['fstype']}, {entry['mode']})")
+            elif entry["device"] is None:
+                self._skip(entry, "device not found")
+            elif "/" in mounted and entry["fstype"] == "btrfs":
+                # Bağlı btrfs kökünde btrfs check güvenilir değil; bağlıyken scrub sağlama toplamlarını denetler
+                if self.config["btrfs_root"] == "skip":
+                    self._skip(entry, "btrfs root scrub disabled in configuration")
+                    continue
+                entry.update(action="scrub", mountpoint="/")
+                root.append(entry)
+            elif "/" in mounted:
+                entry["action"] = "e2fsck"
+                root.append(entry)
+            elif mounted:
+                self._skip(entry, f"mounted on {', '.join(mounted)}")
+            else:
+                entry["action"] = "btrfs check" if entry["fstype"] == "btrfs" else "e2fsck"
+                others.append(entry)
+        for entry in root:
+            if entry["action"] == "scrub":
+                self._run_pass([entry])
+                continue
+            # Kök salt okunur bağlanmadan onarılamaz (eski /forcefsck akışıyla aynı)
+            ok, error = remount_root("ro")
+            if not ok:
+                self._skip(entry, f"cannot remount / read-only: {error}")
+                continue
+            self._run_pass([entry])
+            ok, error = remount_root("rw")
+            if not ok:
+                journal_send(f"fscheck: cannot remount / read-write: {error}", priority=3)
+        self._run_pass(others)
+        self.finished = time.time()
+        return self
+
+    def _skip(self, entry, error, verdict="failed"):
+        entry["error"] = error
+        entry["verdict"] = verdict
+        entry["returncode"] = fsckreport.EXIT_OPERATIONAL
+        journal_send(f"fscheck: {entry['device'] or entry['uuid']} skipped: {error}", priority=4,
+                     uuid=entry["uuid"], device=entry["device"], verdict="skipped")
+        log_event("skip", uuid=entry["uuid"], device=entry["device"], error=error)
+
+    def _run_pass(self, entries):
+        if not entries:
+            return
+        sched = scheduler.ExamineScheduler(runner=self._runner, max_workers=self.max_workers)
+        for entry in entries:
+            action = "repair" if entry["mode"] == "repair" else "examine"
+            if entry["action"] == "scrub":
+                action = "scrub"
+            sched.submit(entry["device"], entry["fstype"], scheduler.spindle_key(entry["device"]), entry=entry,
+                         superblock=superblock.try_probe(entry["device"]), timed_out=False, budget_exceeded=False,
+                         parser=fsckreport.ReportParser(entry["device"], entry["fstype"], action))
+        timer = [None]
+
+        def report_progress():
+            # İlerleme aralıklarla günlüğe yazılır: açılış uzarsa hangi aygıtın nerede olduğu görülür
+            for job in sched.jobs:
+                if job.state == scheduler.Job.RUNNING:
+                    log_event("progress", device=job.path, action=job.entry["action"],
+                              fraction=round(job.progress, 4) if job.progress is not None else None,
+                              stage=job.progress_model.stage if job.progress_model else None,
+                              elapsed_s=round(job.elapsed, 1), remaining_budget_s=self._rounded_remaining())
+            if sched.pending():
+                timer[0] = sched.loop.call_later(self.config["progress_interval"], report_progress)
+
+        if self.config["progress_interval"]:
+            timer[0] = sched.loop.call_later(self.config["progress_interval"], report_progress)
+        sched.wait()
+        if timer[0] is not None:
+            sched.loop.cancel_timer(timer[0])
+        for job in sched.jobs:
+            self._record(job)
+
+    def _rounded_remaining(self):
+        remaining = self.remaining
+        return round(remaining, 1) if remaining is not None else None
+
+    def _runner(self, job, engine, on_line, on_exit):
+        entry = job.entry
+        remaining = self.remaining
+        if remaining is not None and remaining <= 0:
+            job.budget_exceeded = True
+            on_exit(None, "time budget exceeded before start")
+            return None
+        mode, handle_line, feed = scheduler.job_progress(job, on_line)
+
+        def on_output(line):
+            job.parser.feed_line(line)
+            handle_line(line)
+
+        def finished(proc_job):
+            job.resources = proc_job.resources
+            job.timed_out = proc_job.timed_out
+            if proc_job.timed_out and entry["action"] == "scrub":
+                scrub_cancel(entry["mountpoint"])
+            on_exit(proc_job.returncode, proc_job.error)
+
+        timeout = remaining
+        if entry["action"] == "scrub":
+            # Açılışta başka yük yok: kısıtlamasız öncelik
+            cmd = scrub.start_command(entry["mountpoint"], entry["mode"] != "repair", profile="full")
+        elif entry["fstype"] == "btrfs":
+            cmd = btrfs_command(entry["device"], entry["mode"])
+            if entry["mode"] == "repair":
+                # Yarıda kesilen btrfs onarımı dosya sistemini bozabilir
+                timeout = None
+        else:
+            cmd = repair_command(entry["device"], entry["mode"], entry["force"],
+                                 surfacescan.bad_blocks_file(entry["uuid"]))
+        journal_send(f"fscheck: starting {entry['action']} ({entry['mode']}) of {entry['device']}",
+                     uuid=entry["uuid"], device=entry["device"])
+        log_event("begin", uuid=entry["uuid"], device=entry["device"], fstype=entry["fstype"],
+                  action=entry["action"], mode=entry["mode"], timeout_s=round(timeout, 1) if timeout else None)
+        return engine.spawn(cmd, on_line=on_output, on_progress=feed, on_exit=finished, progress=mode,
+                            timeout=timeout, kill_grace=None)
+
+    def _record(self, job):
+        entry = job.entry
+        if job.budget_exceeded:
+            self._skip(entry, "time budget exceeded", verdict="skipped")
+            return
+        returncode = job.returncode
+        if entry["action"] == "scrub" and not job.timed_out:
+            # scrub çıkış kodu ve sayaçları e2fsck bitlerine çevrilir (BootRun.returncode bunları birleştirir)
+            returncode = scrub.exit_code(job.returncode, job.parser.scrub)
+        report = job.parser.finish(returncode)
+        report.resources = job.resources
+        verdict = report.verdict
+        if job.timed_out:
+            verdict = "cancelled"
+        elif job.error:
+            verdict = "failed"
+        entry.update(returncode=returncode, verdict=verdict, error=job.error, seconds=round(job.elapsed, 3),
+                     timed_out=job.timed_out, resources=job.resources, problems=report.problems_total,
+                     tool_version=report.tool_version,
+                     passes=[{"pass": p["pass"], "seconds": p.get("real_s", p["duration_s"])} for p in report.passes])
+        if job.progress_model is not None:
+            entry["progress"] = job.progress_model.snapshot()
+        fields = {f"pass_{p['pass']}_s": p["seconds"] for p in entry["passes"]}
+        failed = entry["verdict"] in ("errors", "failed", "cancelled")
+        suffix = ", time budget exceeded" if job.timed_out else ""
+        journal_send(f"fscheck: {entry['device']} {entry['verdict']} in {entry['seconds']:.1f}s "
+                     f"(exit {job.returncode}, {report.problems_total} problems{suffix})",
+                     priority=3 if failed else 6, uuid=entry["uuid"], device=entry["device"],
+                     fstype=entry["fstype"], mode=entry["mode"], action=entry["action"], exit=job.returncode,
+                     verdict=entry["verdict"], seconds=entry["seconds"], problems=report.problems_total,
+                     timed_out=int(job.timed_out), **fields)
+        log_event("finish", uuid=entry["uuid"], device=entry["device"], action=entry["action"],
+                  verdict=entry["verdict"], returncode=returncode, seconds=entry["seconds"],
+                  timed_out=job.timed_out, problems=report.problems_total, passes=entry["passes"],
+                  resources=job.resources)
+
+    @property
+    def returncode(self):
+        # fsck -A gibi: tüm aygıtların çıkış bitlerinin birleşimi
+        code = 0
+        for entry in self.results:
+            code |= entry["returncode"] or 0
+        return code
+
+    def as_dict(self):
+        return {
+            "started": self.started,
+            "finished": self.finished,
+            "wall_s": round(self.finished - self.started, 3) if self.finished else None,
+            "returncode": self.returncode,
+            "jobs": self.results,
+        }
+
+
+def write_results(run, path=RESULTS_PATH):
+    os.makedirs(os.path.dirname(path), mode=0o755, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(run.as_dict(), f, indent=2)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+def load_results(path=RESULTS_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def run_manifest(manifest_path=MANIFEST_PATH, results_path=RESULTS_PATH, config=None):
+    """Listeyi çalıştır, sonucu yaz ve listeyi sil (başarısız işler açılışı döngüye sokmasın)"""
+    jobs = load_manifest(manifest_path)
+    if not jobs:
+        return 0
+    boot_run = BootRun(jobs, config if config is not None else load_config()).run()
+    wall = round(boot_run.finished - boot_run.started, 3)
+    journal_send(f"fscheck: boot repair of {len(jobs)} filesystem(s) finished in "
+                 f"{wall:.1f}s (exit {boot_run.returncode})", exit=boot_run.returncode, seconds=wall)
+    log_event("summary", wall_s=wall, returncode=boot_run.returncode,
+              verdicts={entry["device"] or entry["uuid"]: entry["verdict"] for entry in boot_run.results})
+    try:
+        write_results(boot_run, results_path)
+    except OSError as e:
+        journal_send(f"fscheck: cannot write results: {e}", priority=3)
+    try:
+        os.remove(manifest_path)
+    except OSError as e:
+        journal_send(f"fscheck: cannot remove {manifest_path}: {e}", priority=3)
+    return boot_run.returncode
+
+
+if __name__ == "__main__":
+    # Kullanım: bootrepair.py add AYGIT TÜR [--mode repair|check] [--no-force]
+    #           bootrepair.py run [--workers N] [--time-budget SN] [--config YOL]   (fscheck-boot.sh'den)
+    #           bootrepair.py flush-log   (fscheck-boot-log.service'ten, local-fs sonrası)
+    #           bootrepair.py list | results
+    arg_parser = argparse.ArgumentParser()
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    add_parser = commands.add_parser("add")
+    add_parser.add_argument("device")
+    add_parser.add_argument("fstype", choices=BOOT_FSTYPES)
+    add_parser.add_argument("--mode", choices=MODES, default="repair")
+    add_parser.add_argument("--no-force", dest="force", action="store_false")
+    add_parser.add_argument("--manifest", default=MANIFEST_PATH)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--workers", type=int)
+    run_parser.add_argument("--time-budget", type=int)
+    run_parser.add_argument("--config", default=CONFIG_PATH)
+    run_parser.add_argument("--manifest", default=MANIFEST_PATH)
+    run_parser.add_argument("--results", default=RESULTS_PATH)
+    flush_parser = commands.add_parser("flush-log")
+    flush_parser.add_argument("--spool", default=LOG_SPOOL)
+    flush_parser.add_argument("--logfile", default=LOGFILE)
+    list_parser = commands.add_parser("list")
+    list_parser.add_argument("--manifest", default=MANIFEST_PATH)
+    results_parser = commands.add_parser("results")
+    results_parser.add_argument("--results", default=RESULTS_PATH)
+    args = arg_parser.parse_args()
+    if args.command == "add":
+        probed = superblock.try_probe(args.device)
+        if probed is None or not probed.uuid:
+            print(f"{args.device}: filesystem UUID not readable", file=sys.stderr)
+            sys.exit(fsckreport.EXIT_OPERATIONAL)
+        add_job(probed.uuid, args.fstype, args.device, args.mode, args.force, args.manifest)
+        sys.exit(0)
+    if args.command == "run":
+        boot_config = load_config(args.config)
+        if args.workers is not None:
+            boot_config["workers"] = args.workers
+        if args.time_budget is not None:
+            boot_config["time_budget"] = args.time_budget
+        sys.exit(run_manifest(args.manifest, args.results, boot_config))
+    if args.command == "flush-log":
+        try:
+            flush_log(args.spool, args.logfile)
+        except OSError as e:
+            print(f"cannot append {args.spool} to {args.logfile}: {e}", file=sys.stderr)
+            sys.exit(fsckreport.EXIT_OPERATIONAL)
+        sys.exit(0)
+    if args.command == "list":
+        print(json.dumps(load_manifest(args.manifest), indent=2))
+        sys.exit(0)
+    print(json.dumps(load_results(args.results), indent=2))
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# Tek geçişli lsblk --json incelemesi ve artımlı aygıt tablosu
+import json
+import os
+import subprocess
+
+import superblock
+
+LSBLK_COLUMNS = "NAME,PATH,TYPE,FSTYPE,MOUNTPOINT,SIZE,LABEL,UUID,PKNAME,ROTA,PARTUUID"
+SUPPORTED_FSTYPES = ("ext2", "ext3", "ext4", "btrfs")
+# lvm: LVM mantıksal birimleri (bağlıysa anlık görüntü üzerinden incelenebilir)
+SUPPORTED_TYPES = ("part", "disk", "lvm")
+# snapshot.SnapshotCheck'in geçici anlık görüntüleri (lsblk adında LV adındaki "-" iki kez yazılır)
+SNAPSHOT_NAME_MARK = "-fscheck--snap--"
+# Kullanıcının eklediği imaj dosyaları; lsblk taramasında görünmez, taramayla silinmez
+IMAGE_TYPE = "image"
+
+
+def format_size(size):
+    """Bayt değerini lsblk gibi okunur biçime çevir (örn. 931,5G -> 931.5G)"""
+    size = float(size or 0)
+    for unit in ("B", "K", "M", "G", "T", "P"):
+        if size < 1024 or unit == "P":
+            break
+        size /= 1024
+    if unit == "B":
+        return f"{int(size)}B"
+    text = f"{size:.1f}".rstrip("0").rstrip(".")
+    return f"{text}{unit}"
+
+
+def _as_bool(value):
+    # lsblk sürümüne göre ROTA true/false ya da "1"/"0" olabilir
+    if isinstance(value, str):
+        return value.strip() in ("1", "true")
+    return bool(value)
+
+
+def _as_int(value):
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class Device:
+    """lsblk'den okunan tek bir blok aygıtı"""
+
+    FIELDS = ("name", "path", "type", "fstype", "mountpoint", "size",
+              "label", "uuid", "pkname", "rotational", "partuuid", "is_system")
+
+    def __init__(self, name, path=None, type="", fstype="", mountpoint="", size=0,
+                 label="", uuid="", pkname="", rotational=False, partuuid="", is_system=False):
+        self.name = name
+        self.path = path or "/dev/" + name
+        self.type = type
+        self.fstype = fstype
+        self.mountpoint = mountpoint
+        self.size = size
+        self.label = label
+        self.uuid = uuid
+        self.pkname = pkname
+        self.rotational = rotational
+        self.partuuid = partuuid
+        self.is_system = is_system
+        # Okunabiliyorsa doğrudan süper bloktan alınan bilgiler
+        self.superblock = None
+
+    @classmethod
+    def from_lsblk(cls, record, system_devices=()):
+        path = record.get("path") or "/dev/" + record.get("name", "")
+        mountpoint = record.get("mountpoint") or ""
+        return cls(
+            name=record.get("name", ""),
+            path=path,
+            type=record.get("type") or "",
+            fstype=record.get("fstype") or "",
+            mountpoint=mountpoint,
+            size=_as_int(record.get("size")),
+            label=record.get("label") or "",
+            uuid=record.get("uuid") or "",
+            pkname=record.get("pkname") or "",
+            rotational=_as_bool(record.get("rota")),
+            partuuid=record.get("partuuid") or "",
+            is_system=path in system_devices or mountpoint == "/",
+        )
+
+    def key(self):
+        return tuple(getattr(self, field) for field in self.FIELDS)
+
+    def __eq__(self, other):
+        return isinstance(other, Device) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def __repr__(self):
+        return f"Device({self.path!r}, {self.fstype!r})"
+
+    def is_supported(self):
+        # Desteklenen dosya sistemleri: ext2/3/4 ve BTRFS
+        return (
+            self.type in SUPPORTED_TYPES + (IMAGE_TYPE,)
+            and self.fstype in SUPPORTED_FSTYPES
+            and not self.name.startswith("loop")
+            and SNAPSHOT_NAME_MARK not in self.name
+            and self.size > 0
+        )
+
+    @property
+    def snapshot_capable(self):
+        """Anlık görüntüyle çevrimiçi kontrol sadece bağlı, LVM üzerindeki ext2/3/4 için (engine.Target ile aynı)"""
+        return bool(self.mountpoint) and self.type == "lvm" and self.fstype in ("ext2", "ext3", "ext4")
+
+    def refine(self):
+        """Aygıt okunabiliyorsa türü, etiketi ve UUID'yi süper bloktan al"""
+        if self.type not in SUPPORTED_TYPES or self.size <= 0:
+            return
+        if self.fstype and self.fstype not in SUPPORTED_FSTYPES:
+            return
+        if not os.access(self.path, os.R_OK):
+            return
+        info = superblock.try_probe(self.path)
+        if info is None or info.fstype not in SUPPORTED_FSTYPES:
+            return
+        self.superblock = info
+        self.fstype = info.fstype
+        self.label = info.label
+        self.uuid = info.uuid
+
+    def display_name(self):
+        system_tag = " [SYSTEM]" if self.is_system else ""
+        info = f"{self.path} ({self.fstype}, {format_size(self.size)}){system_tag}"
+        return f"{self.label} - {info}" if self.label else info
+
+    def as_tuple(self):
+        return self.path, self.fstype, self.is_system
+
+
+def run_lsblk(paths=None):
+    """lsblk'yi tek seferde JSON ve bayt cinsinden çalıştır"""
+    result = subprocess.run(
+        ["lsblk", "--json", "--bytes", "--list", "-o", LSBLK_COLUMNS] + list(paths or []),
+        capture_output=True, text=True
+    )
+    return result.stdout
+
+
+def parse_lsblk(text, system_devices=()):
+    """lsblk JSON çıktısını Device listesine çevir"""
+    if not text.strip():
+        return []
+    data = json.loads(text)
+    devices = []
+    # Yığın ters sırayla doldurulur: aygıtlar lsblk sırasıyla, alt aygıtlar üst aygıttan hemen sonra gelir
+    pending = list(reversed(data.get("blockdevices", [])))
+    while pending:
+        record = pending.pop()
+        # --list olmadan çağrılırsa alt aygıtlar iç içe gelir
+        pending.extend(reversed(record.get("children", [])))
+        devices.append(Device.from_lsblk(record, system_devices))
+    return devices
+
+
+def read_system_devices(path="/proc/mounts"):
+    """Kök dizine bağlı aygıtları bul"""
+    system_devices = set()
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[0].startswith("/dev/") and parts[1] == "/":
+                system_devices.add(parts[0])
+    return system_devices
+
+
+def probe(paths=None):
+    """Aygıtları incele (paths verilirse sadece o aygıtlar ve alt bölümleri)"""
+    if paths is not None:
+        paths = [p for p in paths if os.path.exists(p)]
+        if not paths:
+            return []
+    found = parse_lsblk(run_lsblk(paths), read_system_devices())
+    for dev in found:
+        dev.refine()
+    return found
+
+
+class DeviceTable:
+    """Yola göre anahtarlanmış aygıt tablosu; önceki anlık görüntüyle fark çıkarır"""
+
+    def __init__(self):
+        self.devices = {}
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __iter__(self):
+        return iter(self.devices.values())
+
+    def get(self, path):
+        return self.devices.get(path)
+
+    def paths(self):
+        return list(self.devices)
+
+    def update(self, devices, scope=None):
+        """Yeni anlık görüntüyü uygula ve (olay, aygıt) listesi döndür
+
+        scope verilmezse tam tarama kabul edilir. scope bir aygıt adları kümesiyse
+        sadece bu aygıtlar ve bunların alt bölümleri yeniden değerlendirilir.
+        """
+        incoming = {}
+        for dev in devices:
+            if dev.is_supported():
+                incoming[dev.path] = dev
+        if scope is None:
+            in_scope = {path for path, dev in self.devices.items() if dev.type != IMAGE_TYPE}
+        else:
+            in_scope = {
+                path for path, dev in self.devices.items()
+                if dev.name in scope or dev.pkname in scope
+            }
+        events = []
+        for path in list(self.devices):
+            if path in in_scope and path not in incoming:
+                events.append(("remove", self.devices.pop(path)))
+        for path, dev in incoming.items():
+            old = self.devices.get(path)
+            if old is None:
+                self.devices[path] = dev
+                events.append(("add", dev))
+            elif old != dev:
+                self.devices[path] = dev
+                events.append(("change", dev))
+        return events
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# Olay tabanlı aygıt keşfi: çekirdek uevent'leri ve bağlama (mount) değişiklikleri
+# Periyodik lsblk taraması yerine sadece değişen aygıtlar yeniden incelenir
+import os
+import socket
+import sys
+
+NETLINK_KOBJECT_UEVENT = 15
+# 1: çekirdek grubu (udev'in yeniden yayınladığı grup 2 root gerektirebilir)
+UEVENT_KERNEL_GROUP = 1
+MOUNTINFO_PATH = "/proc/self/mountinfo"
+
+
+def parse_uevent(data):
+    """Çekirdekten gelen ham uevent paketini sözlüğe çevir"""
+    fields = data.split(b"\0")
+    event = {}
+    header = fields[0].decode("utf-8", "replace")
+    if "@" in header:
+        event["ACTION"], event["DEVPATH"] = header.split("@", 1)
+    for field in fields[1:]:
+        if b"=" not in field:
+            continue
+        key, val = field.split(b"=", 1)
+        event[key.decode("utf-8", "replace")] = val.decode("utf-8", "replace")
+    return event
+
+
+def event_devname(event):
+    """Olaydaki aygıt adını döndür (örn. sdb1)"""
+    name = event.get("DEVNAME")
+    if name:
+        return os.path.basename(name)
+    devpath = event.get("DEVPATH", "")
+    return os.path.basename(devpath) if devpath else None
+
+
+class DeviceChanges:
+    """Bir olay grubunun sonucunda değişen ve kaldırılan aygıtlar"""
+
+    def __init__(self):
+        self.changed = set()
+        self.removed = set()
+        self.mounts_changed = False
+
+    def add_event(self, event):
+        if event.get("SUBSYSTEM") != "block":
+            return
+        name = event_devname(event)
+        if not name:
+            return
+        if event.get("ACTION") == "remove":
+            self.changed.discard(name)
+            self.removed.add(name)
+        else:
+            self.removed.discard(name)
+            self.changed.add(name)
+
+    def merge(self, other):
+        for name in other.removed:
+            self.changed.discard(name)
+            self.removed.add(name)
+        for name in other.changed:
+            self.removed.discard(name)
+            self.changed.add(name)
+        self.mounts_changed = self.mounts_changed or other.mounts_changed
+
+    def __bool__(self):
+        return bool(self.changed or self.removed or self.mounts_changed)
+
+    def __repr__(self):
+        return (f"DeviceChanges(changed={sorted(self.changed)}, "
+                f"removed={sorted(self.removed)}, mounts_changed={self.mounts_changed})")
+
+
+class UeventMonitor:
+    """Netlink soketi üzerinden çekirdek block uevent'lerini dinle"""
+
+    def __init__(self):
+        self.sock = socket.socket(
+            socket.AF_NETLINK,
+            socket.SOCK_RAW | socket.SOCK_CLOEXEC | socket.SOCK_NONBLOCK,
+            NETLINK_KOBJECT_UEVENT
+        )
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 1024)
+            self.sock.bind((0, UEVENT_KERNEL_GROUP))
+        except OSError:
+            self.sock.close()
+            raise
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def read_events(self):
+        """Bekleyen tüm olayları oku (bloklamadan)"""
+        events = []
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not data:
+                break
+            events.append(parse_uevent(data))
+        return events
+
+    def close(self):
+        self.sock.close()
+
+
+def read_mount_table(path=MOUNTINFO_PATH, with_options=False):
+    """mountinfo dosyasından aygıt -> bağlama noktaları eşlemesini oku
+
+    with_options verilirse bağlama noktaları kümesi yerine {bağlama noktası: bağlama seçenekleri}.
+    """
+    mounts = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if " - " not in line or len(parts) < 6:
+                continue
+            sep = parts.index("-")
+            if len(parts) < sep + 3:
+                continue
+            source = parts[sep + 2]
+            if not source.startswith("/dev/"):
+                continue
+            # Boşluk gibi karakterler \040 olarak kodlanır
+            mountpoint = parts[4].replace("\\040", " ")
+            if with_options:
+                mounts.setdefault(os.path.basename(source), {})[mountpoint] = parts[5]
+            else:
+                mounts.setdefault(os.path.basename(source), set()).add(mountpoint)
+    return mounts
+
+
+class MountWatcher:
+    """mountinfo üzerinde poll(POLLPRI) ile bağlama değişikliklerini izle"""
+
+    def __init__(self, path=MOUNTINFO_PATH):
+        self.path = path
+        self.file = open(path)
+        self.mounts = read_mount_table(path)
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def changed_devices(self):
+        """Bağlama durumu değişen aygıtların adlarını döndür"""
+        # Bekleyen bildirimi temizlemek için dosya yeniden okunmalı
+        self.file.seek(0)
+        self.file.read()
+        new_mounts = read_mount_table(self.path)
+        changed = set()
+        for name in set(self.mounts) | set(new_mounts):
+            if self.mounts.get(name) != new_mounts.get(name):
+                changed.add(name)
+        self.mounts = new_mounts
+        return changed
+
+    def close(self):
+        self.file.close()
+
+
+def load_recorded_events(path):
+    """`udevadm monitor --kernel --property` çıktısını olay listesine çevir"""
+    events = []
+    current = None
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.rstrip("\n")
+            if not line.strip():
+                if current:
+                    events.append(current)
+                current = None
+                continue
+            if line.startswith(("KERNEL[", "UDEV[")):
+                if current:
+                    events.append(current)
+                current = {}
+                continue
+            if "=" in line:
+                if current is None:
+                    current = {}
+                key, val = line.split("=", 1)
+                current[key.strip()] = val
+    if current:
+        events.append(current)
+    return events
+
+
+class ReplaySource:
+    """Kaydedilmiş uevent dizisini canlı izleyici gibi tekrar oynat"""
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.position = 0
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(load_recorded_events(path))
+
+    def read_events(self, count=None):
+        end = len(self.events) if count is None else min(len(self.events), self.position + count)
+        batch = self.events[self.position:end]
+        self.position = end
+        return batch
+
+    def done(self):
+        return self.position >= len(self.events)
+
+
+def replay(path, batch_size=None):
+    """Kaydı oynat ve her grup için DeviceChanges listesi döndür"""
+    source = ReplaySource.from_file(path)
+    results = []
+    while not source.done():
+        changes = DeviceChanges()
+        for event in source.read_events(batch_size):
+            changes.add_event(event)
+        results.append(changes)
+    return results
+
+
+if __name__ == "__main__":
+    # Kullanım: discovery.py --replay kayit.txt [grup_boyutu]
+    #           discovery.py --monitor
+    if len(sys.argv) >= 3 and sys.argv[1] == "--replay":
+        size = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        for changes in replay(sys.argv[2], size):
+            print(changes)
+    elif len(sys.argv) >= 2 and sys.argv[1] == "--monitor":
+        import select
+        monitor = UeventMonitor()
+        watcher = MountWatcher()
+        poller = select.poll()
+        poller.register(monitor.fileno(), select.POLLIN)
+        poller.register(watcher.fileno(), select.POLLPRI | select.POLLERR)
+        while True:
+            for fd, _ in poller.poll():
+                changes = DeviceChanges()
+                if fd == monitor.fileno():
+                    for event in monitor.read_events():
+                        changes.add_event(event)
+                else:
+                    changes.changed |= watcher.changed_devices()
+                    changes.mounts_changed = True
+                if changes:
+                    print(changes, flush=True)
+    else:
+        print("usage: discovery.py --replay FILE [BATCH] | --monitor", file=sys.stderr)
+        sys.exit(2)
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# GTK'dan bağımsız inceleme motoru: hedef çözümleme, zamanlama, çalıştırma, önbellek ve rapor
+# Hem arayüz hem de başsız komut satırı (fscheck --headless) bu modülü kullanır
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+
+import devices
+import fsckreport
+import imagescan
+import membudget
+import metaimage
+import resultcache
+import scheduler
+import superblock
+import throttle
+
+# Toplam çıkış kodu fsck(8) gibi tüm sonuçların bit düzeyinde VEYA'sıdır
+EXIT_OK = 0
+EXIT_UNCORRECTED = fsckreport.EXIT_UNCORRECTED
+EXIT_OPERATIONAL = fsckreport.EXIT_OPERATIONAL
+EXIT_USAGE = fsckreport.EXIT_USAGE
+# Akış halinde incelemede çalışan işlerin yanında sırada bekletilecek iş sayısı (işçi başına)
+QUEUE_AHEAD = 4
+
+
+class Target:
+    """İncelenecek tek hedef (blok aygıtı ya da imaj dosyası)"""
+
+    def __init__(self, path, fstype="", pkname="", rotational=None, info=None, error=None, kind="", mounted=False):
+        self.path = path
+        self.fstype = fstype
+        self.pkname = pkname
+        self.rotational = rotational
+        # lsblk TYPE (disk, part, lvm, loop, ...); imaj dosyalarında boş
+        self.kind = kind
+        self.mounted = mounted
+        # Okunabildiyse süper blok (önbellek ve ilerleme için)
+        self.superblock = info
+        self.error = error
+
+    @property
+    def spindle(self):
+        return scheduler.spindle_key(self.path, self.pkname, self.rotational)
+
+    @property
+    def snapshot_capable(self):
+        """Anlık görüntüyle çevrimiçi kontrol sadece bağlı, LVM üzerindeki ext2/3/4 için"""
+        return self.mounted and self.kind == "lvm" and self.fstype in ("ext2", "ext3", "ext4")
+
+
+def resolve_target(path):
+    """Yolun dosya sistemi türünü bul: önce süper blok, okunamazsa lsblk"""
+    if not os.path.exists(path):
+        return Target(path, error="No such file or device")
+    info = superblock.try_probe(path)
+    if info is not None:
+        if info.fstype not in devices.SUPPORTED_FSTYPES:
+            return Target(path, info.fstype, info=info, error="Unsupported filesystem")
+        if os.path.isfile(path):
+            return Target(path, info.fstype, info=info)
+    for dev in devices.probe([path]):
+        if os.path.realpath(dev.path) != os.path.realpath(path):
+            continue
+        fstype = info.fstype if info else dev.fstype
+        if fstype not in devices.SUPPORTED_FSTYPES:
+            return Target(path, fstype, error="Unsupported filesystem")
+        return Target(path, fstype, dev.pkname, dev.rotational, info or dev.superblock,
+                      kind=dev.type, mounted=bool(dev.mountpoint))
+    if info is not None:
+        return Target(path, info.fstype, info=info)
+    return Target(path, error="Unknown filesystem")
+
+
+def report_runner(job, engine, on_line, on_exit, runner=scheduler.run_examine):
+    """Çalıştırıcı sarmalayıcısı: çıktıyı ayrıştırır ve raporu job.report'a koyar"""
+    action = "snapshot" if job.snapshot else "image" if job.copy else "examine"
+    parser = fsckreport.ReportParser(job.path, job.fstype, action)
+
+    def feed(line):
+        parser.feed_line(line)
+        on_line(line)
+
+    def finished(returncode, error=None):
+        job.report = parser.finish(returncode)
+        job.report.set_io(job.profile, job.read_bytes, job.active_time)
+        job.report.memory = job.memory
+        job.report.resources = job.resources
+        on_exit(returncode, error)
+
+    return runner(job, engine, feed, finished)
+
+
+def exit_bits(fstype, returncode):
+    """Aracın çıkış kodunu e2fsck bitlerine çevir (btrfs check sadece 0/1 döndürür)"""
+    if returncode is None or returncode < 0:
+        return EXIT_OPERATIONAL
+    if fstype == "btrfs":
+        return EXIT_OK if returncode == 0 else EXIT_UNCORRECTED
+    return returncode
+
+
+class Engine:
+    """Hedefleri zamanlayıcıya veren, sonuçları önbelleğe ve rapor dizinine yazan motor"""
+
+    def __init__(self, cache=None, max_workers=None, use_cache=True, write_reports=True,
+                 on_update=None, runner=scheduler.run_examine, loop=None, profile=None, snapshot=False,
+                 memory_budget=None, scratch_dir=None):
+        self.cache = cache if cache is not None else resultcache.ResultCache()
+        self.use_cache = use_cache
+        self.write_reports = write_reports
+        self.snapshot = snapshot
+        # Bayt cinsinden bellek bütçesi (None: sınırsız); aşılırsa scratch_files/lowmem kullanılır
+        self.memory_budget = memory_budget
+        self.scratch_dir = scratch_dir
+        # capture() sırasında yakalama işlerinin zamanlayıcısı
+        self.captures = None
+        self.scheduler = scheduler.ExamineScheduler(
+            runner=lambda job, engine, on_line, on_exit: report_runner(job, engine, on_line, on_exit, runner),
+            max_workers=max_workers, on_update=on_update, loop=loop, profile=profile)
+
+    def cached(self, info, force=False, mounted=False):
+        if force or not self.use_cache or not info:
+            return None
+        return self.cache.lookup(info, mounted)
+
+    def submit(self, target, **attrs):
+        # Çalıştırıcı iş sıraya girer girmez başlayabilir; alanlar submit'e verilir
+        return self.scheduler.submit(target.path, target.fstype, target.spindle,
+                                     superblock=target.superblock,
+                                     snapshot=self.snapshot and target.snapshot_capable,
+                                     mounted=target.mounted,
+                                     memory_budget=self.memory_budget, scratch_dir=self.scratch_dir, **attrs)
+
+    def finish_job(self, job):
+        """Biten işin sonucunu sözlük olarak döndür; önbelleğe ve rapor dizinine yaz"""
+        report = job.report
+        cancelled = job.state == scheduler.Job.CANCELLED
+        if report and cancelled:
+            report.mark_cancelled(job.partial)
+        result = {
+            "path": job.path,
+            "fstype": job.fstype,
+            "cached": False,
+            "mode": "snapshot" if job.snapshot else "image" if job.copy else "direct",
+            "returncode": job.returncode,
+            "exit_bits": exit_bits(job.fstype, job.returncode),
+            "verdict": report.verdict if report else ("cancelled" if cancelled else "failed"),
+            "elapsed_s": round(job.elapsed, 3),
+        }
+        if job.error:
+            result["error"] = job.error
+        if cancelled:
+            # Sıradayken ya da sinyalle sonlanan işte aracın kendi çıkış kodu yoktur
+            if job.returncode is None or job.returncode < 0:
+                result["exit_bits"] = fsckreport.EXIT_CANCELED
+            else:
+                result["exit_bits"] |= fsckreport.EXIT_CANCELED
+            result["partial"] = job.partial
+        if report:
+            result["problems"] = report.problems_total
+            result["passes"] = [{key: value for key, value in p.items() if key not in ("title", "started")}
+                                for p in report.passes]
+            result["io"] = report.io
+            result["tool_version"] = report.tool_version
+            if report.triage:
+                result["triage"] = report.triage
+            if report.resources:
+                result["resources"] = report.resources
+            if job.memory:
+                result["memory"] = job.memory
+            if self.write_reports:
+                try:
+                    result["report"] = report.write_json()
+                except OSError as e:
+                    result["report_error"] = str(e)
+        # İmaj kopyasının sonucu kaynağın önbellek kaydı yerine geçmez
+        if job.superblock and job.state == scheduler.Job.DONE and self.use_cache and not job.copy:
+            self.cache.store(job.superblock, job.returncode, job.output, result["verdict"], job.mounted)
+        return result
+
+    def cancel_all(self):
+        if self.captures:
+            self.captures.cancel_all()
+        self.scheduler.cancel_all()
+
+    def examine(self, paths, force=False, on_result=None):
+        """Yolları incele; (sonuçlar, toplam çıkış kodu, duvar saati) döndür
+
+        paths herhangi bir yineleyici olabilir (ör. imagescan.iter_targets): sıraya en fazla
+        max_workers * QUEUE_AHEAD iş alınır, biten iş yer açınca sıradaki yol çekilir.
+        on_result verilirse her sonuç bitince ona verilir ve listede tutulmaz.
+        """
+        started = time.monotonic()
+        code = EXIT_OK
+        ordered = []
+        active = {}
+        paths = iter(paths)
+        exhausted = False
+        limit = self.scheduler.max_workers * QUEUE_AHEAD
+
+        def deliver(index, result):
+            nonlocal code
+            code |= result["exit_bits"]
+            if on_result:
+                on_result(result)
+            else:
+                ordered[index] = result
+
+        while True:
+            while not exhausted and len(active) < limit:
+                path = next(paths, None)
+                if path is None:
+                    exhausted = True
+                    break
+                index = len(ordered)
+                if not on_result:
+                    ordered.append(None)
+                target = resolve_target(path)
+                if target.error:
+                    deliver(index, {"path": path, "fstype": target.fstype, "error": target.error,
+                                    "verdict": "failed", "exit_bits": EXIT_OPERATIONAL})
+                    continue
+                entry = self.cached(target.superblock, force, target.mounted)
+                if entry:
+                    deliver(index, {"path": path, "fstype": target.fstype, "cached": True,
+                                    "returncode": entry["returncode"],
+                                    "exit_bits": exit_bits(target.fstype, entry["returncode"]),
+                                    "verdict": fsckreport.FsckReport(path, target.fstype).classify(entry["returncode"]),
+                                    "checked_at": entry.get("checked_at")})
+                    continue
+                # Zorlanan incelemede ön inceleme de atlanır
+                active[self.submit(target, triage=not force)] = index
+            done = [job for job in active if job.state not in (scheduler.Job.QUEUED, scheduler.Job.RUNNING)]
+            for job in done:
+                deliver(active.pop(job), self.finish_job(job))
+                self.scheduler.forget(job)
+            if exhausted and not active:
+                break
+            if not done and not self.scheduler.loop.run_once():
+                break
+        return ordered, code, time.monotonic() - started
+
+    def capture(self, paths, directory, fmt=metaimage.FORMAT_RAW, check=True,
+                capture=metaimage.local_capture):
+        """Meta veri imajlarını yakala ve istenirse imajları paralel incele
+
+        Yakalama kaynak diski okuduğu için disk başına sınırlıdır; biten her yakalamanın
+        kontrolü hemen başlar. (sonuçlar, toplam çıkış kodu, duvar saati) döndürür.
+        """
+        started = time.monotonic()
+        paths = list(dict.fromkeys(paths))
+        os.makedirs(directory, exist_ok=True)
+        results = {}
+        captures = {}
+        checks = {}
+
+        def run_capture(job, engine, on_line, on_exit):
+            def finished(capture_job):
+                job.read_bytes = capture_job.read_bytes
+                job.active_time = capture_job.active_time
+                job.resources = capture_job.resources
+                on_exit(capture_job.returncode, capture_job.error)
+
+            captures[job.path] = metaimage.CaptureJob(engine, job.path, job.image_output, fmt, convert=check,
+                                                      on_line=on_line, on_exit=finished, capture=capture,
+                                                      profile=job.profile)
+            return captures[job.path].start()
+
+        def captured(job):
+            if job.state != scheduler.Job.DONE or not check:
+                return
+            image = captures[job.path].image
+            checks[job.path] = self.scheduler.submit(image, job.fstype, scheduler.spindle_key(image),
+                                                     superblock=superblock.try_probe(image), copy=True)
+
+        self.captures = scheduler.ExamineScheduler(runner=run_capture, max_workers=self.scheduler.max_workers,
+                                                   on_update=captured, loop=self.scheduler.loop,
+                                                   profile=self.scheduler.profile)
+        for path in paths:
+            target = resolve_target(path)
+            error = target.error
+            if not error and target.fstype == "btrfs":
+                error = "Metadata capture is only available for ext2/3/4"
+            if error:
+                results[path] = {"path": path, "fstype": target.fstype, "error": error,
+                                 "verdict": "failed", "exit_bits": EXIT_OPERATIONAL}
+                continue
+            self.captures.submit(path, target.fstype, target.spindle,
+                                 image_output=metaimage.image_path(directory, path, fmt))
+        self.scheduler.loop.run_until(lambda: not self.captures.pending() and not self.scheduler.pending())
+        for job in self.captures.jobs:
+            result = {"path": job.path, "fstype": job.fstype}
+            capture_job = captures.get(job.path)
+            if capture_job:
+                result.update(capture_job.as_dict())
+            if job.state == scheduler.Job.CANCELLED:
+                result.update(verdict="cancelled", exit_bits=fsckreport.EXIT_CANCELED)
+            elif job.state != scheduler.Job.DONE:
+                result.update(verdict="failed", exit_bits=EXIT_OPERATIONAL, error=job.error)
+            elif job.path in checks:
+                result["check"] = self.finish_job(checks[job.path])
+                result["verdict"] = result["check"]["verdict"]
+                result["exit_bits"] = result["check"]["exit_bits"]
+                if fmt == metaimage.FORMAT_QCOW2:
+                    # Ham imaj sadece kontrol içindi; taşınacak olan qcow2 kalır
+                    metaimage.remove_image(capture_job.image)
+                    result["checked_image"] = None
+            else:
+                result.update(verdict="captured", exit_bits=EXIT_OK)
+            results[job.path] = result
+        self.captures = None
+        ordered = [results[path] for path in paths]
+        code = EXIT_OK
+        for result in ordered:
+            code |= result["exit_bits"]
+        return ordered, code, time.monotonic() - started
+
+
+def main(argv=None):
+    """Başsız komut satırı: fscheck --headless examine|capture HEDEF..."""
+    parser = argparse.ArgumentParser(prog="fscheck --headless",
+                                     description="Examine ext2/3/4 and btrfs filesystems without a display.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    examine = sub.add_parser("examine", help="read-only check of devices, image files or directories of images")
+    examine.add_argument("targets", nargs="+", metavar="TARGET",
+                         help="block device, image file (raw or qcow2) or directory scanned for images")
+    examine.add_argument("-f", "--force", action="store_true",
+                         help="ignore cached results and skip the metadata checksum triage")
+    examine.add_argument("-j", "--jobs", type=int, default=None, help="maximum parallel checks")
+    examine.add_argument("--no-cache", action="store_true", help="neither read nor update the result cache")
+    examine.add_argument("--no-report", action="store_true", help="do not write JSON run reports")
+    examine.add_argument("--profile", choices=sorted(throttle.PROFILES), default=throttle.DEFAULT_PROFILE,
+                         help="I/O priority profile (default: %(default)s)")
+    examine.add_argument("--snapshot", action="store_true",
+                         help="check mounted LVM volumes on a temporary snapshot (needs free space in the VG)")
+    examine.add_argument("--memory-budget", type=membudget.parse_size, metavar="SIZE",
+                         help="memory limit for each check, e.g. 512M; larger checks spill to --scratch-dir "
+                              "(e2fsck) or use lowmem mode (btrfs)")
+    examine.add_argument("--scratch-dir", metavar="DIR", default=membudget.DEFAULT_SCRATCH_DIR,
+                         help="fast local directory for e2fsck scratch files (default: %(default)s)")
+    examine.add_argument("--jsonl", action="store_true",
+                         help="print each result as a JSON line when it finishes, then a summary line")
+    capture = sub.add_parser("capture", help="capture ext2/3/4 metadata images (e2image) and check the images")
+    capture.add_argument("targets", nargs="+", metavar="TARGET")
+    capture.add_argument("-o", "--output", required=True, metavar="DIR", help="directory for the images")
+    capture.add_argument("--format", choices=metaimage.FORMATS, default=metaimage.FORMAT_RAW,
+                         help="raw: sparse image e2fsck reads directly; qcow2: compact, for checking elsewhere")
+    capture.add_argument("--no-check", action="store_true", help="only capture, do not check the images")
+    capture.add_argument("-j", "--jobs", type=int, default=None, help="maximum parallel captures and checks")
+    capture.add_argument("--no-report", action="store_true", help="do not write JSON run reports")
+    capture.add_argument("--profile", choices=sorted(throttle.PROFILES), default=throttle.DEFAULT_PROFILE,
+                         help="I/O priority profile for reading the source (default: %(default)s)")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return EXIT_USAGE if e.code else EXIT_OK
+
+    if args.command == "capture":
+        engine = Engine(max_workers=args.jobs, use_cache=False, write_reports=not args.no_report,
+                        profile=args.profile)
+    else:
+        engine = Engine(max_workers=args.jobs, use_cache=not args.no_cache,
+                        write_reports=not args.no_report, profile=args.profile, snapshot=args.snapshot,
+                        memory_budget=args.memory_budget, scratch_dir=args.scratch_dir)
+    # Ctrl+C / SIGTERM: işler iptal edilir, yarım kalan ilerleme sonuçlara yazılır
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda signum, frame: engine.cancel_all())
+    if args.command == "capture":
+        results, code, wall_clock = engine.capture(args.targets, args.output, args.format,
+                                                   check=not args.no_check)
+    elif args.jsonl:
+        # Büyük imaj ağaçlarında sonuçlar bellekte biriktirilmeden akıtılır
+        def emit(result):
+            sys.stdout.write(json.dumps(result) + "\n")
+            sys.stdout.flush()
+
+        counts = {}
+
+        def count(result):
+            counts[result["verdict"]] = counts.get(result["verdict"], 0) + 1
+            emit(result)
+
+        _, code, wall_clock = engine.examine(imagescan.iter_targets(args.targets), force=args.force,
+                                             on_result=count)
+        emit({"command": args.command, "exit_code": code, "wall_clock_s": round(wall_clock, 3),
+              "verdicts": counts})
+        return code
+    else:
+        results, code, wall_clock = engine.examine(imagescan.iter_targets(args.targets), force=args.force)
+    json.dump({"command": args.command, "exit_code": code, "wall_clock_s": round(wall_clock, 3),
+               "results": results}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,34 @@
 #!/bin/bash
 # FSCheck Boot Repair Script
-# Bu betik sistem başlangıcında kök dosya sistemini onarır
+# Bu betik sistem başlangıcında uygulamanın listeye eklediği dosya sistemlerini onarır
+# (aygıt başına, disk grubuna göre paralel); eski /forcefsck bayrağı kökü onarır
+# Günlük dosyasının her satırı bir JSON kaydıdır (bootrepair.py ilerleme ve süreleri de aynı dosyaya yazar).
+# Kayıtlar tmpfs'teki kuyruğa yazılır: kök salt okunurken ve /var bağlanmadan önce de kaybolmaz;
+# local-fs sonrası fscheck-boot-log.service kuyruğu /var/log/fscheck-boot.log'a ekler
 
-LOGFILE="/var/log/fscheck-boot.log"
+LOGFILE="/run/fscheck/boot-log.jsonl"
 FLAGFILE="/forcefsck"
+MANIFEST="/etc/fscheck/boot-jobs.json"
+BOOTREPAIR="/usr/share/fscheck/bootrepair.py"
 
-# Log fonksiyonu
+# Log fonksiyonu: {"ts": ..., "event": "message", "message": ...}
 log_message() {
-    echo "$(date '+%Y-%m-%d %H:%M:%S') - $1" >> "$LOGFILE"
+    local message="${1//\\/\\\\}"
+    message="${message//\"/\\\"}"
+    local record="{\"ts\": \"$(date '+%Y-%m-%dT%H:%M:%S%z')\", \"event\": \"message\", \"message\": \"$message\"}"
+    mkdir -p "${LOGFILE%/*}"
+    # Kuyruk yazılamazsa kayıt servis çıktısıyla journal'a gider
+    echo "$record" >> "$LOGFILE" || echo "$record"
 }
 
+# Aygıt başına iş listesi: süreler ve sonuçlar günlüğe (journal) ve /run/fscheck'e yazılır;
+# süre bütçesi /etc/fscheck/boot.conf'tan okunur, aşılırsa kontrol durdurulup açılış sürer
+if [ -f "$MANIFEST" ]; then
+    log_message "FSCheck per-device boot repair started"
+    /usr/bin/python3 "$BOOTREPAIR" run
+    log_message "FSCheck per-device boot repair finished with exit code: $?"
+fi
+
 # Eğer /forcefsck dosyası varsa fsck çalıştır
 if [ -f "$FLAGFILE" ]; then
     log_message "FSCheck boot repair started"
@@ -17,9 +36,9 @@ if [ -f "$FLAGFILE" ]; then
     # Kök dosya sistemini salt okunur olarak yeniden mount et
     mount -o remount,ro /
     
-    # fsck çalıştır
+    # fsck çalıştır (çıktı journal'a gider; günlük dosyası sadece JSON kayıtları içerir)
     log_message "Running fsck -f -y on root filesystem"
-    /sbin/fsck -f -y / >> "$LOGFILE" 2>&1
+    /sbin/fsck -f -y / 2>&1
     FSCK_EXIT=$?
     
     # Sonucu logla
@@ -1,19 +1,59 @@
 #!/usr/bin/env python3
-import gi
-gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk, Gdk, Gio, GLib
-import subprocess
-import threading
 import os
-import configparser
-import json
 import sys
 
 # Önce yerel dizini kontrol et, sonra sistem dizinini
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SYSTEM_DIR = "/usr/share/fscheck"
 LANG_DIR = os.path.join(SCRIPT_DIR, "language")
 SYSTEM_LANG_DIR = "/usr/share/fscheck/language"
+# Yardımcı modüller fscheck.py ile aynı dizinde; /usr/bin kopyası için sistem dizini de aranır
+if SYSTEM_DIR not in sys.path:
+    sys.path.insert(1, SYSTEM_DIR)
+
+# Başsız kip (sunucu, cron) GTK'yı hiç yüklemeden motoru çalıştırır
+if __name__ == "__main__" and sys.argv[1:2] == ["--headless"]:
+    import engine
+    sys.exit(engine.main(sys.argv[2:]))
+
+import gi
+gi.require_version("Gtk", "4.0")
+from gi.repository import Gtk, Gdk, Gio, GLib
+import subprocess
+from collections import deque
+import configparser
+import itertools
+import json
+import time
+
+import devices
+import discovery
+import engine
+import fsckprogress
+import fsckreport
+import helper
+import imagescan
+import jobengine
+import bootrepair
+import logstore
+import membudget
+import metaimage
+import outputpipe
+import resultcache
+import scheduler
+import scrub
+import snapshot
+import superblock
+import surfacescan
+import throttle
+import triage
 SETTINGS_FILE = os.path.expanduser("~/.fscheck_settings.json")
+# Durum alanında tutulan en fazla satır sayısı
+STATUS_MAX_LINES = 5000
+# Günlükte geriye/ileriye kaydırırken bir seferde yüklenen satır sayısı
+LOG_PAGE_LINES = 1000
+# Eklenen klasör boşta kaldıkça bu kadar dosyalık parçalarla taranır
+IMAGE_SCAN_BATCH = 50
 LANGUAGES = {
     "turkish": "Türkçe",
     "english": "English"
@@ -71,13 +111,48 @@ class ExtFSCheckTool(Gtk.Application):
         self.repair_btn = None
         self.status_label = None
         self.disks = []
+        self.device_table = devices.DeviceTable()
+        # Kullanıcının eklediği imaj dosyaları; aygıt listesi yenilense de korunur
+        self.image_devices = {}
+        self.image_scan = None
+        self.disk_placeholder = True
         self.translations = {}
         self.lang_code = self.get_saved_language()
+        self.throttle_profile = self.get_saved_profile()
+        # Bayt cinsinden bellek bütçesi (None: sınırsız) ve e2fsck geçici dosya dizini
+        self.memory_budget = self.get_saved_memory_budget()
+        self.scratch_dir = self.get_saved_scratch_dir()
+        self.active_profile = None
         self.set_language(self.lang_code)
         self.refresh_timer = None
+        self.uevent_monitor = None
+        self.mount_watcher = None
+        self.watch_ids = []
+        self.pending_changes = None
+        self.pending_timer = None
         self.logo_click_count = 0
         self.easter_egg_shown = False
         self.btrfs_available = self.check_btrfs_tools()
+        self.result_cache = resultcache.ResultCache()
+        # Tüm alt süreçler iş parçacığı olmadan GTK ana döngüsünde izlenir
+        self.loop = jobengine.GLibLoop(GLib)
+        self.jobs = jobengine.JobEngine(self.loop)
+        self.helper_session = helper.Session(self.loop)
+        self.active_job = None
+        self.batch_scheduler = None
+        self.batch_engine = None
+        self.batch_rows = {}
+        self.batch_timer = None
+        # Süper bloğu yardımcıdan beklenen aygıt sayısı ve toplu iptal isteği
+        self.batch_probing = 0
+        self.batch_cancelled = False
+        # Durum alanını besleyen günlük ve görünümdeki satır aralığı [view_first, view_last)
+        self.active_log = None
+        self.view_first = 0
+        self.view_last = 0
+        self.view_following = True
+        self.view_paging = False
+        self.last_scroll_value = 0.0
 
     def get_saved_language(self):
         try:
@@ -92,12 +167,73 @@ class ExtFSCheckTool(Gtk.Application):
         return "english"
 
     def save_language(self, lang_code):
+        self.save_setting('language', lang_code)
+
+    def get_saved_profile(self):
+        try:
+            if os.path.exists(SETTINGS_FILE):
+                with open(SETTINGS_FILE, 'r') as f:
+                    profile = json.load(f).get('throttle_profile')
+                    if profile in throttle.PROFILES:
+                        return profile
+        except:
+            pass
+        return throttle.DEFAULT_PROFILE
+
+    def get_saved_memory_budget(self):
+        try:
+            if os.path.exists(SETTINGS_FILE):
+                with open(SETTINGS_FILE, 'r') as f:
+                    budget = json.load(f).get('memory_budget')
+                    if budget:
+                        return membudget.parse_size(budget)
+        except:
+            pass
+        return None
+
+    def get_saved_scratch_dir(self):
+        try:
+            if os.path.exists(SETTINGS_FILE):
+                with open(SETTINGS_FILE, 'r') as f:
+                    directory = json.load(f).get('scratch_dir')
+                    if directory and os.path.isdir(directory):
+                        return directory
+        except:
+            pass
+        return membudget.DEFAULT_SCRATCH_DIR
+
+    def get_saved_setting(self, key):
+        try:
+            if os.path.exists(SETTINGS_FILE):
+                with open(SETTINGS_FILE, 'r') as f:
+                    return json.load(f).get(key)
+        except:
+            pass
+        return None
+
+    def show_boot_results(self):
+        results = bootrepair.load_results()
+        if not results or results.get("finished") == self.get_saved_setting('boot_results_seen'):
+            return
+        lines = [f'{self.t("Boot repair results")} ({results.get("wall_s") or 0:.1f} s):']
+        for job in results.get("jobs", []):
+            device = job.get("device") or job.get("uuid")
+            line = f'  {device}: {self.t(job.get("verdict") or "failed")}'
+            if job.get("seconds") is not None:
+                line += f' ({job["seconds"]:.1f} s, {self.t("Problems")}: {job.get("problems", 0)})'
+            if job.get("error"):
+                line += f' - {job["error"]}'
+            lines.append(line)
+        self.update_status_text("\n".join(lines))
+        self.save_setting('boot_results_seen', results.get("finished"))
+
+    def save_setting(self, key, value):
         try:
             settings = {}
             if os.path.exists(SETTINGS_FILE):
                 with open(SETTINGS_FILE, 'r') as f:
                     settings = json.load(f)
-            settings['language'] = lang_code
+            settings[key] = value
             with open(SETTINGS_FILE, 'w') as f:
                 json.dump(settings, f)
         except:
@@ -187,6 +323,7 @@ class ExtFSCheckTool(Gtk.Application):
             # Ana kutu
             vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=12, margin_top=12, margin_bottom=12, margin_start=12, margin_end=12)
             self.window.set_child(vbox)
+            self.window.connect("close-request", self.on_window_close_request)
 
             # Program logosu başlık ile combobox arasında (Easter egg için tıklanabilir) logoya 5 kez tıkla gör :-)
             logo_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
@@ -212,10 +349,18 @@ class ExtFSCheckTool(Gtk.Application):
             self.disk_combo.set_hexpand(True)
             self.disk_combo.set_size_request(-1, -1)
             disk_row.append(self.disk_combo)
+            # İmaj dosyaları ve imaj klasörleri blok aygıtlarıyla aynı listeye eklenir
+            add_image_btn = Gtk.Button(label=self.t("Add image"))
+            add_image_btn.connect("clicked", self.on_add_image_clicked)
+            disk_row.append(add_image_btn)
+            add_folder_btn = Gtk.Button(label=self.t("Add folder"))
+            add_folder_btn.connect("clicked", self.on_add_folder_clicked)
+            disk_row.append(add_folder_btn)
             disk_row.set_halign(Gtk.Align.FILL)
             vbox.append(disk_row)
 
-            # İncele ve Onar butonları sağda
+            # İncele ve Onar butonları sağda; seçenekler alttaki açılır bölümde (pencere 500 piksel
+            # genişliğinde ve boyutlandırılamaz, hepsi tek satıra sığmaz)
             button_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=16)
             button_box.set_halign(Gtk.Align.END)
             self.examine_btn = Gtk.Button()
@@ -230,6 +375,98 @@ class ExtFSCheckTool(Gtk.Application):
             button_box.append(self.repair_btn)
             vbox.append(button_box)
 
+            self.options_expander = Gtk.Expander(label=self.t("Options"))
+            options_grid = Gtk.Grid(column_spacing=12, row_spacing=6, margin_top=6)
+            # Canlı sistemde kontrolün G/Ç önceliği (ionice, nice, systemd kapsamı)
+            priority_label = Gtk.Label(label=self.t("I/O priority") + ":")
+            priority_label.set_halign(Gtk.Align.END)
+            options_grid.attach(priority_label, 0, 0, 1, 1)
+            self.profile_combo = Gtk.ComboBoxText()
+            for name, label in ((throttle.PROFILE_IDLE, "Idle"), (throttle.PROFILE_BACKGROUND, "Background"),
+                                (throttle.PROFILE_FULL, "Full speed")):
+                self.profile_combo.append(name, self.t(label))
+            self.profile_combo.set_active_id(self.throttle_profile)
+            self.profile_combo.connect("changed", self.on_profile_changed)
+            options_grid.attach(self.profile_combo, 1, 0, 1, 1)
+            # Küçük makinelerde büyük dosya sistemleri: bütçe aşılırsa e2fsck sayaçları diske yazar
+            memory_label = Gtk.Label(label=self.t("Memory limit") + ":")
+            memory_label.set_halign(Gtk.Align.END)
+            options_grid.attach(memory_label, 0, 1, 1, 1)
+            self.memory_combo = Gtk.ComboBoxText()
+            self.memory_combo.append("", self.t("No limit"))
+            for size in ("512M", "1G", "2G", "4G"):
+                self.memory_combo.append(size, size.replace("M", " MB").replace("G", " GB"))
+            active = next((size for size in ("512M", "1G", "2G", "4G")
+                           if membudget.parse_size(size) == self.memory_budget), "")
+            self.memory_combo.set_active_id(active)
+            self.memory_combo.connect("changed", self.on_memory_budget_changed)
+            options_grid.attach(self.memory_combo, 1, 1, 1, 1)
+            # İşaretlenirse önbellekteki sonuç yok sayılır ve tam kontrol yapılır
+            self.force_check = Gtk.CheckButton(label=self.t("Force full check"))
+            # Bağlı LVM birimleri kısa bir dondurmayla alınan anlık görüntü üzerinde incelenir
+            self.snapshot_check = Gtk.CheckButton(label=self.t("LVM snapshot"))
+            self.snapshot_check.set_tooltip_text(self.t("Check mounted LVM volumes on a temporary snapshot"))
+            # Meta veri e2image ile kısa sürede kopyalanır, kontrol kaynak diske dokunmadan imajda yapılır
+            self.image_check = Gtk.CheckButton(label=self.t("Metadata image"))
+            self.image_check.set_tooltip_text(self.t("Capture metadata with e2image and check the image"))
+            # Bağlı btrfs birimleri bağlama kesilmeden scrub ile incelenir ve onarılır. Varsayılan
+            # kapalıdır: işaretliyken bağlı birimde Onar, yedek kopyalardan yazan bir scrub başlatır
+            self.scrub_check = Gtk.CheckButton(label=self.t("Online scrub"))
+            self.scrub_check.set_tooltip_text(self.t("Scrub mounted btrfs volumes without unmounting them"))
+            # İnceleme yerine aygıtın tamamı okunur; okunamayan bloklar sonraki onarımda işaretlenir
+            self.surface_check = Gtk.CheckButton(label=self.t("Surface scan"))
+            self.surface_check.set_tooltip_text(self.t("Read the whole device to find unreadable sectors"))
+            # Onay kutuları iki sütunda, açılır listelerin altında
+            for index, check in enumerate((self.force_check, self.snapshot_check, self.image_check,
+                                           self.scrub_check, self.surface_check)):
+                options_grid.attach(check, index % 2, 2 + index // 2, 1, 1)
+            self.options_expander.set_child(options_grid)
+            vbox.append(self.options_expander)
+
+            # Çalışan kontrolün ilerlemesi (e2fsck -C / btrfs aşamaları), duraklatma ve iptal
+            self.job_controls = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+            self.job_controls.set_visible(False)
+            self.progress_bar = Gtk.ProgressBar()
+            self.progress_bar.set_show_text(True)
+            self.progress_bar.set_hexpand(True)
+            self.progress_bar.set_valign(Gtk.Align.CENTER)
+            self.job_controls.append(self.progress_bar)
+            self.pause_btn = Gtk.Button(label=self.t("Pause"))
+            self.pause_btn.connect("clicked", self.on_pause_clicked)
+            self.job_controls.append(self.pause_btn)
+            self.cancel_btn = Gtk.Button(label=self.t("Cancel"))
+            self.cancel_btn.connect("clicked", self.on_cancel_clicked)
+            self.job_controls.append(self.cancel_btn)
+            vbox.append(self.job_controls)
+            self.progress_updated = 0
+            self.active_progress = None
+
+            # Toplu inceleme: seçilen aygıtlar disk başına sınırla paralel incelenir
+            self.batch_expander = Gtk.Expander(label=self.t("Batch examine"))
+            batch_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6, margin_top=6)
+            batch_scrolled = Gtk.ScrolledWindow()
+            batch_scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+            batch_scrolled.set_min_content_height(120)
+            self.batch_list = Gtk.ListBox()
+            self.batch_list.set_selection_mode(Gtk.SelectionMode.NONE)
+            batch_scrolled.set_child(self.batch_list)
+            batch_box.append(batch_scrolled)
+            batch_actions = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+            self.batch_time_label = Gtk.Label(label="")
+            self.batch_time_label.set_hexpand(True)
+            self.batch_time_label.set_halign(Gtk.Align.START)
+            batch_actions.append(self.batch_time_label)
+            self.batch_btn = Gtk.Button(label=self.t("Examine selected"))
+            self.batch_btn.connect("clicked", self.on_batch_examine_clicked)
+            batch_actions.append(self.batch_btn)
+            self.batch_cancel_btn = Gtk.Button(label=self.t("Cancel batch"))
+            self.batch_cancel_btn.set_sensitive(False)
+            self.batch_cancel_btn.connect("clicked", self.on_batch_cancel_clicked)
+            batch_actions.append(self.batch_cancel_btn)
+            batch_box.append(batch_actions)
+            self.batch_expander.set_child(batch_box)
+            vbox.append(self.batch_expander)
+
             # İşlem durumu (kaydırılabilir metin alanı)
             status_label = Gtk.Label(label=self.t("Operation status") + ":")
             status_label.set_halign(Gtk.Align.START)
@@ -250,9 +487,16 @@ class ExtFSCheckTool(Gtk.Application):
             # Siyah arka plan, beyaz yazı
             self.status_buffer = self.status_view.get_buffer()
             self.status_buffer.set_text(self.t("You can select a disk and start the process."))
+            # Sağa yapışkan işaret: eklenen metinden sonra da sonda kalır
+            self.status_end_mark = self.status_buffer.create_mark(
+                "status-end", self.status_buffer.get_end_iter(), False)
             
             scrolled.set_child(self.status_view)
             vbox.append(scrolled)
+            # En üste kaydırılınca günlüğün önceki sayfaları diskten yüklenir
+            self.status_scrolled = scrolled
+            self.active_log = None
+            scrolled.get_vadjustment().connect("value-changed", self.on_status_scrolled)
 
             # BTRFS araçları kontrolü
             if not self.btrfs_available:
@@ -260,6 +504,8 @@ class ExtFSCheckTool(Gtk.Application):
             
             # Diskleri yükle
             self.load_disks()
+            # Son açılıştaki onarımların sonuçları (görülmemişse) durum alanına yazılır
+            self.show_boot_results()
             
             # Otomatik yenileme timer'ı başlat
             self.start_auto_refresh()
@@ -284,9 +530,8 @@ class ExtFSCheckTool(Gtk.Application):
         self.retranslate_ui()
 
     def retranslate_ui(self):
-        # Timer'ı durdur
-        if self.refresh_timer:
-            GLib.source_remove(self.refresh_timer)
+        # Timer'ı ve aygıt izleyicilerini durdur
+        self.stop_auto_refresh()
         # Pencereyi yeniden oluştur
         self.window.destroy()
         self.window = None
@@ -305,106 +550,165 @@ class ExtFSCheckTool(Gtk.Application):
         return box
 
     def load_disks(self):
-        # Sistemdeki ext2/3/4 ve BTRFS disk bölümlerini bul
+        # Sistemdeki ext2/3/4 ve BTRFS disk bölümlerini bul (tam tarama)
         self.disks = []
+        self.device_table = devices.DeviceTable()
+        self.disk_placeholder = True
         self.disk_combo.remove_all()
+        self.refresh_devices()
+        if self.image_devices:
+            self.apply_device_events(self.device_table.update(list(self.image_devices.values()), set()))
+
+    def on_add_image_clicked(self, btn):
+        Gtk.FileDialog(title=self.t("Add image")).open_multiple(self.window, None, self.on_images_chosen)
+
+    def on_images_chosen(self, dialog, result):
         try:
-            # Sistemde bağlı olan aygıtları bul (örn. kök disk)
-            system_devices = set()
-            with open("/proc/mounts") as f:
-                for line in f:
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        dev, mnt, fstype = parts[0], parts[1], parts[2]
-                        if dev.startswith("/dev/") and mnt == "/":
-                            system_devices.add(dev)
-
-            # lsblk ile tüm ext2/3/4 ve BTRFS partisyonları bul
-            result = subprocess.run(
-                ["lsblk", "-P", "-o", "NAME,TYPE,FSTYPE,MOUNTPOINT,SIZE,LABEL"],
-                capture_output=True, text=True
-            )
-            for line in result.stdout.splitlines():
-                if not line.strip():
-                    continue
-                props = {}
-                for item in line.strip().split():
-                    if "=" not in item:
-                        continue
-                    try:
-                        key, val = item.split("=", 1)
-                        props[key] = val.strip('"')
-                    except ValueError:
-                        continue
-                
-                # Desteklenen dosya sistemleri: ext2/3/4 ve BTRFS
-                if (
-                    props.get("TYPE") in ["part", "disk"]
-                    and props.get("FSTYPE") in ["ext2", "ext3", "ext4", "btrfs"]
-                    and not props.get("NAME", "").startswith("loop")
-                    and props.get("SIZE", "0B") != "0B"
-                ):
-                    devpath = "/dev/" + props["NAME"]
-                    fs_type = props.get("FSTYPE", "ext4")
-                    is_system = devpath in system_devices or props.get("MOUNTPOINT") == "/"
-                    self.disks.append((devpath, fs_type, is_system))
-
-            if not self.disks:
-                self.disk_combo.append_text(self.t("No external disk found"))
-                self.disk_combo.set_active(0)
-                self.examine_btn.set_sensitive(False)
-                self.repair_btn.set_sensitive(False)
-            else:
-                # Disk bilgilerini göster
-                result2 = subprocess.run(
-                    ["lsblk", "-P", "-o", "NAME,TYPE,FSTYPE,SIZE,LABEL"],
-                    capture_output=True, text=True
-                )
-                disk_info = {}
-                for line in result2.stdout.splitlines():
-                    if not line.strip():
-                        continue
-                    props = {}
-                    for item in line.strip().split():
-                        if "=" not in item:
-                            continue
-                        try:
-                            key, val = item.split("=", 1)
-                            props[key] = val.strip('"')
-                        except ValueError:
-                            continue
-                    if props.get("NAME"):
-                        devpath = "/dev/" + props["NAME"]
-                        for disk_path, disk_fstype, is_system in self.disks:
-                            if disk_path == devpath:
-                                size = props.get("SIZE", "")
-                                fstype = props.get("FSTYPE", disk_fstype)
-                                label = props.get("LABEL", "")
-                                system_tag = " [SYSTEM]" if is_system else ""
-                                if label:
-                                    disk_info[devpath] = f"{label} - {devpath} ({fstype}, {size}){system_tag}"
-                                else:
-                                    disk_info[devpath] = f"{devpath} ({fstype}, {size}){system_tag}"
-                                break
-                
-                for disk_path, disk_fstype, is_system in self.disks:
-                    display_name = disk_info.get(disk_path, f"{disk_path} ({disk_fstype})")
-                    self.disk_combo.append_text(display_name)
-                self.disk_combo.set_active(0)
-                self.examine_btn.set_sensitive(True)
-                self.repair_btn.set_sensitive(True)
+            files = dialog.open_multiple_finish(result)
+        except GLib.Error:
+            return  # Vazgeçildi
+        paths = [files.get_item(i).get_path() for i in range(files.get_n_items())]
+        added = self.add_image_paths(paths)
+        if added < len(paths):
+            self.update_status_text(self.t("Not a supported filesystem image."))
+
+    def on_add_folder_clicked(self, btn):
+        Gtk.FileDialog(title=self.t("Add folder")).select_folder(self.window, None, self.on_folder_chosen)
+
+    def on_folder_chosen(self, dialog, result):
+        try:
+            folder = dialog.select_folder_finish(result)
+        except GLib.Error:
+            return
+        # Ağaç tek seferde listelenmez; bulunan imajlar parça parça eklenir, arayüz donmaz
+        self.image_scan = imagescan.scan(folder.get_path())
+        self.update_status_text(f'{folder.get_path()}: {self.t("scanning for images...")}')
+        GLib.idle_add(self.scan_images_step, folder.get_path(), 0)
+
+    def scan_images_step(self, root, found):
+        if self.image_scan is None:
+            return False
+        paths = list(itertools.islice(self.image_scan, IMAGE_SCAN_BATCH))
+        found += self.add_image_paths(paths)
+        if len(paths) == IMAGE_SCAN_BATCH:
+            GLib.idle_add(self.scan_images_step, root, found)
+        else:
+            self.image_scan = None
+            self.update_status_text(f'{root}: {found} {self.t("images added.")}')
+        return False
+
+    def add_image_paths(self, paths):
+        """Süper bloğu okunabilen imajları listeye ekle; eklenen sayıyı döndür"""
+        found = [dev for dev in map(imagescan.image_device, paths) if dev is not None]
+        for dev in found:
+            self.image_devices[dev.path] = dev
+        if found:
+            # Boş kapsam: sadece eklenen imajlar değerlendirilir, aygıtlar silinmez
+            self.apply_device_events(self.device_table.update(found, set()))
+        return len(found)
+
+    def refresh_devices(self, scope=None):
+        # scope verilirse sadece o aygıtlar (ve alt bölümleri) yeniden incelenir
+        try:
+            paths = None if scope is None else [f"/dev/{name}" for name in sorted(scope)]
+            events = self.device_table.update(devices.probe(paths), scope)
         except Exception as e:
-            self.disk_combo.append_text(self.t("Could not read disks"))
+            self.show_disk_error(e)
+            return []
+        self.apply_device_events(events)
+        return events
+
+    def apply_device_events(self, events):
+        # Combobox'ı yeniden kurmadan sadece değişen satırları güncelle
+        selected = self.get_selected_disk()[0]
+        if events and self.disk_placeholder:
+            self.disk_combo.remove_all()
+            self.disk_placeholder = False
+        for action, dev in events:
+            if action == "add":
+                self.disks.append(dev)
+                self.disk_combo.append_text(dev.display_name())
+                continue
+            idx = next(i for i, d in enumerate(self.disks) if d.path == dev.path)
+            self.disk_combo.remove(idx)
+            if action == "remove":
+                del self.disks[idx]
+            else:
+                self.disks[idx] = dev
+                self.disk_combo.insert_text(idx, dev.display_name())
+
+        if events:
+            self.rebuild_batch_list()
+        if not self.disks:
+            if not self.disk_placeholder:
+                self.disk_combo.remove_all()
+                self.disk_combo.append_text(self.t("No external disk found"))
+                self.disk_placeholder = True
             self.disk_combo.set_active(0)
             self.examine_btn.set_sensitive(False)
             self.repair_btn.set_sensitive(False)
-            self.update_status_text(f'{self.t("Error")}: {e}')
+            return
+        # Seçili aygıt hâlâ listedeyse seçimi koru
+        active = next((i for i, d in enumerate(self.disks) if d.path == selected), 0)
+        self.disk_combo.set_active(active)
+        self.examine_btn.set_sensitive(True)
+        self.repair_btn.set_sensitive(True)
+
+    def rebuild_batch_list(self):
+        # Toplu iş sürerken satırlar işlerin durumunu gösterdiği için dokunma
+        if self.batch_scheduler and self.batch_scheduler.pending():
+            return
+        checked = {path for path, row in self.batch_rows.items() if row[0].get_active()}
+        child = self.batch_list.get_first_child()
+        while child:
+            self.batch_list.remove(child)
+            child = self.batch_list.get_first_child()
+        self.batch_rows = {}
+        for dev in self.disks:
+            row = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2,
+                          margin_top=4, margin_bottom=4, margin_start=4, margin_end=4)
+            check = Gtk.CheckButton(label=dev.display_name())
+            check.set_active(dev.path in checked)
+            row.append(check)
+            progress_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+            progress = Gtk.ProgressBar()
+            progress.set_hexpand(True)
+            progress.set_valign(Gtk.Align.CENTER)
+            progress_row.append(progress)
+            state = Gtk.Label(label="")
+            progress_row.append(state)
+            row.append(progress_row)
+            self.batch_list.append(row)
+            self.batch_rows[dev.path] = (check, progress, state)
+
+    def show_disk_error(self, e):
+        self.disks = []
+        self.device_table = devices.DeviceTable()
+        self.disk_placeholder = True
+        self.disk_combo.remove_all()
+        self.disk_combo.append_text(self.t("Could not read disks"))
+        self.disk_combo.set_active(0)
+        self.examine_btn.set_sensitive(False)
+        self.repair_btn.set_sensitive(False)
+        self.update_status_text(f'{self.t("Error")}: {e}')
 
     def get_selected_disk(self):
         idx = self.disk_combo.get_active()
-        if idx < 0 or idx >= len(self.disks):
+        if idx < 0 or idx >= len(self.disks) or self.disk_placeholder:
             return None, None, False
-        return self.disks[idx]
+        return self.disks[idx].as_tuple()
+
+    def on_profile_changed(self, combo):
+        # Çalışan işi etkilemez, sonraki kontrollerde uygulanır
+        profile = combo.get_active_id()
+        if profile in throttle.PROFILES:
+            self.throttle_profile = profile
+            self.save_setting('throttle_profile', profile)
+
+    def on_memory_budget_changed(self, combo):
+        budget = combo.get_active_id() or ""
+        self.memory_budget = membudget.parse_size(budget) if budget else None
+        self.save_setting('memory_budget', budget)
 
     def on_examine_clicked(self, btn):
         disk_info = self.get_selected_disk()
@@ -412,7 +716,8 @@ class ExtFSCheckTool(Gtk.Application):
             self.update_status_text(self.t("Please select a disk."))
             return
         disk_path, fs_type, is_system = disk_info
-        self.run_fsck(disk_path, fs_type, is_system, check_only=True)
+        self.run_fsck(disk_path, fs_type, is_system, check_only=True,
+                      force=self.force_check.get_active())
 
     def on_repair_clicked(self, btn):
         disk_info = self.get_selected_disk()
@@ -420,7 +725,7 @@ class ExtFSCheckTool(Gtk.Application):
             self.update_status_text(self.t("Please select a disk."))
             return
         disk_path, fs_type, is_system = disk_info
-        if is_system:
+        if is_system and not self.scrub_target(disk_path, fs_type):
             self.show_system_repair_dialog(disk_path, fs_type)
         else:
             self.run_fsck(disk_path, fs_type, is_system, check_only=False)
@@ -449,6 +754,8 @@ class ExtFSCheckTool(Gtk.Application):
             )
         
         dialog.add_button(self.t("Cancel"), Gtk.ResponseType.CANCEL)
+        # Birden çok aygıt aynı açılışta onarılabilsin diye yeniden başlatmadan listeye eklenebilir
+        dialog.add_button(self.t("Schedule only"), Gtk.ResponseType.YES)
         dialog.add_button(self.t("Apply"), Gtk.ResponseType.OK)
         
         dialog.connect("response", self.on_system_repair_response, disk_path, fs_type)
@@ -458,23 +765,31 @@ class ExtFSCheckTool(Gtk.Application):
         dialog.destroy()
         if response == Gtk.ResponseType.OK:
             self.schedule_boot_fsck(disk_path, fs_type)
+        elif response == Gtk.ResponseType.YES:
+            self.schedule_boot_fsck(disk_path, fs_type, restart=False)
     
-    def schedule_boot_fsck(self, disk_path, fs_type):
-        try:
-            if fs_type == "btrfs":
-                self.update_status_text(self.t("BTRFS system disk repair on boot is not supported yet."))
+    def schedule_boot_fsck(self, disk_path, fs_type, restart=True):
+        def on_exit(job):
+            if job.error or job.returncode != 0:
+                error = job.error or f"exit code {job.returncode}"
+                self.update_status_text(f'{self.t("Error scheduling boot fsck")}: {error}')
+                return
+            if not restart:
+                self.update_status_text(
+                    f'{self.t("Boot fsck scheduled for")} {disk_path}\n'
+                    f'{self.t("It will be repaired on next boot.")}')
                 return
-            
-            subprocess.run(["pkexec", "touch", "/forcefsck"], check=True)
-            
             self.update_status_text(
                 f'{self.t("Boot fsck scheduled for")} {disk_path}\n'
                 f'{self.t("System will restart now.")}')
             
             GLib.timeout_add_seconds(3, self.restart_system)
-            
-        except subprocess.CalledProcessError as e:
-            self.update_status_text(f'{self.t("Error scheduling boot fsck")}: {e}')
+
+        # Aygıt UUID ile iş listesine eklenir; açılışta diğer listelenenlerle paralel onarılır
+        self.helper_session.launch(
+            self.jobs, "schedule_boot_check",
+            ["pkexec", sys.executable, bootrepair.__file__, "add", disk_path, fs_type],
+            on_exit=on_exit, path=disk_path, fstype=fs_type)
     
     def restart_system(self):
         try:
@@ -486,14 +801,53 @@ class ExtFSCheckTool(Gtk.Application):
                 self.update_status_text(self.t("Could not restart system. Please restart manually."))
         return False
 
-    def run_fsck(self, disk, fs_type, is_system, check_only=True):
+    def run_fsck(self, disk, fs_type, is_system, check_only=True, force=False):
         self.examine_btn.set_sensitive(False)
+
+        # Yüzey taraması salt okunurdur, bağlı ve sistem diskinde de çalışır
+        if check_only and self.surface_check.get_active():
+            self.surface_scan(disk, fs_type)
+            return
+
+        # Bağlı btrfs birimi (sistem diski dahil) yeniden başlatma ya da bağlama kesme gerektirmez
+        mountpoint = self.scrub_target(disk, fs_type)
+        if mountpoint:
+            self.scrub_disk(disk, mountpoint, check_only)
+            return
         
         if is_system and not check_only:
             self.update_status_text(self.t("System disk repair requires reboot. Use repair dialog."))
             self.examine_btn.set_sensitive(True)
             return
             
+        # Süper blok okunabiliyorsa (root, disk grubu ya da imaj) önbellek ve özet için kullan
+        info = superblock.try_probe(disk)
+        if info is None and check_only and os.path.exists(disk) and not os.access(disk, os.R_OK):
+            # Yetkisiz kullanıcı blok aygıtını okuyamaz: parmak izi incelemeyi yapacak yardımcıdan alınır
+            self.helper_session.probe(
+                disk, fs_type, lambda info: self.start_fsck(disk, fs_type, check_only, force, info))
+            return
+        self.start_fsck(disk, fs_type, check_only, force, info)
+
+    def start_fsck(self, disk, fs_type, check_only, force, info):
+        """run_fsck'in süper blok okunduktan sonraki kısmı: önbellek, komut seçimi ve başlatma"""
+        # Bağlı dosya sisteminin süper bloğu tembelce yazılır; önbellek kullanılmaz
+        dev = self.device_table.get(disk)
+        mounted = bool(dev and dev.mountpoint)
+        if not check_only and superblock.is_qcow2(info):
+            self.update_status_text(self.t("Repair is not available for qcow2 images."))
+            self.examine_btn.set_sensitive(True)
+            return
+        if check_only and info and not force:
+            entry = self.result_cache.lookup(info, mounted)
+            if entry:
+                self.show_cached_result(disk, entry)
+                self.examine_btn.set_sensitive(True)
+                return
+        if not check_only:
+            # Onarım dosya sistemini değiştirir, önceki sonuç geçersiz olur
+            self.result_cache.invalidate(info.uuid if info else dev.uuid if dev else None)
+
         if fs_type == "btrfs":
             if not self.btrfs_available:
                 self.update_status_text(self.t("BTRFS tools not available. Please install btrfs-progs package."))
@@ -510,69 +864,561 @@ class ExtFSCheckTool(Gtk.Application):
             # ext2/3/4 için e2fsck kullan
             if check_only:
                 # Sadece okuma için -n kullan (bağlı dosya sistemlerinde çalışır)
-                cmd = ["pkexec", "/sbin/e2fsck", "-n", disk]
+                cmd = ["pkexec", "/sbin/e2fsck", "-n", "-tt", disk]
             else:
                 # Onarım için önce diski bağlantısını kes, sonra onar, tekrar bağla
                 self.repair_mounted_disk(disk)
                 return
         
+        # Bağlı LVM biriminde e2fsck -n yanlış alarm verir; istenirse anlık görüntü kontrol edilir
+        use_snapshot = (check_only and fs_type != "btrfs" and self.snapshot_check.get_active()
+                        and dev is not None and dev.snapshot_capable)
+        use_image = (check_only and fs_type != "btrfs" and not use_snapshot and self.image_check.get_active())
         action_text = self.t("examine started") if check_only else self.t("repair started")
-        self.update_status_text(f'{disk} {action_text}...\n{self.t("Please wait.")}')
+        if use_snapshot:
+            action_text += f' ({self.t("LVM snapshot")})'
+        elif use_image:
+            action_text += f' ({self.t("Metadata image")})'
+        header = f'{disk} {action_text}...\n{self.t("Please wait.")}'
+        if info:
+            header = self.superblock_summary(info) + "\n" + header
+        pipe = self.make_output_pipe(f"{os.path.basename(disk)}-{'examine' if check_only else 'repair'}", header)
+        action = "snapshot" if use_snapshot else "image" if use_image else "examine" if check_only else "repair"
+        parser = fsckreport.ReportParser(disk, fs_type, action)
+
+        if fs_type == "btrfs":
+            progress = fsckprogress.BtrfsStageProgress()
+        else:
+            progress = fsckprogress.ProgressModel(info.blocks_per_group if info and info.is_ext else 0)
+        feed_progress = self.progress_feeder(progress)
+        self.job_started(progress)
         
-        def worker():
-            try:
-                proc = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=1,
-                    universal_newlines=True
-                )
-                
-                output_lines = []
-                for line in iter(proc.stdout.readline, ''):
-                    output_lines.append(line.rstrip())
-                    current_output = "\n".join(output_lines[-20:])  # Son 20 satırı göster
-                    GLib.idle_add(self.update_status_text, current_output)
-                
-                proc.wait()
-                
-                if proc.returncode == 0:
+        # Önbellek için sadece son satırlar tutulur, tümü akış olarak gösterilir
+        tail = deque(maxlen=resultcache.MAX_OUTPUT_LINES)
+
+        def handle_line(line):
+            tail.append(line)
+            parser.feed_line(line)
+            if fs_type == "btrfs":
+                feed_progress(line)
+            pipe.push(line)
+
+        def on_exit(job):
+            returncode = job.returncode
+            if job.state == jobengine.ProcessJob.CANCELLED:
+                self.write_cancelled(parser, returncode, pipe, progress, job)
+            elif job.error:
+                pipe.push(f'{self.t("Error")}: {job.error}')
+            else:
+                if returncode == 0:
                     final_msg = self.t("Operation completed successfully.")
                 else:
-                    final_msg = f"{self.t('Operation completed with exit code')}: {proc.returncode}"
+                    final_msg = f"{self.t('Operation completed with exit code')}: {returncode}"
                 
-                final_output = "\n".join(output_lines) + "\n\n" + final_msg
-                GLib.idle_add(self.update_status_text, final_output)
-                
-            except Exception as e:
-                GLib.idle_add(self.update_status_text, f'{self.t("Error")}: {e}')
-            finally:
-                GLib.idle_add(self.examine_btn.set_sensitive, True)
-        
-        threading.Thread(target=worker, daemon=True).start()
+                pipe.push("")
+                pipe.push(final_msg)
+                if use_image:
+                    pipe.push(f'{self.t("Capture time")}: {job.capture.capture_s:.1f} s')
+                    pipe.push(f'{self.t("Check time")}: {job.check_s:.1f} s')
+                self.write_report(parser, returncode, pipe, job, memory=job_memory(job))
+                # İmaj kopyasının sonucu kaynağın önbellek kaydı yerine geçmez
+                if check_only and info and not use_image and job.state == jobengine.ProcessJob.DONE:
+                    self.result_cache.store(info, returncode, list(tail), final_msg, mounted)
+            if plan is not None:
+                plan.cleanup()
+            self.job_finished(pipe)
+
+        def job_memory(job):
+            # Yardımcıda çalıştıysa kararı ve tepe RSS'i yardımcı bildirir
+            if getattr(job, "memory", None):
+                return job.memory
+            if plan is not None:
+                return plan.as_dict(getattr(job, "peak_rss", None))
+            return None
+
+        plan = None
+        budget_args = {"budget": self.memory_budget, "scratch": self.scratch_dir}
+
+        # Oturumun yetkili yardımcısı varsa yeni pkexec istemi olmadan onun üzerinden çalıştır
+        if use_snapshot:
+            profile = self.active_profile
+            self.active_job = self.helper_session.launch(
+                self.jobs, "snapshot_examine",
+                lambda on_line, on_progress, on_exit: snapshot.SnapshotCheck(
+                    self.jobs, disk, on_line, on_progress, on_exit, profile).start(),
+                on_line=handle_line, on_progress=feed_progress, on_exit=on_exit,
+                path=disk, fstype=fs_type, profile=profile)
+            return
+        if use_image:
+            # Yakalama yardımcı üzerinden yapılır; imaj kullanıcıya ait olduğu için kontrol yetkisizdir
+            os.makedirs(metaimage.IMAGE_DIR, exist_ok=True)
+            output = metaimage.image_path(metaimage.IMAGE_DIR, disk)
+            self.active_job = metaimage.ImageCheck(
+                self.jobs, disk, output, on_line=handle_line, on_progress=feed_progress, on_exit=on_exit,
+                profile=self.active_profile,
+                capture=lambda *args: self.helper_session.capture(*args, fstype=fs_type)).start()
+            return
+        mode = jobengine.PROGRESS_NONE if fs_type == "btrfs" else jobengine.PROGRESS_FD
+        profile = self.active_profile
+        # "Tam kontrolü zorla" sağlama toplamı ön incelemesini de atlar
+        use_triage = fs_type != "btrfs" and not force
+        # Yerel çalıştırmada bellek kararı burada verilir (yardımcı kendi kararını verir)
+        plan = membudget.plan(disk, fs_type, self.memory_budget, info, self.scratch_dir)
+        if os.path.isfile(disk) and os.access(disk, os.R_OK):
+            # Okunabilen imaj dosyası yetki istemeden yerelde incelenir; qcow2 önce ham imaja açılır
+            plan.prepare()
+            if superblock.is_qcow2(info):
+                self.active_job = metaimage.UnpackCheck(
+                    self.jobs, disk, fs_type, lambda raw: scheduler.examine_command(raw, fs_type, profile, plan),
+                    on_line=handle_line, on_progress=feed_progress, on_exit=on_exit, progress=mode).start()
+            elif use_triage:
+                self.active_job = triage.TriageCheck(
+                    self.jobs, disk, lambda full: scheduler.examine_command(disk, fs_type, profile, plan, full),
+                    on_line=handle_line, on_progress=feed_progress, on_exit=on_exit, progress=mode,
+                    profile=profile).start()
+            else:
+                self.active_job = self.jobs.spawn(
+                    scheduler.examine_command(disk, fs_type, profile, plan), progress=mode,
+                    on_line=handle_line, on_progress=feed_progress, on_exit=on_exit)
+            return
+
+        def local_command(full=False):
+            # -f aygıt yolundan önce gelmelidir
+            return throttle.wrap(plan.prepare().apply(cmd[:-1] + ["-f"] * full + cmd[-1:]), profile, disk)
+
+        def local_examine(on_line, on_progress, on_exit):
+            if use_triage:
+                return triage.TriageCheck(self.jobs, disk, local_command, on_line=on_line, on_progress=on_progress,
+                                          on_exit=on_exit, progress=mode, profile=profile).start()
+            return self.jobs.spawn(local_command(), progress=mode, on_line=on_line, on_progress=on_progress,
+                                   on_exit=on_exit)
+
+        self.active_job = self.helper_session.launch(
+            self.jobs, "examine", local_examine,
+            on_line=handle_line, on_progress=feed_progress, on_exit=on_exit,
+            path=disk, fstype=fs_type, profile=profile, triage=use_triage, **budget_args)
+
+    def scrub_target(self, disk, fs_type):
+        """Çevrimiçi scrub kullanılacaksa birimin bağlama noktası, kullanılmayacaksa None"""
+        if fs_type != "btrfs" or not self.btrfs_available or not self.scrub_check.get_active():
+            return None
+        info = superblock.try_probe(disk)
+        return scrub.find_mountpoint(disk, info.uuid if info else None)
+
+    def scrub_disk(self, disk, mountpoint, check_only):
+        """Bağlı btrfs birimini scrub et: incelemede salt okunur, onarımda yedek kopyalardan düzelterek"""
+        info = superblock.try_probe(disk)
+        action_text = self.t("scrub started")
+        if check_only:
+            action_text += f' ({self.t("read-only")})'
+        header = f'{disk} ({mountpoint}) {action_text}...\n{self.t("Please wait.")}'
+        if info:
+            header = self.superblock_summary(info) + "\n" + header
+        if not check_only:
+            dev = self.device_table.get(disk)
+            self.result_cache.invalidate(info.uuid if info else dev.uuid if dev else None)
+        pipe = self.make_output_pipe(f"{os.path.basename(disk)}-scrub", header)
+        parser = fsckreport.ReportParser(disk, "btrfs", "scrub")
+        # İlerleme yardımcının aralıklı "scrub status -R" sorgularından gelir
+        progress = fsckprogress.ScrubProgress(info.bytes_used if info else 0)
+        feed_progress = self.progress_feeder(progress)
+        self.job_started(progress)
+
+        def handle_line(line):
+            parser.feed_line(line)
+            feed_progress(line)
+            pipe.push(line)
+
+        def on_exit(job):
+            if job.state == jobengine.ProcessJob.CANCELLED:
+                self.write_cancelled(parser, job.returncode, pipe, progress, job)
+            elif job.error:
+                pipe.push(f'{self.t("Error")}: {job.error}')
+            else:
+                pipe.push("")
+                pipe.push(f'{self.t("Scrubbed")}: {devices.format_size(progress.scrubbed_bytes)} - '
+                          f'{self.t("Errors")}: {progress.errors} ({self.t("corrected")}: {progress.corrected}, '
+                          f'{self.t("uncorrectable")}: {progress.uncorrectable})')
+                if job.returncode == 0:
+                    pipe.push(self.t("Operation completed successfully."))
+                else:
+                    pipe.push(f"{self.t('Operation completed with exit code')}: {job.returncode}")
+                self.write_report(parser, job.returncode, pipe, job)
+            self.job_finished(pipe)
+
+        profile = self.active_profile
+        self.active_job = self.helper_session.launch(
+            self.jobs, "scrub",
+            lambda on_line, on_progress, on_exit: scrub.ScrubCheck(
+                self.jobs, disk, mountpoint, on_line, on_progress, on_exit, profile, readonly=check_only).start(),
+            on_line=handle_line, on_progress=feed_progress, on_exit=on_exit,
+            path=disk, fstype="btrfs", profile=profile, readonly=check_only)
+
+    def surface_scan(self, disk, fs_type):
+        """Aygıtı baştan sona doğrudan G/Ç ile oku; hız, gecikme ve okunamayan sektörleri raporla"""
+        info = superblock.try_probe(disk)
+        header = f'{disk} {self.t("Surface scan")}...\n{self.t("Please wait.")}'
+        if info:
+            header = self.superblock_summary(info) + "\n" + header
+        pipe = self.make_output_pipe(f"{os.path.basename(disk)}-surface", header)
+        parser = fsckreport.ReportParser(disk, fs_type, "surface")
+        progress = fsckprogress.SurfaceProgress()
+        feed_progress = self.progress_feeder(progress)
+        self.job_started(progress)
+
+        def handle_line(line):
+            parser.feed_line(line)
+            pipe.push(line)
+
+        def on_exit(job):
+            if job.state == jobengine.ProcessJob.CANCELLED:
+                self.write_cancelled(parser, job.returncode, pipe, progress, job)
+            elif job.error:
+                pipe.push(f'{self.t("Error")}: {job.error}')
+            else:
+                pipe.push("")
+                pipe.push(f'{self.t("Unreadable sectors")}: {progress.unreadable}')
+                if job.returncode == 0:
+                    pipe.push(self.t("Operation completed successfully."))
+                else:
+                    if progress.unreadable and fs_type != "btrfs":
+                        pipe.push(self.t("Repair will mark unreadable blocks as bad."))
+                    pipe.push(f"{self.t('Operation completed with exit code')}: {job.returncode}")
+                self.write_report(parser, job.returncode, pipe, job)
+            self.job_finished(pipe)
+
+        profile = self.active_profile
+        self.active_job = self.helper_session.launch(
+            self.jobs, "surface_scan",
+            lambda on_line, on_progress, on_exit: self.jobs.spawn(
+                surfacescan.command(disk, profile), progress=jobengine.PROGRESS_STDOUT,
+                on_line=on_line, on_progress=on_progress, on_exit=on_exit),
+            on_line=handle_line, on_progress=feed_progress, on_exit=on_exit,
+            path=disk, fstype=fs_type, profile=profile)
+
+    def job_started(self, progress, cancellable=True):
+        """Tek aygıt işi başlarken ilerleme çubuğunu ve iş denetimlerini göster"""
+        self.active_progress = progress
+        # Rapor, seçim sonradan değişse de işin başladığı profili yazar
+        self.active_profile = self.throttle_profile
+        self.pause_btn.set_label(self.t("Pause"))
+        self.pause_btn.set_sensitive(True)
+        self.cancel_btn.set_sensitive(cancellable)
+        self.show_progress(progress)
+
+    def job_finished(self, pipe):
+        """Tek aygıt işi bittiğinde (döngüden çağrılır) arayüzü eski haline getir"""
+        self.active_job = None
+        self.active_progress = None
+        pipe.close()
+        self.hide_progress()
+        self.examine_btn.set_sensitive(True)
+
+    def on_pause_clicked(self, btn):
+        # SIGSTOP/SIGCONT: duraklatılan kontrol disk G/Ç'si yapmaz, üretim yükü araya girebilir
+        job = self.active_job
+        if not job:
+            return
+        if job.paused:
+            if job.resume():
+                self.active_progress.resume()
+                btn.set_label(self.t("Pause"))
+        elif job.pause():
+            self.active_progress.pause()
+            btn.set_label(self.t("Resume"))
+        self.show_progress(self.active_progress)
+
+    def on_cancel_clicked(self, btn):
+        # e2fsck SIGTERM'de tutarlı bir noktada durur ve 32 koduyla çıkar
+        if self.active_job and self.active_job.cancel():
+            btn.set_sensitive(False)
+            self.pause_btn.set_sensitive(False)
+            self.pause_btn.set_label(self.t("Pause"))
+            self.progress_bar.set_text(self.t("Cancelling..."))
+
+    def write_cancelled(self, parser, returncode, pipe, progress, job):
+        """İptal edilen işin o ana kadarki ilerlemesini yaz ve raporla"""
+        pipe.push("")
+        pipe.push(f'{self.t("Cancelled")}: {progress.describe(self.t)}')
+        self.write_report(parser, returncode, pipe, job, partial=progress.snapshot())
+
+    def progress_feeder(self, progress):
+        # e2fsck çok sık kayıt yazar; arayüz en fazla 5 kez/saniye güncellenir
+        def feed(line):
+            if progress.feed_line(line):
+                now = time.monotonic()
+                if now - self.progress_updated >= 0.2:
+                    self.progress_updated = now
+                    self.show_progress(progress)
+
+        return feed
+
+    def show_progress(self, progress):
+        self.job_controls.set_visible(True)
+        self.progress_bar.set_fraction(progress.fraction)
+        text = progress.describe(self.t)
+        job = self.active_job
+        if job and job.paused:
+            text += f' ({self.t("Paused")})'
+        if job and not job.cancel_requested:
+            # Yardımcısız pkexec işi duraklatılamaz (her sinyal yeni parola istemi olurdu)
+            pausable = job.paused or job.can_pause
+            self.pause_btn.set_sensitive(pausable)
+            self.pause_btn.set_tooltip_text(
+                None if pausable else self.t("Pausing a check running as root needs the privileged helper"))
+        self.progress_bar.set_text(text)
+        return False
+
+    def hide_progress(self):
+        self.job_controls.set_visible(False)
+        self.progress_bar.set_fraction(0)
+        return False
+
+    def on_batch_examine_clicked(self, btn):
+        selected = [dev for dev in self.disks
+                    if dev.path in self.batch_rows and self.batch_rows[dev.path][0].get_active()]
+        if not selected:
+            self.update_status_text(self.t("Please select a disk."))
+            return
+        self.batch_btn.set_sensitive(False)
+        self.batch_cancel_btn.set_sensitive(True)
+        self.batch_results = {}
+        self.batch_stored = set()
+        # Başsız komut satırıyla aynı motor; süreçler GTK ana döngüsünde izlenir
+        self.batch_engine = engine.Engine(
+            cache=self.result_cache,
+            on_update=self.update_batch_job,
+            runner=self.helper_session.run_examine,
+            loop=self.loop,
+            profile=self.throttle_profile,
+            snapshot=self.snapshot_check.get_active(),
+            memory_budget=self.memory_budget,
+            scratch_dir=self.scratch_dir)
+        self.batch_scheduler = self.batch_engine.scheduler
+        force = self.force_check.get_active()
+        self.batch_probing = 0
+        self.batch_cancelled = False
+        for dev in selected:
+            self.batch_rows[dev.path][1].set_fraction(0)
+            info = superblock.try_probe(dev.path)
+            if info is None and not os.access(dev.path, os.R_OK):
+                # Okunamayan aygıtın parmak izi yardımcıdan gelince önbelleğe bakılır ya da sıraya konur
+                self.batch_probing += 1
+                self.helper_session.probe(dev.path, dev.fstype,
+                                          lambda info, dev=dev: self.queue_batch_device(dev, info, force, True))
+                continue
+            self.queue_batch_device(dev, info, force)
+        self.batch_timer = GLib.timeout_add(250, self.tick_batch)
+        self.update_status_text(f'{len(selected)} {self.t("devices queued for examine.")}')
+
+    def queue_batch_device(self, dev, info, force, probed=False):
+        """Önbellekte geçerli sonuç varsa göster, yoksa aygıtı toplu incelemeye ekle"""
+        if probed:
+            self.batch_probing -= 1
+        check, progress, state = self.batch_rows[dev.path]
+        if self.batch_cancelled:
+            state.set_label(self.t("Cancelled"))
+            self.batch_results[dev.path] = self.t("Cancelled")
+            return
+        entry = self.batch_engine.cached(info, force, bool(dev.mountpoint))
+        if entry:
+            progress.set_fraction(1)
+            state.set_label(self.batch_verdict(entry["returncode"]) + f' ({self.t("cached")})')
+            self.batch_results[dev.path] = self.batch_verdict(entry["returncode"])
+            return
+        self.batch_engine.submit(engine.Target(dev.path, dev.fstype, dev.pkname, dev.rotational, info,
+                                               kind=dev.type, mounted=bool(dev.mountpoint)),
+                                 triage=not force)
+
+    def on_batch_cancel_clicked(self, btn):
+        # Sıradaki işler hemen, çalışanlar SIGTERM ile iptal edilir
+        btn.set_sensitive(False)
+        self.batch_cancelled = True
+        if self.batch_engine:
+            self.batch_engine.cancel_all()
+
+    def batch_verdict(self, returncode):
+        if returncode == 0:
+            return self.t("clean")
+        return f'{self.t("exit code")} {returncode}'
+
+    def update_batch_job(self, job):
+        row = self.batch_rows.get(job.path)
+        if not row:
+            return False
+        check, progress, state = row
+        if job.state == scheduler.Job.QUEUED:
+            state.set_label(self.t("Queued"))
+        elif job.state == scheduler.Job.RUNNING:
+            state.set_label(f'{self.t("Running")} {job.elapsed:.0f} s')
+        elif job.state == scheduler.Job.DONE:
+            progress.set_fraction(1)
+            verdict = self.batch_verdict(job.returncode)
+            state.set_label(f'{verdict} ({job.elapsed:.1f} s)')
+            self.batch_results[job.path] = verdict
+            if job.path not in self.batch_stored:
+                # Önbelleğe ve rapor dizinine yazma motorun işidir
+                self.batch_stored.add(job.path)
+                self.batch_engine.finish_job(job)
+        elif job.state == scheduler.Job.CANCELLED:
+            state.set_label(self.t("Cancelled"))
+            self.batch_results[job.path] = self.t("Cancelled")
+            if job.started is not None and job.path not in self.batch_stored:
+                # Yarıda kalan ilerleme de rapora yazılır
+                self.batch_stored.add(job.path)
+                self.batch_engine.finish_job(job)
+        else:
+            progress.set_fraction(0)
+            state.set_label(self.t("Error"))
+            self.batch_results[job.path] = f'{self.t("Error")}: {job.error}'
+        return False
+
+    def tick_batch(self):
+        sched = self.batch_scheduler
+        for job in sched.pending():
+            if job.state == scheduler.Job.RUNNING:
+                row = self.batch_rows.get(job.path)
+                if row:
+                    if job.progress is None:
+                        row[1].pulse()
+                    else:
+                        row[1].set_fraction(job.progress)
+                    row[2].set_label(f'{self.t("Running")} {job.elapsed:.0f} s')
+        self.batch_time_label.set_label(f'{self.t("Total time")}: {sched.wall_clock:.1f} s')
+        if sched.pending() or self.batch_probing:
+            return True
+        # Tüm işler bitti: özet göster
+        self.batch_timer = None
+        self.batch_btn.set_sensitive(True)
+        self.batch_cancel_btn.set_sensitive(False)
+        lines = [f'{path}: {verdict}' for path, verdict in self.batch_results.items()]
+        lines.append("")
+        lines.append(f'{self.t("Total time")}: {sched.wall_clock:.1f} s')
+        self.update_status_text("\n".join(lines))
+        return False
+
+    def show_cached_result(self, disk, entry):
+        checked = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["checked_at"]))
+        lines = list(entry.get("output", []))
+        lines.append("")
+        lines.append(f'{disk}: {self.t("No changes since last check")} ({checked}). '
+                     f'{self.t("Showing cached result.")}')
+        lines.append(entry.get("message", ""))
+        self.update_status_text("\n".join(lines))
+
+    def superblock_summary(self, info):
+        if info.has_errors:
+            state = self.t("contains errors")
+        elif info.is_clean:
+            state = self.t("clean")
+        else:
+            state = self.t("not clean")
+        lines = [f'{self.t("Filesystem state")}: {state}']
+        if info.is_ext:
+            max_count = info.max_mnt_count if info.max_mnt_count > 0 else "-"
+            lines.append(f'{self.t("Mount count")}: {info.mnt_count}/{max_count}')
+            if info.lastcheck:
+                checked = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.lastcheck))
+                lines.append(f'{self.t("Last checked")}: {checked}')
+        else:
+            lines.append(f'{self.t("Generation")}: {info.generation}')
+        return "\n".join(lines)
 
     def start_auto_refresh(self):
-        # Her 3 saniyede bir disk listesini kontrol et
-        self.refresh_timer = GLib.timeout_add_seconds(3, self.auto_refresh_disks)
+        # Çekirdek uevent'lerini ve mountinfo değişikliklerini dinle
+        try:
+            self.uevent_monitor = discovery.UeventMonitor()
+            self.mount_watcher = discovery.MountWatcher()
+        except OSError:
+            # Netlink kullanılamıyorsa eski yönteme dön: her 3 saniyede bir disk listesini kontrol et
+            self.stop_auto_refresh()
+            self.refresh_timer = GLib.timeout_add_seconds(3, self.auto_refresh_disks)
+            return
+        self.watch_ids = [
+            GLib.io_add_watch(self.uevent_monitor.fileno(), GLib.PRIORITY_DEFAULT,
+                              GLib.IO_IN, self.on_uevent),
+            GLib.io_add_watch(self.mount_watcher.fileno(), GLib.PRIORITY_DEFAULT,
+                              GLib.IO_PRI | GLib.IO_ERR, self.on_mounts_changed),
+        ]
+
+    def on_window_close_request(self, window):
+        # Pencere kapanırken çalışan işleri güvenle durdur (e2fsck SIGTERM'de 32 ile çıkar)
+        self.stop_auto_refresh()
+        if self.active_job:
+            self.active_job.cancel()
+        if self.batch_scheduler:
+            self.batch_scheduler.shutdown()
+        self.jobs.shutdown()
+        if self.helper_session.client:
+            self.helper_session.client.close()
+        return False
+
+    def stop_auto_refresh(self):
+        if self.batch_timer:
+            GLib.source_remove(self.batch_timer)
+            self.batch_timer = None
+        if self.refresh_timer:
+            GLib.source_remove(self.refresh_timer)
+            self.refresh_timer = None
+        for watch_id in self.watch_ids:
+            GLib.source_remove(watch_id)
+        self.watch_ids = []
+        if self.pending_timer:
+            GLib.source_remove(self.pending_timer)
+            self.pending_timer = None
+        self.pending_changes = None
+        if self.uevent_monitor:
+            self.uevent_monitor.close()
+            self.uevent_monitor = None
+        if self.mount_watcher:
+            self.mount_watcher.close()
+            self.mount_watcher = None
+
+    def on_uevent(self, source, condition):
+        changes = discovery.DeviceChanges()
+        for event in self.uevent_monitor.read_events():
+            changes.add_event(event)
+        self.queue_device_changes(changes)
+        return True
+
+    def on_mounts_changed(self, source, condition):
+        changes = discovery.DeviceChanges()
+        changes.changed |= self.mount_watcher.changed_devices()
+        changes.mounts_changed = True
+        self.queue_device_changes(changes)
+        return True
+
+    def queue_device_changes(self, changes):
+        # Art arda gelen olayları (örn. bir diskin tüm bölümleri) tek seferde işle
+        if not changes:
+            return
+        if self.pending_changes is None:
+            self.pending_changes = discovery.DeviceChanges()
+        self.pending_changes.merge(changes)
+        if not self.pending_timer:
+            self.pending_timer = GLib.timeout_add(250, self.flush_device_changes)
+
+    def flush_device_changes(self):
+        changes = self.pending_changes
+        self.pending_changes = None
+        self.pending_timer = None
+        self.notify_device_events(self.refresh_devices(changes.changed | changes.removed))
+        return False
 
     def auto_refresh_disks(self):
-        # Mevcut disk listesini kaydet
-        old_disks = self.disks.copy()
-        
-        # Yeni disk listesini al
-        self.load_disks()
-        
-        # Eğer disk listesi değiştiyse kullanıcıya bildir
-        if old_disks != self.disks:
-            if len(self.disks) > len(old_disks):
-                self.update_status_text(self.t("New disk detected. List updated."))
-            elif len(self.disks) < len(old_disks):
-                self.update_status_text(self.t("Disk removed. List updated."))
-        
+        # Tüm listeyi yeniden incele, sadece farkları uygula
+        self.notify_device_events(self.refresh_devices())
         return True  # Timer'ı devam ettir
 
+    def notify_device_events(self, events):
+        # Eğer disk listesi değiştiyse kullanıcıya bildir
+        added = sum(1 for action, _ in events if action == "add")
+        removed = sum(1 for action, _ in events if action == "remove")
+        if added > removed:
+            self.update_status_text(self.t("New disk detected. List updated."))
+        elif removed > added:
+            self.update_status_text(self.t("Disk removed. List updated."))
+
     def on_logo_clicked(self, btn):
         """Easter egg: Atatürk sözü göster"""
         self.logo_click_count += 1
@@ -644,132 +1490,323 @@ class ExtFSCheckTool(Gtk.Application):
         dialog.connect("response", lambda d, r: d.destroy())
 
     def repair_mounted_disk(self, disk):
-        def worker():
-            try:
-                # Tek pkexec çağrısıyla tüm işlemleri yap
-                GLib.idle_add(self.update_status_text, f'{disk} {self.t("repair started")}...')
-                
-                # Bash script ile tüm işlemleri tek seferde yap
-                script = f"""
-                # Disk bağlı mı kontrol et
-                if mount | grep -q "{disk}"; then
-                    echo "Unmounting {disk}..."
-                    umount "{disk}" || exit 1
-                    REMOUNT=1
-                else
-                    echo "Disk not mounted, proceeding..."
-                    REMOUNT=0
-                fi
-                
-                # Onarım yap
-                echo "Starting repair..."
-                /sbin/e2fsck -f -y "{disk}"
-                REPAIR_EXIT=$?
-                
-                # Eğer başlangıçta bağlıysa tekrar bağla
-                if [ "$REMOUNT" = "1" ]; then
-                    echo "Remounting {disk}..."
-                    mount "{disk}"
-                fi
-                
-                exit $REPAIR_EXIT
-                """
-                
-                repair_proc = subprocess.Popen(
-                    ["pkexec", "bash", "-c", script],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True
-                )
-                
-                output_lines = []
-                for line in iter(repair_proc.stdout.readline, ''):
-                    output_lines.append(line.rstrip())
-                    current_output = "\n".join(output_lines[-15:])
-                    GLib.idle_add(self.update_status_text, current_output)
-                
-                repair_proc.wait()
-                
-                # Sonuç mesajı
-                if repair_proc.returncode == 0:
+        # Başlık, akan çıktıdan önce ana döngüde yazılır
+        pipe = self.make_output_pipe(f"{os.path.basename(disk)}-repair",
+                                     f'{disk} {self.t("repair started")}...')
+        parser = fsckreport.ReportParser(disk, "ext4", "repair")
+        progress = fsckprogress.ProgressModel()
+        self.job_started(progress)
+
+        def handle_line(line):
+            parser.feed_line(line)
+            pipe.push(line)
+
+        def on_exit(job):
+            # Sonuç mesajı
+            if job.state == jobengine.ProcessJob.CANCELLED:
+                self.write_cancelled(parser, job.returncode, pipe, progress, job)
+            elif job.error:
+                pipe.push(f'{self.t("Error")}: {job.error}')
+            else:
+                if job.returncode == 0:
                     final_msg = self.t("Repair completed successfully.")
                 else:
-                    final_msg = f"{self.t('Repair completed with exit code')}: {repair_proc.returncode}"
-                
-                final_output = "\n".join(output_lines) + "\n\n" + final_msg
-                GLib.idle_add(self.update_status_text, final_output)
+                    final_msg = f"{self.t('Repair completed with exit code')}: {job.returncode}"
                 
-            except Exception as e:
-                GLib.idle_add(self.update_status_text, f'{self.t("Error")}: {e}')
-            finally:
-                GLib.idle_add(self.examine_btn.set_sensitive, True)
-        
-        threading.Thread(target=worker, daemon=True).start()
+                pipe.push("")
+                pipe.push(final_msg)
+                memory = getattr(job, "memory", None) or plan.as_dict(getattr(job, "peak_rss", None))
+                self.write_report(parser, job.returncode, pipe, job, memory=memory)
+            plan.cleanup()
+            self.job_finished(pipe)
+
+        # Yardımcı yoksa yerelde karar verilir; scratch_files için e2fsck.conf önceden yazılır
+        plan = membudget.plan(disk, "ext4", self.memory_budget, scratch_dir=self.scratch_dir).prepare()
+        config_env = f'E2FSCK_CONFIG="{plan.config}" ' if plan.config else ""
+        # Yüzey taramasının bıraktığı liste varsa okunamayan bloklar kötü blok olarak işaretlenir
+        dev = self.device_table.get(disk)
+        bad_blocks = "".join(f'"{arg}" ' for arg in surfacescan.bad_blocks_args(dev.uuid if dev else None))
+        # Yardımcı yoksa tek pkexec çağrısıyla tüm işlemleri yap
+        # fd 3 ilerleme kayıtları için stdout'a, diğer tüm çıktı stderr'e gider
+        script = f"""
+            exec 3>&1 1>&2
+            # İptalde kabuk ölmez: e2fsck güvenle çıktıktan sonra disk yeniden bağlanır
+            trap 'echo "Cancelling..."' TERM
+            
+            # Disk bağlı mı kontrol et
+            if mount | grep -q "{disk}"; then
+                echo "Unmounting {disk}..."
+                umount "{disk}" || exit 1
+                REMOUNT=1
+            else
+                echo "Disk not mounted, proceeding..."
+                REMOUNT=0
+            fi
+            
+            # Onarım yap
+            echo "Starting repair..."
+            {config_env}/sbin/e2fsck -f -y -tt -C 3 {bad_blocks}"{disk}"
+            REPAIR_EXIT=$?
+            
+            # Eğer başlangıçta bağlıysa tekrar bağla
+            if [ "$REMOUNT" = "1" ]; then
+                echo "Remounting {disk}..."
+                mount "{disk}"
+            fi
+            
+            exit $REPAIR_EXIT
+            """
+        if os.path.isfile(disk):
+            # İmaj dosyası bağlı olamaz ve yardımcı onu onarmaz: kullanıcının kendi yetkisiyle onarılır
+            self.active_job = self.jobs.spawn(
+                throttle.wrap(plan.apply(["/sbin/e2fsck", "-f", "-y", "-tt", disk]), self.active_profile, disk),
+                progress=jobengine.PROGRESS_FD, on_line=handle_line, on_progress=self.progress_feeder(progress),
+                on_exit=on_exit, kill_grace=None)
+            return
+        # Yardımcı ayırma, onarım ve yeniden bağlamayı kendisi yapar
+        self.active_job = self.helper_session.launch(
+            self.jobs, "repair", throttle.wrap(["pkexec", "bash", "-c", script], self.active_profile, disk),
+            on_line=handle_line, on_progress=self.progress_feeder(progress), on_exit=on_exit,
+            progress=jobengine.PROGRESS_STDOUT, kill_grace=None, path=disk, fstype="ext4", unmount=True,
+            profile=self.active_profile, budget=self.memory_budget, scratch=self.scratch_dir)
 
     def repair_mounted_btrfs_disk(self, disk):
-        def worker():
-            try:
-                GLib.idle_add(self.update_status_text, f'{disk} BTRFS {self.t("repair started")}...')
-                
-                # BTRFS onarım script'i
-                script = f"""
-                # Disk bağlı mı kontrol et
-                if mount | grep -q "{disk}"; then
-                    echo "Unmounting {disk}..."
-                    umount "{disk}" || exit 1
-                    REMOUNT=1
-                else
-                    echo "Disk not mounted, proceeding..."
-                    REMOUNT=0
-                fi
-                
-                # BTRFS onarım yap
-                echo "Starting BTRFS repair..."
-                btrfs check --repair "{disk}"
-                REPAIR_EXIT=$?
-                
-                # Eğer başlangıçta bağlıysa tekrar bağla
-                if [ "$REMOUNT" = "1" ]; then
-                    echo "Remounting {disk}..."
-                    mount "{disk}"
-                fi
-                
-                exit $REPAIR_EXIT
-                """
-                
-                repair_proc = subprocess.Popen(
-                    ["pkexec", "bash", "-c", script],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True
-                )
-                
-                output_lines = []
-                for line in iter(repair_proc.stdout.readline, ''):
-                    output_lines.append(line.rstrip())
-                    current_output = "\n".join(output_lines[-15:])
-                    GLib.idle_add(self.update_status_text, current_output)
-                
-                repair_proc.wait()
-                
-                # Sonuç mesajı
-                if repair_proc.returncode == 0:
+        pipe = self.make_output_pipe(f"{os.path.basename(disk)}-btrfs-repair",
+                                     f'{disk} BTRFS {self.t("repair started")}...')
+        parser = fsckreport.ReportParser(disk, "btrfs", "repair")
+        progress = fsckprogress.BtrfsStageProgress()
+        feed_progress = self.progress_feeder(progress)
+        # btrfs check --repair yarıda kesilirse dosya sistemi tutarsız kalabilir: sadece duraklatılır
+        self.job_started(progress, cancellable=False)
+
+        def handle_line(line):
+            feed_progress(line)
+            parser.feed_line(line)
+            pipe.push(line)
+
+        def on_exit(job):
+            # Sonuç mesajı
+            if job.error:
+                pipe.push(f'{self.t("Error")}: {job.error}')
+            else:
+                if job.returncode == 0:
                     final_msg = self.t("BTRFS repair completed successfully.")
                 else:
-                    final_msg = f"{self.t('BTRFS repair completed with exit code')}: {repair_proc.returncode}"
+                    final_msg = f"{self.t('BTRFS repair completed with exit code')}: {job.returncode}"
                 
-                final_output = "\n".join(output_lines) + "\n\n" + final_msg
-                GLib.idle_add(self.update_status_text, final_output)
-                
-            except Exception as e:
-                GLib.idle_add(self.update_status_text, f'{self.t("Error")}: {e}')
-            finally:
-                GLib.idle_add(self.examine_btn.set_sensitive, True)
-        
-        threading.Thread(target=worker, daemon=True).start()
+                pipe.push("")
+                pipe.push(final_msg)
+                self.write_report(parser, job.returncode, pipe, job)
+            self.job_finished(pipe)
+
+        # BTRFS onarım script'i (yardımcı yoksa)
+        script = f"""
+            # Disk bağlı mı kontrol et
+            if mount | grep -q "{disk}"; then
+                echo "Unmounting {disk}..."
+                umount "{disk}" || exit 1
+                REMOUNT=1
+            else
+                echo "Disk not mounted, proceeding..."
+                REMOUNT=0
+            fi
+            
+            # BTRFS onarım yap
+            echo "Starting BTRFS repair..."
+            btrfs check --repair "{disk}"
+            REPAIR_EXIT=$?
+            
+            # Eğer başlangıçta bağlıysa tekrar bağla
+            if [ "$REMOUNT" = "1" ]; then
+                echo "Remounting {disk}..."
+                mount "{disk}"
+            fi
+            
+            exit $REPAIR_EXIT
+            """
+        if os.path.isfile(disk):
+            # İmaj dosyası kullanıcının kendi yetkisiyle onarılır
+            self.active_job = self.jobs.spawn(
+                throttle.wrap(["btrfs", "check", "--repair", disk], self.active_profile, disk),
+                on_line=handle_line, on_exit=on_exit, kill_grace=None)
+            return
+        self.active_job = self.helper_session.launch(
+            self.jobs, "repair", throttle.wrap(["pkexec", "bash", "-c", script], self.active_profile, disk),
+            on_line=handle_line, on_exit=on_exit, kill_grace=None, path=disk, fstype="btrfs", unmount=True,
+            profile=self.active_profile)
+
+    def write_report(self, parser, returncode, pipe, job=None, partial=None, memory=None):
+        """Ayrıştırılan çalıştırma raporunu JSON olarak kaydet ve özetini göster"""
+        report = parser.finish(returncode)
+        if partial is not None:
+            report.mark_cancelled(partial)
+        if memory is not None:
+            report.memory = memory
+            # Tepe RSS ya da tahmin bilinmiyorsa (yetkisiz okuma, wait4 yok) "?" gösterilir
+            peak, guess = memory.get("peak_rss"), memory.get("estimate")
+            line = f'{self.t("Memory")}: {self.t("peak")} {devices.format_size(peak) if peak else "?"}, ' \
+                   f'{self.t("estimate")} {devices.format_size(guess) if guess else "?"}'
+            if memory["mode"] != membudget.MODE_MEMORY:
+                line += f' ({memory["mode"]})'
+            pipe.push(line)
+        if job is not None:
+            io = report.set_io(self.active_profile, job.read_bytes, job.active_time)
+            if io["throughput_mb_s"] is not None:
+                pipe.push(f'{self.t("Throughput")}: {io["throughput_mb_s"]:.1f} MB/s '
+                          f'({self.t("I/O priority")}: {io["profile"]})')
+            report.resources = getattr(job, "resources", None)
+            if report.resources:
+                usage = report.resources
+                pipe.push(f'{self.t("Time")}: {usage["wall_s"]:.1f} s ({self.t("user")} {usage["user_s"]:.1f} s, '
+                          f'{self.t("system")} {usage["sys_s"]:.1f} s)')
+            # e2fsck -tt geçiş süreleri: en yavaş geçiş hangi aşamanın darboğaz olduğunu gösterir
+            timed = [p for p in report.passes if p.get("real_s") is not None]
+            if timed:
+                slowest = max(timed, key=lambda p: p["real_s"])
+                pipe.push(f'{self.t("Slowest pass")}: {slowest["pass"]} ({slowest["real_s"]:.2f} s)')
+        if report.triage:
+            line = f'{self.t("Triage")}: {self.t(report.triage["verdict"])}'
+            if report.triage["reason"]:
+                line += f' ({report.triage["reason"]})'
+            if report.triage["verdict"] == "passed":
+                line += f' - {self.t("full check skipped")}'
+            pipe.push(line)
+        summary = (f'{self.t("Verdict")}: {self.t(report.verdict)} - '
+                   f'{self.t("Problems")}: {report.problems_total} '
+                   f'({self.t("fixed")}: {report.problems_fixed}, {self.t("unfixed")}: {report.problems_unfixed})')
+        pipe.push(summary)
+        try:
+            pipe.push(f'{self.t("Report")}: {report.write_json()}')
+        except OSError as e:
+            pipe.push(f'{self.t("Error")}: {e}')
+        return report
+
+    def make_output_pipe(self, name, header):
+        # Satırlar en fazla 20 kez/saniye toplu olarak metin alanının sonuna eklenir.
+        # Tüm çıktı ~/.cache/fscheck altında sıkıştırılmış günlüğe yazılır, bellekte
+        # sadece sabit bir pencere tutulur.
+        try:
+            log = logstore.LogStore(name)
+        except OSError:
+            self.update_status_text(header)
+            return outputpipe.OutputPipe(
+                self.append_status_text,
+                GLib.timeout_add,
+                skipped_text=self.t("... {count} lines skipped ..."))
+        log.append_text(header)
+        self.attach_log(log)
+        # Görünüm günlüğün son penceresinden çizilir: satırlar birleştirilmez, sadece haber verilir
+        return outputpipe.OutputPipe(
+            self.show_log_tail,
+            GLib.timeout_add,
+            log=log,
+            notify_only=True)
+
+    def append_status_text(self, text):
+        self.status_buffer.insert(self.status_buffer.get_end_iter(), text)
+        # Bellek ve çizim maliyeti sınırlı kalsın diye en eski satırları at
+        extra = self.status_buffer.get_line_count() - STATUS_MAX_LINES
+        if extra > 0:
+            found, cut = self.status_buffer.get_iter_at_line(extra)
+            if found:
+                self.status_buffer.delete(self.status_buffer.get_start_iter(), cut)
+        self.status_view.scroll_to_mark(self.status_end_mark, 0.0, False, 0.0, 1.0)
+
+    def attach_log(self, log):
+        self.active_log = log
+        self.view_first = self.view_last = log.window_start
+        self.view_following = True
+        self.status_buffer.set_text("")
+        self.show_log_tail()
+
+    def show_log_tail(self):
+        # Kullanıcı geriye kaydırdıysa görünüm sabit kalır, satırlar sadece günlükte birikir
+        log = self.active_log
+        if log is None or not self.view_following:
+            return
+        count = log.count
+        if count - self.view_last > STATUS_MAX_LINES:
+            # Çok geride kalındı: aradaki satırlar gösterilmeden sona atla
+            self.view_first = self.view_last = count - STATUS_MAX_LINES
+            self.status_buffer.set_text("")
+        lines = log.read(self.view_last, count)
+        if lines:
+            self.status_buffer.insert(self.status_buffer.get_end_iter(), "\n".join(lines) + "\n")
+            self.view_last += len(lines)
+            self.trim_view(from_start=True)
+        self.status_view.scroll_to_mark(self.status_end_mark, 0.0, False, 0.0, 1.0)
+
+    def trim_view(self, from_start):
+        # Görünümde en fazla STATUS_MAX_LINES + bir sayfa satır tutulur
+        extra = (self.view_last - self.view_first) - (STATUS_MAX_LINES + LOG_PAGE_LINES)
+        if extra <= 0:
+            return
+        buf = self.status_buffer
+        if from_start:
+            found, cut = buf.get_iter_at_line(extra)
+            buf.delete(buf.get_start_iter(), cut)
+            self.view_first += extra
+        else:
+            found, cut = buf.get_iter_at_line(self.view_last - self.view_first - extra)
+            buf.delete(cut, buf.get_end_iter())
+            self.view_last -= extra
+
+    def on_status_scrolled(self, adj):
+        if self.active_log is None or self.view_paging:
+            return
+        value = adj.get_value()
+        at_top = value <= adj.get_lower() + 1
+        at_bottom = value + adj.get_page_size() >= adj.get_upper() - 1
+        if value < self.last_scroll_value and not at_bottom:
+            self.view_following = False
+        self.last_scroll_value = value
+        if at_top and self.view_first > 0:
+            self.view_paging = True
+            GLib.idle_add(self.page_log_up)
+        elif at_bottom and not self.view_following:
+            self.view_paging = True
+            GLib.idle_add(self.page_log_down)
+
+    def end_paging(self):
+        self.view_paging = False
+        return False
+
+    def page_log_up(self):
+        # Önceki sayfayı diskten okuyup başa ekle, görünümü eski ilk satırda tut
+        log = self.active_log
+        start = max(0, self.view_first - LOG_PAGE_LINES)
+        lines = log.read(start, self.view_first) if log else []
+        if lines:
+            buf = self.status_buffer
+            anchor = buf.create_mark(None, buf.get_start_iter(), False)
+            buf.insert(buf.get_start_iter(), "\n".join(lines) + "\n")
+            self.view_first = start
+            self.view_following = False
+            self.trim_view(from_start=False)
+            self.status_view.scroll_to_mark(anchor, 0.0, True, 0.0, 0.0)
+            buf.delete_mark(anchor)
+        GLib.timeout_add(150, self.end_paging)
+        return False
+
+    def page_log_down(self):
+        # Sonraki sayfayı ekle; günlüğün sonuna ulaşılınca canlı takibe dön
+        log = self.active_log
+        if log:
+            end = min(log.count, self.view_last + LOG_PAGE_LINES)
+            lines = log.read(self.view_last, end)
+            if lines:
+                self.status_buffer.insert(self.status_buffer.get_end_iter(), "\n".join(lines) + "\n")
+                self.view_last += len(lines)
+                self.trim_view(from_start=True)
+            if self.view_last >= log.count:
+                self.view_following = True
+        GLib.timeout_add(150, self.end_paging)
+        return False
 
     def update_status_text(self, text):
-        self.status_buffer.set_text(text)
+        # Kısa mesajlar için tüm metni değiştir; akan çıktı günlükten beslenir
+        self.active_log = None
+        self.status_buffer.set_text(text + "\n")
         # Otomatik olarak en alta kaydır
         mark = self.status_buffer.get_insert()
         self.status_view.scroll_mark_onscreen(mark)
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+# e2fsck -C <fd> tamamlanma kayıtlarından ilerleme, hız ve kalan süre hesabı
+# BTRFS check için "[N/7] ..." aşama satırları, btrfs scrub için ham sayaçlar (-R) kullanılır,
+# yüzey taraması (surfacescan) e2fsck -C benzeri "1 okunan toplam okunamayan" kayıtları yazar
+import os
+import re
+import subprocess
+import time
+
+# e2fsck'nin kendi ilerleme çubuğunda kullandığı geçiş ağırlıkları (unix.c)
+E2FSCK_PASS_PERCENT = (0, 70, 90, 92, 95, 100)
+BTRFS_STAGE_RE = re.compile(r"^\[(\d+)/(\d+)\]\s+(.*)$")
+# scrub status -R -d / scrub start -B -d -R: aygıt başlığı, durum ve "ad: sayı" sayaçları
+SCRUB_DEVICE_RE = re.compile(r"^scrub device (\S+) \(id (\d+)\)(?: (\w+))?")
+SCRUB_STATUS_RE = re.compile(r"^Status:\s+(\w+)")
+SCRUB_COUNTER_RE = re.compile(r"^(\w+): (\d+)$")
+# Hata sayılan sayaçlar; düzeltilen ve düzeltilemeyenler ayrıca tutulur
+SCRUB_ERROR_COUNTERS = ("read_errors", "csum_errors", "verify_errors", "super_errors")
+
+
+def _format_eta(seconds):
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class ProgressModel:
+    """Geçiş başına ilerleme modeli; fraction, rate ve eta değerlerini tutar"""
+
+    def __init__(self, blocks_per_group=0):
+        # Geçiş 1'de birim blok grubudur; biliniyorsa bloğa çevrilir
+        self.blocks_per_group = blocks_per_group
+        self.started = time.monotonic()
+        self.stage = 0
+        self.stages = len(E2FSCK_PASS_PERCENT) - 1
+        self.current = 0
+        self.maximum = 0
+        self.fraction = 0.0
+        self.rate = 0.0
+        self.unit = "blocks"
+        self.eta = None
+        self.pass_started = self.started
+        self.pass_times = {}
+        self.paused_at = None
+        self._buffer = ""
+
+    def feed(self, data):
+        """Ham veri parçası ekle (satırlar yarım gelebilir); değiştiyse True"""
+        self._buffer += data
+        changed = False
+        while "\n" in self._buffer:
+            line, self._buffer = self._buffer.split("\n", 1)
+            changed = self.feed_line(line) or changed
+        return changed
+
+    def feed_line(self, line):
+        # Biçim: "geçiş mevcut en_fazla aygıt"
+        parts = line.split()
+        if len(parts) < 3:
+            return False
+        try:
+            stage, current, maximum = int(parts[0]), int(parts[1]), int(parts[2])
+        except ValueError:
+            return False
+        self.update(stage, current, maximum)
+        return True
+
+    def update(self, stage, current, maximum, now=None):
+        now = time.monotonic() if now is None else now
+        if stage != self.stage:
+            if self.stage:
+                self.pass_times[self.stage] = now - self.pass_started
+            self.pass_started = now
+            self.stage = stage
+        self.current = current
+        self.maximum = maximum
+        stage_idx = min(max(stage, 1), self.stages)
+        low = E2FSCK_PASS_PERCENT[stage_idx - 1]
+        high = E2FSCK_PASS_PERCENT[stage_idx]
+        within = current / maximum if maximum else 0.0
+        self.fraction = min(1.0, (low + (high - low) * within) / 100.0)
+        elapsed_pass = now - self.pass_started
+        units = current
+        self.unit = "items"
+        if stage == 1 and self.blocks_per_group:
+            units = current * self.blocks_per_group
+            self.unit = "blocks"
+        self.rate = units / elapsed_pass if elapsed_pass > 0 else 0.0
+        elapsed = now - self.started
+        if self.fraction > 0 and elapsed > 0:
+            self.eta = elapsed / self.fraction * (1.0 - self.fraction)
+        else:
+            self.eta = None
+
+    def pause(self, now=None):
+        """Duraklatılan süre hız ve kalan süre hesabına katılmasın"""
+        if self.paused_at is None:
+            self.paused_at = time.monotonic() if now is None else now
+
+    def resume(self, now=None):
+        if self.paused_at is None:
+            return
+        now = time.monotonic() if now is None else now
+        shift = now - self.paused_at
+        self.started += shift
+        self.pass_started += shift
+        self.paused_at = None
+
+    def snapshot(self):
+        """Yarıda kalan çalıştırma için o ana kadarki ilerleme kaydı"""
+        return {
+            "stage": self.stage,
+            "stages": self.stages,
+            "fraction": round(self.fraction, 4),
+            "current": self.current,
+            "maximum": self.maximum,
+            "pass_times": {str(k): round(v, 3) for k, v in self.pass_times.items()},
+        }
+
+    def describe(self, translate=lambda s: s):
+        text = f'{translate("Pass")} {self.stage}/{self.stages}: {self.fraction * 100:.1f}%'
+        if self.rate:
+            text += f' - {self.rate:.0f} {translate(self.unit)}/s'
+        if self.eta is not None:
+            text += f' - {translate("ETA")} {_format_eta(self.eta)}'
+        return text
+
+
+class BtrfsStageProgress(ProgressModel):
+    """btrfs check çıktısındaki "[N/7] checking ..." satırlarından ilerleme"""
+
+    def __init__(self):
+        super().__init__()
+        self.stages = 7
+        self.stage_name = ""
+
+    def feed_line(self, line):
+        match = BTRFS_STAGE_RE.match(line.strip())
+        if not match:
+            return False
+        stage, total = int(match.group(1)), int(match.group(2))
+        self.stages = total
+        self.stage_name = match.group(3)
+        now = time.monotonic()
+        if stage != self.stage:
+            if self.stage:
+                self.pass_times[self.stage] = now - self.pass_started
+            self.pass_started = now
+            self.stage = stage
+        self.fraction = (stage - 1) / total if total else 0.0
+        elapsed = now - self.started
+        self.eta = elapsed / self.fraction * (1.0 - self.fraction) if self.fraction else None
+        return True
+
+    def snapshot(self):
+        data = super().snapshot()
+        data["stage_name"] = self.stage_name
+        return data
+
+    def describe(self, translate=lambda s: s):
+        text = f'{translate("Stage")} {self.stage}/{self.stages}: {self.stage_name}'
+        if self.eta is not None:
+            text += f' - {translate("ETA")} {_format_eta(self.eta)}'
+        return text
+
+
+class ScrubProgress(ProgressModel):
+    """btrfs scrub ham sayaçlarından aygıt başına ilerleme, hız ve hata oranı
+
+    Sayaçlar her sorguda baştan gelir (toplamdır); hız iki sorgu arasındaki farktan hesaplanır.
+    total_bytes (süper bloktaki kullanılan alan) bilinmiyorsa oran yerine taranan miktar gösterilir.
+    """
+
+    def __init__(self, total_bytes=0):
+        super().__init__()
+        self.stage = 1
+        self.stages = 1
+        self.unit = "MB"
+        self.total_bytes = total_bytes or 0
+        # Aygıt yolu -> {"devid", "status", sayaçlar...}
+        self.devices = {}
+        self.device_rates = {}
+        self._current = None
+        self._samples = {}
+
+    def feed_line(self, line):
+        line = line.strip()
+        match = SCRUB_DEVICE_RE.match(line)
+        if match:
+            self._current = match.group(1)
+            device = self.devices.setdefault(self._current, {"devid": int(match.group(2)), "status": None})
+            # scrub start -B bitince aygıt başlığı "done" ile gelir, Status satırı olmayabilir
+            if match.group(3) == "done":
+                device["status"] = "finished"
+            return False
+        if self._current is None:
+            return False
+        device = self.devices[self._current]
+        match = SCRUB_STATUS_RE.match(line)
+        if match:
+            device["status"] = match.group(1)
+            return False
+        match = SCRUB_COUNTER_RE.match(line)
+        if not match:
+            return False
+        device[match.group(1)] = int(match.group(2))
+        # last_physical aygıt kaydının son sayacıdır
+        if match.group(1) != "last_physical":
+            return False
+        self._sample(self._current)
+        return True
+
+    @staticmethod
+    def _device_bytes(device):
+        return device.get("data_bytes_scrubbed", 0) + device.get("tree_bytes_scrubbed", 0)
+
+    def _sample(self, name, now=None):
+        now = time.monotonic() if now is None else now
+        scrubbed = self._device_bytes(self.devices[name])
+        previous = self._samples.get(name)
+        if previous and now > previous[0] and scrubbed >= previous[1]:
+            self.device_rates[name] = (scrubbed - previous[1]) / (now - previous[0])
+        self._samples[name] = (now, scrubbed)
+        if self.devices[name].get("status") == "finished":
+            self.device_rates[name] = 0.0
+        self.rate = sum(self.device_rates.values())
+        if self.devices and all(d.get("status") == "finished" for d in self.devices.values()):
+            self.fraction = 1.0
+        elif self.total_bytes:
+            # DUP/RAID profillerinde taranan kopyalar kullanılan alanı aşabilir; bitene kadar %99'da kalır
+            self.fraction = min(0.99, self.scrubbed_bytes / self.total_bytes)
+        if self.rate and self.total_bytes and self.fraction < 1.0:
+            self.eta = max(0, self.total_bytes - self.scrubbed_bytes) / self.rate
+        else:
+            self.eta = None
+
+    def _sum(self, names):
+        return sum(device.get(name, 0) for device in self.devices.values() for name in names)
+
+    @property
+    def scrubbed_bytes(self):
+        return sum(self._device_bytes(device) for device in self.devices.values())
+
+    @property
+    def errors(self):
+        return self._sum(SCRUB_ERROR_COUNTERS)
+
+    @property
+    def corrected(self):
+        return self._sum(("corrected_errors",))
+
+    @property
+    def uncorrectable(self):
+        return self._sum(("uncorrectable_errors",))
+
+    @property
+    def error_rate(self):
+        """Taranan GiB başına hata"""
+        scrubbed = self.scrubbed_bytes
+        return self.errors / (scrubbed / (1 << 30)) if scrubbed else 0.0
+
+    def resume(self, now=None):
+        super().resume(now)
+        # Duraklatılan süre hıza katılmasın
+        self._samples = {}
+
+    def snapshot(self):
+        data = super().snapshot()
+        data.update({
+            "scrubbed_bytes": self.scrubbed_bytes,
+            "errors": self.errors,
+            "corrected": self.corrected,
+            "uncorrectable": self.uncorrectable,
+            "devices": {name: dict(device) for name, device in self.devices.items()},
+        })
+        return data
+
+    def describe(self, translate=lambda s: s):
+        if self.total_bytes:
+            text = f'{translate("Scrub")}: {self.fraction * 100:.1f}%'
+        else:
+            text = f'{translate("Scrub")}: {self.scrubbed_bytes / 1e6:.0f} MB'
+        if self.rate:
+            text += f' - {self.rate / 1e6:.0f} MB/s'
+        text += f' - {translate("Errors")}: {self.errors}'
+        if self.corrected:
+            text += f' ({translate("corrected")}: {self.corrected})'
+        if len(self.devices) > 1:
+            text += f' - {len(self.devices)} {translate("devices")}'
+        if self.eta is not None:
+            text += f' - {translate("ETA")} {_format_eta(self.eta)}'
+        return text
+
+
+class SurfaceProgress(ProgressModel):
+    """Yüzey taramasının "1 okunan_bayt toplam_bayt okunamayan_sektör" kayıtlarından ilerleme"""
+
+    def __init__(self):
+        super().__init__()
+        self.stage = 1
+        self.stages = 1
+        self.unit = "MB"
+        self.unreadable = 0
+        self._sample = None
+
+    def feed_line(self, line):
+        parts = line.split()
+        if len(parts) >= 4 and parts[3].isdigit():
+            self.unreadable = int(parts[3])
+        return super().feed_line(line)
+
+    def update(self, stage, current, maximum, now=None):
+        now = time.monotonic() if now is None else now
+        if self._sample and now > self._sample[0] and current >= self._sample[1]:
+            self.rate = (current - self._sample[1]) / (now - self._sample[0])
+        self._sample = (now, current)
+        self.current = current
+        self.maximum = maximum
+        self.fraction = min(1.0, current / maximum) if maximum else 0.0
+        self.eta = (maximum - current) / self.rate if self.rate and maximum else None
+
+    def resume(self, now=None):
+        super().resume(now)
+        # Duraklatılan süre hıza katılmasın
+        self._sample = None
+
+    def snapshot(self):
+        data = super().snapshot()
+        data.update({"scanned_bytes": self.current, "unreadable_sectors": self.unreadable})
+        return data
+
+    def describe(self, translate=lambda s: s):
+        text = f'{translate("Surface scan")}: {self.fraction * 100:.1f}%'
+        if self.rate:
+            text += f' - {self.rate / 1e6:.0f} MB/s'
+        text += f' - {translate("Unreadable sectors")}: {self.unreadable}'
+        if self.eta is not None:
+            text += f' - {translate("ETA")} {_format_eta(self.eta)}'
+        return text
+
+
+def add_progress_fd(cmd, fd):
+    """e2fsck komutuna -C <fd> ekle (pkexec öneki korunur)"""
+    for idx, arg in enumerate(cmd):
+        if os.path.basename(arg) == "e2fsck":
+            return cmd[:idx + 1] + ["-C", str(fd)] + cmd[idx + 1:]
+    return list(cmd)
+
+
+def popen_with_progress(cmd, **popen_args):
+    """e2fsck'yi ayrı bir ilerleme borusuyla başlat
+
+    (proc, çıktı_akışı, ilerleme_akışı) döndürür. pkexec 2'den büyük tanıtıcıları
+    kapattığı için o durumda ilerleme stdout'a, normal çıktı stderr'e yönlendirilir.
+    Ek argümanlar (ör. start_new_session) Popen'e aktarılır.
+    """
+    if cmd and cmd[0] == "pkexec":
+        inner = add_progress_fd(cmd[1:], 3)
+        proc = subprocess.Popen(
+            ["pkexec", "sh", "-c", 'exec "$0" "$@" 3>&1 1>&2'] + inner,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            **popen_args
+        )
+        return proc, proc.stderr, proc.stdout
+    read_fd, write_fd = os.pipe()
+    try:
+        proc = subprocess.Popen(
+            add_progress_fd(cmd, write_fd),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            pass_fds=(write_fd,),
+            text=True,
+            **popen_args
+        )
+    except Exception:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    return proc, proc.stdout, os.fdopen(read_fd, "r")
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+# e2fsck, btrfs check ve btrfs scrub çıktısı için artımlı, sabit bellekli ayrıştırıcı
+# Her çalıştırma için makinece okunabilir bir rapor (JSON) üretir
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import fsckprogress
+import logstore
+import throttle
+
+REPORT_DIR = os.path.join(logstore.CACHE_HOME, "fscheck", "reports")
+# Sorun türü sayacında tutulan en fazla farklı imza (sabit bellek için)
+MAX_PROBLEM_KINDS = 200
+KEEP_REPORTS = 200
+# Özel bir kopyada (anlık görüntü, meta veri imajı) çalışan eylemler: düzeltmeler kaynağa yansımaz
+COPY_ACTIONS = ("snapshot", "image")
+
+E2FSCK_PASS_RE = re.compile(r"^Pass (\d[A-D]?): (.*)$")
+E2FSCK_QUESTION_RE = re.compile(r"^(?P<desc>.*?)\s*(?P<question>[A-Z][\w /+'()-]*)\?\s+(?P<answer>yes|no)\s*$")
+E2FSCK_SUMMARY_RE = re.compile(
+    r"^(?P<device>\S+): (?:(?P<clean>clean), )?(?P<files_used>\d+)/(?P<files_total>\d+) files"
+    r"(?: \((?P<noncontig>[\d.]+)% non-contiguous\))?, (?P<blocks_used>\d+)/(?P<blocks_total>\d+) blocks")
+E2FSCK_MODIFIED = "***** FILE SYSTEM WAS MODIFIED *****"
+# -tt çıktısı: geçiş başına ve toplam bellek (yığın, KiB), gerçek/kullanıcı/sistem süresi ve G/Ç
+E2FSCK_TIMING_RE = re.compile(
+    r"^(?:(?:Pass (?P<pass>\d[A-D]?)|(?P<peak>Peak memory)): )?Memory used: (?P<arena>\d+)k/(?P<mmap>\d+)k "
+    r"\(\d+k/\d+k\), time:\s*(?P<real>[\d.]+)/\s*(?P<user>[\d.]+)/\s*(?P<sys>[\d.]+)$")
+E2FSCK_IO_RE = re.compile(
+    r"^(?:Pass (?P<pass>\d[A-D]?): )?I/O read: (?P<read>\d+)MB, write: (?P<write>\d+)MB, rate: [\d.]+MB/s$")
+E2FSCK_VERSION_RE = re.compile(r"^e2fsck (\S+) \(")
+BTRFS_STAGE_RE = re.compile(r"^\[(\d+)/(\d+)\]\s+(.*)$")
+BTRFS_FOUND_RE = re.compile(r"^found (\d+) bytes used, (no error found|error\(s\) found)")
+BTRFS_TOTAL_RE = re.compile(r"^(total [\w ]+ bytes|btree space waste bytes|file data blocks allocated): (\d+)")
+BTRFS_ERROR_RE = re.compile(r"^(ERROR:|error:|ref mismatch|root \d+ inode \d+ errors|.*errors? found in)")
+NUMBER_RE = re.compile(r"\d+")
+# surfacescan çıktısı: okunamayan aralık, yavaş bölge, özet ve e2fsck -l listesi
+SURFACE_BAD_RE = re.compile(r"^Unreadable: LBA (\d+) \(\+(\d+)\) at byte (\d+)$")
+SURFACE_REGION_RE = re.compile(
+    r"^Slow region (\d+) \(bytes (\d+)-(\d+)\): ([\d.]+) MB/s, max latency (\d+) ms, "
+    r"(\d+) outliers, (\d+) unreadable sectors$")
+SURFACE_SUMMARY_RE = re.compile(
+    r"^Scanned (\d+) bytes in ([\d.]+) s \(([\d.]+) MB/s, (direct|buffered) I/O\), (\d+) unreadable sectors$")
+SURFACE_LIST_RE = re.compile(r"^Bad block list: (.+) \((\d+) blocks\)$")
+# triage.Triage.describe satırı: karar ve gerekçe
+TRIAGE_RE = re.compile(r"^Triage: (passed|failed|due|unavailable)(?: \((.*)\))?$")
+
+# e2fsck çıkış kodu bitleri
+EXIT_CORRECTED = 1
+EXIT_REBOOT = 2
+EXIT_UNCORRECTED = 4
+EXIT_OPERATIONAL = 8
+EXIT_USAGE = 16
+EXIT_CANCELED = 32
+EXIT_LIBRARY = 128
+
+# Araç sürümü sürüm başına bir kez sorulur (e2fsck kendi başlığını da basar)
+VERSION_COMMANDS = {
+    "e2fsck": (["/sbin/e2fsck", "-V"], re.compile(r"^e2fsck (\S+)")),
+    "btrfs": (["btrfs", "--version"], re.compile(r"^btrfs-progs v?(\S+)")),
+}
+VERSION_TIMEOUT = 5
+_tool_versions = {}
+
+
+def tool_version(tool):
+    """e2fsprogs/btrfs-progs sürümü (örn. "1.47.0"); bulunamazsa None"""
+    if tool not in VERSION_COMMANDS:
+        # Uygulamanın kendi araçları (surfacescan) ayrı sürümlenmez
+        return None
+    if tool not in _tool_versions:
+        cmd, pattern = VERSION_COMMANDS[tool]
+        version = None
+        try:
+            proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                  stdin=subprocess.DEVNULL, timeout=VERSION_TIMEOUT)
+            for line in proc.stdout.decode("utf-8", "replace").splitlines():
+                match = pattern.match(line.strip())
+                if match:
+                    version = match.group(1)
+                    break
+        except (OSError, subprocess.SubprocessError):
+            pass
+        _tool_versions[tool] = version
+    return _tool_versions[tool]
+
+
+def problem_signature(text):
+    """Sayıları # ile değiştirerek aynı türdeki sorunları tek imzada topla"""
+    return NUMBER_RE.sub("#", text.strip())[:160]
+
+
+class FsckReport:
+    """Tek bir kontrol/onarım çalıştırmasının yapılandırılmış raporu"""
+
+    def __init__(self, device, fstype, action="examine"):
+        self.device = device
+        self.fstype = fstype
+        self.tool = "surfacescan" if action == "surface" else "btrfs" if fstype == "btrfs" else "e2fsck"
+        self.tool_version = None
+        self.action = action
+        self.started = time.time()
+        self.finished = None
+        self.returncode = None
+        self.verdict = None
+        self.lines = 0
+        self.passes = []
+        self.problems_total = 0
+        self.problems_fixed = 0
+        self.problems_unfixed = 0
+        self.problem_kinds = {}
+        self.problem_kinds_overflow = 0
+        self.errors = 0
+        self.modified = False
+        self.summary = {}
+        # İptal edilen çalıştırmada o ana kadarki ilerleme (fsckprogress snapshot)
+        self.partial = None
+        # Kısıtlama profili ve elde edilen okuma verimi
+        self.io = None
+        # Bellek bütçesi kararı, tahmin ve aracın tepe RSS değeri (membudget.Plan.as_dict)
+        self.memory = None
+        # Aracın süreç kaynakları (jobengine resources) ve e2fsck -tt'nin kendi toplamları
+        self.resources = None
+        self.tool_timing = None
+        # Tam kontrol öncesi ön inceleme kararı ({"verdict", "reason"}); yapılmadıysa None
+        self.triage = None
+
+    def add_problem(self, text, fixed):
+        self.problems_total += 1
+        if fixed:
+            self.problems_fixed += 1
+        else:
+            self.problems_unfixed += 1
+        signature = problem_signature(text)
+        if signature in self.problem_kinds or len(self.problem_kinds) < MAX_PROBLEM_KINDS:
+            self.problem_kinds[signature] = self.problem_kinds.get(signature, 0) + 1
+        else:
+            self.problem_kinds_overflow += 1
+
+    def finish(self, returncode):
+        self.finished = time.time()
+        self.returncode = returncode
+        self.verdict = self.classify(returncode)
+        return self
+
+    def set_io(self, profile, read_bytes, seconds):
+        """Profili ve aracın diskten okuduğu bayttan hesaplanan verimi kaydet"""
+        rate = throttle.throughput(read_bytes, seconds)
+        self.io = {
+            "profile": profile or throttle.DEFAULT_PROFILE,
+            "read_bytes": read_bytes,
+            "active_s": round(seconds, 3) if seconds is not None else None,
+            "throughput_mb_s": round(rate, 2) if rate is not None else None,
+        }
+        return self.io
+
+    def mark_cancelled(self, partial=None):
+        """Kullanıcı iptali: hangi çıkış koduyla bitmiş olursa olsun sonuç "cancelled" """
+        self.verdict = "cancelled"
+        self.partial = partial
+
+    def classify(self, returncode):
+        if returncode is None:
+            return "failed"
+        # scrub çıkış kodu scrub.exit_code ile e2fsck bitlerine çevrilmiştir
+        if self.tool == "btrfs" and self.action != "scrub":
+            if returncode == 0 and not self.errors:
+                return "clean"
+            return "errors" if self.errors or returncode == 1 else "failed"
+        if returncode & EXIT_CANCELED:
+            return "cancelled"
+        if returncode & (EXIT_OPERATIONAL | EXIT_USAGE | EXIT_LIBRARY):
+            return "failed"
+        if returncode & EXIT_UNCORRECTED:
+            return "errors"
+        if returncode & (EXIT_CORRECTED | EXIT_REBOOT):
+            return "fixed"
+        return "errors" if self.problems_unfixed else "clean"
+
+    def as_dict(self):
+        return {
+            "device": self.device,
+            "fstype": self.fstype,
+            "tool": self.tool,
+            "tool_version": self.tool_version,
+            "action": self.action,
+            "started": self.started,
+            "finished": self.finished,
+            "duration_s": (self.finished - self.started) if self.finished else None,
+            "returncode": self.returncode,
+            "verdict": self.verdict,
+            "lines": self.lines,
+            "passes": self.passes,
+            "problems": {
+                "total": self.problems_total,
+                "fixed": self.problems_fixed,
+                "unfixed": self.problems_unfixed,
+                "kinds": self.problem_kinds,
+                "kinds_overflow": self.problem_kinds_overflow,
+            },
+            "errors": self.errors,
+            "modified": self.modified,
+            "summary": self.summary,
+            "partial": self.partial,
+            "io": self.io,
+            "memory": self.memory,
+            "resources": self.resources,
+            "tool_timing": self.tool_timing,
+            "triage": self.triage,
+        }
+
+    def write_json(self, directory=REPORT_DIR):
+        """Raporu dizine yaz ve dosya yolunu döndür"""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.device).strip("_") or "device"
+        path = os.path.join(directory, f"{stamp}-{name}-{self.action}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        self._prune(directory)
+        return path
+
+    @staticmethod
+    def _prune(directory):
+        try:
+            names = sorted(n for n in os.listdir(directory) if n.endswith(".json"))
+        except OSError:
+            return
+        for name in names[:-KEEP_REPORTS]:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+
+
+def load_reports(directory=REPORT_DIR):
+    """Kayıtlı raporları eskiden yeniye sözlük olarak üret; bozuk dosyalar atlanır"""
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".json"))
+    except OSError:
+        return
+    for name in names:
+        try:
+            with open(os.path.join(directory, name)) as f:
+                yield json.load(f)
+        except (OSError, ValueError):
+            continue
+
+
+def performance_profiles(reports):
+    """Raporları aygıt, eylem ve araç sürümüne göre grupla; süre ve kaynakların medyanı
+
+    e2fsprogs/btrfs-progs sürümleri arasında aynı dosya sisteminin karşılaştırılması içindir.
+    """
+    groups = {}
+    for report in reports:
+        if report.get("verdict") in ("cancelled", "failed") or not report.get("finished"):
+            continue
+        key = (report["device"], report["action"], report["tool"], report.get("tool_version"))
+        groups.setdefault(key, []).append(report)
+    profiles = []
+    for (device, action, tool, version), runs in sorted(groups.items(), key=lambda item: str(item[0])):
+        def median(values):
+            values = [v for v in values if v is not None]
+            return round(statistics.median(values), 3) if values else None
+
+        usage = [run.get("resources") or {} for run in runs]
+        passes = {}
+        for run in runs:
+            for entry in run.get("passes", []):
+                # -tt süresi varsa aracın kendi ölçümü, yoksa satır zaman damgaları kullanılır
+                seconds = entry.get("real_s", entry.get("duration_s"))
+                passes.setdefault(entry["pass"], []).append(seconds)
+        profiles.append({
+            "device": device,
+            "action": action,
+            "tool": tool,
+            "tool_version": version,
+            "runs": len(runs),
+            "duration_s": median(run.get("duration_s") for run in runs),
+            "user_s": median(u.get("user_s") for u in usage),
+            "sys_s": median(u.get("sys_s") for u in usage),
+            "peak_rss": median(u.get("peak_rss") for u in usage),
+            "read_bytes": median(u.get("read_bytes") for u in usage),
+            "passes": {name: median(values) for name, values in passes.items()},
+        })
+    return profiles
+
+
+class ReportParser:
+    """Satır satır beslenen, sabit bellekli çıktı ayrıştırıcı"""
+
+    def __init__(self, device, fstype, action="examine"):
+        self.report = FsckReport(device, fstype, action)
+        self.feed_line = self._feed_btrfs if fstype == "btrfs" else self._feed_e2fsck
+        # scrub ham sayaçları aygıt başına tutulur; sorunlar bitişte sayaçlardan yazılır
+        self.scrub = None
+        if action == "scrub":
+            self.scrub = fsckprogress.ScrubProgress()
+            self.feed_line = self._feed_scrub
+        elif action == "surface":
+            self.feed_line = self._feed_surface
+        # Soru kendi satırında geldiğinde ("Fix? no") açıklama önceki satırdadır
+        self.context = ""
+
+    def _start_pass(self, name, title):
+        now = time.time()
+        if self.report.passes:
+            last = self.report.passes[-1]
+            last["duration_s"] = now - last["started"]
+        self.report.passes.append({"pass": name, "title": title, "started": now, "duration_s": None})
+
+    def _timing_target(self, name):
+        # Geçiş satırı geçişin sonunda gelir; geçişsiz satır aracın toplamıdır
+        if name is None:
+            if self.report.tool_timing is None:
+                self.report.tool_timing = {}
+            return self.report.tool_timing
+        for entry in reversed(self.report.passes):
+            if entry["pass"] == name:
+                return entry
+        return None
+
+    def _feed_timing(self, line):
+        """e2fsck -tt satırıysa işle ve True döndür"""
+        match = E2FSCK_TIMING_RE.match(line)
+        if match:
+            heap_kb = int(match.group("arena")) + int(match.group("mmap"))
+            if match.group("peak"):
+                target = self._timing_target(None)
+                target["peak_heap_kb"] = max(target.get("peak_heap_kb", 0), heap_kb)
+                return True
+            target = self._timing_target(match.group("pass"))
+            if target is not None:
+                target.update({
+                    "real_s": float(match.group("real")),
+                    "user_s": float(match.group("user")),
+                    "sys_s": float(match.group("sys")),
+                    "heap_kb": heap_kb,
+                })
+            return True
+        match = E2FSCK_IO_RE.match(line)
+        if match:
+            target = self._timing_target(match.group("pass"))
+            if target is not None:
+                target["read_mb"] = int(match.group("read"))
+                target["write_mb"] = int(match.group("write"))
+            return True
+        return False
+
+    def _feed_e2fsck(self, line):
+        report = self.report
+        report.lines += 1
+        line = line.rstrip()
+        if self._feed_timing(line):
+            return
+        match = TRIAGE_RE.match(line)
+        if match:
+            report.triage = {"verdict": match.group(1), "reason": match.group(2) or ""}
+            return
+        match = E2FSCK_VERSION_RE.match(line)
+        if match:
+            report.tool_version = match.group(1)
+            return
+        match = E2FSCK_PASS_RE.match(line)
+        if match:
+            self._start_pass(match.group(1), match.group(2))
+            return
+        match = E2FSCK_QUESTION_RE.match(line)
+        if match:
+            desc = match.group("desc") or self.context or match.group("question")
+            report.add_problem(desc, match.group("answer") == "yes" and report.action not in COPY_ACTIONS)
+            self.context = ""
+            return
+        match = E2FSCK_SUMMARY_RE.match(line)
+        if match:
+            summary = {
+                "files_used": int(match.group("files_used")),
+                "files_total": int(match.group("files_total")),
+                "blocks_used": int(match.group("blocks_used")),
+                "blocks_total": int(match.group("blocks_total")),
+                "clean_shortcut": bool(match.group("clean")),
+            }
+            if match.group("noncontig") is not None:
+                summary["noncontiguous_pct"] = float(match.group("noncontig"))
+            report.summary.update(summary)
+            return
+        if E2FSCK_MODIFIED in line:
+            report.modified = True
+        elif line.strip():
+            self.context = line
+
+    def _feed_btrfs(self, line):
+        report = self.report
+        report.lines += 1
+        line = line.strip()
+        match = BTRFS_STAGE_RE.match(line)
+        if match:
+            self._start_pass(match.group(1), match.group(3))
+            return
+        match = BTRFS_FOUND_RE.match(line)
+        if match:
+            report.summary["bytes_used"] = int(match.group(1))
+            report.summary["errors_found"] = match.group(2) != "no error found"
+            return
+        match = BTRFS_TOTAL_RE.match(line)
+        if match:
+            report.summary[match.group(1).replace(" ", "_")] = int(match.group(2))
+            return
+        if BTRFS_ERROR_RE.match(line):
+            report.errors += 1
+            report.add_problem(line, fixed=report.action == "repair")
+
+    def _feed_scrub(self, line):
+        self.report.lines += 1
+        self.scrub.feed_line(line)
+
+    def _feed_surface(self, line):
+        report = self.report
+        report.lines += 1
+        line = line.rstrip()
+        match = SURFACE_BAD_RE.match(line)
+        if match:
+            report.add_problem(line, fixed=False)
+            unreadable = report.summary.setdefault("unreadable", [])
+            if len(unreadable) < MAX_PROBLEM_KINDS:
+                unreadable.append({"lba": int(match.group(1)), "sectors": int(match.group(2)),
+                                   "offset": int(match.group(3))})
+            return
+        match = SURFACE_REGION_RE.match(line)
+        if match:
+            report.summary.setdefault("slow_regions", []).append({
+                "region": int(match.group(1)), "start": int(match.group(2)), "end": int(match.group(3)),
+                "mb_s": float(match.group(4)), "max_latency_ms": int(match.group(5)),
+                "outliers": int(match.group(6)), "unreadable_sectors": int(match.group(7))})
+            return
+        match = SURFACE_SUMMARY_RE.match(line)
+        if match:
+            report.summary.update({
+                "scanned_bytes": int(match.group(1)), "seconds": float(match.group(2)),
+                "throughput_mb_s": float(match.group(3)), "direct_io": match.group(4) == "direct",
+                "unreadable_sectors": int(match.group(5))})
+            report.errors = int(match.group(5))
+            return
+        match = SURFACE_LIST_RE.match(line)
+        if match:
+            report.summary["bad_block_list"] = match.group(1)
+            report.summary["bad_blocks"] = int(match.group(2))
+
+    def _finish_scrub(self):
+        report = self.report
+        scrub = self.scrub
+        report.summary["scrubbed_bytes"] = scrub.scrubbed_bytes
+        report.summary["devices"] = {name: dict(device) for name, device in scrub.devices.items()}
+        report.errors = scrub.errors
+        report.problems_total = scrub.errors
+        report.problems_fixed = min(scrub.corrected, scrub.errors)
+        report.problems_unfixed = scrub.errors - report.problems_fixed
+        for name in fsckprogress.SCRUB_ERROR_COUNTERS:
+            count = sum(device.get(name, 0) for device in scrub.devices.values())
+            if count:
+                report.problem_kinds[name] = count
+
+    def finish(self, returncode):
+        if self.scrub is not None:
+            self._finish_scrub()
+        if self.report.passes and self.report.passes[-1]["duration_s"] is None:
+            last = self.report.passes[-1]
+            last["duration_s"] = time.time() - last["started"]
+        if self.report.tool_version is None:
+            self.report.tool_version = tool_version(self.report.tool)
+        return self.report.finish(returncode)
+
+
+if __name__ == "__main__":
+    # Kullanım: fsckreport.py [ext4|btrfs] < kayıtlı_çıktı
+    #           fsckreport.py --profiles [RAPOR_DİZİNİ]   (sürüm başına performans profilleri)
+    if sys.argv[1:2] == ["--profiles"]:
+        print(json.dumps(performance_profiles(load_reports(*sys.argv[2:3])), indent=2))
+        sys.exit(0)
+    fstype = sys.argv[1] if len(sys.argv) > 1 else "ext4"
+    parser = ReportParser("stdin", fstype)
+    for input_line in sys.stdin:
+        parser.feed_line(input_line)
+    print(json.dumps(parser.finish(None if len(sys.argv) < 3 else int(sys.argv[2])).as_dict(), indent=2))
@@ -0,0 +1,1097 @@
+#!/usr/bin/env python3
+# Oturum başına bir kez pkexec ile başlatılan yetkili yardımcı ve istemcisi
+# Unix soketi üzerinden JSON satırları: her istek {"id", "op", ...}, her yanıt {"id", "event", ...}
+# Kabuk betiği yoktur; komutlar doğrulanmış argüman listeleriyle çalıştırılır
+import argparse
+import json
+import os
+import pwd
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import bootrepair
+import devices
+import discovery
+import fsckreport
+import jobengine
+import membudget
+import metaimage
+import scheduler
+import scrub
+import snapshot
+import superblock
+import surfacescan
+import throttle
+import triage
+
+SOCKET_NAME = "fscheck-helper.sock"
+# Bağlantı ve iş yokken yardımcının kapanacağı süre (saniye)
+IDLE_TIMEOUT = 600
+IDLE_CHECK = 5.0
+# pkexec parola penceresi dahil yardımcının hazır olması için beklenen en uzun süre
+START_TIMEOUT = 120
+OPS = ("ping", "probe", "examine", "snapshot_examine", "capture", "repair", "scrub", "surface_scan", "unmount",
+       "remount", "schedule_boot_check", "cancel", "pause", "resume", "shutdown")
+FORCEFSCK_FILE = "/forcefsck"
+
+
+class HelperError(Exception):
+    """Yardımcının reddettiği ya da çalıştıramadığı istek"""
+
+
+def default_socket_path(uid=None):
+    uid = os.getuid() if uid is None else uid
+    runtime_dir = f"/run/user/{uid}"
+    if uid == os.getuid() and os.environ.get("XDG_RUNTIME_DIR"):
+        runtime_dir = os.environ["XDG_RUNTIME_DIR"]
+    if not os.path.isdir(runtime_dir):
+        runtime_dir = f"/tmp/fscheck-{uid}"
+    return os.path.join(runtime_dir, SOCKET_NAME)
+
+
+def peer_uid(conn):
+    """Bağlanan sürecin kullanıcı kimliği (SO_PEERCRED)"""
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    pid, uid, gid = struct.unpack("3i", creds)
+    return uid
+
+
+def _mounts(path):
+    """Aygıtın bağlama noktası -> seçenek eşlemesi (ayırmadan önce kaydedilir, geri bağlamada kullanılır)"""
+    return discovery.read_mount_table(with_options=True).get(os.path.basename(os.path.realpath(path)), {})
+
+
+def _remount_command(path, mountpoint, previous=None):
+    """Yeniden bağlama komutu: önceki bağlama suid/dev'e izin vermiyorsa (ya da bilinmiyorsa) nosuid,nodev"""
+    if previous is None:
+        flags = ["nosuid", "nodev"]
+    else:
+        options = previous.split(",")
+        flags = [flag for flag in ("ro", "nosuid", "nodev", "noexec") if flag in options]
+    cmd = ["mount"]
+    if flags:
+        cmd += ["-o", ",".join(flags)]
+    return cmd + ["--", os.path.realpath(path), mountpoint]
+
+
+class LineSocket:
+    """Satır tabanlı JSON soketi; okuma döngüden (ya da bir okuyucu iş parçacığından) beslenir"""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
+        self.send_lock = threading.Lock()
+
+    def send(self, message):
+        data = (json.dumps(message) + "\n").encode()
+        with self.send_lock:
+            try:
+                self.sock.sendall(data)
+                return True
+            except OSError:
+                return False
+
+    def receive(self):
+        """Hazır veriyi oku; tam satırlardan çözülen mesajları döndür, bağlantı kapandıysa None"""
+        try:
+            data = self.sock.recv(65536)
+        except BlockingIOError:
+            return []
+        except OSError:
+            data = b""
+        if not data:
+            return None
+        lines = (self.buffer + data).split(b"\n")
+        self.buffer = lines.pop()
+        messages = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                messages.append({"id": None, "op": None, "invalid": True})
+        return messages
+
+
+class Connection(LineSocket):
+    """Sunucu tarafında tek istemci bağlantısı"""
+
+    def __init__(self, server, sock):
+        super().__init__(sock)
+        self.server = server
+        # İş kimliği -> o an çalışan adımın ProcessJob'u
+        self.procs = {}
+        self.cancelled = set()
+        # Duraklatılmış işler; sonraki adım da duraklatılmış başlar
+        self.paused = set()
+        # İş kimliği -> adımların toplam okunan bayt ve çalışma süresi (verim raporu için)
+        self.io = {}
+        # Bu bağlantının ayırdığı bağlamalar: aygıt -> {bağlama noktası: önceki seçenekler};
+        # remount yalnızca bunları geri bağlar
+        self.unmounted = {}
+        self.closed = False
+        self.watch = server.loop.add_reader(sock.fileno(), self.on_readable)
+
+    def on_readable(self):
+        messages = self.receive()
+        if messages is None:
+            self.close()
+            return
+        for request in messages:
+            self.server.handle_request(self, request)
+
+    def cancel(self, job_id):
+        self.cancelled.add(job_id)
+        self.paused.discard(job_id)
+        proc = self.procs.get(job_id)
+        return proc.cancel() if proc else (self, job_id) in self.server.active
+
+    def pause(self, job_id):
+        if (self, job_id) not in self.server.active:
+            return False
+        self.paused.add(job_id)
+        proc = self.procs.get(job_id)
+        return proc.pause() if proc else True
+
+    def resume(self, job_id):
+        if job_id not in self.paused:
+            return False
+        self.paused.discard(job_id)
+        proc = self.procs.get(job_id)
+        return proc.resume() if proc else True
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.server.loop.remove_reader(self.watch)
+        # İstemci gittiyse işleri güvenli şekilde durdur (e2fsck SIGTERM'de 32 ile çıkar)
+        for job_id in list(self.procs):
+            self.cancel(job_id)
+        self.sock.close()
+        self.server.connection_closed(self)
+
+
+class HelperServer:
+    """Yetkili yardımcı: sadece sahibinden (ve root'tan) gelen bağlantıları kabul eder
+
+    Tek iş parçacığıyla çalışır; tüm süreçler jobengine döngüsünde izlenir.
+    Test kipinde yetkisiz çalışır ve sadece düzenli dosyaları (imajları) kabul eder.
+    """
+
+    def __init__(self, socket_path, owner_uid, test_mode=False, idle_timeout=IDLE_TIMEOUT):
+        self.socket_path = socket_path
+        self.owner_uid = owner_uid
+        self.test_mode = test_mode
+        self.idle_timeout = idle_timeout
+        self.loop = jobengine.SelectorLoop()
+        self.engine = jobengine.JobEngine(self.loop)
+        self.connections = set()
+        # (bağlantı, iş kimliği) çiftleri
+        self.active = set()
+        self.last_active = time.monotonic()
+        self.stopped = False
+        self.listener = None
+
+    def bind(self):
+        directory = os.path.dirname(self.socket_path)
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC)
+        self.listener.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        if os.getuid() == 0 and self.owner_uid != 0:
+            os.chown(self.socket_path, self.owner_uid, -1)
+        self.listener.listen(8)
+        self.listener.setblocking(False)
+
+    def serve_forever(self):
+        if self.listener is None:
+            self.bind()
+        watch = self.loop.add_reader(self.listener.fileno(), self._accept)
+        self.loop.call_later(IDLE_CHECK, self._check_idle)
+        try:
+            # Durdurulduktan sonra süren işler (ör. yeniden bağlama) tamamlanır
+            self.loop.run_until(lambda: self.stopped and not self.active)
+        finally:
+            self.loop.remove_reader(watch)
+            for conn in list(self.connections):
+                conn.close()
+            self.listener.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+
+    def _accept(self):
+        try:
+            sock, _ = self.listener.accept()
+        except BlockingIOError:
+            return
+        if self.stopped or peer_uid(sock) not in (self.owner_uid, 0):
+            sock.close()
+            return
+        sock.setblocking(True)
+        self.connections.add(Connection(self, sock))
+        self.last_active = time.monotonic()
+
+    def stop(self):
+        self.stopped = True
+        for conn in list(self.connections):
+            for job_id in list(conn.procs):
+                conn.cancel(job_id)
+
+    def connection_closed(self, conn):
+        self.connections.discard(conn)
+        self.last_active = time.monotonic()
+
+    def _check_idle(self):
+        if not self.connections and not self.active:
+            if time.monotonic() - self.last_active > self.idle_timeout:
+                self.stopped = True
+                return
+        self.loop.call_later(IDLE_CHECK, self._check_idle)
+
+    # --- İstek doğrulama ---
+
+    def validate_target(self, request, device_only=False):
+        """device_only: bağlama, ayırma ve onarım kullanıcıya ait imaj dosyalarını kabul etmez"""
+        path = request.get("path")
+        fstype = request.get("fstype")
+        if not isinstance(path, str) or not path.startswith("/"):
+            raise HelperError("Path must be absolute")
+        if fstype not in devices.SUPPORTED_FSTYPES:
+            raise HelperError(f"Unsupported filesystem: {fstype}")
+        try:
+            mode = os.stat(path).st_mode
+        except OSError as e:
+            raise HelperError(str(e))
+        if self.test_mode and not stat.S_ISREG(mode):
+            raise HelperError("Test mode only accepts image files")
+        if not (stat.S_ISBLK(mode) or stat.S_ISREG(mode)):
+            raise HelperError("Not a block device or image file")
+        if device_only and not self.test_mode and not stat.S_ISBLK(mode):
+            # root olarak kullanıcının hazırladığı imajı bağlamak setuid ikililere kapı açar
+            raise HelperError("Only block devices can be mounted, unmounted or repaired")
+        info = superblock.try_probe(path)
+        if info is not None and info.fstype != fstype:
+            # ext2/3/4 ayrımı e2fsck için önemli değil, btrfs/ext karışıklığı önemli
+            if (info.fstype == "btrfs") != (fstype == "btrfs"):
+                raise HelperError(f"Filesystem on {path} is {info.fstype}, not {fstype}")
+        return path, fstype
+
+    @staticmethod
+    def validate_profile(request):
+        try:
+            return throttle.get_profile(request.get("profile"))
+        except ValueError as e:
+            raise HelperError(str(e)) from None
+
+    # --- İşler ---
+
+    def handle_request(self, conn, request):
+        job_id = request.get("id")
+        op = request.get("op")
+        if request.get("invalid"):
+            conn.send({"id": None, "event": "error", "message": "Invalid JSON"})
+            return
+        if op not in OPS:
+            conn.send({"id": job_id, "event": "error", "message": f"Unknown operation: {op}"})
+            return
+        if op == "shutdown":
+            conn.send({"id": job_id, "event": "exit", "returncode": 0})
+            self.stop()
+            return
+        if op in ("cancel", "pause", "resume"):
+            found = getattr(conn, op)(request.get("job"))
+            conn.send({"id": job_id, "event": "exit", "returncode": 0 if found else 1})
+            return
+        key = (conn, job_id)
+        if key in self.active:
+            conn.send({"id": job_id, "event": "error", "message": "Duplicate job id"})
+            return
+
+        def done(returncode):
+            self.active.discard(key)
+            conn.procs.pop(job_id, None)
+            conn.cancelled.discard(job_id)
+            conn.paused.discard(job_id)
+            self.last_active = time.monotonic()
+            event = {"id": job_id, "event": "exit", "returncode": returncode}
+            event.update(conn.io.pop(job_id, {}))
+            conn.send(event)
+
+        self.active.add(key)
+        try:
+            conn.send({"id": job_id, "event": "accepted", "op": op})
+            getattr(self, "op_" + op)(conn, job_id, request, done)
+        except Exception as e:
+            self.active.discard(key)
+            message = str(e) if isinstance(e, HelperError) else f"{type(e).__name__}: {e}"
+            conn.send({"id": job_id, "event": "error", "message": message})
+
+    def _line(self, conn, job_id, text):
+        conn.send({"id": job_id, "event": "line", "text": text})
+
+    def _spawn(self, conn, job_id, cmd, callback, progress=jobengine.PROGRESS_NONE,
+               kill_grace=jobengine.KILL_GRACE):
+        """Bir adımı çalıştır; çıktı ve ilerleme istemciye akar, bitince callback(çıkış_kodu)"""
+        def on_progress(line):
+            conn.send({"id": job_id, "event": "progress", "line": line})
+
+        def on_exit(proc_job):
+            conn.procs.pop(job_id, None)
+            if proc_job.read_bytes is not None:
+                io = conn.io.setdefault(job_id, {"read_bytes": 0, "active_time": 0.0, "peak_rss": 0})
+                io["read_bytes"] += proc_job.read_bytes
+                io["active_time"] += proc_job.active_time
+                io["peak_rss"] = max(io["peak_rss"], proc_job.peak_rss)
+                io["resources"] = jobengine.add_resources(io.get("resources"), proc_job.resources)
+            if proc_job.error:
+                self._line(conn, job_id, f"Error: {proc_job.error}")
+                callback(fsckreport.EXIT_OPERATIONAL)
+            else:
+                callback(proc_job.returncode)
+
+        proc = conn.procs[job_id] = self.engine.spawn(
+            cmd, progress=progress, on_line=lambda line: self._line(conn, job_id, line),
+            on_progress=on_progress, on_exit=on_exit, kill_grace=kill_grace)
+        if job_id in conn.paused:
+            proc.pause()
+
+    def op_ping(self, conn, job_id, request, done):
+        self._line(conn, job_id, f"uid={os.getuid()} test_mode={self.test_mode}")
+        done(0)
+
+    def validate_memory(self, conn, job_id, request, path, fstype, done, lowmem=True):
+        """Bellek bütçesi kararını ver; (plan, bitince planı raporlayıp temizleyen done)"""
+        budget = request.get("budget")
+        if budget is not None and (not isinstance(budget, int) or budget <= 0):
+            raise HelperError("Memory budget must be a positive number of bytes")
+        scratch = request.get("scratch") or membudget.DEFAULT_SCRATCH_DIR
+        if not isinstance(scratch, str) or not os.path.isabs(scratch):
+            raise HelperError("Scratch directory must be an absolute path")
+        try:
+            st = os.lstat(scratch)
+        except OSError:
+            raise HelperError("Scratch directory does not exist") from None
+        # Root'un geçici dosya yazacağı dizin sembolik bağ olmamalı ve yabancıya ait olmamalı
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid not in (0, self.owner_uid):
+            raise HelperError("Scratch directory must be owned by root or the session user")
+        plan = membudget.plan(path, fstype, budget, scratch_dir=scratch, lowmem=lowmem).prepare()
+
+        def finished(returncode):
+            plan.cleanup()
+            io = conn.io.setdefault(job_id, {})
+            io["memory"] = plan.as_dict(io.get("peak_rss"))
+            done(returncode)
+
+        return plan, finished
+
+    def op_examine(self, conn, job_id, request, done):
+        path, fstype = self.validate_target(request)
+        plan, done = self.validate_memory(conn, job_id, request, path, fstype, done)
+        profile = self.validate_profile(request)
+
+        def examine_command(full=False):
+            cmd = scheduler.examine_command(path, fstype, profile, plan, full)
+            return cmd[1:] if cmd[0] == "pkexec" else cmd
+
+        progress = jobengine.PROGRESS_NONE if fstype == "btrfs" else jobengine.PROGRESS_FD
+        if not request.get("triage") or fstype == "btrfs":
+            self._spawn(conn, job_id, examine_command(), done, progress)
+            return
+
+        def on_exit(check):
+            conn.procs.pop(job_id, None)
+            if check.read_bytes is not None:
+                conn.io[job_id] = {"read_bytes": check.read_bytes, "active_time": check.active_time,
+                                   "peak_rss": check.peak_rss or 0, "resources": check.resources}
+            if check.error:
+                self._line(conn, job_id, f"Error: {check.error}")
+                done(fsckreport.EXIT_OPERATIONAL)
+            else:
+                done(check.returncode)
+
+        # Ön inceleme root olarak aygıtı okur; geçerse e2fsck hiç başlatılmaz
+        conn.procs[job_id] = triage.TriageCheck(
+            self.engine, path, examine_command, on_line=lambda line: self._line(conn, job_id, line),
+            on_progress=lambda line: conn.send({"id": job_id, "event": "progress", "line": line}),
+            on_exit=on_exit, progress=progress, profile=profile).start()
+
+    def op_snapshot_examine(self, conn, job_id, request, done):
+        path, fstype = self.validate_target(request)
+        if fstype == "btrfs":
+            raise HelperError("Snapshot checks are only available for ext2/3/4")
+        if self.test_mode:
+            raise HelperError("Snapshots are not available in test mode")
+
+        def on_exit(check):
+            conn.procs.pop(job_id, None)
+            if check.read_bytes is not None:
+                conn.io[job_id] = {"read_bytes": check.read_bytes, "active_time": check.active_time,
+                                   "resources": check.resources}
+            if check.error:
+                self._line(conn, job_id, f"Error: {check.error}")
+            done(check.returncode)
+
+        # İptal ve duraklatma adımları bilen SnapshotCheck üzerinden yürür
+        conn.procs[job_id] = snapshot.SnapshotCheck(
+            self.engine, path, on_line=lambda line: self._line(conn, job_id, line),
+            on_progress=lambda line: conn.send({"id": job_id, "event": "progress", "line": line}),
+            on_exit=on_exit, profile=self.validate_profile(request)).start()
+
+    def validate_output(self, request):
+        """İmaj yolu: oturum sahibinin dizininde henüz olmayan mutlak bir dosya"""
+        output = request.get("output")
+        if not isinstance(output, str) or not os.path.isabs(output):
+            raise HelperError("Output must be an absolute path")
+        output = os.path.normpath(output)
+        try:
+            parent = os.lstat(os.path.dirname(output))
+        except OSError:
+            raise HelperError("Output directory does not exist") from None
+        if not stat.S_ISDIR(parent.st_mode) or parent.st_uid != self.owner_uid:
+            raise HelperError("Output directory must be owned by the session user")
+        if os.path.lexists(output):
+            raise HelperError("Output file already exists")
+        return output
+
+    def op_probe(self, conn, job_id, request, done):
+        # Yetkisiz arayüz blok aygıtını okuyamaz; önbellek parmak izi ve özet için süper blok
+        path, fstype = self.validate_target(request)
+        info = superblock.try_probe(path)
+        if info is not None:
+            conn.io[job_id] = {"superblock": info.as_dict()}
+        done(0 if info is not None else 1)
+
+    def op_capture(self, conn, job_id, request, done):
+        path, fstype = self.validate_target(request)
+        if fstype == "btrfs":
+            raise HelperError("Metadata capture is only available for ext2/3/4")
+        fmt = request.get("format", metaimage.FORMAT_RAW)
+        if fmt not in metaimage.FORMATS:
+            raise HelperError(f"Unknown image format: {fmt}")
+        output = self.validate_output(request)
+        gid = -1
+        if os.getuid() == 0:
+            try:
+                gid = pwd.getpwuid(self.owner_uid).pw_gid
+            except KeyError:
+                pass
+        # Dosya burada, sembolik bağ izlenmeden oluşturulup sahibine verilir; e2image sadece açık fd'ye yazar
+        try:
+            fd, target = metaimage.open_output(output, (self.owner_uid, gid))
+        except OSError as e:
+            raise HelperError(f"Cannot create output file: {e.strerror}") from None
+
+        def finished(returncode):
+            os.close(fd)
+            done(returncode)
+
+        cmd = metaimage.capture_command(path, target, fmt)
+        self._spawn(conn, job_id, throttle.wrap(cmd, self.validate_profile(request), path), finished)
+
+    def op_repair(self, conn, job_id, request, done):
+        path, fstype = self.validate_target(request, device_only=True)
+        profile = self.validate_profile(request)
+        options = _mounts(path) if request.get("unmount") else {}
+        pending = sorted(options)
+        if "/" in pending:
+            raise HelperError("Refusing to unmount the root filesystem")
+        if pending and self.test_mode:
+            raise HelperError("Unmounting is not available in test mode")
+        plan, done = self.validate_memory(conn, job_id, request, path, fstype, done, lowmem=False)
+        unmounted = []
+
+        def remount_all(returncode):
+            # Başlangıçta bağlı olan her şey, onarım başarısız ya da iptal edilse de geri bağlanır
+            def remount_next(_=None):
+                if not unmounted:
+                    done(returncode)
+                    return
+                mountpoint = unmounted.pop()
+                self._line(conn, job_id, f"Remounting {mountpoint}...")
+                self._spawn(conn, job_id, _remount_command(path, mountpoint, options.get(mountpoint)),
+                            remount_next)
+
+            remount_next()
+
+        def run_tool():
+            if job_id in conn.cancelled:
+                remount_all(fsckreport.EXIT_CANCELED)
+                return
+            if fstype == "btrfs":
+                self._line(conn, job_id, "Starting BTRFS repair...")
+                cmd = ["btrfs", "check", "--repair", path]
+                progress = jobengine.PROGRESS_NONE
+            else:
+                self._line(conn, job_id, "Starting repair...")
+                # Yüzey taramasının bulduğu okunamayan bloklar e2fsck -l ile kötü blok olarak işaretlenir
+                info = superblock.try_probe(path)
+                bad_blocks = surfacescan.bad_blocks_args(info.uuid) if info is not None else []
+                cmd = ["/sbin/e2fsck", "-f", "-y", "-tt"] + bad_blocks + [path]
+                progress = jobengine.PROGRESS_FD
+            # Onarım zorla öldürülmez: e2fsck SIGTERM'de tutarlı bir noktada durur
+            self._spawn(conn, job_id, throttle.wrap(plan.apply(cmd), profile, path), remount_all, progress,
+                        kill_grace=None)
+
+        def unmount_next(mountpoint=None, returncode=0):
+            if mountpoint is not None:
+                if returncode != 0:
+                    remount_all(1)
+                    return
+                unmounted.append(mountpoint)
+            if pending and job_id not in conn.cancelled:
+                mountpoint = pending.pop(0)
+                self._line(conn, job_id, f"Unmounting {mountpoint}...")
+                self._spawn(conn, job_id, ["umount", mountpoint],
+                            lambda rc, mountpoint=mountpoint: unmount_next(mountpoint, rc))
+                return
+            run_tool()
+
+        if request.get("unmount") and not pending:
+            self._line(conn, job_id, "Disk not mounted, proceeding...")
+        unmount_next()
+
+    def op_scrub(self, conn, job_id, request, done):
+        path, fstype = self.validate_target(request)
+        if fstype != "btrfs":
+            raise HelperError("Scrub is only available for btrfs")
+        if self.test_mode:
+            raise HelperError("Scrub is not available in test mode")
+        info = superblock.try_probe(path)
+        fsid = info.uuid if info is not None else None
+        # Bağlama noktası istemciden alınmaz, yardımcı kendisi bulur
+        mountpoint = scrub.find_mountpoint(path, fsid)
+        if mountpoint is None:
+            raise HelperError("Scrub needs a mounted filesystem")
+        limit = request.get("limit")
+        if limit is not None:
+            try:
+                limit = membudget.parse_size(limit)
+            except ValueError as e:
+                raise HelperError(str(e)) from None
+            if limit <= 0:
+                raise HelperError("Scrub limit must be a positive size")
+
+        def on_exit(check):
+            conn.procs.pop(job_id, None)
+            conn.io[job_id] = {"read_bytes": check.read_bytes, "active_time": check.active_time,
+                               "resources": check.resources}
+            if check.error:
+                self._line(conn, job_id, f"Error: {check.error}")
+            done(check.returncode)
+
+        # Duraklatma ve iptal scrub'ı kaydedilen ilerlemeyle durdurur (ScrubCheck)
+        conn.procs[job_id] = scrub.ScrubCheck(
+            self.engine, path, mountpoint, on_line=lambda line: self._line(conn, job_id, line),
+            on_progress=lambda line: conn.send({"id": job_id, "event": "progress", "line": line}),
+            on_exit=on_exit, profile=self.validate_profile(request), readonly=bool(request.get("readonly")),
+            limit=limit, fsid=fsid).start()
+
+    def op_surface_scan(self, conn, job_id, request, done):
+        path, fstype = self.validate_target(request)
+        # Tarama salt okunurdur. Kötü blok listesi (UUID adıyla, onarımda e2fsck -l) sadece blok
+        # aygıtında yazılır: kullanıcının imajı gerçek aygıtın listesini silemez ya da değiştiremez
+        cmd = surfacescan.command(path, self.validate_profile(request), prefix=[],
+                                  write_list=not self.test_mode and surfacescan.is_block_device(path))
+        self._spawn(conn, job_id, cmd, done, jobengine.PROGRESS_STDOUT)
+
+    def op_unmount(self, conn, job_id, request, done):
+        path, fstype = self.validate_target(request, device_only=True)
+        if self.test_mode:
+            raise HelperError("Unmounting is not available in test mode")
+        options = _mounts(path)
+        pending = sorted(options)
+        if "/" in pending:
+            raise HelperError("Refusing to unmount the root filesystem")
+        unmounted = conn.unmounted.setdefault(os.path.realpath(path), {})
+
+        def unmount_next(mountpoint=None, returncode=0):
+            if mountpoint is not None and returncode == 0:
+                unmounted[mountpoint] = options.get(mountpoint)
+            if returncode != 0 or not pending:
+                done(returncode)
+                return
+            mountpoint = pending.pop(0)
+            self._spawn(conn, job_id, ["umount", "--", mountpoint],
+                        lambda rc, mountpoint=mountpoint: unmount_next(mountpoint, rc))
+
+        unmount_next()
+
+    def op_remount(self, conn, job_id, request, done):
+        path, fstype = self.validate_target(request, device_only=True)
+        mountpoint = request.get("mountpoint")
+        if self.test_mode:
+            raise HelperError("Mounting is not available in test mode")
+        # Sadece bu bağlantının daha önce ayırdığı aygıt, aynı bağlama noktasına geri bağlanır
+        unmounted = conn.unmounted.get(os.path.realpath(path), {})
+        if mountpoint not in unmounted:
+            raise HelperError("Only mount points unmounted by this session can be remounted")
+        previous = unmounted.pop(mountpoint)
+        self._spawn(conn, job_id, _remount_command(path, mountpoint, previous), done)
+
+    def op_schedule_boot_check(self, conn, job_id, request, done):
+        if self.test_mode:
+            raise HelperError("Boot check scheduling is not available in test mode")
+        if request.get("path") is None:
+            # Eski istemciler: sadece kök için /forcefsck bayrağı
+            with open(FORCEFSCK_FILE, "a"):
+                pass
+            done(0)
+            return
+        path, fstype = self.validate_target(request)
+        info = superblock.try_probe(path)
+        if info is None or not info.uuid:
+            raise HelperError("Filesystem UUID not readable")
+        try:
+            bootrepair.add_job(info.uuid, fstype, path, request.get("mode", "repair"), request.get("force", True))
+        except ValueError as e:
+            raise HelperError(str(e)) from None
+        self._line(conn, job_id, f"Scheduled {path} ({info.uuid}) for boot repair")
+        done(0)
+
+
+class RemoteJob:
+    """Yardımcıda çalışan iş; jobengine.ProcessJob ile aynı durum alanlarına sahiptir"""
+
+    def __init__(self, client, op, on_line=None, on_progress=None, on_exit=None):
+        self.client = client
+        self.op = op
+        self.id = None
+        self.on_line = on_line
+        self.on_progress = on_progress
+        self.on_exit = on_exit
+        self.state = jobengine.ProcessJob.RUNNING
+        self.returncode = None
+        self.error = None
+        self.started = time.monotonic()
+        self.finished = None
+        self.cancel_requested = False
+        self.paused = False
+        # Çıkış olayında yardımcı tarafından doldurulur
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.peak_rss = None
+        self.memory = None
+        self.resources = None
+        # probe işinde yardımcının okuduğu süper blok (as_dict)
+        self.superblock = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self):
+        return self.finished is None
+
+    @property
+    def can_pause(self):
+        # Sinyali root olan yardımcı gönderir
+        return self.running
+
+    def handle_event(self, event):
+        kind = event.get("event")
+        if kind == "line" and self.on_line:
+            self.on_line(event.get("text", ""))
+        elif kind == "progress" and self.on_progress:
+            self.on_progress(event.get("line", ""))
+        elif kind in ("exit", "error"):
+            self.finished = time.monotonic()
+            if kind == "error":
+                self.error = event.get("message", "")
+                self.state = jobengine.ProcessJob.FAILED
+            else:
+                self.returncode = event.get("returncode")
+                self.read_bytes = event.get("read_bytes")
+                self.active_time = event.get("active_time", self.elapsed)
+                self.peak_rss = event.get("peak_rss")
+                self.memory = event.get("memory")
+                self.resources = event.get("resources")
+                self.superblock = event.get("superblock")
+                cancelled = self.cancel_requested or self.returncode == fsckreport.EXIT_CANCELED
+                self.state = jobengine.ProcessJob.CANCELLED if cancelled else jobengine.ProcessJob.DONE
+            if self.on_exit:
+                self.on_exit(self)
+
+    def cancel(self):
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        self.client.submit("cancel", None, job=self.id)
+        return True
+
+    def pause(self):
+        if not self.running or self.paused:
+            return False
+        self.paused = True
+        self.client.submit("pause", None, job=self.id)
+        return True
+
+    def resume(self):
+        if not self.paused:
+            return False
+        self.paused = False
+        self.client.submit("resume", None, job=self.id)
+        return True
+
+
+class HelperClient(LineSocket):
+    """Yardımcıya bağlı istemci; birden çok iş aynı bağlantı üzerinden eşzamanlı yürür
+
+    loop verilirse olaylar döngüden (arayüzde GLib ana döngüsü) okunur ve geri
+    çağrılar ana iş parçacığında çalışır; verilmezse bir okuyucu iş parçacığı kullanılır.
+    """
+
+    def __init__(self, socket_path, loop=None):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM | socket.SOCK_CLOEXEC)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            sock.close()
+            raise
+        super().__init__(sock)
+        self.socket_path = socket_path
+        self.loop = loop
+        self.lock = threading.Lock()
+        self.handlers = {}
+        self.next_id = 1
+        self.closed = False
+        if loop is not None:
+            self.watch = loop.add_reader(sock.fileno(), self._on_readable)
+        else:
+            threading.Thread(target=self._read_thread, daemon=True).start()
+
+    @classmethod
+    def start(cls, socket_path=None, test_mode=False, timeout=START_TIMEOUT):
+        """Çalışan yardımcıya bağlan; yoksa başlat ve hazır olana kadar bekle (komut satırı için)"""
+        socket_path = socket_path or default_socket_path()
+        try:
+            return cls(socket_path)
+        except OSError:
+            pass
+        proc = spawn_server(socket_path, test_mode)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                return cls(socket_path)
+            except OSError:
+                if proc.poll() is not None:
+                    raise HelperError(f"Helper exited with code {proc.returncode}")
+                time.sleep(0.05)
+        proc.terminate()
+        raise HelperError("Timed out waiting for helper")
+
+    @property
+    def alive(self):
+        return not self.closed
+
+    def _dispatch(self, messages):
+        for event in messages:
+            with self.lock:
+                handler = self.handlers.get(event.get("id"))
+                if event.get("event") in ("exit", "error"):
+                    self.handlers.pop(event.get("id"), None)
+            if handler:
+                handler(event)
+
+    def _on_readable(self):
+        messages = self.receive()
+        if messages is None:
+            self.loop.remove_reader(self.watch)
+            self._closed()
+            return
+        self._dispatch(messages)
+
+    def _read_thread(self):
+        while True:
+            messages = self.receive()
+            if messages is None:
+                break
+            self._dispatch(messages)
+        self._closed()
+
+    def _closed(self):
+        self.closed = True
+        with self.lock:
+            handlers, self.handlers = self.handlers, {}
+        for job_id, handler in handlers.items():
+            handler({"id": job_id, "event": "error", "message": "Helper connection closed"})
+
+    def submit(self, op, on_event, **args):
+        """İsteği gönder ve iş kimliğini döndür"""
+        with self.lock:
+            if self.closed:
+                raise HelperError("Helper connection closed")
+            job_id = self.next_id
+            self.next_id += 1
+            if on_event:
+                self.handlers[job_id] = on_event
+        if not self.send(dict(args, id=job_id, op=op)):
+            raise HelperError("Helper connection closed")
+        return job_id
+
+    def spawn(self, op, on_line=None, on_progress=None, on_exit=None, **args):
+        """İşi başlat ve RemoteJob döndür; on_exit(iş) bitişte çağrılır"""
+        job = RemoteJob(self, op, on_line, on_progress, on_exit)
+        job.id = self.submit(op, job.handle_event, **args)
+        return job
+
+    def call(self, op, on_line=None, on_progress=None, **args):
+        """İşi çalıştır ve bitene kadar bekle (sadece okuyucu iş parçacıklı istemcide)"""
+        done = threading.Event()
+        job = self.spawn(op, on_line, on_progress, lambda job: done.set(), **args)
+        done.wait()
+        if job.error is not None:
+            raise HelperError(job.error)
+        return job.returncode
+
+    def close(self):
+        self.closed = True
+        if self.loop is not None:
+            self.loop.remove_reader(self.watch)
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def spawn_server(socket_path, test_mode=False):
+    """Yardımcıyı başlat: test kipinde ya da root iken doğrudan, aksi halde tek bir pkexec ile"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--serve",
+           "--socket", socket_path, "--owner", str(os.getuid())]
+    if test_mode:
+        cmd.append("--test")
+    elif os.getuid() != 0:
+        cmd = ["pkexec"] + cmd
+    return subprocess.Popen(cmd, stdin=subprocess.DEVNULL, start_new_session=True)
+
+
+class Launch:
+    """Yardımcı hazır olunca başlayan iş; o ana kadar gelen iptal isteği saklanır"""
+
+    def __init__(self):
+        self.job = None
+        self.cancel_requested = False
+        # Başlamadan iptal edilirse on_exit'e bu nesne verilir
+        self.state = jobengine.ProcessJob.RUNNING
+        self.returncode = None
+        self.error = None
+        self.elapsed = 0.0
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.peak_rss = None
+        self.memory = None
+        self.resources = None
+
+    @property
+    def paused(self):
+        return bool(self.job and self.job.paused)
+
+    @property
+    def can_pause(self):
+        return bool(self.job and self.job.can_pause)
+
+    def cancel(self):
+        self.cancel_requested = True
+        return self.job.cancel() if self.job else True
+
+    def pause(self):
+        return self.job.pause() if self.job else False
+
+    def resume(self):
+        return self.job.resume() if self.job else False
+
+
+class Session:
+    """Oturumun paylaşılan yardımcı bağlantısı; ilk istekte bir kez başlatılır
+
+    Başlatma döngüyü bloklamaz: parola penceresi açıkken arayüz çalışmaya devam eder.
+    Yardımcı başlatılamazsa (parola reddedildi) istekler doğrudan pkexec yoluna düşer.
+    """
+
+    def __init__(self, loop, socket_path=None, test_mode=False):
+        self.loop = loop
+        self.socket_path = socket_path or default_socket_path()
+        self.test_mode = test_mode
+        self.client = None
+        self.failed = False
+        self.waiters = []
+        self.proc = None
+        self.deadline = None
+
+    def request(self, callback):
+        """callback(istemci ya da None) döngüden çağrılır"""
+        if self.client is not None and self.client.alive:
+            callback(self.client)
+            return
+        if self.failed:
+            callback(None)
+            return
+        self.waiters.append(callback)
+        if len(self.waiters) > 1:
+            return
+        try:
+            self._ready(HelperClient(self.socket_path, self.loop))
+            return
+        except OSError:
+            pass
+        try:
+            self.proc = spawn_server(self.socket_path, self.test_mode)
+        except OSError:
+            self._ready(None)
+            return
+        self.deadline = time.monotonic() + START_TIMEOUT
+        self.loop.call_later(0.05, self._poll)
+
+    def _poll(self):
+        try:
+            self._ready(HelperClient(self.socket_path, self.loop))
+        except OSError:
+            if self.proc.poll() is not None or time.monotonic() > self.deadline:
+                self._ready(None)
+            else:
+                self.loop.call_later(0.1, self._poll)
+
+    def _ready(self, client):
+        self.client = client
+        # Kullanıcı parolayı reddettiyse her işte yeniden sorulmaz
+        self.failed = client is None
+        waiters, self.waiters = self.waiters, []
+        for callback in waiters:
+            callback(client)
+
+    def launch(self, engine, op, fallback_cmd, on_line=None, on_progress=None, on_exit=None,
+               progress=jobengine.PROGRESS_NONE, kill_grace=jobengine.KILL_GRACE, **args):
+        """op'u yardımcıda, yardımcı yoksa fallback_cmd ile yerel süreç olarak çalıştır
+
+        fallback_cmd çağrılabilir ise fallback_cmd(on_line, on_progress, on_exit) yerel işi başlatır.
+        """
+        launch = Launch()
+
+        def start(client):
+            if launch.cancel_requested:
+                launch.state = jobengine.ProcessJob.CANCELLED
+                if on_exit:
+                    on_exit(launch)
+                return
+            if client is not None:
+                try:
+                    launch.job = client.spawn(op, on_line, on_progress, on_exit, **args)
+                    return
+                except HelperError:
+                    # Bağlantı koptu; yerel yola düş
+                    pass
+            if callable(fallback_cmd):
+                launch.job = fallback_cmd(on_line, on_progress, on_exit)
+                return
+            launch.job = engine.spawn(fallback_cmd, on_line=on_line, on_progress=on_progress,
+                                      on_exit=on_exit, progress=progress, kill_grace=kill_grace)
+
+        self.request(start)
+        return launch
+
+    def probe(self, path, fstype, callback):
+        """Süper bloğu yardımcı üzerinden oku; callback(SuperblockInfo ya da None) döngüden çağrılır"""
+        def start(client):
+            if client is None:
+                callback(None)
+                return
+
+            def on_exit(job):
+                callback(superblock.SuperblockInfo.from_dict(job.superblock) if job.superblock else None)
+
+            try:
+                client.spawn("probe", on_exit=on_exit, path=path, fstype=fstype)
+            except HelperError:
+                callback(None)
+
+        self.request(start)
+
+    def run_examine(self, job, engine, on_line, on_exit):
+        """scheduler.run_examine yerine geçen çalıştırıcı: işi yardımcı üzerinden yürüt"""
+        if not job.snapshot and os.path.isfile(job.path) and os.access(job.path, os.R_OK):
+            # Okunabilen imaj dosyası (qcow2 dahil) yetki gerekmeden yerelde incelenir
+            return scheduler.run_examine(job, engine, on_line, on_exit)
+        mode, handle_line, feed = scheduler.job_progress(job, on_line)
+        if job.snapshot:
+            return self.launch(engine, "snapshot_examine",
+                               lambda on_line, on_progress, on_exit: snapshot.SnapshotCheck(
+                                   engine, job.path, on_line, on_progress, on_exit, job.profile).start(),
+                               on_line=handle_line, on_progress=feed, on_exit=scheduler.job_exit(job, on_exit),
+                               path=job.path, fstype=job.fstype, profile=job.profile)
+        # Yardımcı yoksa yerelde karar verilir (süper blok okunamazsa güvenli tarafta kalınır)
+        job.memory_plan = membudget.plan(job.path, job.fstype, job.memory_budget, job.superblock,
+                                         job.scratch_dir)
+
+        def fallback(on_line, on_progress, on_exit):
+            if job.triage and job.fstype != "btrfs":
+                return triage.TriageCheck(engine, job.path, examine_command, on_line=on_line,
+                                          on_progress=on_progress, on_exit=on_exit, progress=mode,
+                                          profile=job.profile).start()
+            return engine.spawn(examine_command(), progress=mode, on_line=on_line,
+                                on_progress=on_progress, on_exit=on_exit)
+
+        def examine_command(full=False):
+            return scheduler.examine_command(job.path, job.fstype, job.profile, job.memory_plan.prepare(), full)
+
+        def finished(proc_job):
+            # Yardımcıda çalıştıysa kararı yardımcı vermiştir
+            if isinstance(proc_job, RemoteJob):
+                job.memory_plan = None
+            exit_cb(proc_job)
+
+        exit_cb = scheduler.job_exit(job, on_exit)
+        return self.launch(engine, "examine", fallback, on_line=handle_line, on_progress=feed,
+                           on_exit=finished, path=job.path, fstype=job.fstype, profile=job.profile,
+                           budget=job.memory_budget, scratch=job.scratch_dir, triage=job.triage)
+
+    def capture(self, engine, device, output, fmt, on_line, on_exit, profile=None, fstype="ext4"):
+        """metaimage.CaptureJob için yakalama adımı: yardımcı üzerinden, yoksa yerel pkexec ile"""
+        return self.launch(engine, "capture",
+                           lambda on_line, on_progress, on_exit: metaimage.local_capture(
+                               engine, device, output, fmt, on_line, on_exit, profile),
+                           on_line=on_line, on_exit=on_exit, path=device, fstype=fstype, output=output,
+                           format=fmt, profile=profile)
+
+
+if __name__ == "__main__":
+    # Kullanım: helper.py --serve [--socket YOL] [--owner UID] [--test]
+    #           helper.py [--socket YOL] [--test] [--profile P] OP [YOL [TÜR [ÇIKTI]]]   (deneme istemcisi)
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument("--serve", action="store_true")
+    arg_parser.add_argument("--socket")
+    arg_parser.add_argument("--owner", type=int)
+    arg_parser.add_argument("--test", action="store_true")
+    arg_parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT)
+    arg_parser.add_argument("--profile", choices=sorted(throttle.PROFILES))
+    arg_parser.add_argument("request", nargs="*")
+    args = arg_parser.parse_args()
+    if args.serve:
+        owner = args.owner if args.owner is not None else int(os.environ.get("PKEXEC_UID", os.getuid()))
+        HelperServer(args.socket or default_socket_path(owner), owner,
+                     args.test, args.idle_timeout).serve_forever()
+        sys.exit(0)
+    client = HelperClient.start(args.socket, test_mode=args.test)
+    op = args.request[0] if args.request else "ping"
+    fields = dict(zip(("path", "fstype", "output"), args.request[1:]))
+    if args.profile:
+        fields["profile"] = args.profile
+    try:
+        code = client.call(op, on_line=print, **fields)
+    except HelperError as e:
+        print(f"error: {e}", file=sys.stderr)
+        code = fsckreport.EXIT_OPERATIONAL
+    sys.exit(code)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# İmaj dosyası ve dizin hedefleri: döngü aygıtı kurmadan süper blok okunarak tanınır
+# Dizinler tembel taranır; milyonlarca dosyalık ağaç önceden listelenmeden zamanlayıcıya akar
+import os
+import stat
+import sys
+
+import devices
+import superblock
+
+# ext süper bloğu 1024. baytta başlar; bundan küçük dosyaların okunmasına gerek yok
+MIN_IMAGE_SIZE = superblock.EXT_SUPERBLOCK_OFFSET + superblock.EXT_SUPERBLOCK_SIZE
+
+
+def scan(root, follow_symlinks=False):
+    """Dizin ağacındaki desteklenen dosya sistemi imajlarını bulundukça üret
+
+    Yığın tabanlı ve her dizinde sadece o dizinin girdileri bellekte tutulur; girdiler
+    sıralanır ki sonuç sırası tekrarlanabilir olsun. Okunamayan dizinler atlanır.
+    """
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    subdirs.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=follow_symlinks):
+                    continue
+                if entry.stat(follow_symlinks=follow_symlinks).st_size < MIN_IMAGE_SIZE:
+                    continue
+            except OSError:
+                continue
+            if is_image(entry.path):
+                yield entry.path
+        # Alt dizinler ad sırasıyla işlensin diye yığına ters sırada eklenir
+        pending.extend(reversed(subdirs))
+
+
+def is_image(path):
+    info = superblock.try_probe(path)
+    return info is not None and info.fstype in devices.SUPPORTED_FSTYPES
+
+
+def iter_targets(paths):
+    """Komut satırı hedeflerini aç: dizinler taranır, dosya ve aygıtlar olduğu gibi geçer
+
+    Doğrudan verilen yollar tanınmasa da geçer (hata sonuçta raporlanır); taramada
+    bulunan ve dosya sistemi olmayan dosyalar sessizce atlanır.
+    """
+    seen = set()
+    for path in paths:
+        if path in seen:
+            continue
+        seen.add(path)
+        try:
+            is_dir = stat.S_ISDIR(os.stat(path).st_mode)
+        except OSError:
+            is_dir = False
+        if is_dir:
+            yield from scan(path)
+        else:
+            yield path
+
+
+def image_device(path, info=None):
+    """İmaj dosyasını arayüz listesi için devices.Device'a çevir; tanınmazsa None"""
+    info = info or superblock.try_probe(path)
+    if info is None or info.fstype not in devices.SUPPORTED_FSTYPES:
+        return None
+    try:
+        size = os.stat(path).st_size
+    except OSError:
+        return None
+    dev = devices.Device(os.path.basename(path), path, devices.IMAGE_TYPE, info.fstype,
+                         size=info.size or size, label=info.label, uuid=info.uuid)
+    dev.superblock = info
+    return dev
+
+
+if __name__ == "__main__":
+    # Kullanım: imagescan.py DİZİN_YA_DA_İMAJ...   (bulunan her imaj bir satır)
+    for found in iter_targets(sys.argv[1:]):
+        print(found, flush=True)
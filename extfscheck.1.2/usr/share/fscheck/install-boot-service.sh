@@ -7,12 +7,22 @@ echo "Installing FSCheck boot repair service..."
 sudo cp fscheck-boot.sh /usr/local/bin/
 sudo chmod +x /usr/local/bin/fscheck-boot.sh
 
+# Ayar dosyası varsa kullanıcının değerleri korunur
+sudo mkdir -p /etc/fscheck
+if [ ! -f /etc/fscheck/boot.conf ]; then
+    sudo cp fscheck-boot.conf /etc/fscheck/boot.conf
+fi
+
 # Systemd servis dosyasını kopyala
 sudo cp fscheck-boot.service /etc/systemd/system/
+# Açılışta /run'da biriken günlüğü /var/log'a ekleyen servis (yerel dosya sistemleri bağlandıktan sonra)
+sudo cp fscheck-boot-log.service /etc/systemd/system/
 
 # Systemd'yi yeniden yükle ve servisi etkinleştir
 sudo systemctl daemon-reload
 sudo systemctl enable fscheck-boot.service
+sudo systemctl enable fscheck-boot-log.service
 
 echo "FSCheck boot repair service installed and enabled successfully."
-echo "The service will run on boot if /forcefsck file exists."
\ No newline at end of file
+echo "The service will run on boot if /forcefsck or /etc/fscheck/boot-jobs.json exists."
+echo "Time budget and progress logging can be configured in /etc/fscheck/boot.conf."
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# İş parçacığı kullanmayan, olay döngüsüyle yürüyen alt süreç motoru
+# Aynı iş kodu arayüzde GLib ana döngüsüyle, başsız kipte ve yardımcıda selectors döngüsüyle çalışır
+import heapq
+import itertools
+import os
+import selectors
+import signal
+import subprocess
+import time
+
+import fsckprogress
+
+# SIGTERM'den sonra SIGKILL'e kadar beklenen süre (e2fsck SIGTERM'de güvenle 32 ile çıkar)
+KILL_GRACE = 10.0
+# Süreç çıktıktan sonra borularda kalan verinin okunması için en uzun süre
+DRAIN_TIMEOUT = 1.0
+# pidfd yoksa çıkış bu aralıkla yoklanır
+REAP_POLL = 0.1
+READ_SIZE = 65536
+
+# İlerleme kaynağı: yok, e2fsck -C <fd> borusu, ya da stdout (çıktı stderr'de)
+PROGRESS_NONE = None
+PROGRESS_FD = "fd"
+PROGRESS_STDOUT = "stdout"
+# /proc/<pid>/io'dan alınan sayaçlar: istenen (önbellek dahil) ve diskten gerçekten okunan bayt
+PROC_IO_FIELDS = ("rchar", "syscr", "read_bytes")
+
+
+def read_proc_io(pid):
+    """Sürecin G/Ç sayaçları; başka kullanıcının süreci (pkexec) ya da destek yoksa None
+
+    Süreç çıktıktan sonra da biçilene (wait4) kadar okunabilir.
+    """
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return {name: int(fields[name]) for name in PROC_IO_FIELDS}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def add_resources(total, part):
+    """Birden çok adımın kaynak kullanımını topla (tepe RSS en büyüğüdür)"""
+    if part is None:
+        return total
+    if total is None:
+        return dict(part)
+    merged = dict(total)
+    for key, value in part.items():
+        if value is None:
+            continue
+        if merged.get(key) is None:
+            merged[key] = value
+        elif key == "peak_rss":
+            merged[key] = max(merged[key], value)
+        else:
+            merged[key] = round(merged[key] + value, 3) if isinstance(value, float) else merged[key] + value
+    return merged
+
+
+class SelectorLoop:
+    """selectors tabanlı küçük olay döngüsü (GTK olmadan)"""
+
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.timers = []
+        self.cancelled = set()
+        self.counter = itertools.count()
+
+    def add_reader(self, fd, callback):
+        self.selector.register(fd, selectors.EVENT_READ, callback)
+        return fd
+
+    def remove_reader(self, handle):
+        try:
+            self.selector.unregister(handle)
+        except (KeyError, ValueError):
+            pass
+
+    def call_later(self, delay, callback):
+        handle = next(self.counter)
+        heapq.heappush(self.timers, (time.monotonic() + delay, handle, callback))
+        return handle
+
+    def cancel_timer(self, handle):
+        self.cancelled.add(handle)
+
+    def run_once(self, max_wait=None):
+        """Hazır tanıtıcıları ve zamanı gelen zamanlayıcıları bir kez işle; iş yoksa False"""
+        while self.timers and self.timers[0][1] in self.cancelled:
+            self.cancelled.discard(heapq.heappop(self.timers)[1])
+        if not self.timers and not self.selector.get_map():
+            return False
+        timeout = max_wait
+        if self.timers:
+            timeout = max(0.0, self.timers[0][0] - time.monotonic())
+            if max_wait is not None:
+                timeout = min(timeout, max_wait)
+        for key, mask in self.selector.select(timeout):
+            key.data()
+        now = time.monotonic()
+        while self.timers and self.timers[0][0] <= now:
+            when, handle, callback = heapq.heappop(self.timers)
+            if handle in self.cancelled:
+                self.cancelled.discard(handle)
+                continue
+            callback()
+        return True
+
+    def run_until(self, predicate):
+        while not predicate():
+            if not self.run_once():
+                break
+
+
+class GLibLoop:
+    """Aynı arayüzün GLib ana döngüsü üzerindeki karşılığı (gi modülü dışarıdan verilir)"""
+
+    def __init__(self, glib):
+        self.GLib = glib
+        self.pending_timers = set()
+
+    def add_reader(self, fd, callback):
+        def on_ready(source, condition):
+            callback()
+            return True
+
+        GLib = self.GLib
+        return GLib.io_add_watch(fd, GLib.PRIORITY_DEFAULT, GLib.IO_IN | GLib.IO_HUP | GLib.IO_ERR, on_ready)
+
+    def remove_reader(self, handle):
+        self.GLib.source_remove(handle)
+
+    def call_later(self, delay, callback):
+        def on_timeout():
+            self.pending_timers.discard(handle)
+            callback()
+            return False
+
+        handle = self.GLib.timeout_add(int(delay * 1000), on_timeout)
+        self.pending_timers.add(handle)
+        return handle
+
+    def cancel_timer(self, handle):
+        # Çalışmış bir kaynağı kaldırmak GLib uyarısı üretir
+        if handle in self.pending_timers:
+            self.pending_timers.discard(handle)
+            self.GLib.source_remove(handle)
+
+
+class ProcessJob:
+    """Tek bir alt süreç: boruları ve çıkışı döngüden izlenir, iptal ve zaman aşımı desteklenir"""
+
+    RUNNING = "running"
+    DONE = "done"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
+    FAILED = "failed"
+
+    def __init__(self, cmd, on_line=None, on_progress=None, on_exit=None, progress=PROGRESS_NONE,
+                 timeout=None, kill_grace=KILL_GRACE):
+        self.cmd = list(cmd)
+        self.on_line = on_line
+        self.on_progress = on_progress
+        self.on_exit = on_exit
+        self.progress = progress
+        self.timeout = timeout
+        self.kill_grace = kill_grace
+        self.loop = None
+        self.proc = None
+        self.state = ProcessJob.RUNNING
+        self.returncode = None
+        self.rusage = None
+        self.proc_io = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self.timed_out = False
+        self.paused = False
+        self.paused_at = None
+        self.paused_total = 0.0
+        self._deadline = None
+        self._timeout_left = None
+        self._streams = {}
+        self._exited = False
+        self._pidfd = None
+        self._timers = {}
+
+    @property
+    def pid(self):
+        return self.proc.pid if self.proc else None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def active_time(self):
+        """Duraklatılan süre hariç çalışma süresi"""
+        paused = self.paused_total
+        if self.paused_at is not None:
+            paused += (self.finished or time.monotonic()) - self.paused_at
+        return max(0.0, self.elapsed - paused)
+
+    @property
+    def read_bytes(self):
+        """Sürecin diskten okuduğu bayt (çıktıktan sonra rusage'dan; 512 baytlık birimler)"""
+        return self.rusage.ru_inblock * 512 if self.rusage is not None else None
+
+    @property
+    def peak_rss(self):
+        """Sürecin en yüksek yerleşik belleği, bayt (çıktıktan sonra; ru_maxrss KiB cinsinden)"""
+        return self.rusage.ru_maxrss * 1024 if self.rusage is not None else None
+
+    @property
+    def resources(self):
+        """Çıkıştaki kaynak kullanımı: duvar/kullanıcı/sistem süresi, tepe RSS, okunan bayt"""
+        if self.rusage is None:
+            return None
+        usage = {
+            "wall_s": round(self.active_time, 3),
+            "user_s": round(self.rusage.ru_utime, 3),
+            "sys_s": round(self.rusage.ru_stime, 3),
+            "peak_rss": self.peak_rss,
+            "read_bytes": self.read_bytes,
+        }
+        if self.proc_io is not None:
+            usage["io_rchar"] = self.proc_io["rchar"]
+            usage["io_syscr"] = self.proc_io["syscr"]
+            usage["io_read_bytes"] = self.proc_io["read_bytes"]
+        return usage
+
+    def start(self, loop):
+        self.loop = loop
+        self.started = time.monotonic()
+        try:
+            if self.progress == PROGRESS_FD:
+                self.proc, output, progress_stream = fsckprogress.popen_with_progress(
+                    self.cmd, start_new_session=True)
+            else:
+                self.proc = subprocess.Popen(
+                    self.cmd,
+                    start_new_session=True,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE if self.progress == PROGRESS_STDOUT else subprocess.STDOUT
+                )
+                output, progress_stream = self.proc.stdout, None
+                if self.progress == PROGRESS_STDOUT:
+                    output, progress_stream = self.proc.stderr, self.proc.stdout
+        except OSError as e:
+            self.error = str(e)
+            # on_exit her zaman döngüden, start() döndükten sonra çağrılır
+            self._set_timer("finish", 0, lambda: self._finish(ProcessJob.FAILED))
+            return self
+        self._watch(output, self.on_line)
+        if progress_stream is not None:
+            self._watch(progress_stream, self.on_progress)
+        try:
+            self._pidfd = os.pidfd_open(self.proc.pid)
+            self._pidfd_watch = loop.add_reader(self._pidfd, self._reap)
+        except (AttributeError, OSError):
+            self._set_timer("reap", REAP_POLL, self._poll_reap)
+        if self.timeout:
+            self._deadline = self.started + self.timeout
+            self._set_timer("timeout", self.timeout, self._on_timeout)
+        return self
+
+    # --- Boru okuma ---
+
+    def _watch(self, stream, callback):
+        fd = stream.fileno()
+        os.set_blocking(fd, False)
+        entry = {"stream": stream, "callback": callback, "buffer": b""}
+        entry["watch"] = self.loop.add_reader(fd, lambda: self._on_readable(fd))
+        self._streams[fd] = entry
+
+    def _on_readable(self, fd):
+        entry = self._streams.get(fd)
+        if entry is None:
+            return
+        try:
+            data = os.read(fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close_stream(fd)
+            self._maybe_finish()
+            return
+        lines = (entry["buffer"] + data).split(b"\n")
+        entry["buffer"] = lines.pop()
+        callback = entry["callback"]
+        if callback:
+            for line in lines:
+                callback(line.decode("utf-8", "replace").rstrip())
+
+    def _close_stream(self, fd):
+        entry = self._streams.pop(fd, None)
+        if entry is None:
+            return
+        self.loop.remove_reader(entry["watch"])
+        if entry["buffer"] and entry["callback"]:
+            entry["callback"](entry["buffer"].decode("utf-8", "replace").rstrip())
+        entry["stream"].close()
+
+    # --- Çıkış ---
+
+    def _reap(self):
+        # Zombi sürecin sayaçları biçilmeden önce okunmalı
+        proc_io = read_proc_io(self.proc.pid)
+        try:
+            pid, status, rusage = os.wait4(self.proc.pid, os.WNOHANG)
+        except ChildProcessError:
+            pid, status, rusage = self.proc.pid, None, None
+        if pid == 0:
+            return False
+        self.proc_io = proc_io
+        self.returncode = os.waitstatus_to_exitcode(status) if status is not None else None
+        # Popen'in süreci yeniden beklemeye çalışmaması için
+        self.proc.returncode = self.returncode
+        self.rusage = rusage
+        self._exited = True
+        if self._pidfd is not None:
+            self.loop.remove_reader(self._pidfd_watch)
+            os.close(self._pidfd)
+            self._pidfd = None
+        if self._streams:
+            # Torun süreçler boruyu açık tutabilir; en fazla DRAIN_TIMEOUT beklenir
+            self._set_timer("drain", DRAIN_TIMEOUT, self._drain_expired)
+        self._maybe_finish()
+        return True
+
+    def _poll_reap(self):
+        if not self._reap():
+            self._set_timer("reap", REAP_POLL, self._poll_reap)
+
+    def _drain_expired(self):
+        for fd in list(self._streams):
+            self._close_stream(fd)
+        self._maybe_finish()
+
+    def _maybe_finish(self):
+        if not self._exited or self._streams or self.finished is not None:
+            return
+        if self.timed_out:
+            state = ProcessJob.TIMED_OUT
+        elif self.cancel_requested:
+            state = ProcessJob.CANCELLED
+        else:
+            state = ProcessJob.DONE
+        self._finish(state)
+
+    def _finish(self, state):
+        if self.finished is not None:
+            return
+        for name in list(self._timers):
+            self._cancel_timer(name)
+        self.state = state
+        self.finished = time.monotonic()
+        if self.on_exit:
+            self.on_exit(self)
+
+    # --- Zamanlayıcılar ---
+
+    def _set_timer(self, name, delay, callback):
+        self._cancel_timer(name)
+
+        def fire():
+            self._timers.pop(name, None)
+            callback()
+
+        self._timers[name] = self.loop.call_later(delay, fire)
+
+    def _cancel_timer(self, name):
+        handle = self._timers.pop(name, None)
+        if handle is not None:
+            self.loop.cancel_timer(handle)
+
+    # --- Denetim ---
+
+    @property
+    def running(self):
+        return self.proc is not None and not self._exited
+
+    @property
+    def can_pause(self):
+        """Sürecin grubuna yetki istemeden sinyal gönderilebiliyor mu
+
+        Yardımcı yokken pkexec ile root olarak çalışan işler duraklatılamaz: her
+        duraklatma ve devam için yeni bir parola istemi açılmasın.
+        """
+        if not self.running:
+            return False
+        try:
+            os.killpg(self.proc.pid, 0)
+            return True
+        except (ProcessLookupError, PermissionError):
+            return False
+
+    def send_signal(self, sig, escalate=False):
+        """Sürecin grubuna sinyal gönder; başarılıysa True
+
+        Süreçler kendi oturumlarında başlatılır; böylece onarım betiği ve altındaki
+        e2fsck birlikte durdurulur. pkexec ile root olarak çalışan gruba kullanıcı
+        doğrudan sinyal gönderemez; escalate verilmişse (yalnızca iptal) sinyal tek
+        bir "pkexec kill" ile iletilir, verilmemişse False döner.
+        """
+        if not self.running:
+            return False
+        try:
+            os.killpg(self.proc.pid, sig)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            if not escalate:
+                return False
+            ProcessJob(["pkexec", "kill", "-s", signal.Signals(sig).name[3:], "--", f"-{self.proc.pid}"]).start(self.loop)
+            return True
+
+    def cancel(self):
+        """SIGTERM gönder; kill_grace verilmişse o süre içinde çıkmayan sürece SIGKILL
+
+        e2fsck SIGTERM'de o anki birimi bitirip 32 koduyla güvenle çıkar; onarımda
+        kill_grace None verilerek zorla sonlandırma kapatılır. Root olarak çalışan
+        gruba SIGKILL gönderilmez: iptal tek bir parola istemiyle sınırlı kalır.
+        """
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        sent = self.send_signal(signal.SIGTERM, escalate=True)
+        if self.paused:
+            # Durdurulmuş süreç SIGTERM'i ancak devam ettirilince işler
+            self.resume()
+        if sent and self.kill_grace is not None:
+            self._set_timer("kill", self.kill_grace, lambda: self.send_signal(signal.SIGKILL))
+        return sent
+
+    def pause(self):
+        """SIGSTOP ile duraklat (üretim G/Ç'sine yer açmak için); zaman aşımı sayacı durur"""
+        if not self.running or self.paused:
+            return False
+        if not self.send_signal(signal.SIGSTOP):
+            return False
+        self.paused = True
+        self.paused_at = time.monotonic()
+        if "timeout" in self._timers:
+            self._cancel_timer("timeout")
+            self._timeout_left = max(0.0, self._deadline - self.paused_at)
+        return True
+
+    def resume(self):
+        if not self.paused:
+            return False
+        self.send_signal(signal.SIGCONT)
+        now = time.monotonic()
+        self.paused = False
+        self.paused_total += now - self.paused_at
+        self.paused_at = None
+        if self._timeout_left is not None:
+            self._deadline = now + self._timeout_left
+            self._set_timer("timeout", self._timeout_left, self._on_timeout)
+            self._timeout_left = None
+        return True
+
+    def _on_timeout(self):
+        self.timed_out = True
+        self.cancel()
+
+    def detach(self):
+        """Döngü kapanırken tüm izlemeleri kaldır ve tanıtıcıları kapat"""
+        for name in list(self._timers):
+            self._cancel_timer(name)
+        for fd in list(self._streams):
+            entry = self._streams.pop(fd)
+            self.loop.remove_reader(entry["watch"])
+            entry["stream"].close()
+        if self._pidfd is not None:
+            self.loop.remove_reader(self._pidfd_watch)
+            os.close(self._pidfd)
+            self._pidfd = None
+
+
+class JobEngine:
+    """Bir döngü üzerinde çalışan tüm alt süreç işlerinin sahibi"""
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.jobs = set()
+
+    def spawn(self, cmd, on_exit=None, **kwargs):
+        def finished(job):
+            self.jobs.discard(job)
+            if on_exit:
+                on_exit(job)
+
+        job = ProcessJob(cmd, on_exit=finished, **kwargs)
+        self.jobs.add(job)
+        return job.start(self.loop)
+
+    def shutdown(self):
+        """Pencere kapanırken: işlere SIGTERM gönder ve döngüden ayır"""
+        for job in list(self.jobs):
+            job.cancel_requested = True
+            job.send_signal(signal.SIGTERM)
+            if job.paused:
+                job.send_signal(signal.SIGCONT)
+            job.detach()
+        self.jobs.clear()
+
+
+if __name__ == "__main__":
+    # Kullanım: jobengine.py SAYI — SAYI adet kısa süreci tek iş parçacığıyla eşzamanlı çalıştır
+    import sys
+    import threading
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    loop = SelectorLoop()
+    engine = JobEngine(loop)
+    done = []
+    start = time.monotonic()
+    for i in range(count):
+        engine.spawn(["sh", "-c", f"for n in 1 2 3; do echo job{i} line$n; sleep 0.2; done"],
+                     on_exit=done.append)
+    loop.run_until(lambda: len(done) == count)
+    print(f"{len(done)} jobs, threads={threading.active_count()}, "
+          f"wall={time.monotonic() - start:.2f}s, codes={sorted({j.returncode for j in done})}")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Bellekte sabit bir pencere tutan, tüm günlüğü sıkıştırılmış dosyaya yazan çıktı deposu
+# Dosya bağımsız parçalardan (gzip üyeleri ya da zstd çerçeveleri) oluşur; zcat/zstdcat ile okunabilir
+import bisect
+import gzip
+import os
+import re
+import threading
+import time
+from collections import deque
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CACHE_HOME = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+LOG_DIR = os.path.join(CACHE_HOME, "fscheck")
+CHUNK_LINES = 1000
+WINDOW_LINES = 5000
+# Dizinde saklanan en fazla günlük dosyası
+KEEP_LOGS = 20
+LOG_SUFFIXES = (".log.gz", ".log.zst")
+
+
+def _compress(data):
+    if zstandard:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=3)
+
+
+def _decompress(data, path):
+    if path.endswith(".zst"):
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def prune_logs(directory=LOG_DIR, keep=KEEP_LOGS):
+    """En yeni keep adet dışındaki günlük dosyalarını sil"""
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(LOG_SUFFIXES))
+    except OSError:
+        return
+    for name in names[:-keep] if keep else names:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
+
+
+class LogStore:
+    """Satır tabanlı günlük deposu: son WINDOW_LINES satır bellekte, tamamı diskte"""
+
+    def __init__(self, name, directory=LOG_DIR, window=WINDOW_LINES, chunk_lines=CHUNK_LINES):
+        os.makedirs(directory, exist_ok=True)
+        prune_logs(directory, KEEP_LOGS - 1)
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "log"
+        suffix = ".log.zst" if zstandard else ".log.gz"
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(directory, f"{stamp}-{safe_name}{suffix}")
+        self.file = open(self.path, "wb")
+        self.chunk_lines = chunk_lines
+        self.lock = threading.Lock()
+        # (ilk satır, dosya ofseti, bayt uzunluğu) — diske yazılmış parçalar
+        self.index = []
+        self.index_lines = []
+        self.chunk = []
+        self.window = deque(maxlen=window)
+        self.count = 0
+        self.closed = False
+        # Son okunan parçanın açılmış hali (geriye kaydırmada art arda okumalar için)
+        self._cached_chunk = (None, None)
+
+    @property
+    def window_start(self):
+        return self.count - len(self.window)
+
+    def append(self, line):
+        """Herhangi bir iş parçacığından satır ekle"""
+        with self.lock:
+            if self.closed:
+                return
+            self.chunk.append(line)
+            self.window.append(line)
+            self.count += 1
+            if len(self.chunk) >= self.chunk_lines:
+                self._write_chunk()
+
+    def append_text(self, text):
+        for line in text.split("\n"):
+            self.append(line)
+
+    def _write_chunk(self):
+        if not self.chunk:
+            return
+        data = _compress(("\n".join(self.chunk) + "\n").encode("utf-8", "replace"))
+        first = self.count - len(self.chunk)
+        offset = self.file.tell()
+        self.file.write(data)
+        self.file.flush()
+        self.index.append((first, offset, len(data)))
+        self.index_lines.append(first)
+        self.chunk = []
+
+    def _read_chunk(self, idx):
+        if self._cached_chunk[0] == idx:
+            return self._cached_chunk[1]
+        first, offset, size = self.index[idx]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read(size)
+        lines = _decompress(data, self.path).decode("utf-8", "replace").split("\n")[:-1]
+        self._cached_chunk = (idx, lines)
+        return lines
+
+    def read(self, start, end):
+        """[start, end) aralığındaki satırları döndür; pencere dışındakiler diskten okunur"""
+        with self.lock:
+            start = max(0, start)
+            end = min(end, self.count)
+            lines = []
+            pos = start
+            while pos < end:
+                if pos >= self.window_start:
+                    offset = pos - self.window_start
+                    lines.extend(list(self.window)[offset:offset + end - pos])
+                    break
+                chunk_start = self.count - len(self.chunk)
+                if pos >= chunk_start:
+                    lines.extend(self.chunk[pos - chunk_start:end - chunk_start])
+                    break
+                idx = bisect.bisect_right(self.index_lines, pos) - 1
+                chunk = self._read_chunk(idx)
+                first = self.index[idx][0]
+                part = chunk[pos - first:end - first]
+                lines.extend(part)
+                pos += len(part)
+            return lines
+
+    def close(self):
+        """Kalan satırları diske yaz; okuma (sayfalama) kapatıldıktan sonra da çalışır"""
+        with self.lock:
+            if self.closed:
+                return
+            self._write_chunk()
+            self.file.close()
+            self.closed = True
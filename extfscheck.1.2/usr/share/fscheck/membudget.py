@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# Bellek bütçeli kontrol: süper bloktan e2fsck'nin bellek ihtiyacı tahmin edilir,
+# bütçe aşılıyorsa e2fsck sayaçları diske ([scratch_files]) yazar, btrfs lowmem kipinde çalışır
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+
+import superblock
+
+# /tmp çoğu dağıtımda tmpfs'tir (RAM); geçici dosyalar diskte olmalı
+DEFAULT_SCRATCH_DIR = "/var/tmp"
+MODE_MEMORY = "memory"
+MODE_SCRATCH = "scratch_files"
+MODE_LOWMEM = "lowmem"
+# Tablolardan bağımsız sabit kullanım (kütüphane, önbellek, okuma tamponları)
+BASE_BYTES = 16 * 1024 * 1024
+# btrfs check (özgün kip) kabaca kullanılan her TB için 1 GB bellek ister
+BTRFS_BYTES_PER_USED = 1 / 1000
+GDT_DIRS_LO = struct.Struct("<H")
+SIZE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*$", re.IGNORECASE)
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(text):
+    """"512M", "2G", "1.5GiB" ya da bayt sayısını bayta çevir; geçersizse ValueError"""
+    if isinstance(text, int):
+        return text
+    match = SIZE_RE.match(str(text))
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2).upper()])
+
+
+def count_dirs(path, info):
+    """Grup tanımlayıcılarındaki dizin sayılarının toplamı; okunamazsa None
+
+    meta_bg'de tanımlayıcılar dağınık olduğu için okunmaz.
+    """
+    if info is None or not info.is_ext or superblock.is_qcow2(info):
+        return None
+    if info.feature_incompat & superblock.EXT_INCOMPAT_META_BG:
+        return None
+    if not info.blocks_per_group:
+        return None
+    block_size = info.block_size
+    groups = -(-(info.blocks_count - info.first_data_block) // info.blocks_per_group)
+    desc_size = 32
+    if info.feature_incompat & superblock.EXT_INCOMPAT_64BIT and info.desc_size >= 64:
+        desc_size = info.desc_size
+    offset = (info.first_data_block + 1) * block_size
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            table = os.pread(fd, groups * desc_size, offset)
+        finally:
+            os.close(fd)
+    except OSError:
+        return None
+    if len(table) < groups * desc_size:
+        return None
+    dirs = 0
+    for pos in range(0, groups * desc_size, desc_size):
+        dirs += GDT_DIRS_LO.unpack_from(table, pos + 0x10)[0]
+        if desc_size >= 64:
+            dirs += GDT_DIRS_LO.unpack_from(table, pos + 0x32)[0] << 16
+    return dirs
+
+
+def estimate(info, dirs=None):
+    """(bellekte kalan, scratch_files ile diske taşınabilen) bayt tahmini
+
+    Kaba model: inode/blok bit eşlemleri ve dizin blok listesi her zaman bellektedir;
+    inode sayaçları (icount) ve dizin bilgisi scratch_files ile diske taşınır.
+    Dizin sayısı bilinmiyorsa kullanılan her inode dizin sayılır (üst sınır).
+    """
+    if info.fstype == "btrfs":
+        return BASE_BYTES + int(info.bytes_used * BTRFS_BYTES_PER_USED), 0
+    inodes = info.inodes_count
+    used = inodes - info.free_inodes_count
+    dirs = used if dirs is None else dirs
+    in_core = BASE_BYTES + 5 * (inodes // 8) + 3 * (info.blocks_count // 8) + 12 * dirs
+    movable = 2 * (used // 8) + 28 * dirs
+    return in_core, movable
+
+
+class Plan:
+    """Tek bir kontrol için bellek kararı; prepare() geçici dizini kurar, cleanup() siler"""
+
+    def __init__(self, fstype, budget=None, estimate=None, in_core=None, mode=MODE_MEMORY,
+                 scratch_dir=DEFAULT_SCRATCH_DIR):
+        self.fstype = fstype
+        self.budget = budget
+        # Toplam tahmin ve scratch_files kullanılırken bellekte kalan kısım (bilinmiyorsa None)
+        self.estimate = estimate
+        self.in_core = in_core
+        self.mode = mode
+        self.scratch_dir = scratch_dir
+        self.workdir = None
+        self.config = None
+
+    @property
+    def over_budget(self):
+        """Düşürülmüş kipte bile tahmin bütçeyi aşıyor mu"""
+        expected = self.in_core if self.mode == MODE_SCRATCH else self.estimate
+        return bool(self.budget and expected and expected > self.budget)
+
+    def prepare(self):
+        # e2fsck.conf ve sayaç dosyaları her çalıştırmaya özel, sadece sahibinin erişebildiği dizinde
+        if self.mode != MODE_SCRATCH or self.workdir:
+            return self
+        self.workdir = tempfile.mkdtemp(prefix="fscheck-scratch-", dir=self.scratch_dir)
+        self.config = os.path.join(self.workdir, "e2fsck.conf")
+        with open(self.config, "w") as f:
+            f.write(config_text(self.workdir))
+        return self
+
+    def cleanup(self):
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+            self.config = None
+
+    def apply(self, cmd):
+        """Komutu kipe göre düzenle (pkexec öneki korunur; throttle.wrap'ten önce çağrılır)"""
+        cmd = list(cmd)
+        for idx, arg in enumerate(cmd):
+            name = os.path.basename(arg)
+            if self.mode == MODE_LOWMEM and name == "btrfs" and cmd[idx + 1:idx + 2] == ["check"]:
+                return cmd[:idx + 2] + ["--mode", "lowmem"] + cmd[idx + 2:]
+            if self.mode == MODE_SCRATCH and self.config and name == "e2fsck":
+                # pkexec ortamı temizler; değişken env ile komutun hemen önüne konur
+                return cmd[:idx] + ["env", f"E2FSCK_CONFIG={self.config}"] + cmd[idx:]
+        return cmd
+
+    def as_dict(self, peak_rss=None):
+        return {
+            "budget": self.budget,
+            "estimate": self.estimate,
+            "in_core_estimate": self.in_core if self.mode == MODE_SCRATCH else self.estimate,
+            "mode": self.mode,
+            "over_budget": self.over_budget,
+            "peak_rss": peak_rss,
+        }
+
+
+def config_text(directory):
+    return f"[scratch_files]\n\tdirectory = {directory}\n"
+
+
+def plan(path, fstype, budget=None, info=None, scratch_dir=None, lowmem=True):
+    """Hedef için bellek kararı ver; bütçe yoksa MODE_MEMORY
+
+    Süper blok okunamıyorsa (yetkisiz istemci) tahmin yoktur ve bütçe verilmişse
+    güvenli tarafta kalınıp düşürülmüş kip seçilir. lowmem=False ise btrfs her zaman
+    özgün kipte çalışır (lowmem onarımı hâlâ deneyseldir).
+    """
+    scratch_dir = scratch_dir or DEFAULT_SCRATCH_DIR
+    info = info if info is not None else superblock.try_probe(path)
+    if info is None:
+        in_core = movable = None
+    else:
+        in_core, movable = estimate(info, count_dirs(path, info))
+    total = in_core + movable if in_core is not None else None
+    result = Plan(fstype, budget, total, in_core, scratch_dir=scratch_dir)
+    if budget and (total is None or total > budget):
+        if fstype != "btrfs":
+            result.mode = MODE_SCRATCH
+        elif lowmem:
+            result.mode = MODE_LOWMEM
+    return result
+
+
+if __name__ == "__main__":
+    # Kullanım: membudget.py AYGIT_YA_DA_İMAJ [BÜTÇE]
+    if len(sys.argv) < 2:
+        print("usage: membudget.py DEVICE [BUDGET]", file=sys.stderr)
+        sys.exit(2)
+    target = sys.argv[1]
+    probed = superblock.try_probe(target)
+    if probed is None:
+        print(f"{target}: superblock not readable", file=sys.stderr)
+        sys.exit(8)
+    decided = plan(target, probed.fstype, parse_size(sys.argv[2]) if len(sys.argv) > 2 else None, probed)
+    print({"dirs": count_dirs(target, probed), **decided.as_dict()})
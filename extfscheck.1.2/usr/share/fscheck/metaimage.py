@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+# Meta veri imajı (e2image) yakalama: kaynak diskten sadece meta veri blokları okunur,
+# kontrol imaj üzerinde (başka bir çekirdekte ya da makinede) yapılır
+import errno
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import fsckreport
+import jobengine
+import logstore
+import snapshot
+import throttle
+
+FORMAT_RAW = "raw"
+FORMAT_QCOW2 = "qcow2"
+FORMATS = (FORMAT_RAW, FORMAT_QCOW2)
+# Arayüzün geçici imajları; kontrolden sonra silinir
+IMAGE_DIR = os.path.join(logstore.CACHE_HOME, "fscheck", "images")
+
+
+def image_path(directory, device, fmt=FORMAT_RAW, when=None):
+    """Aygıt ve zamandan imaj dosyası yolu üret"""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(when))
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", device).strip("_") or "device"
+    return os.path.join(directory, f"{name}-{stamp}.{'img' if fmt == FORMAT_RAW else 'qcow2'}")
+
+
+def raw_path(qcow2_path):
+    return os.path.splitext(qcow2_path)[0] + ".img"
+
+
+def capture_command(device, output, fmt=FORMAT_RAW):
+    """e2image komutu: -r seyrek ham imaj (e2fsck doğrudan okur), -Q küçük qcow2 (taşımak için)"""
+    flag = "-r" if fmt == FORMAT_RAW else "-Q"
+    return ["e2image", flag, device, output]
+
+
+def open_output(output, owner=None):
+    """İmaj dosyasını sembolik bağ izlemeden ve var olanı ezmeden oluştur; (fd, e2image'a verilecek yol)
+
+    Dosya dizin fd'sine göre O_EXCL|O_NOFOLLOW ile açılır ve yazılmadan önce owner'a ((uid, gid))
+    verilir. e2image yolu değil, açık fd'nin /proc bağını alır; yol sonradan değiştirilse de aynı
+    dosyaya yazar. fd iş bitene kadar açık tutulmalıdır.
+    """
+    dir_fd = os.open(os.path.dirname(output), os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW | os.O_CLOEXEC)
+    try:
+        if owner is not None and os.fstat(dir_fd).st_uid != owner[0]:
+            raise PermissionError(errno.EPERM, "Output directory must be owned by the session user", output)
+        fd = os.open(os.path.basename(output), os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW | os.O_CLOEXEC,
+                     0o600, dir_fd=dir_fd)
+    finally:
+        os.close(dir_fd)
+    if owner is not None:
+        os.fchown(fd, *owner)
+    return fd, f"/proc/{os.getpid()}/fd/{fd}"
+
+
+def convert_command(qcow2_path, output):
+    # qcow2 e2fsck tarafından okunamaz; kontrol için seyrek ham imaja açılır
+    return ["e2image", "-r", qcow2_path, output]
+
+
+def unpack_command(qcow2_path, output, fstype):
+    """qcow2 kabındaki dosya sistemini seyrek ham imaja açan komut; açılamıyorsa None
+
+    qemu-img her qcow2'yi açar; yoksa e2image kendi ürettiği ext imajlarını açabilir.
+    """
+    if shutil.which("qemu-img"):
+        return ["qemu-img", "convert", "-O", "raw", qcow2_path, output]
+    if fstype != "btrfs":
+        return convert_command(qcow2_path, output)
+    return None
+
+
+def allocated_bytes(path):
+    """Seyrek dosyanın diskte kapladığı gerçek boyut"""
+    try:
+        return os.stat(path).st_blocks * 512
+    except OSError:
+        return None
+
+
+def remove_image(*paths):
+    for path in paths:
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def local_capture(engine, device, output, fmt, on_line, on_exit, profile=None):
+    """Yardımcı olmadan yakalama: blok aygıtı için tek pkexec çağrısı
+
+    İmaj kullanıcı tarafından oluşturulur; root olarak çalışan e2image sadece bu açık dosyaya yazar.
+    """
+    fd, target = open_output(output)
+    cmd = capture_command(device, target, fmt)
+    if not os.path.isfile(device) and os.geteuid() != 0:
+        cmd = ["pkexec"] + cmd
+
+    def finished(job):
+        os.close(fd)
+        if on_exit:
+            on_exit(job)
+
+    return engine.spawn(throttle.wrap(cmd, profile, device), on_line=on_line, on_exit=finished)
+
+
+class CaptureJob:
+    """Yakalama (ve qcow2 ise ham imaja açma) adımları; ProcessJob ile aynı denetim arayüzü
+
+    capture(engine, aygıt, çıktı, biçim, on_line, on_exit, profile) yakalama adımını başlatır;
+    arayüz bunu yardımcı üzerinden yapar. Bitince image kontrol edilecek ham imajın yoludur.
+    """
+
+    def __init__(self, engine, device, output, fmt=FORMAT_RAW, convert=True, on_line=None,
+                 on_exit=None, capture=local_capture, profile=None):
+        self.engine = engine
+        self.device = device
+        self.output = output
+        self.fmt = fmt
+        self.convert = convert and fmt == FORMAT_QCOW2
+        self.on_line = on_line
+        self.on_exit = on_exit
+        self.capture = capture
+        self.profile = profile
+        self.state = jobengine.ProcessJob.RUNNING
+        self.returncode = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self.image = None
+        self.capture_s = None
+        self.convert_s = None
+        # Kaynaktan okunan bayt (meta veri miktarı); yardımcı üzerinden yakalamada yardımcı bildirir
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.resources = None
+        self.current = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self):
+        return self.started is not None and self.finished is None
+
+    @property
+    def paused(self):
+        return bool(self.current and self.current.paused)
+
+    @property
+    def can_pause(self):
+        return bool(self.current and self.current.can_pause)
+
+    @property
+    def image_bytes(self):
+        return allocated_bytes(self.output)
+
+    def start(self):
+        self.started = time.monotonic()
+        self.current = self.capture(self.engine, self.device, self.output, self.fmt,
+                                    self.on_line, self._captured, self.profile)
+        return self
+
+    def cancel(self):
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        return self.current.cancel() if self.current else True
+
+    def pause(self):
+        return self.current.pause() if self.current else False
+
+    def resume(self):
+        return self.current.resume() if self.current else False
+
+    def _captured(self, proc_job):
+        self.current = None
+        self.capture_s = round(time.monotonic() - self.started, 3)
+        self.read_bytes = proc_job.read_bytes
+        self.active_time = proc_job.active_time
+        self.resources = getattr(proc_job, "resources", None)
+        if self.cancel_requested:
+            remove_image(self.output)
+            self._finish(fsckreport.EXIT_CANCELED, jobengine.ProcessJob.CANCELLED)
+            return
+        if proc_job.error or proc_job.returncode != 0:
+            remove_image(self.output)
+            self.error = proc_job.error or f"e2image failed with exit code {proc_job.returncode}"
+            self._finish(fsckreport.EXIT_OPERATIONAL, jobengine.ProcessJob.FAILED)
+            return
+        if not self.convert:
+            self.image = self.output if self.fmt == FORMAT_RAW else None
+            self._finish(0, jobengine.ProcessJob.DONE)
+            return
+        target = raw_path(self.output)
+        step_started = time.monotonic()
+
+        def converted(proc_job):
+            self.current = None
+            self.convert_s = round(time.monotonic() - step_started, 3)
+            if self.cancel_requested or proc_job.error or proc_job.returncode != 0:
+                remove_image(target)
+                if self.cancel_requested:
+                    self._finish(fsckreport.EXIT_CANCELED, jobengine.ProcessJob.CANCELLED)
+                else:
+                    self.error = proc_job.error or f"e2image failed with exit code {proc_job.returncode}"
+                    self._finish(fsckreport.EXIT_OPERATIONAL, jobengine.ProcessJob.FAILED)
+                return
+            self.image = target
+            self._finish(0, jobengine.ProcessJob.DONE)
+
+        self.current = self.engine.spawn(convert_command(self.output, target), on_line=self.on_line,
+                                         on_exit=converted)
+
+    def _finish(self, returncode, state):
+        self.returncode = returncode
+        self.state = state
+        self.finished = time.monotonic()
+        if self.on_exit:
+            self.on_exit(self)
+
+    def as_dict(self):
+        return {
+            "format": self.fmt,
+            "image": self.output if self.state == jobengine.ProcessJob.DONE else None,
+            "checked_image": self.image,
+            "capture_s": self.capture_s,
+            "convert_s": self.convert_s,
+            "image_bytes": self.image_bytes if self.state == jobengine.ProcessJob.DONE else None,
+            "metadata_read_bytes": self.read_bytes,
+            "capture_resources": self.resources,
+        }
+
+
+class ImageCheck:
+    """Yakala, ham imajı kontrol et ve (keep değilse) imajları sil; tek aygıt işi için
+
+    returncode kaynağa göre çevrilmiş e2fsck kodudur; capture (CaptureJob) ve check_s
+    süreleri rapora yazılır.
+    """
+
+    def __init__(self, engine, device, output, fmt=FORMAT_RAW, on_line=None, on_progress=None,
+                 on_exit=None, profile=None, capture=local_capture, keep=False):
+        self.engine = engine
+        self.device = device
+        self.on_line = on_line
+        self.on_progress = on_progress
+        self.on_exit = on_exit
+        self.profile = profile
+        self.keep = keep
+        self.capture = CaptureJob(engine, device, output, fmt, on_line=on_line, on_exit=self._captured,
+                                  capture=capture, profile=profile)
+        self.state = jobengine.ProcessJob.RUNNING
+        self.returncode = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self.check_s = None
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.resources = None
+        self.current = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self):
+        return self.started is not None and self.finished is None
+
+    @property
+    def paused(self):
+        return bool(self.current and self.current.paused)
+
+    @property
+    def can_pause(self):
+        return bool(self.current and self.current.can_pause)
+
+    def start(self):
+        self.started = time.monotonic()
+        self.current = self.capture.start()
+        return self
+
+    def cancel(self):
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        return self.current.cancel() if self.current else True
+
+    def pause(self):
+        return self.current.pause() if self.current else False
+
+    def resume(self):
+        return self.current.resume() if self.current else False
+
+    def _captured(self, capture):
+        self.current = None
+        # Kaynak aygıttan okunan sadece yakalama adımıdır; kontrol imajı okur
+        self.read_bytes = capture.read_bytes
+        self.active_time = capture.active_time
+        self.resources = capture.resources
+        if capture.state != jobengine.ProcessJob.DONE or self.cancel_requested:
+            self.error = capture.error
+            self._finish(capture.returncode, capture.state)
+            return
+        self.current = snapshot.CopyCheck(self.engine, capture.image, self.on_line, self.on_progress,
+                                          self._checked, self.profile, self.device, prefix=[]).start()
+
+    def _checked(self, check):
+        self.current = None
+        self.check_s = round(check.elapsed, 3)
+        # Kaynak kullanımı yakalama ve kontrolün toplamıdır
+        self.resources = jobengine.add_resources(self.resources, check.resources)
+        self.error = check.error
+        self._finish(check.returncode, check.state)
+
+    def _finish(self, returncode, state):
+        if not self.keep:
+            remove_image(self.capture.output if self.capture.state == jobengine.ProcessJob.DONE else None,
+                         self.capture.image)
+        self.returncode = returncode
+        self.state = state
+        self.finished = time.monotonic()
+        if self.on_exit:
+            self.on_exit(self)
+
+
+class UnpackCheck:
+    """qcow2 imaj hedefi: geçici ham imaja aç, check_command(ham_yol) ile incele, sonra sil
+
+    İnceleme salt okunur olduğu için kabın kendisi değişmez.
+    """
+
+    def __init__(self, engine, path, fstype, check_command, on_line=None, on_progress=None, on_exit=None,
+                 progress=jobengine.PROGRESS_NONE):
+        self.engine = engine
+        self.path = path
+        self.fstype = fstype
+        self.check_command = check_command
+        self.on_line = on_line
+        self.on_progress = on_progress
+        self.on_exit = on_exit
+        self.progress = progress
+        self.state = jobengine.ProcessJob.RUNNING
+        self.returncode = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self.unpack_s = None
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.resources = None
+        self.workdir = None
+        self.current = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self):
+        return self.started is not None and self.finished is None
+
+    @property
+    def paused(self):
+        return bool(self.current and self.current.paused)
+
+    @property
+    def can_pause(self):
+        return bool(self.current and self.current.can_pause)
+
+    def start(self):
+        self.started = time.monotonic()
+        self.workdir = tempfile.mkdtemp(prefix="fscheck-unpack-")
+        raw = os.path.join(self.workdir, "image.img")
+        cmd = unpack_command(self.path, raw, self.fstype)
+        if cmd is None:
+            self.error = "qemu-img is required to open btrfs qcow2 images"
+            self._finish(fsckreport.EXIT_OPERATIONAL, jobengine.ProcessJob.FAILED)
+            return self
+        self.current = self.engine.spawn(cmd, on_line=self.on_line,
+                                         on_exit=lambda proc_job: self._unpacked(proc_job, raw))
+        return self
+
+    def cancel(self):
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        return self.current.cancel() if self.current else True
+
+    def pause(self):
+        return self.current.pause() if self.current else False
+
+    def resume(self):
+        return self.current.resume() if self.current else False
+
+    def _account(self, proc_job):
+        self.current = None
+        if proc_job.read_bytes is not None:
+            self.read_bytes = (self.read_bytes or 0) + proc_job.read_bytes
+        self.active_time += proc_job.active_time
+        self.resources = jobengine.add_resources(self.resources, proc_job.resources)
+
+    def _unpacked(self, proc_job, raw):
+        self._account(proc_job)
+        self.unpack_s = round(time.monotonic() - self.started, 3)
+        if self.cancel_requested:
+            self._finish(fsckreport.EXIT_CANCELED, jobengine.ProcessJob.CANCELLED)
+        elif proc_job.error or proc_job.returncode != 0:
+            self.error = proc_job.error or f"{proc_job.cmd[0]} failed with exit code {proc_job.returncode}"
+            self._finish(fsckreport.EXIT_OPERATIONAL, jobengine.ProcessJob.FAILED)
+        else:
+            self.current = self.engine.spawn(self.check_command(raw), progress=self.progress,
+                                             on_line=self.on_line, on_progress=self.on_progress,
+                                             on_exit=self._checked)
+
+    def _checked(self, proc_job):
+        self._account(proc_job)
+        self.error = proc_job.error
+        self._finish(proc_job.returncode, proc_job.state)
+
+    def _finish(self, returncode, state):
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+        self.returncode = returncode
+        self.state = state
+        self.finished = time.monotonic()
+        if self.on_exit:
+            self.on_exit(self)
+
+
+if __name__ == "__main__":
+    # Kullanım: metaimage.py AYGIT ÇIKTI [raw|qcow2]
+    if len(sys.argv) < 3:
+        print("usage: metaimage.py DEVICE OUTPUT [raw|qcow2]", file=sys.stderr)
+        sys.exit(fsckreport.EXIT_USAGE)
+    loop = jobengine.SelectorLoop()
+    job = CaptureJob(jobengine.JobEngine(loop), sys.argv[1], sys.argv[2],
+                     sys.argv[3] if len(sys.argv) > 3 else FORMAT_RAW, on_line=print).start()
+    loop.run_until(lambda: not job.running)
+    print(job.as_dict(), job.error or "")
+    sys.exit(job.returncode)
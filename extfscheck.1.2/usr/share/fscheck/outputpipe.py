@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# İş parçacıklarından ana döngüye birleştirilmiş, hızı sınırlı çıktı hattı
+# Satırlar sınırlı bir halka tamponda toplanır ve en fazla max_rate kez/saniye toplu teslim edilir
+import threading
+import time
+from collections import deque
+
+DEFAULT_CAPACITY = 10000
+DEFAULT_RATE = 20
+
+
+class OutputPipe:
+    """Sınırlı halka tampon + kare hızı sınırlı toplu teslim
+
+    schedule(gecikme_ms, geri_çağrı) teslimatı ana döngüde planlar (GTK'da
+    GLib.timeout_add). deliver(metin) ana döngüde çağrılır ve birleştirilmiş
+    satırları alır. Tampon dolarsa en eski teslim edilmemiş satırlar atılır
+    ve bir sonraki teslimatta atlanan satır sayısı bildirilir.
+
+    notify_only verilirse satırlar tamponlanmaz ve birleştirilmez (görünüm günlükten
+    okunur); deliver() argümansız, yine en fazla max_rate kez/saniye çağrılır.
+    """
+
+    def __init__(self, deliver, schedule, capacity=DEFAULT_CAPACITY, max_rate=DEFAULT_RATE,
+                 skipped_text="... {count} lines skipped ...", log=None, notify_only=False):
+        self.deliver = deliver
+        # Verilirse her satır ayrıca tam günlüğe (logstore.LogStore) yazılır
+        self.log = log
+        self.notify_only = notify_only
+        # notify_only kipinde teslim edilmemiş satır sayısı
+        self.pending = 0
+        self.schedule = schedule
+        self.capacity = capacity
+        self.interval = 1.0 / max_rate
+        self.skipped_text = skipped_text
+        self.lines = deque()
+        self.lock = threading.Lock()
+        self.scheduled = False
+        self.last_flush = 0.0
+        # Geri basınç sayaçları
+        self.pushed = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.pending_dropped = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.max_backlog = 0
+
+    def push(self, line):
+        """Herhangi bir iş parçacığından satır ekle"""
+        if self.log is not None:
+            self.log.append(line)
+        with self.lock:
+            self.pushed += 1
+            if self.notify_only:
+                self.pending += 1
+                backlog = self.pending
+            else:
+                if len(self.lines) >= self.capacity:
+                    self.lines.popleft()
+                    self.dropped += 1
+                    self.pending_dropped += 1
+                self.lines.append(line)
+                backlog = len(self.lines)
+            if backlog > self.max_backlog:
+                self.max_backlog = backlog
+            if self.scheduled:
+                return
+            self.scheduled = True
+            delay = max(0.0, self.last_flush + self.interval - time.monotonic())
+        self.schedule(int(delay * 1000), self.flush)
+
+    def flush(self):
+        """Bekleyen satırları tek parça halinde teslim et (ana döngüde çağrılır)"""
+        if self.notify_only:
+            with self.lock:
+                count, self.pending = self.pending, 0
+                self.scheduled = False
+                self.last_flush = time.monotonic()
+            if count:
+                self.batches += 1
+                self.max_batch = max(self.max_batch, count)
+                self.delivered += count
+                self.deliver()
+            return False
+        with self.lock:
+            batch = list(self.lines)
+            self.lines.clear()
+            skipped = self.pending_dropped
+            self.pending_dropped = 0
+            self.scheduled = False
+            self.last_flush = time.monotonic()
+        if batch or skipped:
+            self.batches += 1
+            self.max_batch = max(self.max_batch, len(batch))
+            self.delivered += len(batch)
+            if skipped:
+                batch.insert(0, self.skipped_text.format(count=skipped))
+            self.deliver("\n".join(batch) + "\n")
+        # GLib kaynağının tekrarlanmaması için False döndür
+        return False
+
+    def close(self):
+        """Günlüğün kalan satırlarını diske yaz (bekleyen teslimat zaten planlanmıştır)"""
+        if self.log is not None:
+            self.log.close()
+
+    def stats(self):
+        with self.lock:
+            return {
+                "pushed": self.pushed,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "max_batch": self.max_batch,
+                "max_backlog": self.max_backlog,
+                "backlog": self.pending if self.notify_only else len(self.lines),
+            }
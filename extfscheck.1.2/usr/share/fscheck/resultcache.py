@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# UUID'ye göre anahtarlanmış "temizse atla" sonuç önbelleği
+# Süper blok parmak izi değişmediyse son kontrolün sonucu tekrar kullanılır
+import json
+import os
+import time
+from collections import OrderedDict
+
+CACHE_FILE = os.path.expanduser("~/.fscheck_cache.json")
+MAX_ENTRIES = 512
+# Önbellekte saklanan çıktı satırı sayısı
+MAX_OUTPUT_LINES = 20
+
+
+def fingerprint(info):
+    """Dosya sisteminde yazma olup olmadığını gösteren süper blok alanları"""
+    if info.fstype == "btrfs":
+        return {
+            "generation": info.generation,
+            "bytes_used": info.bytes_used,
+        }
+    return {
+        "wtime": info.wtime,
+        "mnt_count": info.mnt_count,
+        "free_blocks_count": info.free_blocks_count,
+        "free_inodes_count": info.free_inodes_count,
+        "state": info.state,
+        "error_count": info.error_count,
+    }
+
+
+class ResultCache:
+    """Boyutu sınırlı, LRU tahliyeli kalıcı sonuç önbelleği"""
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.entries = OrderedDict(data.get("entries", []))
+        except (OSError, ValueError):
+            self.entries = OrderedDict()
+
+    def save(self):
+        # Yarım yazılmış dosya kalmaması için önce geçici dosyaya yaz
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"entries": list(self.entries.items())}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def lookup(self, info, mounted=False):
+        """Parmak izi eşleşirse önbellekteki kaydı döndür, yoksa None
+
+        Bağlı dosya sisteminde çekirdek süper bloğu tembelce yazar (wtime, sayaçlar yazma sırasında
+        değişmeyebilir); parmak izi güvenilmez olduğu için önbellek kullanılmaz.
+        """
+        if not info or not info.uuid or mounted:
+            return None
+        entry = self.entries.get(info.uuid)
+        if entry is None:
+            return None
+        if entry.get("fingerprint") != fingerprint(info):
+            return None
+        self.entries.move_to_end(info.uuid)
+        return entry
+
+    def store(self, info, returncode, output_lines=(), message="", mounted=False):
+        if not info or not info.uuid or mounted:
+            return
+        self.entries[info.uuid] = {
+            "fstype": info.fstype,
+            "fingerprint": fingerprint(info),
+            "returncode": returncode,
+            "message": message,
+            "output": list(output_lines)[-MAX_OUTPUT_LINES:],
+            "checked_at": time.time(),
+        }
+        self.entries.move_to_end(info.uuid)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.save()
+
+    def invalidate(self, uuid):
+        if uuid and self.entries.pop(uuid, None) is not None:
+            self.save()
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# Çoklu aygıt inceleme zamanlayıcısı
+# Aynı dönen diskteki (HDD) iki kontrol asla aynı anda çalışmaz, SSD/NVMe paralel çalışır
+import os
+import stat
+import time
+
+import fsckprogress
+import jobengine
+import membudget
+import metaimage
+import snapshot
+import superblock
+import throttle
+import triage
+
+# Her iş için saklanan son çıktı satırı sayısı
+OUTPUT_TAIL = 20
+
+
+def examine_command(path, fstype, profile=None, plan=None, full=False):
+    """İnceleme komutunu oluştur; düzenli dosyalar (imajlar) ve root için pkexec gerekmez
+
+    Komut verilen kısıtlama profiliyle (throttle) sarılır; hazırlanmış bir bellek
+    kararı (membudget.Plan) verilirse lowmem ya da scratch_files uygulanır. e2fsck
+    -tt ile geçiş başına süre ve bellek basar (fsckreport ayrıştırır). full=True
+    (ön inceleme başarısız) temiz görünen dosya sisteminde de tam kontrol (-f) yapar.
+    """
+    if fstype == "btrfs":
+        cmd = ["btrfs", "check", "--readonly", path]
+    else:
+        cmd = ["/sbin/e2fsck", "-n", "-tt"] + (["-f"] if full else []) + [path]
+    if not os.path.isfile(path) and os.geteuid() != 0:
+        cmd = ["pkexec"] + cmd
+    if plan is not None:
+        cmd = plan.apply(cmd)
+    return throttle.wrap(cmd, profile, path)
+
+
+def _sysfs_rotational(sys_path):
+    # Bölümlerin queue dizini yoktur, üst diske bakılır
+    for candidate in (sys_path, os.path.dirname(sys_path)):
+        try:
+            with open(os.path.join(candidate, "queue", "rotational")) as f:
+                return f.read().strip() == "1", os.path.basename(candidate)
+        except OSError:
+            continue
+    return False, os.path.basename(sys_path)
+
+
+def spindle_key(path, pkname="", rotational=None):
+    """Aynı anda tek iş çalışması gereken fiziksel disk anahtarı; sınırsızsa None
+
+    Blok aygıtları için lsblk'den gelen PKNAME ve ROTA kullanılır. İmaj dosyaları
+    için dosyanın bulunduğu aygıt sysfs üzerinden bulunur.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        st = None
+    if st is not None and stat.S_ISREG(st.st_mode):
+        real = os.path.realpath(f"/sys/dev/block/{os.major(st.st_dev)}:{os.minor(st.st_dev)}")
+        rotational, disk = _sysfs_rotational(real)
+        return f"disk:{disk}" if rotational else None
+    if rotational is None and st is not None and stat.S_ISBLK(st.st_mode):
+        real = os.path.realpath(f"/sys/dev/block/{os.major(st.st_rdev)}:{os.minor(st.st_rdev)}")
+        rotational, disk = _sysfs_rotational(real)
+        pkname = pkname or disk
+    if not rotational:
+        return None
+    return f"disk:{pkname or os.path.basename(path)}"
+
+
+class Job:
+    """Zamanlayıcıdaki tek bir inceleme işi"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, job_id, path, fstype, spindle=None, profile=None):
+        self.id = job_id
+        self.path = path
+        self.fstype = fstype
+        self.spindle = spindle
+        # throttle profil adı; None varsayılan profildir
+        self.profile = profile
+        # Bağlı LVM birimi anlık görüntü üzerinden incelenir (snapshot.SnapshotCheck)
+        self.snapshot = False
+        # Hedef kaynağın özel bir kopyası (meta veri imajı): günlük oynatılıp düzeltmeyle kontrol edilir
+        self.copy = False
+        self.state = Job.QUEUED
+        self.returncode = None
+        self.error = None
+        self.output = []
+        self.started = None
+        self.finished = None
+        # 0..1 arası ilerleme; bilinmiyorsa None
+        self.progress = None
+        self.progress_text = ""
+        # Önbellek için iş başlamadan okunan süper blok (varsa)
+        self.superblock = None
+        # Bağlı dosya sisteminin sonucu önbelleğe yazılmaz (süper blok parmak izi güncel değildir)
+        self.mounted = False
+        # Çalıştırıcı çıktıyı ayrıştırıyorsa fsckreport.FsckReport
+        self.report = None
+        # Çalıştırıcının döndürdüğü iptal edilebilir tutamaç
+        self.handle = None
+        self.cancel_requested = False
+        # job_progress'in kurduğu ilerleme modeli; iptalde o ana kadarki ilerleme partial'a yazılır
+        self.progress_model = None
+        self.partial = None
+        # Aracın diskten okuduğu bayt ve duraklatmalar hariç çalışma süresi (verim için)
+        self.read_bytes = None
+        self.active_time = None
+        # Bellek bütçesi (bayt; None sınırsız) ve scratch_files için geçici dosya dizini
+        self.memory_budget = None
+        self.scratch_dir = None
+        # Yerelde verilen bellek kararı; rapor için memory (tahmin, kip, tepe RSS) sözlüğü
+        self.memory_plan = None
+        self.memory = None
+        self.peak_rss = None
+        # Aracın süre, bellek ve G/Ç kullanımı (jobengine.ProcessJob.resources)
+        self.resources = None
+        # ext2/3/4'te önce metadata_csum ön incelemesi (triage.TriageCheck) yapılsın mı
+        self.triage = False
+
+    @property
+    def paused(self):
+        return bool(self.handle and getattr(self.handle, "paused", False))
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def add_line(self, line):
+        self.output.append(line)
+        if len(self.output) > OUTPUT_TAIL:
+            del self.output[0]
+
+
+def job_progress(job, on_line):
+    """İş için ilerleme modu ve satır/ilerleme geri çağrılarını hazırla"""
+    if job.fstype == "btrfs":
+        model = fsckprogress.BtrfsStageProgress()
+        mode = jobengine.PROGRESS_NONE
+    else:
+        sb = job.superblock
+        model = fsckprogress.ProgressModel(sb.blocks_per_group if sb and sb.is_ext else 0)
+        mode = jobengine.PROGRESS_FD
+    job.progress_model = model
+
+    def feed(line):
+        if model.feed_line(line):
+            job.progress = model.fraction
+            job.progress_text = model.describe()
+
+    def handle_line(line):
+        # btrfs ilerlemesi normal çıktıdaki aşama satırlarından okunur
+        if job.fstype == "btrfs":
+            feed(line)
+        on_line(line)
+
+    return mode, handle_line, feed
+
+
+def job_exit(job, on_exit):
+    """Çalıştırıcının süreç nesnesini iş alanlarına aktarıp on_exit(çıkış_kodu, hata) çağıran geri çağrı"""
+    def finished(proc_job):
+        job.read_bytes = proc_job.read_bytes
+        job.active_time = proc_job.active_time
+        job.peak_rss = getattr(proc_job, "peak_rss", None)
+        job.resources = getattr(proc_job, "resources", None)
+        if job.memory_plan is not None:
+            job.memory_plan.cleanup()
+            job.memory = job.memory_plan.as_dict(job.peak_rss)
+        elif getattr(proc_job, "memory", None):
+            # Yardımcıda çalışan işin kararı çıkış olayıyla gelir
+            job.memory = proc_job.memory
+        on_exit(proc_job.returncode, proc_job.error)
+
+    return finished
+
+
+def run_examine(job, engine, on_line, on_exit):
+    """Varsayılan iş çalıştırıcı: komutu döngüde başlat, bitince on_exit(çıkış_kodu, hata)"""
+    mode, handle_line, feed = job_progress(job, on_line)
+    if job.snapshot:
+        return snapshot.SnapshotCheck(engine, job.path, on_line=handle_line, on_progress=feed,
+                                      on_exit=job_exit(job, on_exit), profile=job.profile).start()
+    if job.copy:
+        return snapshot.CopyCheck(engine, job.path, on_line=handle_line, on_progress=feed,
+                                  on_exit=job_exit(job, on_exit), profile=job.profile,
+                                  prefix=[] if os.path.isfile(job.path) else None).start()
+    # Bütçe verilmese de tahmin ve tepe RSS rapora yazılır
+    job.memory_plan = membudget.plan(job.path, job.fstype, job.memory_budget, job.superblock,
+                                     job.scratch_dir).prepare()
+    if superblock.is_qcow2(job.superblock):
+        return metaimage.UnpackCheck(engine, job.path, job.fstype,
+                                     lambda raw: examine_command(raw, job.fstype, job.profile, job.memory_plan),
+                                     on_line=handle_line, on_progress=feed, on_exit=job_exit(job, on_exit),
+                                     progress=mode).start()
+    if job.triage and job.fstype != "btrfs":
+        return triage.TriageCheck(engine, job.path,
+                                  lambda full: examine_command(job.path, job.fstype, job.profile, job.memory_plan,
+                                                               full),
+                                  on_line=handle_line, on_progress=feed, on_exit=job_exit(job, on_exit),
+                                  progress=mode, profile=job.profile).start()
+    return engine.spawn(examine_command(job.path, job.fstype, job.profile, job.memory_plan), progress=mode,
+                        on_line=handle_line, on_progress=feed, on_exit=job_exit(job, on_exit))
+
+
+class ExamineScheduler:
+    """Aynı anda en fazla max_workers süreç, disk başına eşzamanlılık sınırı uygulayan zamanlayıcı
+
+    İş parçacığı kullanmaz: süreçler verilen döngüde (arayüzde GLib, aksi halde
+    selectors) izlenir. Çalıştırıcı runner(iş, motor, on_line, on_exit) işi başlatır
+    ve iptal edilebilir bir tutamaç döndürür.
+    """
+
+    def __init__(self, runner=run_examine, max_workers=None, on_update=None, loop=None, profile=None):
+        self.runner = runner
+        self.profile = profile
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.loop = loop or jobengine.SelectorLoop()
+        self.engine = jobengine.JobEngine(self.loop)
+        # on_update(job) döngü içinden çağrılır
+        self.on_update = on_update
+        self.jobs = []
+        self.busy_spindles = set()
+        self.running = 0
+        self.started = None
+        self.finished = None
+        self.next_id = 1
+
+    def submit(self, path, fstype, spindle=None, **attrs):
+        """İşi sıraya koy; attrs (ör. superblock) iş başlamadan önce işe atanır"""
+        job = Job(self.next_id, path, fstype, spindle, self.profile)
+        for name, value in attrs.items():
+            setattr(job, name, value)
+        self.next_id += 1
+        self.jobs.append(job)
+        self.finished = None
+        self._notify(job)
+        self._dispatch()
+        return job
+
+    @property
+    def wall_clock(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def pending(self):
+        return [j for j in self.jobs if j.state in (Job.QUEUED, Job.RUNNING)]
+
+    def forget(self, job):
+        """Biten işi listeden çıkar; uzun akışlarda jobs listesi sıradaki işlerle sınırlı kalır"""
+        if job.state not in (Job.QUEUED, Job.RUNNING) and job in self.jobs:
+            self.jobs.remove(job)
+
+    def wait(self):
+        """Tüm işler bitene kadar döngüyü çalıştır (sadece selectors döngüsünde)"""
+        self.loop.run_until(lambda: not self.pending())
+
+    def shutdown(self):
+        self.engine.shutdown()
+
+    def cancel(self, job):
+        """Sıradaki işi hemen, çalışanı SIGTERM ile iptal et (e2fsck 32 ile güvenle çıkar)"""
+        if job.state == Job.QUEUED:
+            job.cancel_requested = True
+            job.state = Job.CANCELLED
+            if not self.pending():
+                self.finished = time.monotonic()
+            self._notify(job)
+            return True
+        if job.state != Job.RUNNING or job.handle is None:
+            return False
+        job.cancel_requested = True
+        return job.handle.cancel()
+
+    def cancel_all(self):
+        # Önce sıradakiler: çalışan biri bitince yenisi başlamasın
+        for job in sorted(self.pending(), key=lambda j: j.state != Job.QUEUED):
+            self.cancel(job)
+
+    def pause(self, job):
+        """SIGSTOP ile duraklat; duraklatılan süre hız ve kalan süreye sayılmaz"""
+        if job.state != Job.RUNNING or job.handle is None or not job.handle.pause():
+            return False
+        if job.progress_model:
+            job.progress_model.pause()
+        self._notify(job)
+        return True
+
+    def resume(self, job):
+        if job.state != Job.RUNNING or job.handle is None or not job.handle.resume():
+            return False
+        if job.progress_model:
+            job.progress_model.resume()
+        self._notify(job)
+        return True
+
+    def _notify(self, job):
+        if self.on_update:
+            self.on_update(job)
+
+    def _dispatch(self):
+        for job in self.jobs:
+            if self.running >= self.max_workers:
+                break
+            if job.state != Job.QUEUED:
+                continue
+            if job.spindle is not None and job.spindle in self.busy_spindles:
+                continue
+            if job.spindle is not None:
+                self.busy_spindles.add(job.spindle)
+            job.state = Job.RUNNING
+            job.started = time.monotonic()
+            if self.started is None:
+                self.started = job.started
+            self.running += 1
+            self._notify(job)
+            try:
+                job.handle = self.runner(job, self.engine, job.add_line,
+                                         lambda returncode, error=None, job=job: self._finished(job, returncode, error))
+            except Exception as e:
+                self._finished(job, None, str(e))
+
+    def _finished(self, job, returncode, error=None):
+        if job.state != Job.RUNNING:
+            return
+        job.returncode = returncode
+        job.error = error
+        if job.cancel_requested:
+            job.state = Job.CANCELLED
+            if job.progress_model:
+                job.partial = job.progress_model.snapshot()
+        else:
+            job.state = Job.FAILED if error else Job.DONE
+        job.finished = time.monotonic()
+        self.running -= 1
+        self.busy_spindles.discard(job.spindle)
+        if not self.pending():
+            self.finished = job.finished
+        self._notify(job)
+        self._dispatch()
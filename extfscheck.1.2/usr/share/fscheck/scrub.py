@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# Bağlı btrfs birimleri için çevrimiçi scrub: veri ve meta veri sağlama toplamlarına göre okunur,
+# yedek kopyası olan (DUP/RAID) bozuk bloklar düzeltilir; birim bağlama kesilmeden kontrol edilir.
+# Çok aygıtlı dizilerde btrfs-progs her aygıtı kendi iş parçacığında paralel tarar.
+# Canlı sayaçlar "scrub status -R" ile okunur; yarıda kalan scrub "scrub resume" ile sürdürülür.
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import discovery
+import fsckprogress
+import fsckreport
+import jobengine
+import membudget
+import superblock
+import throttle
+
+SYSFS_BTRFS = "/sys/fs/btrfs"
+# Canlı istatistik için scrub status sorgulama aralığı (saniye)
+STATUS_INTERVAL = 2.0
+STEP_TIMEOUT = 30
+# scrub start/resume -B: düzeltilemeyen hata bulunduysa 3 ile çıkar
+EXIT_UNCORRECTABLE = 3
+# "scrub resume" ile sürdürülebilen durumlar (eski sürümler "... was aborted after" yazar)
+RESUMABLE_RE = re.compile(r"^(?:Status:\s+(?:interrupted|aborted|canceled|cancelled)\b"
+                          r"|.* (?:was aborted|interrupted) after\b)")
+
+
+def member_devices(fsid):
+    """Bağlı birimin aygıtları (/sys/fs/btrfs/<fsid>/devices); bağlı değilse boş liste"""
+    try:
+        names = os.listdir(os.path.join(SYSFS_BTRFS, fsid, "devices"))
+    except (OSError, TypeError):
+        return []
+    return sorted("/dev/" + name for name in names)
+
+
+def device_limits(fsid):
+    """devid -> scrub hız sınırı (bayt/sn, 0 sınırsız); çekirdek desteklemiyorsa boş sözlük"""
+    base = os.path.join(SYSFS_BTRFS, fsid, "devinfo")
+    limits = {}
+    try:
+        devids = os.listdir(base)
+    except (OSError, TypeError):
+        return limits
+    for devid in devids:
+        try:
+            with open(os.path.join(base, devid, "scrub_speed_max")) as f:
+                limits[int(devid)] = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            continue
+    return limits
+
+
+def find_mountpoint(path, fsid=None):
+    """Birimin bağlı olduğu dizin (kök öncelikli); dizide bağlanan aygıt herhangi biri olabilir"""
+    table = discovery.read_mount_table()
+    for device in [path] + member_devices(fsid):
+        mounts = table.get(os.path.basename(os.path.realpath(device)))
+        if mounts:
+            return "/" if "/" in mounts else sorted(mounts)[0]
+    return None
+
+
+def ionice_args(profile=None):
+    """Profilin G/Ç önceliği scrub'ın kendi -c/-n seçenekleriyle verilir
+
+    btrfs scrub önceliği kendisi ayarlar (varsayılanı idle sınıfıdır); ionice ile sarmak etkisizdir.
+    """
+    profile = profile if isinstance(profile, throttle.Profile) else throttle.get_profile(profile)
+    if profile.ionice_class is None:
+        # Kısıtlamasız profil: best-effort
+        return ["-c", "2"]
+    args = ["-c", str(profile.ionice_class)]
+    if profile.ionice_level is not None:
+        args += ["-n", str(profile.ionice_level)]
+    return args
+
+
+def start_command(mountpoint, readonly=False, resume=False, profile=None):
+    # -B: bitene kadar ön planda, -d: aygıt başına, -R: ham sayaçlar (rapor ayrıştırıcı için)
+    cmd = ["btrfs", "scrub", "resume" if resume else "start", "-B", "-d", "-R"] + ionice_args(profile)
+    if readonly:
+        cmd.append("-r")
+    return cmd + [mountpoint]
+
+
+def status_command(mountpoint):
+    return ["btrfs", "scrub", "status", "-R", "-d", mountpoint]
+
+
+def cancel_command(mountpoint):
+    return ["btrfs", "scrub", "cancel", mountpoint]
+
+
+def limit_command(mountpoint, devid, limit):
+    # 0 sınırı kaldırır
+    return ["btrfs", "scrub", "limit", "-d", str(devid), "-l", str(limit), mountpoint]
+
+
+def resumable(lines):
+    """scrub status çıktısında yarıda kalmış (iptal edilmiş ya da kesilmiş) aygıt var mı"""
+    return any(RESUMABLE_RE.match(line.strip()) for line in lines)
+
+
+def exit_code(returncode, stats):
+    """scrub çıkış kodu ve sayaçlardan e2fsck bitleri (raporlar ve arayüz aynı yorumu yapar)"""
+    if returncode not in (0, EXIT_UNCORRECTABLE):
+        return fsckreport.EXIT_OPERATIONAL
+    code = 0
+    if stats.corrected:
+        code |= fsckreport.EXIT_CORRECTED
+    if returncode == EXIT_UNCORRECTABLE or stats.errors > stats.corrected:
+        code |= fsckreport.EXIT_UNCORRECTED
+    return code
+
+
+class ScrubCheck:
+    """Adım adım yürüyen çevrimiçi scrub; ProcessJob ile aynı denetim arayüzüne sahiptir
+
+    Adımlar: scrub status (yarıda kalmış scrub varsa resume ile sürdürülür) -> aygıt başına hız
+    sınırı (btrfs scrub limit) -> scrub start/resume -B -> eski sınırların geri yüklenmesi.
+    Çekirdekte scrub duraklatılamaz: duraklatma scrub'ı iptal edip ilerlemeyi kaydettirir,
+    sürdürme kaldığı yerden "scrub resume" ile devam eder.
+    """
+
+    RUNNING = jobengine.ProcessJob.RUNNING
+    DONE = jobengine.ProcessJob.DONE
+    CANCELLED = jobengine.ProcessJob.CANCELLED
+    FAILED = jobengine.ProcessJob.FAILED
+
+    def __init__(self, engine, path, mountpoint, on_line=None, on_progress=None, on_exit=None,
+                 profile=None, readonly=False, limit=None, fsid=None):
+        self.engine = engine
+        self.path = path
+        self.mountpoint = mountpoint
+        self.on_line = on_line
+        self.on_progress = on_progress
+        self.on_exit = on_exit
+        self.profile = profile if isinstance(profile, throttle.Profile) else throttle.get_profile(profile)
+        self.readonly = readonly
+        # Sınır verilmezse profilin okuma sınırı kullanılır (idle: 20M); None sınırsızdır
+        if limit is None and self.profile.read_bandwidth:
+            limit = membudget.parse_size(self.profile.read_bandwidth)
+        self.limit = limit
+        if fsid is None:
+            info = superblock.try_probe(path)
+            fsid = info.uuid if info is not None else None
+        self.fsid = fsid
+        self.state = ScrubCheck.RUNNING
+        self.returncode = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self.pause_requested = False
+        self.resumed = False
+        self.scrub_rc = None
+        # Son -R çıktısındaki sayaçlar (çıkış kodu için)
+        self.stats = fsckprogress.ScrubProgress()
+        self.previous_limits = {}
+        self.limits_applied = False
+        # Taranan bayt ve scrub adımlarının duraklatmalar hariç süresi (verim raporu için)
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.resources = None
+        self.timings = {}
+        self.current = None
+        self.scrubbing = False
+        self._interrupted = False
+        self._poll_timer = None
+        self._poller = None
+        self._output = []
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self):
+        return self.started is not None and self.finished is None
+
+    @property
+    def paused(self):
+        return self.running and self.pause_requested
+
+    @property
+    def can_pause(self):
+        # Duraklatma taramayı iptal eder; yetki istemi gerekiyorsa sunulmaz
+        return bool(self.scrubbing and self.current and self.current.can_pause)
+
+    def start(self):
+        self.started = time.monotonic()
+        if os.geteuid() != 0:
+            # Scrub yedi-sekiz ayrı btrfs komutuyla yürür; her biri ayrı pkexec istemi açardı.
+            # Arayüz scrub'ı yetkili yardımcı üzerinden çalıştırır, yerel yol sadece root içindir.
+            self.error = "Online scrub needs root privileges (privileged helper is not available)"
+            self.returncode = fsckreport.EXIT_OPERATIONAL
+            # on_exit, ProcessJob'daki gibi start() döndükten sonra döngüden çağrılır
+            self.engine.loop.call_later(0, lambda: self._finish(ScrubCheck.FAILED))
+            return self
+        self._run("status", status_command(self.mountpoint), self._checked_status, capture=True,
+                  timeout=STEP_TIMEOUT)
+        return self
+
+    # --- Denetim ---
+
+    def cancel(self):
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        if self.scrubbing and self.current is not None:
+            self._interrupted = True
+            self.current.cancel()
+        elif self.current is None:
+            # Duraklatılmış: scrub zaten durdu, sadece sınırlar geri yüklenir
+            self._restore_limits()
+        return True
+
+    def pause(self):
+        if not self.scrubbing or self.current is None or self.pause_requested:
+            return False
+        self.pause_requested = True
+        self._interrupted = True
+        self.current.cancel()
+        return True
+
+    def resume(self):
+        if not self.pause_requested or self.cancel_requested:
+            return False
+        self.pause_requested = False
+        if self.current is None:
+            self._scrub(resume=True)
+        return True
+
+    # --- Adımlar ---
+
+    def _line(self, text):
+        if self.on_line:
+            self.on_line(text)
+
+    def _run(self, name, cmd, callback, cancellable=False, capture=False, timeout=None):
+        self._output = []
+        step_started = time.monotonic()
+
+        def on_line(line):
+            if capture:
+                self._output.append(line)
+            else:
+                self.stats.feed_line(line)
+                self._line(line)
+
+        def on_exit(proc_job):
+            self.current = None
+            self.timings[name] = round(self.timings.get(name, 0.0) + time.monotonic() - step_started, 3)
+            callback(proc_job)
+
+        self.current = self.engine.spawn(
+            cmd, on_line=on_line, on_exit=on_exit, timeout=timeout,
+            kill_grace=jobengine.KILL_GRACE if cancellable else None)
+
+    def _run_steps(self, name, commands, callback):
+        """Komutları sırayla çalıştır; başarısız adım uyarı olarak yazılır, zincir sürer"""
+        if not commands:
+            callback()
+            return
+        cmd = commands[0]
+
+        def step_done(proc_job):
+            if proc_job.returncode != 0:
+                self._line(f"Warning: {' '.join(cmd)} failed with exit code {proc_job.returncode}")
+            self._run_steps(name, commands[1:], callback)
+
+        self._run(name, cmd, step_done, capture=True, timeout=STEP_TIMEOUT)
+
+    def _checked_status(self, proc_job):
+        self.resumed = proc_job.returncode == 0 and resumable(self._output)
+        if self.cancel_requested:
+            self._done()
+            return
+        self.previous_limits = device_limits(self.fsid) if self.limit else {}
+        if self.limit and not self.previous_limits:
+            self._line("Scrub rate limit is not supported by this kernel, continuing without it")
+        if not self.previous_limits:
+            self._scrub(self.resumed)
+            return
+        self._line(f"Limiting scrub to {self.limit // (1 << 20)} MiB/s per device...")
+        self.limits_applied = True
+        self._run_steps("limit", [limit_command(self.mountpoint, devid, self.limit)
+                                  for devid in sorted(self.previous_limits)],
+                        lambda: self._done() if self.cancel_requested else self._scrub(self.resumed))
+
+    def _scrub(self, resume=False):
+        devices = member_devices(self.fsid)
+        if resume:
+            self._line("Resuming interrupted scrub...")
+        else:
+            self._line(f"Starting scrub of {self.mountpoint} ({len(devices) or 1} device(s) in parallel)...")
+        self.scrubbing = True
+        self._run("scrub", start_command(self.mountpoint, self.readonly, resume, self.profile),
+                  self._scrubbed, cancellable=True)
+        if self.on_progress:
+            self._poll_timer = self.engine.loop.call_later(STATUS_INTERVAL, self._poll)
+
+    def _poll(self):
+        # Sorgu çıktısı toplu iletilir: model her aygıt kaydını bir bütün olarak görür
+        self._poll_timer = None
+        if not self.scrubbing or self._poller is not None:
+            return
+        lines = []
+
+        def polled(proc_job):
+            self._poller = None
+            for line in lines:
+                self.on_progress(line)
+            if self.scrubbing:
+                self._poll_timer = self.engine.loop.call_later(STATUS_INTERVAL, self._poll)
+
+        self._poller = self.engine.spawn(status_command(self.mountpoint), on_line=lines.append,
+                                         on_exit=polled, timeout=STEP_TIMEOUT)
+
+    def _scrubbed(self, proc_job):
+        self.scrubbing = False
+        if self._poll_timer is not None:
+            self.engine.loop.cancel_timer(self._poll_timer)
+            self._poll_timer = None
+        self.active_time += proc_job.active_time
+        self.resources = jobengine.add_resources(self.resources, proc_job.resources)
+        if not self._interrupted:
+            self.scrub_rc = proc_job.returncode
+            if proc_job.error:
+                self.error = proc_job.error
+            self._restore_limits()
+            return
+        # Sinyal alan btrfs-progs scrub'ı iptal edip ilerlemeyi kaydeder; çekirdekte süren kalmasın
+        self._interrupted = False
+        self._run("cancel", cancel_command(self.mountpoint), self._interrupt_done, capture=True,
+                  timeout=STEP_TIMEOUT)
+
+    def _interrupt_done(self, proc_job):
+        if self.cancel_requested:
+            self._restore_limits()
+        elif self.pause_requested:
+            self._line("Scrub paused; progress saved")
+        else:
+            # Duraklatma, scrub durmadan geri alındı
+            self._scrub(resume=True)
+
+    def _restore_limits(self):
+        if not self.limits_applied:
+            self._done()
+            return
+        self.limits_applied = False
+        self._run_steps("restore", [limit_command(self.mountpoint, devid, limit)
+                                    for devid, limit in sorted(self.previous_limits.items())], self._done)
+
+    def _done(self):
+        self.read_bytes = self.stats.scrubbed_bytes or None
+        if self.cancel_requested:
+            self.returncode = fsckreport.EXIT_CANCELED
+            self._finish(ScrubCheck.CANCELLED)
+            return
+        self.returncode = exit_code(self.scrub_rc, self.stats)
+        self._finish(ScrubCheck.FAILED if self.error else ScrubCheck.DONE)
+
+    def _finish(self, state):
+        self.state = state
+        self.finished = time.monotonic()
+        if self.on_exit:
+            self.on_exit(self)
+
+
+if __name__ == "__main__":
+    # Kullanım: scrub.py [--readonly] [--limit 50M] [--profile idle] AYGIT   (root olarak, birim bağlıyken)
+    parser = argparse.ArgumentParser(description="Scrub a mounted btrfs filesystem with live statistics.")
+    parser.add_argument("device")
+    parser.add_argument("--readonly", action="store_true")
+    parser.add_argument("--limit", type=membudget.parse_size)
+    parser.add_argument("--profile", choices=sorted(throttle.PROFILES))
+    args = parser.parse_args()
+    probed = superblock.try_probe(args.device)
+    target = find_mountpoint(args.device, probed.uuid if probed else None)
+    if target is None:
+        print(f"{args.device} is not mounted", file=sys.stderr)
+        sys.exit(fsckreport.EXIT_USAGE)
+    progress = fsckprogress.ScrubProgress(probed.bytes_used if probed else 0)
+
+    def show(line):
+        if progress.feed_line(line):
+            print(progress.describe(), file=sys.stderr)
+
+    loop = jobengine.SelectorLoop()
+    check = ScrubCheck(jobengine.JobEngine(loop), args.device, target, on_line=print, on_progress=show,
+                       profile=args.profile, readonly=args.readonly, limit=args.limit,
+                       fsid=probed.uuid if probed else None).start()
+    loop.run_until(lambda: not check.running)
+    if check.error:
+        print(f"error: {check.error}", file=sys.stderr)
+    print(json.dumps({"returncode": check.returncode, "state": check.state, "resumed": check.resumed,
+                      "scrubbed_bytes": check.stats.scrubbed_bytes, "errors": check.stats.errors,
+                      "corrected": check.stats.corrected, "timings_s": check.timings}))
+    sys.exit(check.returncode)
@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+# Bağlı ext2/3/4 LVM birimlerinin anlık görüntü üzerinden çevrimiçi kontrolü (e2scrub gibi)
+# lvcreate anlık görüntü alırken dosya sistemini kısa süre dondurur (dm suspend); kontrol bu
+# tutarlı kopyada tam doğrulukla yapılır ve anlık görüntü her durumda silinir
+import json
+import os
+import sys
+import time
+
+import fsckreport
+import jobengine
+import throttle
+
+SNAPSHOT_PREFIX = "fscheck-snap-"
+# Kontrol süresince kaynakta değişen bloklar için yer (e2scrub ile aynı varsayılan)
+SNAPSHOT_SIZE = 256 * 1024 * 1024
+MIN_SNAPSHOT_SIZE = 32 * 1024 * 1024
+LVS_FIELDS = "vg_name,lv_name,lv_attr,lv_path,vg_free,vg_extent_size"
+# lvs sorguları için en uzun süre (lvcreate/lvremove yarıda kesilmez)
+LVS_TIMEOUT = 60
+
+
+class SnapshotError(Exception):
+    """Anlık görüntü alınamadı (LVM değil, yer yok, ...)"""
+
+
+class LogicalVolume:
+    """lvs'den okunan kaynak mantıksal birim"""
+
+    def __init__(self, vg, name, attr, path, vg_free, extent_size):
+        self.vg = vg
+        self.name = name
+        self.attr = attr
+        self.path = path
+        self.vg_free = vg_free
+        self.extent_size = extent_size or 1
+
+    @property
+    def origin(self):
+        return f"{self.vg}/{self.name}"
+
+    @property
+    def thin(self):
+        # İnce birimlerin anlık görüntüsü havuzdan yer alır, boyut verilmez
+        return self.attr[:1] == "V"
+
+    @property
+    def snapshot_name(self):
+        # LVM adları en fazla 127 karakter olabilir
+        return (SNAPSHOT_PREFIX + self.name)[:127]
+
+    @property
+    def snapshot_ref(self):
+        return f"{self.vg}/{self.snapshot_name}"
+
+    @property
+    def snapshot_path(self):
+        return f"/dev/{self.vg}/{self.snapshot_name}"
+
+    def snapshot_size(self):
+        """Birim grubundaki boş yere göre anlık görüntü boyutu (bayt, kapsam katı)"""
+        size = min(SNAPSHOT_SIZE, self.vg_free)
+        size -= size % self.extent_size
+        if size < MIN_SNAPSHOT_SIZE:
+            raise SnapshotError(f"Not enough free space in volume group {self.vg} for a snapshot")
+        return size
+
+
+def _as_int(value):
+    try:
+        return int(str(value).strip().rstrip("B"))
+    except ValueError:
+        return 0
+
+
+def _lvs_rows(text):
+    """lvs --reportformat json çıktısındaki birim satırları; okunamazsa boş liste
+
+    stderr de aynı akışa geldiği için JSON'dan önce ya da sonra uyarı satırları olabilir.
+    """
+    try:
+        return json.JSONDecoder().raw_decode(text[text.index("{"):])[0]["report"][0]["lv"] or []
+    except (ValueError, KeyError, IndexError, TypeError):
+        return []
+
+
+def parse_lvs(text):
+    """lvs --reportformat json çıktısından ilk birimi oku; yoksa None"""
+    report = _lvs_rows(text)
+    if not report:
+        return None
+    row = report[0]
+    return LogicalVolume(row.get("vg_name", ""), row.get("lv_name", ""), row.get("lv_attr", ""),
+                         row.get("lv_path", ""), _as_int(row.get("vg_free")),
+                         _as_int(row.get("vg_extent_size")))
+
+
+def lvs_command(path):
+    return ["lvs", "--reportformat", "json", "--units", "b", "--nosuffix", "-o", LVS_FIELDS, path]
+
+
+def leftover_command(lv):
+    # Yarıda kalmış bir kontrolden (çökme, güç kesintisi) kalan anlık görüntü; yoksa lvs 5 ile çıkar
+    return ["lvs", "--reportformat", "json", "-o", "lv_name,origin", lv.snapshot_ref]
+
+
+def parse_leftover(text):
+    """Aynı adlı birim yoksa None, varsa kaynağı ("" anlık görüntü değilse)"""
+    rows = _lvs_rows(text)
+    return rows[0].get("origin", "") if rows else None
+
+
+def create_command(lv):
+    if lv.thin:
+        # İnce anlık görüntüler varsayılan olarak etkinleştirilmez
+        return ["lvcreate", "--snapshot", "--setactivationskip", "n", "--name", lv.snapshot_name, lv.origin]
+    return ["lvcreate", "--snapshot", "--size", f"{lv.snapshot_size()}b",
+            "--name", lv.snapshot_name, lv.origin]
+
+
+def status_command(lv):
+    return ["lvs", "--noheadings", "-o", "lv_attr", lv.snapshot_ref]
+
+
+def remove_command(lv):
+    return ["lvremove", "--force", lv.snapshot_ref]
+
+
+def origin_exit_code(check_rc):
+    """Anlık görüntüde düzeltilen sorunlar kaynakta hâlâ vardır: düzeltildi bitini düzeltilmedi'ye çevir"""
+    if check_rc is None or check_rc < 0:
+        return fsckreport.EXIT_OPERATIONAL
+    code = check_rc & ~fsckreport.EXIT_REBOOT
+    if code & fsckreport.EXIT_CORRECTED:
+        code = (code & ~fsckreport.EXIT_CORRECTED) | fsckreport.EXIT_UNCORRECTED
+    return code
+
+
+def replay_command(path):
+    # Bağlı dosya sisteminin kopyasında günlük her zaman kurtarma bekler
+    return ["env", "E2FSCK_FIXES_ONLY=1", "/sbin/e2fsck", "-E", "journal_only", "-p", path]
+
+
+def copy_check_command(path):
+    # E2FSCK_FIXES_ONLY: sadece gerçek sorunlar düzeltilir, iyileştirmeler (sıkıştırma vb.) yapılmaz
+    return ["env", "E2FSCK_FIXES_ONLY=1", "/sbin/e2fsck", "-f", "-y", "-tt", path]
+
+
+class CopyCheck:
+    """Kaynağın özel bir kopyasını (anlık görüntü, meta veri imajı) kontrol eden iki adımlı iş
+
+    Önce günlük kopyada oynatılır, sonra düzeltmelerle tam kontrol yapılır; böylece bağlı
+    dosya sisteminde "e2fsck -n"in verdiği yanlış alarmlar oluşmaz. Düzeltmeler sadece
+    kopyaya yazılır; returncode kaynağa göre çevrilmiş koddur (origin_exit_code).
+    """
+
+    def __init__(self, engine, path, on_line=None, on_progress=None, on_exit=None,
+                 profile=None, throttle_target=None, prefix=None):
+        self.engine = engine
+        self.path = path
+        self.on_line = on_line
+        self.on_progress = on_progress
+        self.on_exit = on_exit
+        self.profile = profile
+        # io.max sınırı kopyanın değil kaynağın bulunduğu aygıta uygulanır
+        self.throttle_target = throttle_target or path
+        self.prefix = ([] if os.geteuid() == 0 else ["pkexec"]) if prefix is None else prefix
+        self.state = jobengine.ProcessJob.RUNNING
+        self.returncode = None
+        self.check_rc = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.resources = None
+        self.timings = {}
+        self.current = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self):
+        return self.started is not None and self.finished is None
+
+    @property
+    def paused(self):
+        return bool(self.current and self.current.paused)
+
+    @property
+    def can_pause(self):
+        return bool(self.current and self.current.can_pause)
+
+    def start(self):
+        self.started = time.monotonic()
+        self._run("journal", self.prefix + replay_command(self.path), self._replayed,
+                  jobengine.PROGRESS_NONE)
+        return self
+
+    def cancel(self):
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        return self.current.cancel() if self.current else True
+
+    def pause(self):
+        return self.current.pause() if self.current else False
+
+    def resume(self):
+        return self.current.resume() if self.current else False
+
+    def _run(self, name, cmd, callback, progress):
+        step_started = time.monotonic()
+
+        def on_exit(proc_job):
+            self.current = None
+            self.timings[name] = round(time.monotonic() - step_started, 3)
+            callback(proc_job)
+
+        self.current = self.engine.spawn(cmd, on_line=self.on_line, on_progress=self.on_progress,
+                                         on_exit=on_exit, progress=progress)
+
+    def _replayed(self, proc_job):
+        if self.cancel_requested:
+            self._finish(fsckreport.EXIT_CANCELED, jobengine.ProcessJob.CANCELLED)
+            return
+        if proc_job.error or proc_job.returncode not in (0, fsckreport.EXIT_CORRECTED):
+            self.error = proc_job.error
+            self.check_rc = proc_job.returncode
+            self._finish(origin_exit_code(proc_job.returncode), jobengine.ProcessJob.FAILED)
+            return
+        cmd = throttle.wrap(self.prefix + copy_check_command(self.path), self.profile, self.throttle_target)
+        self._run("check", cmd, self._checked, jobengine.PROGRESS_FD)
+
+    def _checked(self, proc_job):
+        self.check_rc = proc_job.returncode
+        self.read_bytes = proc_job.read_bytes
+        self.active_time = proc_job.active_time
+        self.resources = proc_job.resources
+        self.error = proc_job.error
+        code = origin_exit_code(proc_job.returncode)
+        if self.cancel_requested or code & fsckreport.EXIT_CANCELED:
+            self._finish(code | fsckreport.EXIT_CANCELED, jobengine.ProcessJob.CANCELLED)
+        elif self.error:
+            self._finish(code, jobengine.ProcessJob.FAILED)
+        else:
+            self._finish(code, jobengine.ProcessJob.DONE)
+
+    def _finish(self, returncode, state):
+        self.returncode = returncode
+        self.state = state
+        self.finished = time.monotonic()
+        if self.on_exit:
+            self.on_exit(self)
+
+
+class SnapshotCheck:
+    """Adım adım yürüyen anlık görüntü kontrolü; ProcessJob ile aynı denetim arayüzüne sahiptir
+
+    Adımlar: lvs -> önceki kontrolden kalan anlık görüntünün silinmesi -> lvcreate -s ->
+    günlüğü anlık görüntüde oynat -> e2fsck -f -y (anlık görüntüde) -> taşma denetimi ->
+    lvremove -> kaynağı işaretle (tune2fs). Sadece e2fsck
+    adımları duraklatılabilir ve iptal edilebilir; dosya sistemi donukken (lvcreate) ya da
+    temizlik sırasında gelen iptal, kontrol atlanarak anlık görüntü silindikten sonra uygulanır.
+    """
+
+    RUNNING = jobengine.ProcessJob.RUNNING
+    DONE = jobengine.ProcessJob.DONE
+    CANCELLED = jobengine.ProcessJob.CANCELLED
+    FAILED = jobengine.ProcessJob.FAILED
+
+    def __init__(self, engine, path, on_line=None, on_progress=None, on_exit=None,
+                 profile=None, mark_origin=True):
+        self.engine = engine
+        self.path = path
+        self.on_line = on_line
+        self.on_progress = on_progress
+        self.on_exit = on_exit
+        self.profile = profile
+        self.mark_origin = mark_origin
+        # root değilsek her adım pkexec ile çalışır (arayüz bunun yerine yardımcıyı kullanır)
+        self.prefix = [] if os.geteuid() == 0 else ["pkexec"]
+        self.state = SnapshotCheck.RUNNING
+        self.returncode = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self.lv = None
+        self.snapshot_created = False
+        self.leftover_checked = False
+        self.check_rc = None
+        # Kontrol adımının okuduğu bayt ve çalışma süresi (verim raporu için)
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.resources = None
+        self.timings = {}
+        self.current = None
+        self.current_cancellable = False
+        self._output = []
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self):
+        return self.started is not None and self.finished is None
+
+    @property
+    def paused(self):
+        return bool(self.current_cancellable and self.current and self.current.paused)
+
+    @property
+    def can_pause(self):
+        return bool(self.current_cancellable and self.current and self.current.can_pause)
+
+    def start(self):
+        self.started = time.monotonic()
+        self._run("lvs", lvs_command(self.path), self._resolved, capture=True, timeout=LVS_TIMEOUT)
+        return self
+
+    # --- Denetim ---
+
+    def cancel(self):
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        if self.current_cancellable and self.current is not None:
+            self.current.cancel()
+        return True
+
+    def pause(self):
+        if not self.current_cancellable or self.current is None:
+            return False
+        return self.current.pause()
+
+    def resume(self):
+        if self.current is None:
+            return False
+        return self.current.resume()
+
+    # --- Adımlar ---
+
+    def _line(self, text):
+        if self.on_line:
+            self.on_line(text)
+
+    def _run(self, name, cmd, callback, progress=jobengine.PROGRESS_NONE, cancellable=False,
+             capture=False, timeout=None):
+        self._output = []
+        if cmd[:1] != ["pkexec"]:
+            cmd = self.prefix + cmd
+        step_started = time.monotonic()
+
+        def on_line(line):
+            if capture:
+                self._output.append(line)
+            else:
+                self._line(line)
+
+        def on_exit(proc_job):
+            self.current = None
+            self.timings[name] = round(time.monotonic() - step_started, 3)
+            callback(proc_job)
+
+        self.current_cancellable = cancellable
+        self.current = self.engine.spawn(
+            cmd, on_line=on_line, on_progress=self.on_progress, on_exit=on_exit,
+            progress=progress, timeout=timeout, kill_grace=None if not cancellable else jobengine.KILL_GRACE)
+
+    def _fail(self, message, returncode=fsckreport.EXIT_OPERATIONAL):
+        self.error = message
+        self.returncode = returncode
+        self._finish(SnapshotCheck.FAILED)
+
+    def _resolved(self, proc_job):
+        self.lv = parse_lvs("\n".join(self._output))
+        if proc_job.returncode != 0 and self.lv is None and proc_job.returncode != 5:
+            # 5: lvs hedefi bulamadı; diğer kodlar (126/127) yetki ya da kurulum sorunudur
+            self._fail(proc_job.error or f"lvs failed with exit code {proc_job.returncode}")
+            return
+        if self.lv is None:
+            self._fail(f"{self.path} is not an LVM logical volume")
+            return
+        if self.cancel_requested:
+            self._cancelled()
+            return
+        if not self.leftover_checked:
+            # e2scrub gibi: sabit adlı anlık görüntü önceki bir kontrolden kalmışsa lvcreate başarısız olur
+            self.leftover_checked = True
+            self._run("leftover", leftover_command(self.lv), self._checked_leftover, capture=True,
+                      timeout=LVS_TIMEOUT)
+            return
+        self._create()
+
+    def _create(self):
+        if self.cancel_requested:
+            self._cancelled()
+            return
+        try:
+            cmd = create_command(self.lv)
+        except SnapshotError as e:
+            self._fail(str(e))
+            return
+        self._line(f"Creating snapshot {self.lv.snapshot_ref}...")
+        self._run("snapshot", cmd, self._created)
+
+    def _checked_leftover(self, proc_job):
+        origin = parse_leftover("\n".join(self._output))
+        if origin is None:
+            self._create()
+            return
+        if origin != self.lv.name:
+            self._fail(f"{self.lv.snapshot_ref} exists and is not a snapshot of {self.lv.origin}")
+            return
+        self._line(f"Removing leftover snapshot {self.lv.snapshot_ref}...")
+
+        def removed(proc_job):
+            if proc_job.returncode != 0:
+                self._fail(proc_job.error or f"Could not remove leftover snapshot {self.lv.snapshot_ref}")
+                return
+            # Silinen anlık görüntünün yeri boşaldı: boyut güncel vg_free ile hesaplansın
+            self._run("lvs", lvs_command(self.path), self._resolved, capture=True, timeout=LVS_TIMEOUT)
+
+        self._run("leftover", remove_command(self.lv), removed)
+
+    def _created(self, proc_job):
+        if proc_job.returncode != 0:
+            self._fail(proc_job.error or f"lvcreate failed with exit code {proc_job.returncode}")
+            return
+        self.snapshot_created = True
+        if self.cancel_requested:
+            self._remove()
+            return
+        # Onarım sadece anlık görüntüye yazılır; kaynağa dokunulmaz
+        self._line("Checking snapshot...")
+        step_started = time.monotonic()
+
+        def checked(copy):
+            self.current = None
+            self.timings.update(copy.timings)
+            self.timings["check_total"] = round(time.monotonic() - step_started, 3)
+            self._checked(copy)
+
+        self.current_cancellable = True
+        self.current = CopyCheck(self.engine, self.lv.snapshot_path, on_line=self._line,
+                                 on_progress=self.on_progress, on_exit=checked, profile=self.profile,
+                                 throttle_target=self.lv.path, prefix=self.prefix).start()
+
+    def _checked(self, copy):
+        self.check_rc = copy.check_rc
+        self.read_bytes = copy.read_bytes
+        self.active_time = copy.active_time
+        self.resources = copy.resources
+        if copy.error:
+            self.error = copy.error
+        self._run("status", status_command(self.lv), self._status, capture=True, timeout=LVS_TIMEOUT)
+
+    def _status(self, proc_job):
+        attrs = [line.strip() for line in self._output if len(line.strip()) == 10]
+        attr = attrs[-1] if attrs else ""
+        # lv_attr 5. karakteri "I": anlık görüntü taştı, kontrol sonucu güvenilmez
+        if len(attr) > 4 and attr[4] == "I":
+            self.error = "Snapshot overflowed during the check; retry with more free space in the volume group"
+            self.check_rc = fsckreport.EXIT_OPERATIONAL
+        self._remove()
+
+    def _remove(self):
+        self._line(f"Removing snapshot {self.lv.snapshot_ref}...")
+        self._run("remove", remove_command(self.lv), self._removed)
+
+    def _removed(self, proc_job):
+        if proc_job.returncode != 0:
+            self._line(f"Warning: could not remove {self.lv.snapshot_ref}, remove it with lvremove")
+        if self.cancel_requested and self.check_rc is None:
+            self._cancelled()
+            return
+        code = origin_exit_code(self.check_rc)
+        if self.cancel_requested or code & fsckreport.EXIT_CANCELED:
+            self._cancelled(code)
+            return
+        if not self.mark_origin or code & (fsckreport.EXIT_OPERATIONAL | fsckreport.EXIT_USAGE):
+            self._done(code)
+            return
+        if code & fsckreport.EXIT_UNCORRECTED:
+            # Sonraki açılışta ya da onarımda tam kontrol zorlanır
+            self._line("Errors found: marking filesystem for a full check")
+            cmd = ["tune2fs", "-E", "force_fsck", self.lv.path]
+        else:
+            # Temiz: son kontrol zamanı ve bağlama sayacı sıfırlanır (açılış kontrolü ertelenir)
+            cmd = ["tune2fs", "-C", "0", "-T", "now", self.lv.path]
+        self._run("mark", cmd, lambda proc_job: self._done(code))
+
+    def _done(self, code):
+        self.returncode = code
+        self._finish(SnapshotCheck.FAILED if self.error else SnapshotCheck.DONE)
+
+    def _cancelled(self, code=fsckreport.EXIT_CANCELED):
+        self.returncode = code | fsckreport.EXIT_CANCELED
+        self._finish(SnapshotCheck.CANCELLED)
+
+    def _finish(self, state):
+        self.state = state
+        self.finished = time.monotonic()
+        if self.on_exit:
+            self.on_exit(self)
+
+
+if __name__ == "__main__":
+    # Kullanım: snapshot.py /dev/VG/LV   (root olarak; deneme için benchmarks/bench_snapshot.py)
+    if len(sys.argv) != 2:
+        print("usage: snapshot.py /dev/VG/LV", file=sys.stderr)
+        sys.exit(fsckreport.EXIT_USAGE)
+    loop = jobengine.SelectorLoop()
+    check = SnapshotCheck(jobengine.JobEngine(loop), sys.argv[1], on_line=print).start()
+    loop.run_until(lambda: not check.running)
+    if check.error:
+        print(f"error: {check.error}", file=sys.stderr)
+    print(json.dumps({"returncode": check.returncode, "state": check.state, "timings_s": check.timings}))
+    sys.exit(check.returncode)
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# Alt süreç çalıştırmadan ext2/3/4 ve BTRFS süper bloğu okuyucu
+# Her aygıt/imaj için en fazla iki pread yapılır, alanlar önceden derlenmiş struct ile çözülür
+import json
+import os
+import struct
+import sys
+import time
+import uuid as uuidlib
+
+EXT_SUPERBLOCK_OFFSET = 1024
+EXT_SUPERBLOCK_SIZE = 1024
+EXT_MAGIC = 0xEF53
+BTRFS_SUPERBLOCK_OFFSET = 0x10000
+BTRFS_SUPERBLOCK_SIZE = 4096
+BTRFS_MAGIC = b"_BHRfS_M"
+# qcow2 kabı (e2image -Q, sanal makine imajları): süper blok kümeler eşlenerek okunur
+QCOW2_MAGIC = b"QFI\xfb"
+QCOW2_HEADER = struct.Struct(">4sIQIIQIIQ")
+QCOW2_OFFSET_MASK = 0x00FFFFFFFFFFFE00
+QCOW2_COMPRESSED = 1 << 62
+QCOW2_ZERO = 1
+CONTAINER_QCOW2 = "qcow2"
+
+# s_state bitleri
+EXT_STATE_VALID = 0x0001
+EXT_STATE_ERROR = 0x0002
+EXT_STATE_ORPHAN = 0x0004
+
+# Özellik bayrakları
+EXT_COMPAT_HAS_JOURNAL = 0x0004
+EXT_INCOMPAT_FILETYPE = 0x0002
+EXT_INCOMPAT_RECOVER = 0x0004
+EXT_INCOMPAT_JOURNAL_DEV = 0x0008
+EXT_INCOMPAT_META_BG = 0x0010
+EXT_INCOMPAT_64BIT = 0x0080
+EXT_INCOMPAT_CSUM_SEED = 0x2000
+EXT_RO_COMPAT_SPARSE_SUPER = 0x0001
+EXT_RO_COMPAT_LARGE_FILE = 0x0002
+EXT_RO_COMPAT_BTREE_DIR = 0x0004
+EXT_RO_COMPAT_GDT_CSUM = 0x0010
+EXT_RO_COMPAT_BIGALLOC = 0x0200
+EXT_RO_COMPAT_METADATA_CSUM = 0x0400
+EXT3_INCOMPAT_SUPP = EXT_INCOMPAT_FILETYPE | EXT_INCOMPAT_RECOVER | EXT_INCOMPAT_META_BG
+EXT3_RO_COMPAT_SUPP = EXT_RO_COMPAT_SPARSE_SUPER | EXT_RO_COMPAT_LARGE_FILE | EXT_RO_COMPAT_BTREE_DIR
+
+
+def _layout(fields):
+    """(ofset, ad, biçim) listesinden boşlukları dolduran tek bir struct oluştur"""
+    fmt = "<"
+    pos = 0
+    names = []
+    for offset, name, code in sorted(fields):
+        if offset > pos:
+            fmt += f"{offset - pos}x"
+        fmt += code
+        pos = offset + struct.calcsize("<" + code)
+        names.append(name)
+    return struct.Struct(fmt), tuple(names)
+
+
+EXT_LAYOUT, EXT_FIELDS = _layout([
+    (0x00, "inodes_count", "I"),
+    (0x04, "blocks_count_lo", "I"),
+    (0x08, "r_blocks_count_lo", "I"),
+    (0x0C, "free_blocks_count_lo", "I"),
+    (0x10, "free_inodes_count", "I"),
+    (0x14, "first_data_block", "I"),
+    (0x18, "log_block_size", "I"),
+    (0x20, "blocks_per_group", "I"),
+    (0x24, "clusters_per_group", "I"),
+    (0x28, "inodes_per_group", "I"),
+    (0x2C, "mtime", "I"),
+    (0x30, "wtime", "I"),
+    (0x34, "mnt_count", "H"),
+    (0x36, "max_mnt_count", "h"),
+    (0x38, "magic", "H"),
+    (0x3A, "state", "H"),
+    (0x3C, "errors", "H"),
+    (0x40, "lastcheck", "I"),
+    (0x44, "checkinterval", "I"),
+    (0x4C, "rev_level", "I"),
+    (0x58, "inode_size", "H"),
+    (0x5C, "feature_compat", "I"),
+    (0x60, "feature_incompat", "I"),
+    (0x64, "feature_ro_compat", "I"),
+    (0x68, "uuid", "16s"),
+    (0x78, "volume_name", "16s"),
+    (0xFE, "desc_size", "H"),
+    (0x108, "mkfs_time", "I"),
+    (0x150, "blocks_count_hi", "I"),
+    (0x158, "free_blocks_count_hi", "I"),
+    (0x174, "log_groups_per_flex", "B"),
+    (0x175, "checksum_type", "B"),
+    (0x178, "kbytes_written", "Q"),
+    (0x194, "error_count", "I"),
+    (0x198, "first_error_time", "I"),
+    (0x1CC, "last_error_time", "I"),
+    (0x270, "checksum_seed", "I"),
+    (0x3FC, "checksum", "I"),
+])
+
+BTRFS_LAYOUT, BTRFS_FIELDS = _layout([
+    (0x20, "fsid", "16s"),
+    (0x30, "bytenr", "Q"),
+    (0x40, "magic", "8s"),
+    (0x48, "generation", "Q"),
+    (0x70, "total_bytes", "Q"),
+    (0x78, "bytes_used", "Q"),
+    (0x88, "num_devices", "Q"),
+    (0x90, "sectorsize", "I"),
+    (0x94, "nodesize", "I"),
+    (0xA4, "chunk_root_generation", "Q"),
+    (0xC4, "csum_type", "H"),
+    (0xC9, "devid", "Q"),
+    (0x12B, "label", "256s"),
+])
+
+
+def _cstring(raw):
+    return raw.split(b"\0", 1)[0].decode("utf-8", "replace")
+
+
+def _uuid(raw):
+    return str(uuidlib.UUID(bytes=raw))
+
+
+class SuperblockInfo:
+    """Süper bloktan çözülen dosya sistemi bilgileri"""
+
+    def __init__(self, fstype, uuid="", label="", size=0, block_size=0, fields=None):
+        self.fstype = fstype
+        self.uuid = uuid
+        self.label = label
+        self.size = size
+        self.block_size = block_size
+        # Ham alanlar (ext için s_*, btrfs için süper blok alanları)
+        self.fields = fields or {}
+        # Dosya sistemi bir kabın içindeyse kap türü (qcow2); araçlar önce ham imaja açar
+        self.container = ""
+
+    def __repr__(self):
+        return f"SuperblockInfo({self.fstype!r}, uuid={self.uuid!r}, label={self.label!r})"
+
+    def __getattr__(self, name):
+        fields = self.__dict__.get("fields", {})
+        if name in fields:
+            return fields[name]
+        raise AttributeError(name)
+
+    @property
+    def is_ext(self):
+        return self.fstype in ("ext2", "ext3", "ext4", "jbd")
+
+    @property
+    def is_clean(self):
+        if not self.is_ext:
+            return True
+        return bool(self.state & EXT_STATE_VALID) and not self.state & EXT_STATE_ERROR
+
+    @property
+    def has_errors(self):
+        return self.is_ext and bool(self.state & EXT_STATE_ERROR or self.error_count)
+
+    @property
+    def check_due(self):
+        """Bağlama sayısı ya da kontrol aralığı aşıldıysa True"""
+        if not self.is_ext:
+            return False
+        if self.max_mnt_count > 0 and self.mnt_count >= self.max_mnt_count:
+            return True
+        if self.checkinterval and self.lastcheck + self.checkinterval <= time.time():
+            return True
+        return False
+
+    def as_dict(self):
+        data = {
+            "fstype": self.fstype,
+            "uuid": self.uuid,
+            "label": self.label,
+            "size": self.size,
+            "block_size": self.block_size,
+        }
+        if self.container:
+            data["container"] = self.container
+        for key, val in self.fields.items():
+            if isinstance(val, bytes):
+                continue
+            data[key] = val
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """as_dict çıktısından geri kur (ör. yardımcının okuduğu süper blok); bayt alanları yoktur"""
+        top = ("fstype", "uuid", "label", "size", "block_size", "container")
+        info = cls(data["fstype"], data.get("uuid", ""), data.get("label", ""), data.get("size", 0),
+                   data.get("block_size", 0), {key: val for key, val in data.items() if key not in top})
+        info.container = data.get("container", "")
+        return info
+
+
+def _ext_type(sb):
+    if sb["feature_incompat"] & EXT_INCOMPAT_JOURNAL_DEV:
+        return "jbd"
+    beyond_ext3 = (
+        sb["feature_incompat"] & ~EXT3_INCOMPAT_SUPP
+        or sb["feature_ro_compat"] & ~EXT3_RO_COMPAT_SUPP
+    )
+    if beyond_ext3:
+        return "ext4"
+    if sb["feature_compat"] & EXT_COMPAT_HAS_JOURNAL:
+        return "ext3"
+    return "ext2"
+
+
+def decode_ext(raw):
+    """1024 baytlık ext süper bloğunu çöz; sihirli sayı tutmazsa None"""
+    if len(raw) < EXT_SUPERBLOCK_SIZE:
+        return None
+    sb = dict(zip(EXT_FIELDS, EXT_LAYOUT.unpack_from(raw)))
+    if sb["magic"] != EXT_MAGIC:
+        return None
+    is_64bit = sb["feature_incompat"] & EXT_INCOMPAT_64BIT
+    sb["blocks_count"] = sb["blocks_count_lo"] | ((sb["blocks_count_hi"] << 32) if is_64bit else 0)
+    sb["free_blocks_count"] = sb["free_blocks_count_lo"] | (
+        (sb["free_blocks_count_hi"] << 32) if is_64bit else 0)
+    block_size = 1024 << sb["log_block_size"]
+    return SuperblockInfo(
+        fstype=_ext_type(sb),
+        uuid=_uuid(sb["uuid"]),
+        label=_cstring(sb["volume_name"]),
+        size=sb["blocks_count"] * block_size,
+        block_size=block_size,
+        fields=sb,
+    )
+
+
+def decode_btrfs(raw):
+    """BTRFS süper bloğunu çöz; sihirli sayı tutmazsa None"""
+    if len(raw) < BTRFS_LAYOUT.size:
+        return None
+    sb = dict(zip(BTRFS_FIELDS, BTRFS_LAYOUT.unpack_from(raw)))
+    if sb["magic"] != BTRFS_MAGIC:
+        return None
+    return SuperblockInfo(
+        fstype="btrfs",
+        uuid=_uuid(sb["fsid"]),
+        label=_cstring(sb["label"]),
+        size=sb["total_bytes"],
+        block_size=sb["sectorsize"],
+        fields=sb,
+    )
+
+
+class Qcow2Reader:
+    """qcow2 dosyasında sanal ofsetten okuma (L1/L2 tabloları; sıkıştırılmış kümeler desteklenmez)"""
+
+    def __init__(self, fd, header):
+        magic, version, _, _, cluster_bits, size, crypt, l1_size, l1_offset = QCOW2_HEADER.unpack_from(header)
+        if magic != QCOW2_MAGIC or version not in (2, 3) or crypt or not 9 <= cluster_bits <= 21:
+            raise ValueError("unsupported qcow2 image")
+        self.fd = fd
+        self.cluster_bits = cluster_bits
+        self.cluster_size = 1 << cluster_bits
+        self.l2_bits = cluster_bits - 3
+        self.size = size
+        self.l1_size = l1_size
+        self.l1_offset = l1_offset
+
+    def _entry(self, table_offset, index):
+        raw = os.pread(self.fd, 8, table_offset + index * 8)
+        return struct.unpack(">Q", raw)[0] if len(raw) == 8 else 0
+
+    def _host_offset(self, offset):
+        """Sanal ofsetin dosyadaki yeri; ayrılmamış (sıfır) kümede None"""
+        cluster = offset >> self.cluster_bits
+        l1_index = cluster >> self.l2_bits
+        if l1_index >= self.l1_size:
+            return None
+        l2_offset = self._entry(self.l1_offset, l1_index) & QCOW2_OFFSET_MASK
+        if not l2_offset:
+            return None
+        entry = self._entry(l2_offset, cluster & ((1 << self.l2_bits) - 1))
+        if entry & QCOW2_COMPRESSED:
+            raise ValueError("compressed qcow2 clusters are not supported")
+        if entry & QCOW2_ZERO or not entry & QCOW2_OFFSET_MASK:
+            return None
+        return (entry & QCOW2_OFFSET_MASK) + (offset & (self.cluster_size - 1))
+
+    def pread(self, size, offset):
+        chunks = []
+        while size > 0 and offset < self.size:
+            length = min(size, self.cluster_size - (offset & (self.cluster_size - 1)))
+            host = self._host_offset(offset)
+            chunks.append(bytes(length) if host is None else os.pread(self.fd, length, host))
+            offset += length
+            size -= length
+        return b"".join(chunks)
+
+
+def _probe_reader(pread):
+    info = decode_ext(pread(EXT_SUPERBLOCK_SIZE, EXT_SUPERBLOCK_OFFSET))
+    if info is None:
+        info = decode_btrfs(pread(BTRFS_SUPERBLOCK_SIZE, BTRFS_SUPERBLOCK_OFFSET))
+    return info
+
+
+def probe_fd(fd):
+    """Açık bir dosya tanıtıcısından süper bloğu oku"""
+    info = _probe_reader(lambda size, offset: os.pread(fd, size, offset))
+    if info is not None:
+        return info
+    # İki okumada tanınmadıysa qcow2 kabı olabilir (üstbilgi ilk kümenin başında)
+    header = os.pread(fd, QCOW2_HEADER.size, 0)
+    if not header.startswith(QCOW2_MAGIC) or len(header) < QCOW2_HEADER.size:
+        return None
+    try:
+        info = _probe_reader(Qcow2Reader(fd, header).pread)
+    except ValueError:
+        return None
+    if info is not None:
+        info.container = CONTAINER_QCOW2
+    return info
+
+
+def is_qcow2(info):
+    return info is not None and info.container == CONTAINER_QCOW2
+
+
+def probe(path):
+    """Aygıt ya da imaj dosyasını incele; tanınmayan dosya sisteminde None döndür
+
+    Okuma izni yoksa OSError (PermissionError) yükseltilir.
+    """
+    fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        return probe_fd(fd)
+    finally:
+        os.close(fd)
+
+
+def try_probe(path):
+    """probe() gibi, ama okunamayan yollar için sessizce None döndür"""
+    try:
+        return probe(path)
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    # Kullanım: superblock.py AYGIT_YA_DA_IMAJ...
+    results = {}
+    start = time.perf_counter()
+    for path in sys.argv[1:]:
+        try:
+            info = probe(path)
+            results[path] = info.as_dict() if info else None
+        except OSError as e:
+            results[path] = {"error": str(e)}
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"elapsed_s": elapsed, "results": results}, indent=2))
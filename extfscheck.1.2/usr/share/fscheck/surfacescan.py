@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+# Salt okunur yüzey taraması (bad-block taraması): aygıt baştan sona O_DIRECT ile büyük, hizalı
+# parçalar halinde okunur. MB/s, bölge başına gecikme aykırıları ve okunamayan LBA'lar raporlanır;
+# ext2/3/4'te okunamayan bloklar onarımda "e2fsck -l" ile verilecek listeye yazılır.
+import argparse
+import errno
+import fcntl
+import json
+import mmap
+import os
+import queue
+import signal
+import stat
+import struct
+import sys
+import threading
+import time
+
+import fsckreport
+import superblock
+import throttle
+
+DEFAULT_CHUNK = 4 << 20
+# Okuyucu iş parçacığı (ve tampon) sayısı: biri okurken diğerinin sonucu işlenir
+DEFAULT_DEPTH = 2
+MAX_DEPTH = 32
+# Aygıt bu kadar eşit bölgeye ayrılır; bölge başına verim ve gecikme tutulur
+REGIONS = 64
+# Aykırı gecikme: kayan ortalamanın bu katından ve OUTLIER_MIN_S'den uzun süren okuma
+OUTLIER_FACTOR = 5.0
+OUTLIER_MIN_S = 0.1
+OUTLIER_WARMUP = 8
+LATENCY_SMOOTHING = 0.05
+# Verimi bölgelerin ortancasının bu oranının altında kalan bölge yavaş sayılır (HDD'de iç izler
+# dış izlerin yarısı hızındadır, bu normaldir); birkaç okumalık bölgelerde verim tek okumanın
+# gecikmesidir, karşılaştırılmaz
+SLOW_REGION_RATIO = 0.25
+SLOW_REGION_MIN_READS = 4
+# Okunamayan parçada bulunacak en fazla tek kötü sektör; sonrası bölünmeden kötü sayılır
+# (arızalı HDD'de her başarısız okuma çekirdek zaman aşımına kadar sürebilir)
+MAX_BAD_PER_CHUNK = 64
+PROGRESS_INTERVAL = 0.5
+SECTOR_SIZE = 512
+BLKSSZGET = 0x1268
+# Onarımda "e2fsck -l" ile verilen listeler (dosya sistemi UUID'si başına, badblocks(8) biçimi)
+BADBLOCKS_DIR = "/var/lib/fscheck/badblocks"
+
+
+def bad_blocks_file(uuid, directory=BADBLOCKS_DIR):
+    """Dosya sisteminin boş olmayan kötü blok listesi; yoksa None"""
+    if not uuid:
+        return None
+    path = os.path.join(directory, f"{uuid}.txt")
+    try:
+        return path if os.path.getsize(path) > 0 else None
+    except OSError:
+        return None
+
+
+def bad_blocks_args(uuid):
+    """Onarım komutuna eklenecek "-l LİSTE" (liste yoksa boş)"""
+    path = bad_blocks_file(uuid)
+    return ["-l", path] if path else []
+
+
+def is_block_device(path):
+    try:
+        return stat.S_ISBLK(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+
+def command(path, profile=None, prefix=None, write_list=True):
+    """Tarama komutu: ilerleme kayıtları stdout'a, metin stderr'e (jobengine.PROGRESS_STDOUT)"""
+    if prefix is None:
+        prefix = [] if os.access(path, os.R_OK) or os.geteuid() == 0 else ["pkexec"]
+    cmd = prefix + [sys.executable, os.path.abspath(__file__), "--progress-fd", "1"]
+    if not write_list or not is_block_device(path):
+        cmd.append("--no-list")
+    return throttle.wrap(cmd + [path], profile, path)
+
+
+def parse_fault(text):
+    """--inject-fault BAŞLANGIÇ:UZUNLUK (bayt); test için okunamayan aralık"""
+    start, _, length = text.partition(":")
+    try:
+        return int(start, 0), int(length or str(SECTOR_SIZE), 0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid fault range: {text}") from None
+
+
+def _partition_start(st):
+    """Bölümün diskteki başlangıcı (bayt); bölüm değilse 0 (LBA'lar diske göre verilir)"""
+    if not stat.S_ISBLK(st.st_mode):
+        return 0
+    try:
+        with open(f"/sys/dev/block/{os.major(st.st_rdev)}:{os.minor(st.st_rdev)}/start") as f:
+            return int(f.read().strip()) * SECTOR_SIZE
+    except (OSError, ValueError):
+        return 0
+
+
+def _merge(ranges):
+    merged = []
+    for offset, length in sorted(ranges):
+        if merged and offset <= merged[-1][0] + merged[-1][1]:
+            end = max(merged[-1][0] + merged[-1][1], offset + length)
+            merged[-1] = (merged[-1][0], end - merged[-1][0])
+        else:
+            merged.append((offset, length))
+    return merged
+
+
+class Region:
+    """Aygıtın bir bölgesindeki okumaların verimi ve gecikmeleri"""
+
+    def __init__(self, index, start, end):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.bytes = 0
+        self.reads = 0
+        self.first = None
+        self.last = None
+        self.max_latency = 0.0
+        self.outliers = 0
+        self.bad_sectors = 0
+
+    @property
+    def rate(self):
+        if self.first is None or self.last is None or self.last <= self.first:
+            return None
+        return self.bytes / (self.last - self.first)
+
+    def as_dict(self):
+        rate = self.rate
+        return {
+            "region": self.index,
+            "start": self.start,
+            "end": self.end,
+            "mb_s": round(rate / 1e6, 1) if rate is not None else None,
+            "max_latency_ms": round(self.max_latency * 1000),
+            "outliers": self.outliers,
+            "bad_sectors": self.bad_sectors,
+        }
+
+
+class SurfaceScan:
+    """Aygıtı depth okuyucu iş parçacığıyla sırayla okuyan tarayıcı
+
+    Her okuyucunun kendi sayfa hizalı tamponu (anonim mmap) vardır; veri içeriğine
+    bakılmadığı için tampon tüketiciye devredilmez, okuyucu hemen bir sonraki parçayı
+    ister. Böylece depth >= 2 iken aygıtta her zaman bekleyen bir istek olur.
+    """
+
+    def __init__(self, path, chunk=DEFAULT_CHUNK, depth=DEFAULT_DEPTH, regions=REGIONS, faults=()):
+        self.path = path
+        self.chunk = chunk
+        self.depth = max(1, min(depth, MAX_DEPTH))
+        self.region_count = regions
+        self.faults = list(faults)
+        self.fd = None
+        self.direct = False
+        # Kötü blok listesi sadece blok aygıtı için yazılır (open() belirler)
+        self.block_device = False
+        self.size = 0
+        self.sector = SECTOR_SIZE
+        self.disk_offset = 0
+        self.region_size = 0
+        self.regions = []
+        self.bad = []
+        self.scanned = 0
+        self.started = None
+        self.finished = None
+        self.cancelled = False
+        self.stop = threading.Event()
+        self._lock = threading.Lock()
+        self._next = 0
+        self._results = queue.Queue()
+        self._mean_latency = None
+        self._reads = 0
+
+    def open(self):
+        """Aygıtı O_DIRECT ile aç; desteklemeyen dosya sistemindeki imajda tamponlu okumaya düş"""
+        flags = os.O_RDONLY | os.O_CLOEXEC
+        try:
+            self.fd = os.open(self.path, flags | os.O_DIRECT)
+            self.direct = True
+        except OSError as e:
+            if e.errno != errno.EINVAL:
+                raise
+            self.fd = os.open(self.path, flags)
+            os.posix_fadvise(self.fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        st = os.fstat(self.fd)
+        self.size = os.lseek(self.fd, 0, os.SEEK_END)
+        self.block_device = stat.S_ISBLK(st.st_mode)
+        if self.block_device:
+            try:
+                self.sector = struct.unpack("i", fcntl.ioctl(self.fd, BLKSSZGET, b"\0" * 4))[0]
+            except OSError:
+                pass
+        self.disk_offset = _partition_start(st)
+        # Parça sektörün katı olmalı (O_DIRECT); bölgeler parça sınırına hizalanır
+        self.chunk = max(self.sector, self.chunk // self.sector * self.sector)
+        chunks = max(1, -(-self.size // self.chunk))
+        self.region_size = -(-chunks // max(1, min(self.region_count, chunks))) * self.chunk
+        self.regions = [Region(index, start, min(start + self.region_size, self.size))
+                        for index, start in enumerate(range(0, max(self.size, 1), self.region_size))]
+        return self
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def lba(self, offset):
+        """Bayt ofsetini diskteki mantıksal blok adresine çevir"""
+        return (self.disk_offset + offset) // self.sector
+
+    def _read(self, view, length, offset):
+        done = os.preadv(self.fd, [view[:length]], offset)
+        for start, size in self.faults:
+            if start < offset + length and offset < start + size:
+                raise OSError(errno.EIO, "injected fault")
+        if done < length and offset + done < self.size:
+            raise OSError(errno.EIO, "short read")
+        return done
+
+    def _bisect(self, view, offset, length, found):
+        """Okunamayan aralığı ikiye bölerek kötü sektörleri bul (iyi yarılar tek okumada geçer)"""
+        if self.stop.is_set():
+            return
+        try:
+            self._read(view, length, offset)
+            return
+        except OSError:
+            pass
+        if length <= self.sector or len(found) >= MAX_BAD_PER_CHUNK:
+            found.append((offset, length))
+            return
+        half = max(self.sector, length // 2 // self.sector * self.sector)
+        self._bisect(view, offset, half, found)
+        self._bisect(view, offset + half, length - half, found)
+
+    def _reader(self):
+        buffer = mmap.mmap(-1, self.chunk)
+        view = memoryview(buffer)
+        try:
+            while not self.stop.is_set():
+                with self._lock:
+                    offset = self._next
+                    if offset >= self.size:
+                        break
+                    self._next += self.chunk
+                # Son parça da sektörün katı okunur; dosya sonunda kısa okuma normaldir
+                length = -(-min(self.chunk, self.size - offset) // self.sector) * self.sector
+                started = time.monotonic()
+                bad = []
+                try:
+                    self._read(view, length, offset)
+                except OSError:
+                    # İlk deneme geçici hatayı ayıklar: yeniden okunabilen parça kötü sayılmaz
+                    self._bisect(view, offset, length, bad)
+                self._results.put((offset, min(length, self.size - offset), started, time.monotonic(), bad))
+        finally:
+            view.release()
+            buffer.close()
+            self._results.put(None)
+
+    def _account(self, offset, length, started, ended, bad):
+        region = self.regions[offset // self.region_size]
+        latency = ended - started
+        self.scanned += length
+        region.bytes += length
+        region.reads += 1
+        region.first = started if region.first is None else min(region.first, started)
+        region.last = ended if region.last is None else max(region.last, ended)
+        region.max_latency = max(region.max_latency, latency)
+        self._reads += 1
+        if bad:
+            # Hata ayıklaması sürdüğü için bu parçanın gecikmesi aykırı sayılmaz
+            bad = _merge(bad)
+            self.bad.extend(bad)
+            region.bad_sectors += sum(-(-size // self.sector) for _, size in bad)
+            return bad
+        if (self._reads > OUTLIER_WARMUP and latency > OUTLIER_MIN_S
+                and latency > OUTLIER_FACTOR * self._mean_latency):
+            region.outliers += 1
+        elif self._mean_latency is None:
+            self._mean_latency = latency
+        else:
+            self._mean_latency += LATENCY_SMOOTHING * (latency - self._mean_latency)
+        return bad
+
+    def run(self, on_bad=None, on_progress=None):
+        """Taramayı bitene ya da stop ayarlanana kadar sürdür; on_bad(ofset, uzunluk) her kötü aralıkta"""
+        self.started = time.monotonic()
+        readers = [threading.Thread(target=self._reader, daemon=True) for _ in range(self.depth)]
+        for reader in readers:
+            reader.start()
+        alive = len(readers)
+        reported = 0.0
+        while alive:
+            try:
+                item = self._results.get(timeout=PROGRESS_INTERVAL)
+            except queue.Empty:
+                item = False
+            if item is None:
+                alive -= 1
+            elif item:
+                for offset, length in self._account(*item):
+                    if on_bad:
+                        on_bad(offset, length)
+            now = time.monotonic()
+            if on_progress and now - reported >= PROGRESS_INTERVAL:
+                reported = now
+                on_progress(self)
+        for reader in readers:
+            reader.join()
+        self.finished = time.monotonic()
+        self.cancelled = self.stop.is_set() and self.scanned < self.size
+        if on_progress:
+            on_progress(self)
+        return self
+
+    def cancel(self):
+        self.stop.set()
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rate(self):
+        return self.scanned / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def bad_sectors(self):
+        return sum(-(-size // self.sector) for _, size in self.bad)
+
+    def slow_regions(self):
+        """Kötü sektörlü, aykırı gecikmeli ya da verimi ortancanın çok altında kalan bölgeler"""
+        measured = [r for r in self.regions if r.rate and r.reads >= SLOW_REGION_MIN_READS]
+        rates = sorted(r.rate for r in measured)
+        median = rates[len(rates) // 2] if rates else None
+        return [region for region in self.regions
+                if region.bad_sectors or region.outliers
+                or (region in measured and region.rate < SLOW_REGION_RATIO * median)]
+
+    def bad_blocks(self, block_size):
+        """Kötü aralıkların dosya sistemi blok numaraları (e2fsck -l / badblocks -b ile aynı birim)"""
+        blocks = set()
+        for offset, length in self.bad:
+            blocks.update(range(offset // block_size, (offset + length - 1) // block_size + 1))
+        return sorted(blocks)
+
+    def write_bad_blocks(self, info, directory=BADBLOCKS_DIR):
+        """ext2/3/4'te listeyi UUID adıyla yaz; temiz tam taramada eski listeyi sil. Yolu döndürür
+
+        İmaj dosyalarında hiçbir şey yapılmaz: dd/e2image yedeği kaynağın UUID'sini taşır,
+        taraması gerçek aygıtın listesini silmemeli ya da onarıma sahte liste vermemeli.
+        """
+        if (info is None or not info.is_ext or info.fstype == "jbd" or self.cancelled
+                or not self.block_device):
+            return None
+        path = os.path.join(directory, f"{info.uuid}.txt")
+        if not self.bad:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        os.makedirs(directory, mode=0o755, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.writelines(f"{block}\n" for block in self.bad_blocks(info.block_size))
+        os.replace(tmp, path)
+        return path
+
+    def as_dict(self):
+        return {
+            "path": self.path,
+            "size": self.size,
+            "scanned_bytes": self.scanned,
+            "seconds": round(self.elapsed, 3),
+            "mb_s": round(self.rate / 1e6, 1),
+            "direct": self.direct,
+            "chunk": self.chunk,
+            "depth": self.depth,
+            "sector": self.sector,
+            "cancelled": self.cancelled,
+            "unreadable_sectors": self.bad_sectors,
+            "unreadable": [{"lba": self.lba(offset), "sectors": -(-length // self.sector), "offset": offset}
+                           for offset, length in _merge(self.bad)],
+            "slow_regions": [region.as_dict() for region in self.slow_regions()],
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="surfacescan.py",
+                                     description="Read a device or image end to end and report unreadable sectors.")
+    parser.add_argument("path", help="block device, partition or image file")
+    parser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK, help="read size in bytes (default: 4 MiB)")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH,
+                        help="parallel reads in flight (default: %(default)s, double buffering)")
+    parser.add_argument("--progress-fd", type=int, metavar="FD",
+                        help='write "1 scanned total unreadable" progress records to FD (text goes to stderr)')
+    parser.add_argument("--bad-blocks-dir", default=BADBLOCKS_DIR,
+                        help="where the e2fsck -l list is written (default: %(default)s)")
+    parser.add_argument("--no-list", action="store_true", help="do not write or remove the bad block list")
+    parser.add_argument("--inject-fault", type=parse_fault, action="append", default=[], metavar="START:LENGTH",
+                        help="treat this byte range as unreadable (for testing)")
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return fsckreport.EXIT_USAGE if e.code else 0
+    if args.chunk <= 0:
+        parser.print_usage(sys.stderr)
+        return fsckreport.EXIT_USAGE
+    out = sys.stderr if args.progress_fd == 1 else sys.stdout
+    progress = os.fdopen(args.progress_fd, "w", buffering=1) if args.progress_fd is not None else None
+
+    def say(text):
+        print(text, file=out, flush=True)
+
+    scan = SurfaceScan(args.path, args.chunk, args.depth, faults=args.inject_fault)
+    try:
+        scan.open()
+    except OSError as e:
+        say(f"Error: {args.path}: {e.strerror}")
+        return fsckreport.EXIT_OPERATIONAL
+    info = superblock.try_probe(args.path)
+    # SIGTERM (iptal): okuyucular durur, o ana kadarki sonuç yazılır
+    signal.signal(signal.SIGTERM, lambda signum, frame: scan.cancel())
+    signal.signal(signal.SIGINT, lambda signum, frame: scan.cancel())
+    say(f"Surface scan of {args.path}: {scan.size} bytes, sector {scan.sector}, chunk {scan.chunk // 1024} KiB, "
+        f"depth {scan.depth}, {'direct' if scan.direct else 'buffered'} I/O")
+
+    def report_bad(offset, length):
+        say(f"Unreadable: LBA {scan.lba(offset)} (+{-(-length // scan.sector)}) at byte {offset}")
+
+    def report_progress(current):
+        if progress:
+            progress.write(f"1 {current.scanned} {current.size} {current.bad_sectors}\n")
+
+    try:
+        scan.run(report_bad, report_progress)
+    finally:
+        scan.close()
+    for region in scan.slow_regions():
+        rate = region.rate
+        say(f"Slow region {region.index} (bytes {region.start}-{region.end}): "
+            f"{rate / 1e6 if rate else 0:.1f} MB/s, max latency {region.max_latency * 1000:.0f} ms, "
+            f"{region.outliers} outliers, {region.bad_sectors} unreadable sectors")
+    say(f"Scanned {scan.scanned} bytes in {scan.elapsed:.1f} s ({scan.rate / 1e6:.1f} MB/s, "
+        f"{'direct' if scan.direct else 'buffered'} I/O), {scan.bad_sectors} unreadable sectors")
+    if not args.no_list:
+        try:
+            listed = scan.write_bad_blocks(info, args.bad_blocks_dir)
+        except OSError as e:
+            say(f"Error: cannot write bad block list: {e}")
+        else:
+            if listed:
+                say(f"Bad block list: {listed} ({len(scan.bad_blocks(info.block_size))} blocks)")
+    if args.json:
+        print(json.dumps(scan.as_dict(), indent=2))
+    if scan.cancelled:
+        return fsckreport.EXIT_CANCELED
+    return fsckreport.EXIT_UNCORRECTED if scan.bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# Canlı sistemde kontroller için G/Ç önceliği ve cgroup kısıtlama profilleri
+# Komutun başına ionice, nice ve (yetkiliyse) geçici bir systemd kapsamı eklenir;
+# hepsi exec ile zincirlendiği için sürecin PID'i ve rusage değerleri korunur
+import os
+import shutil
+import sys
+
+PROFILE_IDLE = "idle"
+PROFILE_BACKGROUND = "background"
+PROFILE_FULL = "full"
+DEFAULT_PROFILE = PROFILE_BACKGROUND
+
+
+class Profile:
+    """Tek bir kısıtlama profili; None olan ayar uygulanmaz"""
+
+    def __init__(self, name, ionice_class=None, ionice_level=None, nice=0, io_weight=None,
+                 read_bandwidth=None):
+        self.name = name
+        # ionice sınıfı: 2 = best-effort (seviye 0-7), 3 = idle (sadece disk boştayken)
+        self.ionice_class = ionice_class
+        self.ionice_level = ionice_level
+        self.nice = nice
+        # cgroup v2 io.weight (1-10000, varsayılan 100); her zamanlayıcıda geçerlidir
+        self.io_weight = io_weight
+        # cgroup v2 io.max okuma sınırı (systemd biçimi, ör. "20M"); aygıta uygulanır
+        self.read_bandwidth = read_bandwidth
+
+
+PROFILES = {
+    # ionice idle sınıfı sadece BFQ'da geçerlidir; NVMe/mq-deadline için io.max sınırı asıl frendir
+    PROFILE_IDLE: Profile(PROFILE_IDLE, ionice_class=3, nice=19, io_weight=10, read_bandwidth="20M"),
+    PROFILE_BACKGROUND: Profile(PROFILE_BACKGROUND, ionice_class=2, ionice_level=7, nice=10, io_weight=50),
+    PROFILE_FULL: Profile(PROFILE_FULL),
+}
+
+
+def get_profile(name):
+    """Adı profile çevir; bilinmeyen ad ValueError"""
+    if name is None:
+        name = DEFAULT_PROFILE
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown throttle profile: {name}") from None
+
+
+def systemd_available():
+    # Sistem yöneticisi systemd değilse (konteyner, initramfs) systemd-run çalışmaz
+    return os.path.isdir("/run/systemd/system") and shutil.which("systemd-run") is not None
+
+
+def _block_device(target):
+    return target if target and target.startswith("/dev/") else None
+
+
+def wrap(cmd, profile=None, target=None):
+    """Komuta profilin önceliklerini ekle (pkexec öneki korunur)
+
+    Geçici systemd kapsamı sadece komut root olarak çalışacaksa (pkexec ile ya da
+    root iken) kullanılır: kullanıcı yöneticisine io denetleyicisi genelde devredilmez.
+    io.max sınırı yalnızca hedef bir blok aygıtıysa eklenir.
+    """
+    profile = profile if isinstance(profile, Profile) else get_profile(profile)
+    cmd = list(cmd)
+    prefix = []
+    if cmd and cmd[0] == "pkexec":
+        prefix, cmd = cmd[:1], cmd[1:]
+    privileged = bool(prefix) or os.geteuid() == 0
+    wrapper = []
+    if privileged and (profile.io_weight or profile.read_bandwidth) and systemd_available():
+        wrapper += ["systemd-run", "--scope", "--quiet", "--collect"]
+        if profile.io_weight:
+            wrapper.append(f"--property=IOWeight={profile.io_weight}")
+        device = _block_device(target)
+        if profile.read_bandwidth and device:
+            wrapper.append(f"--property=IOReadBandwidthMax={device} {profile.read_bandwidth}")
+    if profile.ionice_class is not None and shutil.which("ionice"):
+        wrapper += ["ionice", "-c", str(profile.ionice_class)]
+        if profile.ionice_level is not None:
+            wrapper += ["-n", str(profile.ionice_level)]
+    if profile.nice and shutil.which("nice"):
+        wrapper += ["nice", "-n", str(profile.nice)]
+    return prefix + wrapper + cmd
+
+
+def throughput(read_bytes_count, seconds):
+    """MB/s cinsinden elde edilen okuma hızı; ölçülemediyse None"""
+    if read_bytes_count is None or not seconds or seconds <= 0:
+        return None
+    return read_bytes_count / seconds / 1e6
+
+
+if __name__ == "__main__":
+    # Kullanım: throttle.py PROFİL KOMUT...   (sarılmış komutu yazdırır)
+    if len(sys.argv) < 3:
+        print("usage: throttle.py {idle|background|full} COMMAND...", file=sys.stderr)
+        sys.exit(2)
+    print(" ".join(wrap(sys.argv[2:], sys.argv[1], sys.argv[-1])))
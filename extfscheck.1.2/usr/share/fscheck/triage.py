@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# Tam kontrolden önce hızlı ön inceleme (triage): süper blok durum/hata alanları ve metadata_csum
+# sağlama toplamları (süper blok, grup tanımlayıcıları, blok/inode bit eşlemleri) doğrulanır.
+# Geçen dosya sisteminde e2fsck hiç başlatılmaz; geçemeyen ya da kontrol zamanı gelen -f ile
+# tam kontrole gider, doğrulanamayan eskisi gibi normal incelemeye gider.
+import json
+import mmap
+import os
+import stat
+import struct
+import sys
+import time
+
+import fsckreport
+import jobengine
+import superblock
+import throttle
+
+try:
+    # python3-crc32c (C uzantısı) varsa bit eşlemleri en hızlı onunla doğrulanır
+    import crc32c as crc32c_ext
+except ImportError:
+    crc32c_ext = None
+try:
+    # Yoksa NumPy ile aynı boydaki bit eşlemleri sütun sütun birlikte işlenir
+    import numpy
+except ImportError:
+    numpy = None
+
+VERDICT_PASSED = "passed"
+VERDICT_FAILED = "failed"
+VERDICT_DUE = "due"
+VERDICT_UNAVAILABLE = "unavailable"
+VERDICTS = (VERDICT_PASSED, VERDICT_FAILED, VERDICT_DUE, VERDICT_UNAVAILABLE)
+# Betik kararı çıkış koduyla bildirir; bunların dışındaki her kod "doğrulanamadı" sayılır
+VERDICT_EXIT = {VERDICT_PASSED: 0, VERDICT_FAILED: 1, VERDICT_DUE: 2, VERDICT_UNAVAILABLE: 3}
+FULL_CHECK_EXITS = (VERDICT_EXIT[VERDICT_FAILED], VERDICT_EXIT[VERDICT_DUE])
+
+# ext4 sağlama toplamı: Castagnoli polinomu (yansıtılmış), son ters çevirme yapılmaz (çekirdek crc32c_le)
+CRC32C_POLY = 0x82F63B78
+CRC_MASK = 0xFFFFFFFF
+EXT_CHECKSUM_TYPE_CRC32C = 1
+EXT_SB_CHECKSUM_OFFSET = 0x3FC
+
+# Grup tanımlayıcısı alanları
+GD_BLOCK_BITMAP_LO = 0x00
+GD_INODE_BITMAP_LO = 0x04
+GD_FLAGS = 0x12
+GD_BLOCK_BITMAP_CSUM_LO = 0x18
+GD_INODE_BITMAP_CSUM_LO = 0x1A
+GD_CHECKSUM = 0x1E
+GD_BLOCK_BITMAP_HI = 0x20
+GD_INODE_BITMAP_HI = 0x24
+GD_BLOCK_BITMAP_CSUM_HI = 0x38
+GD_INODE_BITMAP_CSUM_HI = 0x3A
+# Bit eşlemi sağlama toplamının üst 16 biti tanımlayıcı bu boydan büyükse vardır
+GD_BLOCK_BITMAP_CSUM_HI_END = 0x3A
+GD_INODE_BITMAP_CSUM_HI_END = 0x3C
+BG_INODE_UNINIT = 0x0001
+BG_BLOCK_UNINIT = 0x0002
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+
+# NumPy'de aynı anda işlenen bit eşlemi sayısı (bellek: satır * bit eşlemi boyu)
+BATCH_ROWS = 1024
+# Saf Python arka ucu ~5 MB/s hızındadır: bundan büyük tanımlayıcı + bit eşlemi hesabı yapılmaz,
+# karar "unavailable" olur ve inceleme ön incelemesiz (e2fsck -n) sürer
+PYTHON_MAX_BYTES = 4 * 1024 * 1024
+# Raporda listelenen en fazla uyuşmazlık
+MAX_MISMATCHES = 10
+
+
+def _crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ CRC32C_POLY if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+CRC32C_TABLE = _crc_table()
+
+
+def backend():
+    """Toplu sağlama toplamı hesabında kullanılan arka uç"""
+    if crc32c_ext is not None:
+        return "crc32c"
+    return "numpy" if numpy is not None else "python"
+
+
+def crc32c(seed, data):
+    """Çekirdeğin ext4_chksum'u: seed'den devam eden, son ters çevirmesiz crc32c"""
+    if crc32c_ext is not None:
+        # Uzantı standart (ters çevrilmiş) değerle zincirlenir
+        return ~crc32c_ext.crc32c(bytes(data), ~seed & CRC_MASK) & CRC_MASK
+    crc = seed
+    table = CRC32C_TABLE
+    for byte in bytes(data):
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc
+
+
+def crc32c_many(seeds, rows, length):
+    """Aynı uzunluktaki blokların crc32c'leri; seeds tek bir değer ya da satır başına liste"""
+    if not isinstance(seeds, list):
+        seeds = [seeds] * len(rows)
+    if crc32c_ext is not None or numpy is None or len(rows) < 2:
+        return [crc32c(seed, row) for seed, row in zip(seeds, rows)]
+    table = numpy.array(CRC32C_TABLE, dtype=numpy.uint32)
+    result = []
+    for first in range(0, len(rows), BATCH_ROWS):
+        chunk = rows[first:first + BATCH_ROWS]
+        # Sütunlar bitişik olsun diye devrik kopya: her adımda tüm satırların bir baytı işlenir
+        data = numpy.frombuffer(b"".join(bytes(row) for row in chunk), dtype=numpy.uint8)
+        data = numpy.ascontiguousarray(data.reshape(len(chunk), length).T)
+        crc = numpy.array(seeds[first:first + BATCH_ROWS], dtype=numpy.uint32)
+        for column in data:
+            crc = table[(crc ^ column) & 0xFF] ^ (crc >> 8)
+        result.extend(int(value) for value in crc)
+    return result
+
+
+class Triage:
+    """Ön incelemenin sonucu"""
+
+    def __init__(self, path):
+        self.path = path
+        self.verdict = None
+        self.reason = ""
+        self.fstype = ""
+        self.groups = 0
+        self.descriptors = 0
+        self.bitmaps = 0
+        # (grup, yapı) uyuşmazlıkları; en fazla MAX_MISMATCHES tanesi tutulur
+        self.mismatches = []
+        self.mismatch_count = 0
+        self.backend = backend()
+        # Yavaş arka uçta atlanan doğrulamanın gerekçesi
+        self.skipped = ""
+        self.seconds = 0.0
+
+    @property
+    def full_check(self):
+        return self.verdict in (VERDICT_FAILED, VERDICT_DUE)
+
+    def decide(self, verdict, reason):
+        self.verdict = verdict
+        self.reason = reason
+        return self
+
+    def mismatch(self, group, what):
+        self.mismatch_count += 1
+        if len(self.mismatches) < MAX_MISMATCHES:
+            self.mismatches.append((group, what))
+
+    def describe(self):
+        """fsckreport.TRIAGE_RE'nin ayrıştırdığı karar satırı"""
+        return f"Triage: {self.verdict} ({self.reason})" if self.reason else f"Triage: {self.verdict}"
+
+    def as_dict(self):
+        return {
+            "path": self.path,
+            "verdict": self.verdict,
+            "reason": self.reason,
+            "fstype": self.fstype,
+            "groups": self.groups,
+            "descriptors": self.descriptors,
+            "bitmaps": self.bitmaps,
+            "mismatches": self.mismatch_count,
+            "backend": self.backend,
+            "skipped": self.skipped,
+            "seconds": round(self.seconds, 4),
+        }
+
+
+def _busy(path, st):
+    """Blok aygıtı bağlıysa (O_EXCL EBUSY verir) True; bağlı birimin diskteki bit eşlemleri eskidir"""
+    if not stat.S_ISBLK(st.st_mode):
+        return False
+    try:
+        os.close(os.open(path, os.O_RDONLY | os.O_EXCL | os.O_CLOEXEC))
+    except OSError:
+        return True
+    return False
+
+
+def _state_verdict(result, info, mounted):
+    """Süper blok alanlarından karar; bit eşlemlerine bakmak gerekiyorsa None"""
+    if info is None or not info.is_ext or info.fstype == "jbd":
+        return result.decide(VERDICT_UNAVAILABLE, "not an ext2/3/4 filesystem")
+    if superblock.is_qcow2(info):
+        return result.decide(VERDICT_UNAVAILABLE, "qcow2 container")
+    if mounted:
+        return result.decide(VERDICT_UNAVAILABLE, "mounted")
+    if info.has_errors:
+        return result.decide(VERDICT_FAILED, f"errors recorded in superblock ({info.error_count})")
+    if not info.state & superblock.EXT_STATE_VALID:
+        return result.decide(VERDICT_FAILED, "not cleanly unmounted")
+    if info.state & superblock.EXT_STATE_ORPHAN:
+        return result.decide(VERDICT_FAILED, "orphan inodes pending")
+    if info.feature_incompat & superblock.EXT_INCOMPAT_RECOVER:
+        return result.decide(VERDICT_FAILED, "journal needs recovery")
+    if info.check_due:
+        return result.decide(VERDICT_DUE, "mount count or check interval reached")
+    if not info.feature_ro_compat & superblock.EXT_RO_COMPAT_METADATA_CSUM:
+        return result.decide(VERDICT_UNAVAILABLE, "no metadata checksums")
+    if info.checksum_type != EXT_CHECKSUM_TYPE_CRC32C:
+        return result.decide(VERDICT_UNAVAILABLE, f"unknown checksum type {info.checksum_type}")
+    if info.feature_incompat & superblock.EXT_INCOMPAT_META_BG:
+        # Tanımlayıcılar dağınıktır (membudget.count_dirs gibi okunmaz)
+        return result.decide(VERDICT_UNAVAILABLE, "meta_bg descriptors")
+    if not info.blocks_per_group or not info.inodes_per_group:
+        return result.decide(VERDICT_FAILED, "invalid group geometry")
+    return None
+
+
+def _verify(result, info, image):
+    """image (mmap) üzerinde süper blok, tanımlayıcı ve bit eşlemi sağlama toplamlarını doğrula"""
+    raw = image[superblock.EXT_SUPERBLOCK_OFFSET:superblock.EXT_SUPERBLOCK_OFFSET + superblock.EXT_SUPERBLOCK_SIZE]
+    if crc32c(CRC_MASK, raw[:EXT_SB_CHECKSUM_OFFSET]) != info.checksum:
+        result.mismatch(None, "superblock")
+        return
+    if info.feature_incompat & superblock.EXT_INCOMPAT_CSUM_SEED:
+        seed = info.checksum_seed
+    else:
+        # info.uuid metin biçimidir; ham 16 bayt alanlarda durur
+        seed = crc32c(CRC_MASK, info.fields["uuid"])
+    block_size = info.block_size
+    blocks = info.blocks_count
+    groups = -(-(blocks - info.first_data_block) // info.blocks_per_group)
+    desc_size = 32
+    if info.feature_incompat & superblock.EXT_INCOMPAT_64BIT and info.desc_size >= 64:
+        desc_size = info.desc_size
+    result.groups = groups
+    clusters = info.blocks_per_group
+    if info.feature_ro_compat & superblock.EXT_RO_COMPAT_BIGALLOC:
+        clusters = info.clusters_per_group
+    total = groups * (desc_size + clusters // 8 + info.inodes_per_group // 8)
+    if result.backend == "python" and total > PYTHON_MAX_BYTES:
+        result.skipped = (f"{total >> 20} MiB of checksums, needs python3-numpy or python3-crc32c")
+        return
+    offset = (info.first_data_block + 1) * block_size
+    table = image[offset:offset + groups * desc_size]
+    if len(table) < groups * desc_size:
+        result.mismatch(None, "group descriptor table truncated")
+        return
+
+    # Grup tanımlayıcıları: crc(seed, le32 grup no) ile başlar, checksum alanı sıfır sayılır
+    group_seeds = [crc32c(seed, U32.pack(group)) for group in range(groups)]
+    descriptors = []
+    for group in range(groups):
+        desc = bytearray(table[group * desc_size:(group + 1) * desc_size])
+        desc[GD_CHECKSUM:GD_CHECKSUM + 2] = b"\0\0"
+        descriptors.append(bytes(desc))
+    sums = crc32c_many(group_seeds, descriptors, desc_size)
+    result.descriptors = groups
+    valid = []
+    for group, value in enumerate(sums):
+        if value & 0xFFFF != U16.unpack_from(table, group * desc_size + GD_CHECKSUM)[0]:
+            result.mismatch(group, "group descriptor")
+        else:
+            valid.append(group)
+    if result.mismatch_count:
+        # Bozuk tanımlayıcının gösterdiği bit eşlemi konumlarına güvenilmez
+        return
+
+    checks = (
+        # (ad, boy, konum lo/hi, toplam lo/hi, hi için gereken tanımlayıcı boyu, atlatan bayrak)
+        ("block bitmap", clusters // 8, GD_BLOCK_BITMAP_LO, GD_BLOCK_BITMAP_HI,
+         GD_BLOCK_BITMAP_CSUM_LO, GD_BLOCK_BITMAP_CSUM_HI, GD_BLOCK_BITMAP_CSUM_HI_END, BG_BLOCK_UNINIT),
+        ("inode bitmap", info.inodes_per_group // 8, GD_INODE_BITMAP_LO, GD_INODE_BITMAP_HI,
+         GD_INODE_BITMAP_CSUM_LO, GD_INODE_BITMAP_CSUM_HI, GD_INODE_BITMAP_CSUM_HI_END, BG_INODE_UNINIT),
+    )
+    for name, size, loc_lo, loc_hi, csum_lo, csum_hi, hi_end, uninit in checks:
+        members, rows, expected = [], [], []
+        for group in valid:
+            base = group * desc_size
+            if U16.unpack_from(table, base + GD_FLAGS)[0] & uninit:
+                continue
+            block = U32.unpack_from(table, base + loc_lo)[0]
+            stored = U16.unpack_from(table, base + csum_lo)[0]
+            mask = 0xFFFF
+            if desc_size >= 64:
+                block |= U32.unpack_from(table, base + loc_hi)[0] << 32
+            if desc_size >= hi_end:
+                stored |= U16.unpack_from(table, base + csum_hi)[0] << 16
+                mask = CRC_MASK
+            if not info.first_data_block <= block < blocks:
+                result.mismatch(group, f"{name} location")
+                continue
+            members.append((group, mask, stored))
+            rows.append(image[block * block_size:block * block_size + size])
+        for (group, mask, stored), value in zip(members, crc32c_many(seed, rows, size)):
+            if value & mask != stored:
+                result.mismatch(group, name)
+        result.bitmaps += len(rows)
+
+
+def triage(path):
+    """Yolu ön incelemeden geçir; okunamayan ya da doğrulanamayan hedefte karar "unavailable" """
+    result = Triage(path)
+    started = time.monotonic()
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError as e:
+        return result.decide(VERDICT_UNAVAILABLE, f"not readable: {e.strerror}")
+    try:
+        info = superblock.probe_fd(fd)
+        result.fstype = info.fstype if info else ""
+        if _state_verdict(result, info, _busy(path, os.fstat(fd))):
+            return result
+        size = os.lseek(fd, 0, os.SEEK_END)
+        with mmap.mmap(fd, size, prot=mmap.PROT_READ) as image:
+            _verify(result, info, image)
+        if result.mismatch_count:
+            return result.decide(VERDICT_FAILED, f"checksum mismatches: {result.mismatch_count}")
+        if result.skipped:
+            return result.decide(VERDICT_UNAVAILABLE, f"bitmap checksums skipped: {result.skipped}")
+        return result.decide(VERDICT_PASSED, f"superblock, {result.descriptors} group descriptors and "
+                                             f"{result.bitmaps} bitmaps verified")
+    except (OSError, ValueError) as e:
+        return result.decide(VERDICT_UNAVAILABLE, str(e))
+    finally:
+        os.close(fd)
+        result.seconds = time.monotonic() - started
+
+
+def command(path, profile=None):
+    """Ön incelemeyi ayrı süreçte çalıştıran komut (döngü beklemez, profil uygulanır)"""
+    return throttle.wrap([sys.executable, os.path.abspath(__file__), path], profile, path)
+
+
+class TriageCheck:
+    """Önce ön inceleme, gerekirse check_command(full) ile inceleme
+
+    Ön inceleme geçerse e2fsck başlatılmaz ve iş 0 ile biter; başarısızsa ya da
+    kontrol zamanı geldiyse full=True (e2fsck -f) ile, doğrulanamazsa eskisi gibi
+    incelenir. Okunamayan hedefte (pkexec ile incelenecek aygıt) doğrudan incelemeye geçilir.
+    """
+
+    def __init__(self, engine, path, check_command, on_line=None, on_progress=None, on_exit=None,
+                 progress=jobengine.PROGRESS_NONE, profile=None):
+        self.engine = engine
+        self.path = path
+        self.check_command = check_command
+        self.on_line = on_line
+        self.on_progress = on_progress
+        self.on_exit = on_exit
+        self.progress = progress
+        self.profile = profile
+        self.state = jobengine.ProcessJob.RUNNING
+        self.returncode = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_requested = False
+        self.verdict = None
+        self.triage_s = None
+        self.read_bytes = None
+        self.active_time = 0.0
+        self.resources = None
+        self.peak_rss = None
+        self.current = None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def running(self):
+        return self.started is not None and self.finished is None
+
+    @property
+    def paused(self):
+        return bool(self.current and self.current.paused)
+
+    @property
+    def can_pause(self):
+        return bool(self.current and self.current.can_pause)
+
+    def start(self):
+        self.started = time.monotonic()
+        if not os.access(self.path, os.R_OK):
+            self._line(Triage(self.path).decide(VERDICT_UNAVAILABLE, "not readable").describe())
+            self._check(False)
+            return self
+        self.current = self.engine.spawn(command(self.path, self.profile), on_line=self._line,
+                                         on_exit=self._triaged)
+        return self
+
+    def cancel(self):
+        if not self.running:
+            return False
+        self.cancel_requested = True
+        return self.current.cancel() if self.current else True
+
+    def pause(self):
+        return self.current.pause() if self.current else False
+
+    def resume(self):
+        return self.current.resume() if self.current else False
+
+    def _line(self, line):
+        if line.startswith("Triage: "):
+            self.verdict = line[len("Triage: "):].split(" ", 1)[0]
+        if self.on_line:
+            self.on_line(line)
+
+    def _account(self, proc_job):
+        self.current = None
+        if proc_job.read_bytes is not None:
+            self.read_bytes = (self.read_bytes or 0) + proc_job.read_bytes
+        self.active_time += proc_job.active_time
+        self.resources = jobengine.add_resources(self.resources, proc_job.resources)
+        self.peak_rss = max(self.peak_rss or 0, getattr(proc_job, "peak_rss", None) or 0) or None
+
+    def _triaged(self, proc_job):
+        self._account(proc_job)
+        self.triage_s = round(time.monotonic() - self.started, 3)
+        if self.cancel_requested:
+            self._finish(fsckreport.EXIT_CANCELED, jobengine.ProcessJob.CANCELLED)
+        elif not proc_job.error and proc_job.returncode == VERDICT_EXIT[VERDICT_PASSED]:
+            self._finish(0, jobengine.ProcessJob.DONE)
+        else:
+            self._check(not proc_job.error and proc_job.returncode in FULL_CHECK_EXITS)
+
+    def _check(self, full):
+        self.current = self.engine.spawn(self.check_command(full), progress=self.progress,
+                                         on_line=self.on_line, on_progress=self.on_progress,
+                                         on_exit=self._checked)
+
+    def _checked(self, proc_job):
+        self._account(proc_job)
+        self.error = proc_job.error
+        self._finish(proc_job.returncode, proc_job.state)
+
+    def _finish(self, returncode, state):
+        self.returncode = returncode
+        self.state = state
+        self.finished = time.monotonic()
+        if self.on_exit:
+            self.on_exit(self)
+
+
+if __name__ == "__main__":
+    # Kullanım: triage.py [--json] AYGIT_YA_DA_IMAJ
+    #   Çıkış kodu: 0 geçti, 1 başarısız, 2 kontrol zamanı geldi, 3 doğrulanamadı
+    args = sys.argv[1:]
+    as_json = args[:1] == ["--json"]
+    if as_json:
+        args = args[1:]
+    if len(args) != 1:
+        print("usage: triage.py [--json] DEVICE_OR_IMAGE", file=sys.stderr)
+        sys.exit(fsckreport.EXIT_USAGE)
+    outcome = triage(args[0])
+    if as_json:
+        print(json.dumps(outcome.as_dict(), indent=2))
+    else:
+        for mismatch_group, structure in outcome.mismatches:
+            where = "" if mismatch_group is None else f" in group {mismatch_group}"
+            print(f"Triage mismatch: {structure}{where}")
+        print(outcome.describe())
+    sys.exit(VERDICT_EXIT[outcome.verdict])
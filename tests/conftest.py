@@ -0,0 +1,6 @@
+# Testler uygulama modüllerini kurulum olmadan, paket dizininden içe aktarır
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "extfscheck.1.2", "usr", "share", "fscheck"))
@@ -0,0 +1,39 @@
+# Açılış günlüğü: olaylar /run'daki kuyruğa yazılır, local-fs sonrası kalıcı günlüğe eklenir
+import json
+import os
+
+import pytest
+
+import bootrepair
+
+
+def test_events_are_spooled_and_flushed_in_order(tmp_path):
+    spool = str(tmp_path / "run" / "boot-log.jsonl")
+    logfile = str(tmp_path / "var" / "log" / "fscheck-boot.log")
+    bootrepair.log_event("start", spool, jobs=2)
+    bootrepair.log_event("finish", spool, device="/dev/sda1", returncode=1)
+
+    # /var henüz yok (bağlanmamış): kalıcı günlüğe hiçbir şey yazılmadı
+    assert not os.path.exists(logfile)
+    assert bootrepair.flush_log(spool, logfile) == 2
+    with open(logfile) as f:
+        events = [json.loads(line)["event"] for line in f]
+    assert events == ["start", "finish"]
+    assert not os.path.exists(spool)
+    assert bootrepair.flush_log(spool, logfile) == 0
+
+
+def test_failed_flush_keeps_events_for_the_next_run(tmp_path):
+    spool = str(tmp_path / "boot-log.jsonl")
+    logfile = tmp_path / "fscheck-boot.log"
+    bootrepair.log_event("start", spool)
+    # Yazılamayan günlük (root için de): yol bir dizin
+    logfile.mkdir()
+    with pytest.raises(OSError):
+        bootrepair.flush_log(spool, str(logfile))
+    logfile.rmdir()
+    bootrepair.log_event("summary", spool)
+
+    # Yarım kalan ekleme önce, yeni kuyruk sonra eklenir
+    assert bootrepair.flush_log(spool, str(logfile)) == 2
+    assert [json.loads(line)["event"] for line in logfile.read_text().splitlines()] == ["start", "summary"]
@@ -0,0 +1,63 @@
+# lsblk --json --list çıktısından aygıt listesi: LVM birimleri listelenir, geçici anlık görüntüler listelenmez
+import json
+
+import devices
+
+ROWS = [
+    {"name": "sda", "path": "/dev/sda", "type": "disk", "fstype": None, "mountpoint": None,
+     "size": 500107862016, "pkname": None, "rota": True},
+    {"name": "sda1", "path": "/dev/sda1", "type": "part", "fstype": "ext4", "mountpoint": "/boot",
+     "size": 1073741824, "uuid": "6f1c0a52-0c3e-4f55-8d7e-0a9e4b1f2c11", "pkname": "sda", "rota": True},
+    {"name": "sda2", "path": "/dev/sda2", "type": "part", "fstype": "LVM2_member", "mountpoint": None,
+     "size": 499032023040, "pkname": "sda", "rota": True},
+    {"name": "vg0-root", "path": "/dev/mapper/vg0-root", "type": "lvm", "fstype": "ext4", "mountpoint": "/",
+     "size": 107374182400, "uuid": "0b3a6c1e-5d2f-4e7a-9c11-2f4d6e8a0b1c", "pkname": "sda2", "rota": True},
+    {"name": "vg0-data", "path": "/dev/mapper/vg0-data", "type": "lvm", "fstype": "ext4", "mountpoint": None,
+     "size": 214748364800, "pkname": "sda2", "rota": True},
+    {"name": "vg0-fscheck--snap--root", "path": "/dev/mapper/vg0-fscheck--snap--root", "type": "lvm",
+     "fstype": "ext4", "mountpoint": None, "size": 107374182400, "pkname": "sda2", "rota": True},
+    {"name": "vg0-swap", "path": "/dev/mapper/vg0-swap", "type": "lvm", "fstype": "swap", "mountpoint": "[SWAP]",
+     "size": 8589934592, "pkname": "sda2", "rota": True},
+]
+
+
+def supported(rows, system_devices=()):
+    found = devices.parse_lsblk(json.dumps({"blockdevices": rows}), system_devices)
+    return {dev.path: dev for dev in found if dev.is_supported()}
+
+
+def test_lvm_volume_reaches_device_list_with_snapshot_option():
+    listed = supported(ROWS)
+
+    assert sorted(listed) == ["/dev/mapper/vg0-data", "/dev/mapper/vg0-root", "/dev/sda1"]
+    root = listed["/dev/mapper/vg0-root"]
+    assert root.type == "lvm" and root.is_system
+    # Bağlı LV anlık görüntüyle incelenir; bağlı olmayan LV ve bölüm doğrudan incelenir
+    assert root.snapshot_capable
+    assert not listed["/dev/mapper/vg0-data"].snapshot_capable
+    assert not listed["/dev/sda1"].snapshot_capable
+
+
+def test_temporary_snapshot_is_not_listed():
+    assert "/dev/mapper/vg0-fscheck--snap--root" not in supported(ROWS)
+
+
+def test_nested_children_keep_lsblk_order():
+    tree = [
+        {"name": "sda", "type": "disk", "children": [
+            {"name": "sda1", "type": "part"},
+            {"name": "sda2", "type": "part", "children": [{"name": "vg0-root", "type": "lvm"}]},
+        ]},
+        {"name": "sdb", "type": "disk", "children": [{"name": "sdb1", "type": "part"}]},
+    ]
+    found = devices.parse_lsblk(json.dumps({"blockdevices": tree}))
+
+    assert [dev.name for dev in found] == ["sda", "sda1", "sda2", "vg0-root", "sdb", "sdb1"]
+
+
+def test_many_devices_parse_in_linear_time():
+    # Çok aygıtlı sunucular (ör. 20000 bölüm): listenin başından çıkarmak karesel maliyet getirirdi
+    rows = [{"name": f"sd{i}", "type": "part", "fstype": "ext4", "size": 1} for i in range(20000)]
+    found = devices.parse_lsblk(json.dumps({"blockdevices": rows}))
+
+    assert [dev.name for dev in found] == [row["name"] for row in rows]
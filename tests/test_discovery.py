@@ -0,0 +1,160 @@
+# Kaydedilmiş `udevadm monitor --kernel --property` çıktısı oynatılır: eklenen, değişen, kaldırılan ve
+# yeniden eklenen aygıtlar için DeviceChanges kümeleri ve DeviceTable.update(scope=...) olayları
+import os
+
+import devices
+import discovery
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+USB_STICK = os.path.join(DATA, "uevents-usb-stick.txt")
+
+
+def changes_of(batch):
+    return batch.changed, batch.removed
+
+
+def test_load_recorded_events():
+    events = discovery.load_recorded_events(USB_STICK)
+    assert [event["SEQNUM"] for event in events] == ["4410", "4431", "4432", "4433", "4440", "4451", "4452",
+                                                     "4470", "4471"]
+    assert events[2]["ACTION"] == "add"
+    assert events[2]["DEVTYPE"] == "partition"
+    assert discovery.event_devname(events[2]) == "sdb1"
+    # DEVNAME olmayan olaylarda ad DEVPATH'ten alınır
+    assert discovery.event_devname(events[3]) == "8:16"
+
+
+def test_replay_event_by_event():
+    results = discovery.replay(USB_STICK, batch_size=1)
+    assert [changes_of(batch) for batch in results] == [
+        (set(), set()),  # usb alt sistemi yok sayılır
+        ({"sdb"}, set()),
+        ({"sdb1"}, set()),
+        (set(), set()),  # bdi
+        ({"sdb1"}, set()),  # change
+        (set(), {"sdb1"}),
+        (set(), {"sdb"}),
+        ({"sdb"}, set()),  # yeniden ekleme
+        ({"sdb1"}, set()),
+    ]
+    assert not results[0] and not results[3]
+    assert not any(batch.mounts_changed for batch in results)
+
+
+def test_replay_batches_coalesce():
+    # Aynı grupta kaldırılıp yeniden eklenen aygıt değişmiş sayılır, kaldırılmış değil
+    whole, = discovery.replay(USB_STICK)
+    assert changes_of(whole) == ({"sdb", "sdb1"}, set())
+
+    first, second = discovery.replay(USB_STICK, batch_size=6)
+    assert changes_of(first) == ({"sdb"}, {"sdb1"})
+    assert changes_of(second) == ({"sdb", "sdb1"}, set())
+    first.merge(second)
+    assert changes_of(first) == changes_of(whole)
+
+
+def test_remove_then_readd_within_batch():
+    changes = discovery.DeviceChanges()
+    changes.add_event({"ACTION": "add", "SUBSYSTEM": "block", "DEVNAME": "/dev/sdc1"})
+    changes.add_event({"ACTION": "remove", "SUBSYSTEM": "block", "DEVNAME": "/dev/sdc1"})
+    assert changes_of(changes) == (set(), {"sdc1"})
+    changes.add_event({"ACTION": "add", "SUBSYSTEM": "block", "DEVNAME": "/dev/sdc1"})
+    assert changes_of(changes) == ({"sdc1"}, set())
+
+
+class FakeKernel:
+    """Olaylara göre hangi aygıtların var olduğunu tutan, lsblk yerine geçen benzetim"""
+
+    def __init__(self):
+        self.present = set()
+        # change olayı etiketi değiştirir (ör. e2label)
+        self.labels = {"sdb1": "STICK"}
+
+    def apply(self, events):
+        for event in events:
+            if event.get("SUBSYSTEM") != "block":
+                continue
+            name = discovery.event_devname(event)
+            if event["ACTION"] == "remove":
+                self.present.discard(name)
+            else:
+                self.present.add(name)
+                if event["ACTION"] == "change":
+                    self.labels[name] = "BACKUP"
+
+    def lsblk(self, scope):
+        found = []
+        for name in sorted(self.present):
+            pkname = "sdb" if name == "sdb1" else ""
+            if name not in scope and pkname not in scope:
+                continue
+            if name == "sdb":
+                found.append(devices.Device("sdb", type="disk", size=8 << 30))
+            else:
+                found.append(devices.Device(name, type="part", fstype="ext4", size=8 << 30, pkname=pkname,
+                                            label=self.labels[name], uuid="5a1d5e66-0c1e-4b53-9f0e-1d2c3b4a5f60"))
+        return found
+
+
+def test_device_table_scoped_updates():
+    system = devices.Device("sda2", type="part", fstype="ext4", size=64 << 30, pkname="sda",
+                            mountpoint="/", is_system=True)
+    table = devices.DeviceTable()
+    assert table.update([system]) == [("add", system)]
+
+    kernel = FakeKernel()
+    source = discovery.ReplaySource.from_file(USB_STICK)
+    steps = []
+    while not source.done():
+        events = source.read_events(1)
+        kernel.apply(events)
+        changes = discovery.DeviceChanges()
+        for event in events:
+            changes.add_event(event)
+        if not changes:
+            continue
+        scope = changes.changed | changes.removed
+        steps.append([(kind, dev.name, dev.label) for kind, dev in table.update(kernel.lsblk(scope), scope)])
+
+    assert steps == [
+        [],  # sdb: dosya sistemi yok, tabloya girmez
+        [("add", "sdb1", "STICK")],
+        [("change", "sdb1", "BACKUP")],
+        [("remove", "sdb1", "BACKUP")],
+        [],
+        [],
+        [("add", "sdb1", "BACKUP")],
+    ]
+    # Kapsam dışındaki sistem diski hiç yeniden değerlendirilmez
+    assert table.paths() == ["/dev/sda2", "/dev/sdb1"]
+    assert table.get("/dev/sda2") is system
+
+
+def test_parent_scope_removes_partitions():
+    table = devices.DeviceTable()
+    part = devices.Device("sdb1", type="part", fstype="btrfs", size=1 << 30, pkname="sdb")
+    table.update([part])
+    assert table.update([], scope={"sdb"}) == [("remove", part)]
+    assert len(table) == 0
+
+
+MOUNTINFO = ("22 1 254:0 / / rw,relatime shared:1 - ext4 /dev/vda rw\n"
+             "{extra}")
+STICK_MOUNT = "61 22 8:17 / /media/user/STICK rw,nosuid,nodev,relatime shared:40 - ext4 /dev/sdb1 rw\n"
+
+
+def test_mount_watcher_reports_changed_devices(tmp_path):
+    path = tmp_path / "mountinfo"
+    path.write_text(MOUNTINFO.format(extra=""))
+    watcher = discovery.MountWatcher(str(path))
+    try:
+        path.write_text(MOUNTINFO.format(extra=STICK_MOUNT))
+        assert watcher.changed_devices() == {"sdb1"}
+        assert watcher.changed_devices() == set()
+        path.write_text(MOUNTINFO.format(extra=""))
+        assert watcher.changed_devices() == {"sdb1"}
+    finally:
+        watcher.close()
+    path.write_text(MOUNTINFO.format(extra=STICK_MOUNT))
+    assert discovery.read_mount_table(str(path)) == {"vda": {"/"}, "sdb1": {"/media/user/STICK"}}
+    assert discovery.read_mount_table(str(path), with_options=True)["sdb1"] == {"/media/user/STICK": "rw,nosuid,nodev,relatime"}
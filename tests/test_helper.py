@@ -0,0 +1,116 @@
+# Yardımcı: istek doğrulaması ve uçtan uca inceleme, geçici soket üzerinde iş parçacığında çalışan sunucuyla
+# Test kipi yetkisiz çalışır ve sadece imaj dosyalarını kabul eder; device_only reddi test kipi dışında denenir
+import gzip
+import os
+import shutil
+import threading
+
+import pytest
+
+import helper
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+# Yanıt gelmezse test askıda kalmasın
+WAIT = 60
+
+
+@pytest.fixture
+def image(tmp_path):
+    """tests/data'daki temiz ext4 imajı (2 MiB, 1 KiB blok)"""
+    path = tmp_path / "ext4-clean.img"
+    with gzip.open(os.path.join(DATA, "ext4-clean.img.gz")) as src, open(path, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    return str(path)
+
+
+def start_server(socket_path, test_mode):
+    server = helper.HelperServer(socket_path, os.getuid(), test_mode=test_mode)
+    server.bind()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = helper.HelperClient(socket_path)
+    return server, thread, client
+
+
+def stop_server(thread, client):
+    run(client, "shutdown")
+    client.close()
+    thread.join(WAIT)
+    assert not thread.is_alive()
+
+
+@pytest.fixture
+def client(tmp_path):
+    server, thread, client = start_server(str(tmp_path / "helper.sock"), True)
+    yield client
+    stop_server(thread, client)
+
+
+@pytest.fixture
+def device_client(tmp_path):
+    """Test kipi dışındaki sunucu: imaj dosyalarını bağlama, ayırma ve onarımda reddetmeli"""
+    server, thread, client = start_server(str(tmp_path / "helper-device.sock"), False)
+    yield client
+    stop_server(thread, client)
+
+
+def run(client, op, **args):
+    """İşi çalıştır, bitişini bekle; (iş, satırlar, ilerleme satırları)"""
+    finished = threading.Event()
+    lines, progress = [], []
+    job = client.spawn(op, lines.append, progress.append, lambda job: finished.set(), **args)
+    assert finished.wait(WAIT), f"{op} did not finish"
+    return job, lines, progress
+
+
+def test_ping_reports_test_mode(client):
+    job, lines, _ = run(client, "ping")
+
+    assert job.returncode == 0
+    assert lines == [f"uid={os.getuid()} test_mode=True"]
+
+
+def test_relative_path_is_refused(client, image):
+    job, _, _ = run(client, "examine", path=os.path.relpath(image), fstype="ext4")
+
+    assert job.error == "Path must be absolute"
+
+
+def test_fstype_mismatch_is_refused(client, image):
+    job, _, _ = run(client, "examine", path=image, fstype="btrfs")
+
+    assert job.error == f"Filesystem on {image} is ext4, not btrfs"
+
+
+def test_unknown_fstype_is_refused(client, image):
+    job, _, _ = run(client, "examine", path=image, fstype="xfs")
+
+    assert job.error == "Unsupported filesystem: xfs"
+
+
+@pytest.mark.parametrize("op", ["unmount", "remount"])
+def test_mount_operations_are_refused_in_test_mode(client, image, op):
+    job, _, _ = run(client, op, path=image, fstype="ext4", mountpoint="/mnt")
+
+    assert job.error in ("Unmounting is not available in test mode", "Mounting is not available in test mode")
+
+
+@pytest.mark.parametrize("op", ["repair", "unmount", "remount"])
+def test_image_files_are_refused_for_device_only_operations(device_client, image, op):
+    job, _, _ = run(device_client, op, path=image, fstype="ext4", mountpoint="/mnt", unmount=True)
+
+    assert job.error == "Only block devices can be mounted, unmounted or repaired"
+    # İmaj değişmeden kalır
+    with gzip.open(os.path.join(DATA, "ext4-clean.img.gz")) as src, open(image, "rb") as current:
+        assert current.read() == src.read()
+
+
+@pytest.mark.skipif(not os.path.exists("/sbin/e2fsck"), reason="e2fsprogs not installed")
+def test_examine_image_end_to_end(client, image):
+    job, lines, progress = run(client, "examine", path=image, fstype="ext4")
+
+    assert job.error is None
+    assert job.returncode == 0
+    assert any("fscheck-test: clean" in line for line in lines)
+    # Çıkış olayı yardımcının ölçtüğü G/Ç ve bellek kararını taşır
+    assert job.memory is not None
@@ -0,0 +1,113 @@
+# Çıktı hattı stres testi: bir iş parçacığından 1M satır; teslim hızı sınırda, tampon sınırlı, sayaçlar tutarlı
+import heapq
+import re
+import threading
+import time
+
+import outputpipe
+
+LINES = 1000000
+CAPACITY = 1000
+SKIPPED_RE = re.compile(r"^\.\.\. (\d+) lines skipped \.\.\.$")
+# Zamanlayıcı ve time.monotonic çözünürlüğü için pay (saniye)
+SLACK = 0.002
+
+
+class FakeMainLoop:
+    """GLib.timeout_add benzeri zamanlayıcı; geri çağrılar test iş parçacığında çalışır"""
+
+    def __init__(self):
+        self.timers = []
+        self.lock = threading.Lock()
+        self.counter = 0
+
+    def timeout_add(self, delay_ms, callback):
+        with self.lock:
+            self.counter += 1
+            heapq.heappush(self.timers, (time.monotonic() + delay_ms / 1000.0, self.counter, callback))
+
+    def run_until(self, done):
+        while True:
+            with self.lock:
+                item = self.timers[0] if self.timers else None
+            if item is None:
+                if done.is_set():
+                    return
+                time.sleep(0.001)
+                continue
+            if item[0] > time.monotonic():
+                time.sleep(min(0.005, item[0] - time.monotonic()))
+                continue
+            with self.lock:
+                heapq.heappop(self.timers)
+            item[2]()
+
+
+def stress(pipe, loop):
+    done = threading.Event()
+
+    def producer():
+        for i in range(LINES):
+            pipe.push(f"Inode {i} has illegal block(s).  Clear? no")
+        done.set()
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    loop.run_until(done)
+    thread.join()
+    # Son planlanan teslimat döngüde çalıştı; kalan olmamalı
+    assert pipe.stats()["backlog"] == 0
+
+
+def assert_rate_capped(flush_times, max_rate=outputpipe.DEFAULT_RATE):
+    """Ardışık iki teslimat arasında en az 1/max_rate saniye var"""
+    gaps = [b - a for a, b in zip(flush_times, flush_times[1:])]
+    assert gaps and min(gaps) >= 1.0 / max_rate - SLACK
+
+
+def test_million_lines_are_rate_limited_bounded_and_counted():
+    loop = FakeMainLoop()
+    flush_times = []
+    received = []
+
+    def deliver(text):
+        flush_times.append(time.monotonic())
+        received.extend(text.splitlines())
+
+    pipe = outputpipe.OutputPipe(deliver, loop.timeout_add, capacity=CAPACITY)
+    stress(pipe, loop)
+    stats = pipe.stats()
+
+    assert_rate_capped(flush_times)
+    # Halka tampon kapasiteyi hiç aşmadı; üretici tüketiciden hızlı olduğu için satır atıldı
+    assert stats["max_backlog"] <= CAPACITY
+    assert stats["max_batch"] <= CAPACITY
+    assert stats["dropped"] > 0
+    # Teslim edilen ve atlanan satırlar gönderilenlerin tamamı
+    assert stats["pushed"] == LINES
+    assert stats["delivered"] + stats["dropped"] == LINES
+    assert stats["batches"] == len(flush_times)
+    skipped = [int(m.group(1)) for m in map(SKIPPED_RE.match, received) if m]
+    lines = [line for line in received if not SKIPPED_RE.match(line)]
+    assert sum(skipped) == stats["dropped"]
+    assert len(lines) == stats["delivered"]
+    # Atlanan satırlar en eskilerdir: teslim edilenler sıralı kalır ve son satır kaybolmaz
+    numbers = [int(line.split()[1]) for line in lines]
+    assert numbers == sorted(numbers)
+    assert numbers[-1] == LINES - 1
+
+
+def test_million_lines_notify_only_coalesces_without_buffering():
+    loop = FakeMainLoop()
+    flush_times = []
+    pipe = outputpipe.OutputPipe(lambda: flush_times.append(time.monotonic()), loop.timeout_add,
+                                 capacity=CAPACITY, notify_only=True)
+    stress(pipe, loop)
+    stats = pipe.stats()
+
+    assert_rate_capped(flush_times)
+    # Satırlar tamponlanmaz: hiçbiri atılmaz, hepsi bildirimlerde birleştirilmiş sayılır
+    assert len(pipe.lines) == 0
+    assert stats["dropped"] == 0
+    assert stats["pushed"] == stats["delivered"] == LINES
+    assert stats["batches"] == len(flush_times) < LINES
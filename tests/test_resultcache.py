@@ -0,0 +1,50 @@
+# Sonuç önbelleği: parmak izi eşleşmesi, bağlı dosya sistemlerinde atlama ve yardımcıdan gelen süper blok
+import shutil
+import subprocess
+
+import pytest
+
+import resultcache
+import superblock
+
+pytestmark = pytest.mark.skipif(not shutil.which("mke2fs"), reason="e2fsprogs not installed")
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "fs.img"
+    with open(path, "wb") as f:
+        f.truncate(16 * 1024 * 1024)
+    subprocess.run(["mke2fs", "-q", "-F", "-t", "ext4", str(path)], check=True, capture_output=True)
+    return str(path)
+
+
+def test_lookup_matches_until_written(tmp_path, image):
+    cache = resultcache.ResultCache(str(tmp_path / "cache.json"))
+    info = superblock.probe(image)
+    cache.store(info, 0, ["clean"], "ok")
+    assert cache.lookup(superblock.probe(image))["returncode"] == 0
+    # Kalıcı: yeniden yüklenen önbellek de aynı kaydı verir
+    assert resultcache.ResultCache(cache.path).lookup(info)["output"] == ["clean"]
+    subprocess.run(["debugfs", "-w", "-R", "mkdir newdir", image], check=True, capture_output=True)
+    assert cache.lookup(superblock.probe(image)) is None
+
+
+def test_mounted_filesystem_is_not_cached(tmp_path, image):
+    cache = resultcache.ResultCache(str(tmp_path / "cache.json"))
+    info = superblock.probe(image)
+    cache.store(info, 0, mounted=True)
+    assert cache.lookup(info) is None
+    cache.store(info, 0)
+    assert cache.lookup(info, mounted=True) is None
+    assert cache.lookup(info) is not None
+
+
+def test_helper_superblock_round_trip(image):
+    # Yardımcı süper bloğu as_dict olarak gönderir; parmak izi doğrudan okunanla aynı olmalıdır
+    info = superblock.probe(image)
+    copy = superblock.SuperblockInfo.from_dict(info.as_dict())
+    assert (copy.fstype, copy.uuid, copy.size, copy.block_size) == (info.fstype, info.uuid, info.size,
+                                                                   info.block_size)
+    assert resultcache.fingerprint(copy) == resultcache.fingerprint(info)
+    assert copy.is_clean and copy.blocks_per_group == info.blocks_per_group
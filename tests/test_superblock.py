@@ -0,0 +1,116 @@
+# superblock.probe alanları mke2fs/mkfs.btrfs ile oluşturulan küçük imajlarda dumpe2fs -h ile karşılaştırılır
+import shutil
+import subprocess
+
+import pytest
+
+import superblock
+
+UUID = "0b3a6c1e-5d2f-4e7a-9c11-2f4d6e8a0b1c"
+LABEL = "fscheck-test"
+
+needs_mke2fs = pytest.mark.skipif(not shutil.which("mke2fs") or not shutil.which("dumpe2fs"),
+                                  reason="e2fsprogs not installed")
+needs_btrfs = pytest.mark.skipif(not shutil.which("mkfs.btrfs"), reason="mkfs.btrfs not installed")
+
+
+def make_image(tmp_path, size_mb=16):
+    path = tmp_path / "fs.img"
+    with open(path, "wb") as f:
+        f.truncate(size_mb * 1024 * 1024)
+    return str(path)
+
+
+def mke2fs(path, fstype, *options):
+    subprocess.run(["mke2fs", "-q", "-F", "-t", fstype, "-L", LABEL, "-U", UUID, *options, path],
+                   check=True, capture_output=True)
+
+
+def dumpe2fs(path):
+    """dumpe2fs -h çıktısı: "Alan adı: değer" satırlarından sözlük"""
+    out = subprocess.run(["dumpe2fs", "-h", path], check=True, capture_output=True, text=True).stdout
+    fields = {}
+    for line in out.splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip()] = value.strip()
+    return fields
+
+
+@needs_mke2fs
+@pytest.mark.parametrize("fstype, options", [
+    ("ext2", []),
+    ("ext3", []),
+    ("ext4", []),
+    ("ext4", ["-b", "1024", "-O", "^metadata_csum"]),
+    ("ext4", ["-O", "64bit,metadata_csum", "-I", "128"]),
+])
+def test_ext_fields_match_dumpe2fs(tmp_path, fstype, options):
+    path = make_image(tmp_path)
+    mke2fs(path, fstype, *options)
+    expected = dumpe2fs(path)
+    info = superblock.probe(path)
+
+    assert info.fstype == fstype
+    assert info.is_ext
+    assert info.uuid == expected["Filesystem UUID"]
+    assert info.label == expected["Filesystem volume name"]
+    assert info.block_size == int(expected["Block size"])
+    assert info.blocks_count == int(expected["Block count"])
+    assert info.size == int(expected["Block count"]) * int(expected["Block size"])
+    assert info.free_blocks_count == int(expected["Free blocks"])
+    assert info.free_inodes_count == int(expected["Free inodes"])
+    assert info.inodes_count == int(expected["Inode count"])
+    assert info.blocks_per_group == int(expected["Blocks per group"])
+    assert info.inodes_per_group == int(expected["Inodes per group"])
+    assert info.inode_size == int(expected["Inode size"])
+    assert info.mnt_count == int(expected["Mount count"])
+    assert info.max_mnt_count == int(expected["Maximum mount count"])
+    features = expected["Filesystem features"].split()
+    assert bool(info.feature_compat & superblock.EXT_COMPAT_HAS_JOURNAL) == ("has_journal" in features)
+    assert bool(info.feature_incompat & superblock.EXT_INCOMPAT_64BIT) == ("64bit" in features)
+    assert bool(info.feature_ro_compat & superblock.EXT_RO_COMPAT_METADATA_CSUM) == ("metadata_csum" in features)
+    assert expected["Filesystem state"] == "clean"
+    assert info.is_clean and not info.has_errors
+
+
+@needs_mke2fs
+def test_ext_state_and_error_fields(tmp_path):
+    path = make_image(tmp_path)
+    mke2fs(path, "ext4")
+    subprocess.run(["debugfs", "-w", "-R", "ssv state 3", path], check=True, capture_output=True)
+    info = superblock.probe(path)
+    assert "with errors" in dumpe2fs(path)["Filesystem state"]
+    assert not info.is_clean
+    assert info.has_errors
+
+
+@needs_mke2fs
+def test_qcow2_container(tmp_path):
+    path = make_image(tmp_path)
+    mke2fs(path, "ext4")
+    qcow2 = str(tmp_path / "fs.qcow2")
+    subprocess.run(["e2image", "-Q", path, qcow2], check=True, capture_output=True)
+    info = superblock.probe(qcow2)
+    assert superblock.is_qcow2(info)
+    assert info.uuid == UUID
+    assert info.blocks_count == int(dumpe2fs(path)["Block count"])
+
+
+@needs_btrfs
+def test_btrfs_fields(tmp_path):
+    path = make_image(tmp_path, 128)
+    subprocess.run(["mkfs.btrfs", "-q", "-f", "-L", LABEL, "-U", UUID, path], check=True, capture_output=True)
+    info = superblock.probe(path)
+    assert info.fstype == "btrfs"
+    assert info.uuid == UUID
+    assert info.label == LABEL
+    assert info.size == 128 * 1024 * 1024
+    assert info.num_devices == 1
+    assert info.is_clean and not info.is_ext
+
+
+def test_unknown_filesystem(tmp_path):
+    path = make_image(tmp_path, 1)
+    assert superblock.probe(path) is None
+    assert superblock.try_probe(str(tmp_path / "missing.img")) is None
@@ -0,0 +1,68 @@
+# Yüzey taraması: imaj dosyası taranırken kötü blok listesi dizinine (BADBLOCKS_DIR) hiç dokunulmaz
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import fsckreport
+import surfacescan
+
+UUID = "0b3a6c1e-5d2f-4e7a-9c11-2f4d6e8a0b1c"
+
+needs_mke2fs = pytest.mark.skipif(not shutil.which("mke2fs"), reason="e2fsprogs not installed")
+
+
+@pytest.fixture
+def image(tmp_path):
+    """Gerçek bir aygıtın dd yedeği gibi: kaynağın UUID'sini taşıyan ext4 imajı"""
+    path = tmp_path / "backup.img"
+    with open(path, "wb") as f:
+        f.truncate(16 * 1024 * 1024)
+    subprocess.run(["mke2fs", "-q", "-F", "-t", "ext4", "-U", UUID, str(path)], check=True, capture_output=True)
+    return str(path)
+
+
+@pytest.fixture
+def badblocks_dir(tmp_path):
+    """Gerçek aygıt için daha önce yazılmış liste"""
+    directory = tmp_path / "badblocks"
+    directory.mkdir()
+    (directory / f"{UUID}.txt").write_text("1234\n")
+    return directory
+
+
+def snapshot(directory):
+    return {name: (directory / name).read_text() for name in sorted(os.listdir(directory))}
+
+
+@needs_mke2fs
+@pytest.mark.parametrize("faults", [[], ["--inject-fault", "8192:4096"]], ids=["clean", "unreadable"])
+def test_image_scan_never_touches_bad_block_list(image, badblocks_dir, faults):
+    before = snapshot(badblocks_dir)
+    returncode = surfacescan.main([image, "--bad-blocks-dir", str(badblocks_dir)] + faults)
+
+    assert returncode == (fsckreport.EXIT_UNCORRECTED if faults else 0)
+    # Temiz tarama aygıtın listesini silmez, kötü bölgeli imaj yeni liste yazmaz
+    assert snapshot(badblocks_dir) == before
+
+
+@needs_mke2fs
+def test_write_bad_blocks_ignores_image_files(image, badblocks_dir):
+    scan = surfacescan.SurfaceScan(image, faults=[(8192, 4096)])
+    scan.open()
+    try:
+        scan.run(lambda offset, length: None, lambda current: None)
+    finally:
+        scan.close()
+
+    assert scan.bad and not scan.block_device
+    assert scan.write_bad_blocks(surfacescan.superblock.probe(image), str(badblocks_dir)) is None
+    assert snapshot(badblocks_dir) == {f"{UUID}.txt": "1234\n"}
+
+
+def test_command_disables_list_for_image_files(tmp_path):
+    path = tmp_path / "disk.img"
+    path.write_bytes(b"\0" * 4096)
+
+    assert "--no-list" in surfacescan.command(str(path), prefix=[])